@@ -52,13 +52,21 @@ NCF_PARAMS = {
     "dropout": 0.3,                 # Dropout dikurangi sedikit
     "weight_decay": 5e-4,           # Regularisasi sedikit dikurangi
     "patience": 7,                  # Patience ditingkatkan
-    "negative_ratio": 3             # Lebih banyak negative samples
+    "negative_ratio": 3,            # Lebih banyak negative samples
+    "inference_batch_pairs": 262144, # Maks pasangan (user, item) per forward pass batch inference
+    "serving_cache": True,          # Precompute embedding tower user/item untuk inference cepat
+    "resample_negatives": False,    # Negatives baru setiap epoch (bukan set yang sama)
+    "background_resampling": False  # Siapkan negatives epoch berikutnya di background thread
 }
 
 # Feature-Enhanced CF - OPTIMIZED SETTINGS
 FECF_PARAMS = {
     "no_components": 64,            # Ditingkatkan dari 48
-    "content_alpha": 0.55           # Lebih seimbang antara collaborative dan content features
+    "content_alpha": 0.55,          # Lebih seimbang antara collaborative dan content features
+    "blend_block_size": 1024,       # Baris per blok saat blending content similarity (0 = sekaligus)
+    "neighbor_k": 0,                # Top-K neighbour index per item (0 = dense matrix N x N)
+    "batch_block_size": 256,        # User per blok pada recommend_for_users (batch scoring)
+    "fold_in_max_users": 10000      # Maks user hasil fold-in online yang disimpan (LRU)
 }
 
 # Hybrid Model - BALANCED ADAPTIVE SETTINGS (UPDATED)
@@ -79,6 +87,34 @@ HYBRID_PARAMS = {
     "min_ncf_interactions": 20,     # Minimal interactions untuk NCF
 }
 
+# Artifact model: array besar (similarity, neighbour index, bobot NCF) disimpan sebagai .npy
+# di <nama_model>_arrays/ dan dibuka read-only dengan mmap, satu salinan fisik untuk semua worker
+MODEL_ARTIFACTS_CONFIG = {
+    "mmap": True,                   # False = np.load biasa (salinan per proses)
+    "split_arrays": True,           # save_model menulis array ke .npy, bukan ke dalam pickle
+}
+
+# Model registry: versi model (manifest per file hasil training) dan hot-swap di API
+MODEL_REGISTRY_CONFIG = {
+    "directory": os.path.join(MODELS_DIR, "registry"),
+    "auto_discover": True,          # File model baru di MODELS_DIR otomatis didaftarkan
+    "warm_users": 32,               # Sample user untuk warm-up sebelum swap (0 = tanpa warm-up)
+    "warm_n": 10,
+    "keep_previous": 1,             # Versi lama yang tetap di memori untuk rollback instan
+}
+
+# Materialized top-N (python main.py materialize), dilayani langsung oleh API
+MATERIALIZED_PARAMS = {
+    "enabled": True,                # API membaca store jika tersedia
+    "directory": os.path.join(MODELS_DIR, "materialized"),
+    "models": ["hybrid", "fecf", "ncf"],
+    "top_n": 50,                    # Panjang list per user (request dengan n <= top_n dilayani dari store)
+    "chunk_size": 256,              # User per job recommend_for_users
+    "workers": min(8, os.cpu_count() or 4),
+    "keep_versions": 2,             # Versi lama disimpan untuk proses API yang masih mmap
+    "reload_interval": 30.0,        # Detik antar pengecekan pointer CURRENT di API
+}
+
 # Category Configuration - ENHANCED SETTINGS
 CATEGORY_CONFIG = {
     "max_per_category": 0.2,        # Sedikit tingkatkan batas kategori
@@ -91,6 +127,48 @@ CATEGORY_CONFIG = {
 TRADING_SIGNAL_WINDOW = 14  # Ukuran jendela untuk perhitungan indikator
 CONFIDENCE_THRESHOLD = 0.7  # Threshold untuk keyakinan sinyal
 
+# Graph indikator: hasil RSI/MACD/ADX/frame indikator di-memo per (fingerprint data, indikator, periode)
+INDICATOR_GRAPH_CONFIG = {
+    "enabled": True,
+    "max_entries": 2048,                # LRU node (series, tuple series, frame indikator)
+    "max_bytes": 128 * 1024 * 1024,     # Batas ukuran total hasil yang disimpan
+}
+
+# Engine indikator streaming: state per (coin, set periode) dimajukan satu candle per update
+STREAMING_INDICATOR_CONFIG = {
+    "history_size": 300,        # Baris hasil terakhir yang disimpan per engine (untuk generate_alerts)
+    "max_engines": 1000,        # LRU engine (coin x set periode) di store
+    "resync_interval": 1000,    # Jumlah update sebelum jumlah rolling dihitung ulang (batasi drift float)
+}
+
+# Backtest tervektorisasi & grid search parameter
+BACKTEST_CONFIG = {
+    "max_combinations": 5000,   # Batas jumlah kombinasi parameter per request sweep
+    "min_chunk_size": 25,       # Kombinasi minimal per potongan yang dikirim ke process executor
+    "default_grids": {          # Grid default bila parameter tidak diberikan di request
+        "macd": {"macd_fast": [6, 8, 10, 12, 15], "macd_slow": [20, 24, 26, 30, 35], "macd_signal": [5, 7, 9, 12]},
+        "rsi": {"rsi_period": [7, 10, 14, 21], "rsi_oversold": [20, 25, 30, 35], "rsi_overbought": [65, 70, 75, 80]},
+        "bollinger": {"bb_period": [10, 15, 20, 25, 30], "bb_std": [1.5, 2.0, 2.5, 3.0]},
+        "ma": {"ma_short": [5, 10, 20, 30], "ma_medium": [30, 50, 100]},
+    },
+}
+
+# Optimasi periode indikator (walk-forward) per (coin, regime, trading style)
+PARAMETER_OPTIMIZER_CONFIG = {
+    "enabled": True,            # False: selalu pakai tabel get_optimal_parameters
+    "ttl": 6 * 3600,            # Umur hasil optimasi di cache (detik)
+    "partial_ttl": 300,         # Umur hasil yang terpotong time_budget (keluarga belum dievaluasi)
+    "max_entries": 5000,        # LRU (coin x trading style)
+    "time_budget": 1.5,         # Detik maksimum optimasi on-demand di request /analysis/*
+    "candidate_chunk": 25,      # Kandidat per batch; budget dicek di antara batch
+    "min_history": 120,         # Minimal candle untuk walk-forward (kurang: pakai tabel)
+    "folds": 4,                 # Jumlah jendela out-of-sample walk-forward
+    "min_train": 60,            # Minimal candle training sebelum jendela test pertama
+    "scales": [0.7, 0.85, 1.0, 1.2, 1.4],  # Pengali periode tabel untuk kandidat
+    "min_improvement": 0.1,     # Selisih Sharpe out-of-sample minimum agar kandidat menggantikan tabel
+    "precompute_days": 365,     # Histori yang diambil job precompute
+}
+
 # Evaluasi model
 EVAL_METRICS = ["precision", "recall", "ndcg", "map", "mrr", "hit_ratio"]
 EVAL_K_VALUES = [5, 10, 20]
@@ -147,6 +225,46 @@ API_HOST = "0.0.0.0"
 API_PORT = 8001
 API_CACHE_TTL = 300  # 5 menit dalam detik
 
+# Startup API: modul model (torch, scikit-learn) dan artifact dimuat di background setelah server listen
+API_STARTUP_CONFIG = {
+    "background_load": True,            # False = load sinkron saat import src.api.recommend (perilaku lama)
+    "parallel": True,                   # FECF, NCF, hybrid dimuat bersamaan (1 thread per model)
+    "required_models": ["fecf", "ncf", "hybrid"],  # Harus aktif (atau tidak punya file) sebelum "ready"
+}
+
+# Cache response rekomendasi (LRU + TTL, persist write-behind ke cache/recommendations_cache.sqlite)
+RECOMMENDATION_CACHE_CONFIG = {
+    "max_entries": 20000,               # Batas jumlah entry (semua model)
+    "max_bytes": 256 * 1024 * 1024,     # Batas ukuran total (pickled) dalam bytes
+    "flush_interval": 2.0,              # Interval background writer (detik)
+}
+
+# Endpoint POST /recommend/batch
+RECOMMENDATION_BATCH_CONFIG = {
+    "max_users": 1000,                  # Maks request (user) per batch call
+    "chunk_size": 64,                   # Request per job executor (juga granularity streaming NDJSON)
+}
+
+# Executor untuk komputasi berat di endpoint async (kapasitas lane = max_workers + max_pending)
+EXECUTOR_CONFIG = {
+    "thread": {                         # Inference model & indikator (NumPy/torch/pandas melepas GIL)
+        "max_workers": min(8, os.cpu_count() or 4),
+        "max_pending": 64,
+        "queue_timeout": 10.0,          # Detik menunggu slot sebelum 503
+    },
+    "process": {                        # Pure-Python berat (ARIMA, backtest)
+        "max_workers": max(1, (os.cpu_count() or 2) // 2),
+        "max_pending": 16,
+        "queue_timeout": 10.0,
+        "start_method": "spawn",        # Hindari fork dari proses yang sudah punya thread torch/TF
+    },
+    "io": {                             # HTTP sinkron ke API market data
+        "max_workers": 16,
+        "max_pending": 128,
+        "queue_timeout": 30.0,
+    },
+}
+
 # Cold Start Evaluation - FIXED SETTINGS
 COLD_START_EVAL_CONFIG = {
     "cold_start_users": 100,         # Jumlah test users tetap
@@ -845,7 +845,7 @@ def recommend(args):
         is_cold_start = False
         
         if hasattr(model, 'user_item_matrix') and model.user_item_matrix is not None:
-            is_cold_start = user_id not in model.user_item_matrix.index
+            is_cold_start = not model.user_item_matrix.has_user(user_id)
         
         # Generate recommendations
         if is_cold_start:
@@ -1082,6 +1082,71 @@ def trading_signals(args):
         print(f"ERROR: Error generating trading signals: {str(e)}")
         return False
 
+def _load_trained_model(model_type: str):
+    """Load versi terbaru dari model registry (sama seperti API). Return (model, model_path) atau (None, None)"""
+    from src.models.model_registry import get_model_registry
+
+    try:
+        handle = get_model_registry().load(model_type, warm=False)
+    except Exception as e:
+        logger.error(f"Failed to load {model_type} model: {str(e)}")
+        return None, None
+
+    if handle is None:
+        logger.error(f"No trained {model_type} model file found")
+        return None, None
+
+    if hasattr(handle.model, 'is_trained') and not handle.model.is_trained():
+        logger.error(f"Model {model_type} version {handle.version} loaded but not properly initialized")
+        return None, None
+
+    return handle.model, handle.model_path
+
+def materialize(args):
+    """
+    ⚡ OPTIMIZATION: Precompute top-N rekomendasi semua user untuk setiap model ke
+    materialized store (array .npy yang di-mmap oleh API), sehingga request pertama
+    setelah retrain tidak perlu scoring online.
+    """
+    from config import MATERIALIZED_PARAMS
+    from src.models.materialized_store import materialize_recommendations
+
+    logger.info("Materializing top-N recommendations")
+
+    model_types = getattr(args, 'materialize_models', None) or MATERIALIZED_PARAMS['models']
+    if isinstance(model_types, str):
+        model_types = [m.strip() for m in model_types.split(',') if m.strip()]
+    top_n = getattr(args, 'top_n', None) or MATERIALIZED_PARAMS['top_n']
+    workers = getattr(args, 'workers', None) or MATERIALIZED_PARAMS['workers']
+
+    print(f"Materializing top-{top_n} recommendations for models: {', '.join(model_types)}")
+
+    all_success = True
+    for model_type in model_types:
+        start_time = time.time()
+        try:
+            model, model_path = _load_trained_model(model_type)
+            if model is None:
+                print(f"WARNING: Skipping {model_type}: no trained model available")
+                # Model yang memang tidak ada tidak membuat materialisasi gagal
+                continue
+
+            result = materialize_recommendations(
+                model, model_type, n=top_n, workers=workers, model_path=model_path
+            )
+            print(f"SUCCESS: {model_type}: {result['num_users']} users materialized "
+                  f"in {time.time() - start_time:.2f}s -> {result['path']}")
+            if result['failed_users']:
+                print(f"WARNING: {model_type}: {result['failed_users']} users failed (served online)")
+
+        except Exception as e:
+            logger.error(f"Error materializing {model_type} recommendations: {str(e)}")
+            logger.error(traceback.format_exc())
+            print(f"ERROR: Error materializing {model_type}: {str(e)}")
+            all_success = False
+
+    return all_success
+
 def start_api(args):
     logger.info("Starting API server")
     print("Starting API server...")
@@ -1424,7 +1489,7 @@ def debug_recommendations(args):
         # Check if user exists
         user_exists = True
         if hasattr(model, 'user_item_matrix'):
-            if user_id not in model.user_item_matrix.index:
+            if not model.user_item_matrix.has_user(user_id):
                 print(f"WARNING: User '{user_id}' not found in training data")
                 print("Will use cold-start recommendations")
                 user_exists = False
@@ -1432,8 +1497,7 @@ def debug_recommendations(args):
         # Get user's known items
         known_items = []
         if user_exists and hasattr(model, 'user_item_matrix'):
-            user_items = model.user_item_matrix.loc[user_id]
-            known_items = user_items[user_items > 0].index.tolist()
+            known_items = model.user_item_matrix.known_items(user_id)
             print(f"User has {len(known_items)} known items")
             if known_items:
                 print(f"Sample known items: {known_items[:5]}")
@@ -1594,6 +1658,14 @@ def run_pipeline(args):
                 "skip_if": lambda args: getattr(args, 'skip_training', False),
                 "args": args
             },
+            {
+                "name": "Materialize Recommendations",
+                "function": materialize,
+                "description": "Precomputing top-N recommendations for all users",
+                "required": False,
+                "skip_if": lambda args: getattr(args, 'skip_materialize', False),
+                "args": args
+            },
             {
                 "name": "Model Evaluation",
                 "function": evaluate_models,
@@ -1630,6 +1702,14 @@ def run_pipeline(args):
                 "skip_if": lambda args: getattr(args, 'skip_training', False),
                 "args": args
             },
+            {
+                "name": "Materialize Recommendations",
+                "function": materialize,
+                "description": "Precomputing top-N recommendations for all users",
+                "required": False,
+                "skip_if": lambda args: getattr(args, 'skip_materialize', False),
+                "args": args
+            },
             {
                 "name": "Model Evaluation",
                 "function": evaluate_models,
@@ -1798,6 +1878,9 @@ Examples:
   # Generate trading signals for a project
   python main.py signals --project-id bitcoin --risk medium
   
+  # Precompute top-N recommendations served by the API
+  python main.py materialize --models hybrid fecf ncf --top-n 50
+  
   # Start the API server
   python main.py api
   
@@ -1894,6 +1977,13 @@ Examples:
     debug_parser.add_argument("--model", choices=["fecf", "ncf", "hybrid"], default="hybrid", help="Model to use")
     debug_parser.add_argument("--num", type=int, default=20, help="Number of recommendations")
     
+    # materialize command
+    materialize_parser = subparsers.add_parser("materialize", help="Precompute top-N recommendations for all users")
+    materialize_parser.add_argument("--models", dest="materialize_models", nargs="+",
+                                    choices=["fecf", "ncf", "hybrid"], help="Models to materialize (default: all)")
+    materialize_parser.add_argument("--top-n", type=int, help="Recommendations stored per user (default: MATERIALIZED_PARAMS top_n)")
+    materialize_parser.add_argument("--workers", type=int, help="Parallel scoring threads")
+    
     # ✅ FIXED: run command dengan parameter yang consistent
     run_parser = subparsers.add_parser("run", help="Run complete pipeline")
     run_parser.add_argument("--skip-collection", action="store_true", 
@@ -1906,6 +1996,8 @@ Examples:
                         help="Skip generating sample recommendations")
     run_parser.add_argument("--skip-analysis", action="store_true",
                         help="Skip result analysis step")
+    run_parser.add_argument("--skip-materialize", action="store_true",
+                        help="Skip precomputing top-N recommendations for the API")
     # ✅ FIXED: Use consistent parameter names
     run_parser.add_argument("--limit", type=int, default=1000,
                         help="Number of coins to collect (production default: 1000)")
@@ -1967,6 +2059,8 @@ Examples:
         recommend(args)
     elif args.command == "signals":
         trading_signals(args)
+    elif args.command == "materialize":
+        materialize(args)
     elif args.command == "api":
         start_api(args)
     elif args.command == "run":
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 from fastapi import APIRouter, HTTPException, Query, Depends, Body, Path
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, conlist
 import time
 
 # Path handling
@@ -19,10 +19,19 @@ from src.technical.signals import (
     personalize_signals, 
     detect_market_events, 
     detect_market_regime, 
-    get_optimal_parameters,
     weighted_signal_ensemble
 )
 from src.data.collector import fetch_real_market_data
+from src.api.executors import run_in_thread, run_in_process, run_io, get_executor
+from src.api.single_flight import SingleFlight
+from src.technical.indicator_graph import get_indicator_graph
+from src.technical.streaming import get_streaming_store
+from src.technical.panel import PricePanel, screen_panel
+from src.technical.backtest import (
+    MIN_BACKTEST_POINTS, expand_grid, evaluate_parameter_grid, merge_grid_results,
+    split_combinations, summarize_sweep
+)
+from src.technical.parameter_optimizer import get_optimized_parameters, get_parameter_store, precompute_parameters
 
 # Setup router
 router = APIRouter(
@@ -48,18 +57,19 @@ warnings.filterwarnings("ignore", message="No supported index is available")
 warnings.filterwarnings("ignore", message="A date index has been provided")
 warnings.filterwarnings("ignore", message="Do not pass an `input_shape`/`input_dim` argument to a layer")
 
-# Untuk statsmodels
-try:
-    from statsmodels.tools.sm_exceptions import ValueWarning
-    warnings.filterwarnings("ignore", category=ValueWarning)
-except ImportError:
-    pass
+# Untuk statsmodels: filter ValueWarning dipasang di predict_price_arima saat statsmodels
+# pertama kali di-import (tidak di-import di sini supaya startup API tetap ringan)
 
 # Cache for price data and signals
 _price_data_cache = {}
 _signals_cache = {}
 _cache_ttl = 300  # 5 minutes in seconds
 
+# OPTIMIZATION: Single-flight per cache key, request konkuren dengan key yang sama
+# menunggu satu fetch/prediksi yang sedang berjalan (mencegah thundering herd saat TTL habis)
+_price_data_flights = SingleFlight("price_data")
+_prediction_flights = SingleFlight("price_prediction")
+
 # Function to get price data using real market data
 async def get_price_data(project_id: str, days: int = 30, interval: str = "1d") -> pd.DataFrame:
     # Check cache first
@@ -72,10 +82,14 @@ async def get_price_data(project_id: str, days: int = 30, interval: str = "1d")
             logger.info(f"Returning cached price data for {cache_key}")
             return cache_entry['data']
     
+    return await _price_data_flights.do(cache_key, lambda: _fetch_price_data(project_id, days, cache_key))
+
+async def _fetch_price_data(project_id: str, days: int, cache_key: str) -> pd.DataFrame:
     try:
         # Get real market data
         logger.info(f"Fetching real market data for {project_id}")
-        df = fetch_real_market_data(project_id, days=days)
+        # OPTIMIZATION: Fetch sinkron dijalankan di io executor, event loop tidak terblok
+        df = await run_io(fetch_real_market_data, project_id, days=days)
         
         if df.empty:
             logger.error(f"Failed to fetch market data for {project_id}")
@@ -89,6 +103,8 @@ async def get_price_data(project_id: str, days: int = 30, interval: str = "1d")
         
         return df
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching price data for {project_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching price data: {str(e)}")
@@ -480,6 +496,12 @@ def _extract_oscillator_composite(df: pd.DataFrame, latest_data: Dict[str, Any])
         'description': f"Combined oscillator value is {composite_value:.2f} ({signal})"
     }
 
+def _compute_reversal_and_trend(price_data: pd.DataFrame, indicator_periods: Optional[Dict[str, Any]],
+                                periods: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Reversal signals dan trend prediction (dijalankan di thread executor)"""
+    ti = TechnicalIndicators(price_data, indicator_periods)
+    return ti.generate_reversal_signals(), ti.predict_price_trend(periods=periods)
+
 def _get_regime_description(market_regime: str) -> str:
     descriptions = {
         "trending_bullish": "Strong uptrend with normal volatility",
@@ -575,6 +597,43 @@ class TechnicalIndicatorsRequest(BaseModel):
     trading_style: str = Field("standard", description="Gaya trading ('short_term', 'standard', 'long_term')")
     auto_optimize: bool = Field(True, description="Otomatis optimasi parameter berdasarkan market regime")
 
+class WatchlistAlertsRequest(BaseModel):
+    project_ids: List[str] = Field(..., min_length=1, max_length=500, description="Daftar project ID watchlist")
+    days: int = Field(30, ge=1, le=365)
+    interval: str = Field("1d", description="Price data interval")
+    lookback: int = Field(5, ge=1, le=30, description="Number of periods to look back for alerts")
+    trading_style: str = Field("standard", description="Gaya trading ('short_term', 'standard', 'long_term')")
+
+class ScreenerRequest(BaseModel):
+    project_ids: List[str] = Field(..., min_length=1, max_length=500, description="Daftar project ID yang di-screen")
+    days: int = Field(90, ge=1, le=365, description="Jumlah hari data historis")
+    interval: str = Field("1d", description="Price data interval")
+    trading_style: str = Field("standard", description="Gaya trading ('short_term', 'standard', 'long_term')")
+    periods: Optional[IndicatorPeriods] = Field(None, description="Periode indikator (default: optimal per regime)")
+    action: Optional[str] = Field(None, description="Filter aksi ('buy', 'sell', 'hold')")
+    sort_by: str = Field("buy_score", description="Urutan ranking ('buy_score', 'sell_score', 'confidence')")
+    limit: int = Field(50, ge=1, le=500, description="Jumlah hasil teratas")
+
+class BacktestSweepRequest(BaseModel):
+    days: int = Field(180, ge=30, le=365, description="Historical days to backtest")
+    interval: str = Field("1d", description="Price data interval")
+    strategy_type: str = Field("macd", description="Strategy type (macd, rsi, bollinger, ma)")
+    grid: Optional[Dict[str, conlist(float, min_length=1, max_length=100)]] = Field(
+        None, max_length=10,
+        description="Nilai parameter per nama (maks. 100 nilai per parameter), mis. {'macd_fast': [8, 12], 'macd_slow': [21, 26]} (default: BACKTEST_CONFIG)"
+    )
+    initial_capital: float = Field(10000.0, gt=0, description="Initial capital for backtest")
+    top_n: int = Field(20, ge=1, le=500, description="Jumlah maksimum parameter set Pareto yang dikembalikan")
+
+class ParameterPrecomputeRequest(BaseModel):
+    project_ids: List[str] = Field(..., min_length=1, max_length=500, description="Daftar project ID yang dioptimasi")
+    days: int = Field(365, ge=30, le=365, description="Jumlah hari histori untuk walk-forward")
+    interval: str = Field("1d", description="Price data interval")
+    trading_styles: List[str] = Field(
+        ["short_term", "standard", "long_term"], min_length=1,
+        description="Gaya trading yang dioptimasi ('short_term', 'standard', 'long_term')"
+    )
+
 class TechnicalIndicatorsResponse(BaseModel):
     project_id: str
     indicators: Dict[str, Dict[str, Any]]
@@ -612,6 +671,61 @@ class PricePredictionResponse(BaseModel):
     predictions: List[PredictionDataPoint]
     timestamp: datetime
 
+def _compute_trading_signals(price_data: pd.DataFrame, request: Any) -> Dict[str, Any]:
+    """Bagian CPU-bound dari /trading-signals (dijalankan di thread executor)"""
+    # Ensure price_data has necessary columns (PERBAIKAN)
+    if 'close' not in price_data.columns and 'price' in price_data.columns:
+        price_data['close'] = price_data['price']
+    
+    # Detect market regime
+    market_regime = detect_market_regime(price_data)
+    logger.info(f"Detected market regime: {market_regime}")
+    
+    # Optimize parameters if requested
+    if request.auto_optimize:
+        if request.periods:
+            # Use provided parameters but enhance them for this market regime
+            indicator_periods = request.periods.dict()
+            optimized_params = get_optimized_parameters(request.project_id, price_data, market_regime,
+                                                        request.trading_style)
+            
+            # Merge the parameters, keeping user-specified ones
+            for key, value in optimized_params.items():
+                if key not in indicator_periods:
+                    indicator_periods[key] = value
+                    
+            logger.info(f"Using optimized parameters for {market_regime} regime with user customizations")
+        else:
+            # Use fully optimized parameters
+            indicator_periods = get_optimized_parameters(request.project_id, price_data, market_regime,
+                                                         request.trading_style)
+            logger.info(f"Using fully optimized parameters for {market_regime} regime")
+    else:
+        # Use provided parameters or defaults
+        indicator_periods = request.periods.dict() if request.periods else None
+    
+    # Generate trading signals
+    signals = generate_trading_signals(price_data, indicator_periods)
+    
+    # Personalize based on preferences
+    personalized = personalize_signals(signals, risk_tolerance=request.risk_tolerance)
+    
+    # Get additional technical analysis
+    ti = TechnicalIndicators(price_data, indicator_periods)
+    reversal_data = ti.generate_reversal_signals()
+    
+    # Add trend prediction
+    trend_prediction = ti.predict_price_trend(periods=5)
+    
+    return {
+        'market_regime': market_regime,
+        'indicator_periods': indicator_periods,
+        'signals': signals,
+        'personalized': personalized,
+        'reversal_data': reversal_data,
+        'trend_prediction': trend_prediction
+    }
+
 # Routes
 @router.post("/trading-signals", response_model=TradingSignalResponse)
 async def get_trading_signals(request: TradingSignalRequest):
@@ -642,47 +756,14 @@ async def get_trading_signals(request: TradingSignalRequest):
             interval=optimal_interval
         )
         
-        # Ensure price_data has necessary columns (PERBAIKAN)
-        if 'close' not in price_data.columns and 'price' in price_data.columns:
-            price_data['close'] = price_data['price']
-        
-        # Detect market regime
-        market_regime = detect_market_regime(price_data)
-        logger.info(f"Detected market regime: {market_regime}")
-        
-        # Optimize parameters if requested
-        if request.auto_optimize:
-            if request.periods:
-                # Use provided parameters but enhance them for this market regime
-                indicator_periods = request.periods.dict()
-                optimized_params = get_optimal_parameters(price_data, market_regime, request.trading_style)
-                
-                # Merge the parameters, keeping user-specified ones
-                for key, value in optimized_params.items():
-                    if key not in indicator_periods:
-                        indicator_periods[key] = value
-                        
-                logger.info(f"Using optimized parameters for {market_regime} regime with user customizations")
-            else:
-                # Use fully optimized parameters
-                indicator_periods = get_optimal_parameters(price_data, market_regime, request.trading_style)
-                logger.info(f"Using fully optimized parameters for {market_regime} regime")
-        else:
-            # Use provided parameters or defaults
-            indicator_periods = request.periods.dict() if request.periods else None
-        
-        # Generate trading signals
-        signals = generate_trading_signals(price_data, indicator_periods)
-        
-        # Personalize based on preferences
-        personalized = personalize_signals(signals, risk_tolerance=request.risk_tolerance)
-        
-        # Get additional technical analysis
-        ti = TechnicalIndicators(price_data, indicator_periods)
-        reversal_data = ti.generate_reversal_signals()
-        
-        # Add trend prediction
-        trend_prediction = ti.predict_price_trend(periods=5)
+        # OPTIMIZATION: Regime, parameter, sinyal dan indikator dihitung di thread executor
+        computed = await run_in_thread(_compute_trading_signals, price_data, request)
+        market_regime = computed['market_regime']
+        indicator_periods = computed['indicator_periods']
+        signals = computed['signals']
+        personalized = computed['personalized']
+        reversal_data = computed['reversal_data']
+        trend_prediction = computed['trend_prediction']
         
         # PERBAIKAN: Format reversal signals dengan konsisten
         formatted_reversal_signals = []
@@ -738,6 +819,41 @@ async def get_trading_signals(request: TradingSignalRequest):
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def _compute_indicators(price_data: pd.DataFrame, request: Any) -> Tuple[str, Optional[Dict[str, Any]], pd.DataFrame]:
+    """Bagian CPU-bound dari /indicators (dijalankan di thread executor)"""
+    # Detect market regime
+    market_regime = detect_market_regime(price_data)
+    logger.info(f"Detected market regime: {market_regime}")
+    
+    # Determine parameters
+    if request.auto_optimize:
+        if request.periods:
+            # Use provided parameters but enhance them for this market regime
+            indicator_periods = request.periods.dict()
+            optimized_params = get_optimized_parameters(request.project_id, price_data, market_regime,
+                                                        request.trading_style)
+            
+            # Merge the parameters, keeping user-specified ones
+            for key, value in optimized_params.items():
+                if key not in indicator_periods:
+                    indicator_periods[key] = value
+                    
+            logger.info(f"Using optimized parameters for {market_regime} regime with user customizations")
+        else:
+            # Use fully optimized parameters
+            indicator_periods = get_optimized_parameters(request.project_id, price_data, market_regime,
+                                                         request.trading_style)
+            logger.info(f"Using fully optimized parameters for {market_regime} regime")
+    else:
+        # Use provided parameters or defaults
+        indicator_periods = request.periods.dict() if request.periods else None
+    
+    # Calculate indicators
+    ti = TechnicalIndicators(price_data, indicator_periods)
+    df_with_indicators = ti.add_indicators()
+    
+    return market_regime, indicator_periods, df_with_indicators
+
 @router.post("/indicators", response_model=TechnicalIndicatorsResponse)
 async def get_technical_indicators(request: TechnicalIndicatorsRequest):
     start_time = datetime.now()
@@ -775,34 +891,10 @@ async def get_technical_indicators(request: TechnicalIndicatorsRequest):
         if price_data.empty:
             raise HTTPException(status_code=404, detail=f"No price data found for {request.project_id}")
         
-        # Detect market regime
-        market_regime = detect_market_regime(price_data)
-        logger.info(f"Detected market regime: {market_regime}")
-        
-        # Determine parameters
-        if request.auto_optimize:
-            if request.periods:
-                # Use provided parameters but enhance them for this market regime
-                indicator_periods = request.periods.dict()
-                optimized_params = get_optimal_parameters(price_data, market_regime, request.trading_style)
-                
-                # Merge the parameters, keeping user-specified ones
-                for key, value in optimized_params.items():
-                    if key not in indicator_periods:
-                        indicator_periods[key] = value
-                        
-                logger.info(f"Using optimized parameters for {market_regime} regime with user customizations")
-            else:
-                # Use fully optimized parameters
-                indicator_periods = get_optimal_parameters(price_data, market_regime, request.trading_style)
-                logger.info(f"Using fully optimized parameters for {market_regime} regime")
-        else:
-            # Use provided parameters or defaults
-            indicator_periods = request.periods.dict() if request.periods else None
-        
-        # Calculate indicators
-        ti = TechnicalIndicators(price_data, indicator_periods)
-        df_with_indicators = ti.add_indicators()
+        # OPTIMIZATION: Regime, parameter dan add_indicators dihitung di thread executor
+        market_regime, indicator_periods, df_with_indicators = await run_in_thread(
+            _compute_indicators, price_data, request
+        )
         
         # Extract results into a structured response
         indicators_result = {}
@@ -940,7 +1032,7 @@ async def get_market_events(
         )
         
         # Detect market regime first
-        market_regime = detect_market_regime(price_data)
+        market_regime = await run_in_thread(detect_market_regime, price_data)
 
         # custom_thresholds dari parameter individual
         custom_thresholds = {}
@@ -981,7 +1073,7 @@ async def get_market_events(
                 }
         
         # Detect market events with adaptive thresholds
-        events = detect_market_events(price_data, custom_thresholds=custom_thresholds)
+        events = await run_in_thread(detect_market_events, price_data, custom_thresholds=custom_thresholds)
         
         # Create response
         response = MarketEventResponse(
@@ -996,6 +1088,8 @@ async def get_market_events(
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error detecting market events: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -1019,6 +1113,13 @@ async def predict_future_price(
             logger.info(f"Returning cached prediction for {project_id}")
             return cache_entry['data']
     
+    return await _prediction_flights.do(
+        cache_key,
+        lambda: _compute_price_prediction(project_id, days, prediction_days, interval, model, cache_key)
+    )
+
+async def _compute_price_prediction(project_id: str, days: int, prediction_days: int, interval: str,
+                                    model: str, cache_key: str) -> PricePredictionResponse:
     try:
         start_time = time.time()
         
@@ -1033,7 +1134,7 @@ async def predict_future_price(
         logger.info(f"Retrieved {len(price_data)} data points for {project_id}")
         
         # Detect market regime
-        market_regime = detect_market_regime(price_data)
+        market_regime = await run_in_thread(detect_market_regime, price_data)
         logger.info(f"Market regime detected: {market_regime}")
         
         # PERBAIKAN: Enhanced model selection dengan better error handling
@@ -1057,6 +1158,7 @@ async def predict_future_price(
                 logger.info(f"Using Simple model for {project_id} with {len(price_data)} data points")
         
         # PERBAIKAN: Enhanced prediction execution dengan comprehensive error handling
+        # OPTIMIZATION: ARIMA (pure-Python fitting) di process executor, ML/simple di thread executor
         import asyncio
         
         async def run_prediction_with_timeout():
@@ -1067,13 +1169,13 @@ async def predict_future_price(
                     # PERBAIKAN: Pre-validation untuk ML model
                     if len(price_data) < 100:
                         logger.warning(f"Insufficient data for ML ({len(price_data)} < 100), switching to ARIMA")
-                        return await asyncio.to_thread(predict_price_arima, price_data, days_to_predict=prediction_days)
+                        return await run_in_process(predict_price_arima, price_data, days_to_predict=prediction_days)
                     
                     # PERBAIKAN: Check data quality sebelum ML training
                     close_data = price_data['close'].dropna()
                     if len(close_data) < len(price_data) * 0.95:
                         logger.warning(f"Too much missing data for ML model, switching to ARIMA")
-                        return await asyncio.to_thread(predict_price_arima, price_data, days_to_predict=prediction_days)
+                        return await run_in_process(predict_price_arima, price_data, days_to_predict=prediction_days)
                     
                     # PERBAIKAN: Timeout yang disesuaikan berdasarkan data size
                     data_size = len(price_data)
@@ -1087,7 +1189,7 @@ async def predict_future_price(
                     logger.info(f"Using {timeout}s timeout for ML model with {data_size} data points")
                     
                     result = await asyncio.wait_for(
-                        asyncio.to_thread(predict_price_ml, price_data, prediction_days),
+                        run_in_thread(predict_price_ml, price_data, prediction_days),
                         timeout=timeout
                     )
                     
@@ -1113,33 +1215,33 @@ async def predict_future_price(
                         logger.warning(f"ML prediction failed for {project_id}, falling back to ARIMA")
                     
                     # Fallback to ARIMA
-                    return await asyncio.to_thread(predict_price_arima, price_data, days_to_predict=prediction_days)
+                    return await run_in_process(predict_price_arima, price_data, days_to_predict=prediction_days)
                         
                 elif model == "arima":
                     logger.info(f"Starting ARIMA prediction for {project_id}...")
-                    result = await asyncio.to_thread(predict_price_arima, price_data, days_to_predict=prediction_days)
+                    result = await run_in_process(predict_price_arima, price_data, days_to_predict=prediction_days)
                     logger.info(f"ARIMA prediction completed for {project_id}: {result.get('model_type', 'Unknown')}")
                     return result
                 else:
                     logger.info(f"Starting Simple prediction for {project_id}...")
-                    result = await asyncio.to_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
+                    result = await run_in_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
                     logger.info(f"Simple prediction completed for {project_id}: {result.get('model_type', 'Unknown')}")
                     return result
                     
             except asyncio.TimeoutError:
                 logger.warning(f"Prediction timeout for {project_id} using {model} model, falling back to simple model")
-                return await asyncio.to_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
+                return await run_in_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
             except Exception as e:
                 logger.error(f"Error in {model} prediction for {project_id}: {str(e)}")
                 # PERBAIKAN: Specific error handling untuk LSTM
                 if "inverse transform" in str(e).lower() or "array element" in str(e).lower():
                     logger.error(f"LSTM inverse transform error detected, using ARIMA fallback")
                     try:
-                        return await asyncio.to_thread(predict_price_arima, price_data, days_to_predict=prediction_days)
+                        return await run_in_process(predict_price_arima, price_data, days_to_predict=prediction_days)
                     except:
-                        return await asyncio.to_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
+                        return await run_in_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
                 else:
-                    return await asyncio.to_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
+                    return await run_in_thread(predict_price_simple, price_data, days_to_predict=prediction_days)
         
         # Jalankan prediksi dengan enhanced timeout handling
         prediction_result = await run_prediction_with_timeout()
@@ -1213,9 +1315,9 @@ async def predict_future_price(
                        f"data_points={training_info.get('data_points', 'N/A')}")
         
         # Get additional technical analysis
-        ti = TechnicalIndicators(price_data)
-        reversal_data = ti.generate_reversal_signals()
-        trend_prediction = ti.predict_price_trend(periods=prediction_days)
+        reversal_data, trend_prediction = await run_in_thread(
+            _compute_reversal_and_trend, price_data, None, prediction_days
+        )
         
         # PERBAIKAN: Enhanced prediction data formatting
         predictions = []
@@ -1336,6 +1438,38 @@ async def predict_future_price(
             # Final fallback - raise HTTP exception
             raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def _compute_alerts(project_id: str, price_data: pd.DataFrame, trading_style: str,
+                    lookback: int) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """Bagian CPU-bound dari /alerts (dijalankan di thread executor)"""
+    # Detect market regime
+    market_regime = detect_market_regime(price_data)
+    
+    # Get optimal parameters for this regime and trading style
+    indicator_periods = get_optimized_parameters(project_id, price_data, market_regime, trading_style)
+    
+    # Calculate indicators and generate alerts
+    ti = TechnicalIndicators(price_data, indicator_periods)
+    
+    # Perbaikan: Simpan dataframe dengan indikator
+    df_with_indicators = ti.add_indicators()
+    
+    # Perbaikan: Gunakan df_with_indicators untuk generate_alerts
+    alerts = ti.generate_alerts(lookback_period=lookback, df=df_with_indicators)
+    
+    # Get reversal signals
+    reversal_data = ti.generate_reversal_signals()
+    
+    return market_regime, alerts, reversal_data
+
+def _format_alerts(alerts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{
+        "date": alert.get('date').isoformat() if isinstance(alert.get('date'), pd.Timestamp) else str(alert.get('date')),
+        "type": alert.get('type'),
+        "message": alert.get('message'),
+        "signal": alert.get('signal'),
+        "strength": alert.get('strength')
+    } for alert in alerts]
+
 @router.get("/alerts/{project_id}")
 async def get_technical_alerts(
     project_id: str = Path(..., description="Project ID"),
@@ -1354,23 +1488,10 @@ async def get_technical_alerts(
             interval=interval
         )
         
-        # Detect market regime
-        market_regime = detect_market_regime(price_data)
-        
-        # Get optimal parameters for this regime and trading style
-        indicator_periods = get_optimal_parameters(price_data, market_regime, trading_style)
-        
-        # Calculate indicators and generate alerts
-        ti = TechnicalIndicators(price_data, indicator_periods)
-        
-        # Perbaikan: Simpan dataframe dengan indikator
-        df_with_indicators = ti.add_indicators()
-        
-        # Perbaikan: Gunakan df_with_indicators untuk generate_alerts
-        alerts = ti.generate_alerts(lookback_period=lookback, df=df_with_indicators)
-        
-        # Get reversal signals
-        reversal_data = ti.generate_reversal_signals()
+        # OPTIMIZATION: Indikator dan alert dihitung di thread executor
+        market_regime, alerts, reversal_data = await run_in_thread(
+            _compute_alerts, project_id, price_data, trading_style, lookback
+        )
         
         # Add market regime signals
         regime_alert = {
@@ -1394,15 +1515,7 @@ async def get_technical_alerts(
             alerts.insert(1, reversal_alert)
         
         # Format response
-        formatted_alerts = []
-        for alert in alerts:
-            formatted_alerts.append({
-                "date": alert.get('date').isoformat() if isinstance(alert.get('date'), pd.Timestamp) else str(alert.get('date')),
-                "type": alert.get('type'),
-                "message": alert.get('message'),
-                "signal": alert.get('signal'),
-                "strength": alert.get('strength')
-            })
+        formatted_alerts = _format_alerts(alerts)
         
         return {
             "project_id": project_id,
@@ -1414,11 +1527,183 @@ async def get_technical_alerts(
             "trading_style": trading_style
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error generating technical alerts: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def _compute_streaming_alerts(project_id: str, price_data: pd.DataFrame, interval: str,
+                              trading_style: str, lookback: int) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Alert indikator dari engine streaming: hanya candle baru sejak request sebelumnya
+    yang dihitung (O(1) per candle per indikator), bukan seluruh histori.
+    """
+    market_regime = detect_market_regime(price_data)
+    indicator_periods = get_optimized_parameters(project_id, price_data, market_regime, trading_style)
+    
+    engine = get_streaming_store().advance(f"{project_id}:{interval}", price_data, indicator_periods)
+    frame = engine.frame()
+    
+    # generate_alerts hanya membaca baris terakhir frame indikator, tidak menghitung ulang
+    ti = TechnicalIndicators(frame, engine.periods)
+    alerts = ti.generate_alerts(lookback_period=lookback, df=frame)
+    alerts.insert(0, {
+        'date': price_data.index[-1],
+        'type': f"market_regime_{market_regime}",
+        'message': f"Market Regime: {market_regime.replace('_', ' ')}",
+        'signal': 'buy' if 'bullish' in market_regime else 'sell' if 'bearish' in market_regime else 'neutral',
+        'strength': 0.6
+    })
+    return market_regime, alerts
+
+@router.post("/alerts/watchlist")
+async def get_watchlist_alerts(request: WatchlistAlertsRequest):
+    """
+    Alert teknikal untuk seluruh watchlist (mis. di-poll tiap menit). Indikator dimajukan
+    secara inkremental per (project, set periode) lewat engine streaming; project yang
+    gagal dilaporkan di "errors" tanpa menggagalkan seluruh watchlist.
+    """
+    import asyncio
+    
+    start_time = time.time()
+    project_ids = list(dict.fromkeys(request.project_ids))
+    price_results = await asyncio.gather(
+        *(get_price_data(project_id, days=request.days, interval=request.interval) for project_id in project_ids),
+        return_exceptions=True
+    )
+    
+    results = {}
+    errors = {}
+    for project_id, price_data in zip(project_ids, price_results):
+        if isinstance(price_data, Exception):
+            errors[project_id] = str(price_data.detail if isinstance(price_data, HTTPException) else price_data)
+            continue
+        try:
+            market_regime, alerts = await run_in_thread(
+                _compute_streaming_alerts, project_id, price_data, request.interval,
+                request.trading_style, request.lookback
+            )
+            results[project_id] = {
+                "alerts": _format_alerts(alerts),
+                "count": len(alerts),
+                "market_regime": market_regime
+            }
+        except Exception as e:
+            logger.error(f"Error generating watchlist alerts for {project_id}: {str(e)}")
+            errors[project_id] = str(e)
+    
+    return {
+        "results": results,
+        "errors": errors,
+        "period": f"{request.days} days ({request.interval})",
+        "lookback": request.lookback,
+        "trading_style": request.trading_style,
+        "execution_time": time.time() - start_time
+    }
+
+_SCREENER_SORT_KEYS = ("buy_score", "sell_score", "confidence")
+
+def _compute_screener(frames: Dict[str, pd.DataFrame], request: Any) -> pd.DataFrame:
+    """Bagian CPU-bound dari /screener: satu panel (waktu x coin) untuk semua coin"""
+    panel = PricePanel.from_frames(frames)
+    periods = request.periods.dict() if request.periods else None
+    result = screen_panel(panel, request.trading_style, periods)
+    
+    if request.action:
+        result = result[result['action'] == request.action]
+    return result.sort_values([request.sort_by, 'confidence'], ascending=False).head(request.limit)
+
+@router.post("/screener")
+async def screen_market(request: ScreenerRequest):
+    """
+    Screening banyak coin sekaligus: indikator dan skor buy/sell generate_trading_signals
+    dihitung vektor (NumPy) atas panel harga semua coin, lalu diurutkan.
+    """
+    import asyncio
+    
+    if request.sort_by not in _SCREENER_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {list(_SCREENER_SORT_KEYS)}")
+    if request.action is not None and request.action not in ('buy', 'sell', 'hold'):
+        raise HTTPException(status_code=400, detail="action must be one of ['buy', 'sell', 'hold']")
+    
+    start_time = time.time()
+    project_ids = list(dict.fromkeys(request.project_ids))
+    price_results = await asyncio.gather(
+        *(get_price_data(project_id, days=request.days, interval=request.interval) for project_id in project_ids),
+        return_exceptions=True
+    )
+    
+    frames = {}
+    errors = {}
+    for project_id, price_data in zip(project_ids, price_results):
+        if isinstance(price_data, Exception):
+            errors[project_id] = str(price_data.detail if isinstance(price_data, HTTPException) else price_data)
+        else:
+            frames[project_id] = price_data
+    
+    if not frames:
+        raise HTTPException(status_code=502, detail={"message": "No price data available", "errors": errors})
+    
+    try:
+        ranked = await run_in_thread(_compute_screener, frames, request)
+    except HTTPException as he:
+        # Re-raise HTTP exceptions (mis. 503 saat executor penuh)
+        raise he
+    except Exception as e:
+        logger.error(f"Error screening market: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    
+    results = []
+    for rank, (project_id, row) in enumerate(ranked.iterrows(), start=1):
+        results.append({
+            "rank": rank,
+            "project_id": project_id,
+            "action": row['action'],
+            "confidence": float(row['confidence']),
+            "strong_signal": bool(row['strong_signal']),
+            "buy_score": float(row['buy_score']),
+            "sell_score": float(row['sell_score']),
+            "market_regime": row['market_regime'],
+            "trend_direction": row['trend_direction'],
+            "close": float(row['close']),
+            "data_points": int(row['data_points']),
+            "indicators": {
+                key: float(row[key]) for key in (
+                    'rsi', 'macd', 'macd_signal', 'macd_histogram', 'bollinger_percent',
+                    'stochastic_k', 'stochastic_d', 'adx', 'plus_di', 'minus_di'
+                )
+            },
+            "indicator_periods": row['indicator_periods']
+        })
+    
+    return {
+        "results": results,
+        "count": len(results),
+        "screened": len(frames),
+        "errors": errors,
+        "trading_style": request.trading_style,
+        "sort_by": request.sort_by,
+        "period": f"{request.days} days ({request.interval})",
+        "execution_time": time.time() - start_time
+    }
+
 # Cache management endpoint
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Statistik cache analysis dan request coalescing (single-flight)"""
+    return {
+        "price_cache_entries": len(_price_data_cache),
+        "signals_cache_entries": len(_signals_cache),
+        "indicator_graph": get_indicator_graph().stats(),
+        "streaming_indicators": get_streaming_store().stats(),
+        "optimized_parameters": get_parameter_store().stats(),
+        "single_flight": {
+            "price_data": _price_data_flights.stats(),
+            "price_prediction": _prediction_flights.stats()
+        }
+    }
+
 @router.post("/cache/clear")
 async def clear_cache():
     """
@@ -1433,14 +1718,89 @@ async def clear_cache():
         _price_data_cache = {}
         _signals_cache = {}
         
+        indicator_graph = get_indicator_graph()
+        indicator_entries = indicator_graph.stats()['entries']
+        indicator_graph.clear()
+        
+        streaming_store = get_streaming_store()
+        streaming_engines = streaming_store.stats()['engines']
+        streaming_store.clear()
+        
+        parameter_store = get_parameter_store()
+        parameter_entries = parameter_store.stats()['entries']
+        parameter_store.clear()
+        
         return {
-            "message": f"Cache cleared ({price_cache_size} price entries, {signals_cache_size} signal entries)"
+            "message": f"Cache cleared ({price_cache_size} price entries, {signals_cache_size} signal entries, "
+                       f"{indicator_entries} indicator graph entries, {streaming_engines} streaming engines, "
+                       f"{parameter_entries} optimized parameter sets)"
         }
     
     except Exception as e:
         logger.error(f"Error clearing cache: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@router.post("/parameters/precompute")
+async def precompute_optimal_parameters(request: ParameterPrecomputeRequest):
+    """
+    Job precompute (mis. dipanggil scheduler tiap beberapa jam): optimasi walk-forward
+    periode indikator tanpa budget waktu untuk setiap project x trading style, hasilnya
+    mengisi cache yang dipakai endpoint /analysis/* sampai TTL habis.
+    """
+    import asyncio
+    
+    start_time = time.time()
+    project_ids = list(dict.fromkeys(request.project_ids))
+    trading_styles = list(dict.fromkeys(request.trading_styles))
+    price_results = await asyncio.gather(
+        *(get_price_data(project_id, days=request.days, interval=request.interval) for project_id in project_ids),
+        return_exceptions=True
+    )
+    
+    # PERBAIKAN: maksimal satu job per worker proses; sisanya menunggu di sini (bukan di antrian
+    # executor yang me-reject dengan 503 setelah timeout) dan lane tetap bisa dipakai endpoint lain
+    slots = asyncio.Semaphore(get_executor("process").max_workers)
+    
+    async def optimize(project_id: str, price_data: pd.DataFrame):
+        async with slots:
+            try:
+                return project_id, await run_in_process(precompute_parameters, price_data, trading_styles)
+            except Exception as e:
+                return project_id, e
+    
+    errors = {}
+    jobs = []
+    for project_id, price_data in zip(project_ids, price_results):
+        if isinstance(price_data, Exception):
+            errors[project_id] = str(price_data.detail if isinstance(price_data, HTTPException) else price_data)
+        else:
+            jobs.append(optimize(project_id, price_data))
+    
+    parameter_store = get_parameter_store()
+    results = {}
+    for project_id, outcome in await asyncio.gather(*jobs):
+        if isinstance(outcome, Exception):
+            logger.error(f"Error optimizing parameters for {project_id}: {str(outcome)}")
+            errors[project_id] = str(outcome)
+            continue
+        results[project_id] = {}
+        for result in outcome:
+            if result['status'] != 'insufficient_data':
+                parameter_store.put(project_id, result)
+            results[project_id][result['trading_style']] = {
+                "market_regime": result['market_regime'],
+                "status": result['status'],
+                "parameters": result['parameters'],
+                "adopted": [name for name, family in result['families'].items() if family['adopted']]
+            }
+    
+    return {
+        "results": results,
+        "errors": errors,
+        "period": f"{request.days} days ({request.interval})",
+        "execution_time": time.time() - start_time
+    }
+
 # Backtesting endpoint
 @router.post("/backtest/{project_id}")
 async def backtest_strategy(
@@ -1465,21 +1825,25 @@ async def backtest_strategy(
         )
 
         # Detect market regime
-        market_regime = detect_market_regime(price_data)
+        market_regime = await run_in_thread(detect_market_regime, price_data)
         
         # Get optimal parameters if none provided
         if not indicator_periods:
-            indicator_periods = get_optimal_parameters(price_data, market_regime)
+            indicator_periods = await run_in_thread(get_optimized_parameters, project_id, price_data, market_regime)
             logger.info(f"Using optimized parameters for {market_regime} regime")
             
         # Run backtest - import dari src.technical.signals untuk menghindari rekursi
         from src.technical.signals import backtest_strategy as run_backtest
-        backtest_results = run_backtest(
+        # OPTIMIZATION: Backtest sudah tervektorisasi (numpy), cukup di thread executor
+        backtest_results = await run_in_thread(
+            run_backtest,
             price_data, 
             strategy_type=strategy_type,
             indicator_periods=indicator_periods,
             initial_capital=initial_capital
         )
+        if 'error' in backtest_results:
+            raise HTTPException(status_code=400, detail=backtest_results['error'])
         
         # Format trade history
         trade_history = []
@@ -1583,6 +1947,68 @@ async def backtest_strategy(
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error running backtest: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@router.post("/backtest/{project_id}/sweep")
+async def backtest_parameter_sweep(
+    project_id: str = Path(..., description="Project ID"),
+    request: BacktestSweepRequest = Body(...)
+):
+    """
+    Grid search parameter strategi: semua kombinasi dievaluasi dengan backtest
+    tervektorisasi, dibagi ke process executor, lalu dikembalikan parameter set
+    Pareto-terbaik (total_return & sharpe_ratio maksimum, max_drawdown minimum).
+    """
+    import asyncio
+
+    logger.info(f"Backtest sweep request for {project_id} using {request.strategy_type} strategy")
+    start_time = time.time()
+
+    try:
+        # Ekspansi grid di thread pool agar event loop tidak terblokir
+        combinations = await run_in_thread(expand_grid, request.strategy_type, request.grid)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not combinations:
+        raise HTTPException(status_code=400, detail="Parameter grid has no valid combinations")
+
+    try:
+        price_data = await get_price_data(project_id, days=request.days, interval=request.interval)
+        if len(price_data) < MIN_BACKTEST_POINTS:
+            raise HTTPException(status_code=400, detail="Insufficient data for backtesting")
+        close = price_data['close'].to_numpy(dtype=float)
+
+        # Satu potongan grid per worker proses; grid kecil tidak dipecah (overhead pickling)
+        chunks = split_combinations(combinations, get_executor("process").max_workers)
+        if len(chunks) == 1:
+            results = [await run_in_thread(
+                evaluate_parameter_grid, close, request.strategy_type, chunks[0], request.initial_capital
+            )]
+        else:
+            results = await asyncio.gather(*[
+                run_in_process(evaluate_parameter_grid, close, request.strategy_type, chunk, request.initial_capital)
+                for chunk in chunks
+            ])
+
+        summary = summarize_sweep(combinations, merge_grid_results(results), request.top_n)
+        return {
+            "project_id": project_id,
+            "strategy": request.strategy_type,
+            "period": f"{request.days} days ({request.interval})",
+            "initial_capital": request.initial_capital,
+            **summary,
+            "chunks": len(chunks),
+            "execution_time": time.time() - start_time,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running backtest sweep: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
@@ -0,0 +1,216 @@
+import os
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import EXECUTOR_CONFIG
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusyError(HTTPException):
+    """Antrian executor penuh: request ditolak dengan 503 (backpressure) daripada menumpuk"""
+
+    def __init__(self, lane: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"Server busy ({lane} executor queue full), please retry",
+            headers={"Retry-After": str(max(1, int(round(retry_after))))}
+        )
+        self.lane = lane
+
+
+class BoundedExecutor:
+    """
+    Pool thread/process dengan antrian terbatas.
+
+    Setiap lane punya kapasitas max_workers + max_pending. Request yang tidak
+    mendapat slot dalam queue_timeout detik ditolak dengan ExecutorBusyError,
+    sehingga event loop tidak pernah memblok dan endpoint ringan (cache hit,
+    blockchain I/O) tetap dilayani saat model sedang menghitung.
+    """
+
+    def __init__(self, lane: str, kind: str = "thread", max_workers: int = 4,
+                 max_pending: int = 32, queue_timeout: float = 10.0,
+                 start_method: Optional[str] = None):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Invalid executor kind: {kind}")
+
+        self.lane = lane
+        self.kind = kind
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(0, int(max_pending))
+        self.queue_timeout = queue_timeout
+        self.start_method = start_method
+
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+
+        # Semaphore dibuat per event loop (asyncio primitive terikat ke loop)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0,
+            'running': 0, 'waiting': 0, 'total_wait_time': 0.0, 'total_run_time': 0.0
+        }
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_pending
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        context = multiprocessing.get_context(self.start_method) if self.start_method else None
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                    else:
+                        self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix=f"{self.lane}-executor")
+                    logger.info(f"Started {self.kind} executor '{self.lane}' "
+                                f"({self.max_workers} workers, {self.max_pending} pending)")
+        return self._pool
+
+    def _reset_pool(self):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._slots_loop = loop
+        return self._slots
+
+    def _update_stats(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Jalankan func(*args, **kwargs) di pool; tunggu slot maksimal queue_timeout detik"""
+        slots = self._get_slots()
+        wait_start = time.time()
+
+        self._update_stats(waiting=1)
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._update_stats(rejected=1)
+            logger.warning(f"Executor '{self.lane}' saturated, rejecting {getattr(func, '__name__', func)}")
+            raise ExecutorBusyError(self.lane, self.queue_timeout)
+        finally:
+            self._update_stats(waiting=-1)
+
+        run_start = time.time()
+        self._update_stats(submitted=1, running=1, total_wait_time=run_start - wait_start)
+
+        def _finish(future: asyncio.Future):
+            failed = future.cancelled() or future.exception() is not None
+            self._update_stats(running=-1, completed=0 if failed else 1, failed=1 if failed else 0,
+                               total_run_time=time.time() - run_start)
+            # Slot dilepas saat worker benar-benar selesai (bukan saat caller timeout/cancel),
+            # jadi kapasitas lane selalu mencerminkan pekerjaan yang sedang jalan
+            slots.release()
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(self._get_pool(), functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._update_stats(running=-1, failed=1)
+            slots.release()
+            raise
+        future.add_done_callback(_finish)
+
+        try:
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            # Worker process mati (OOM/segfault): buat pool baru untuk request berikutnya
+            logger.error(f"Process pool '{self.lane}' broken, restarting")
+            self._reset_pool()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        finished = stats['completed'] + stats['failed']
+        stats.update({
+            'lane': self.lane,
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'avg_wait_time': stats['total_wait_time'] / stats['submitted'] if stats['submitted'] else 0.0,
+            'avg_run_time': stats['total_run_time'] / finished if finished else 0.0
+        })
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+_executors: Dict[str, BoundedExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(lane: str) -> BoundedExecutor:
+    """Executor bersama per lane ("thread", "process", "io") sesuai EXECUTOR_CONFIG"""
+    if lane not in _executors:
+        with _executors_lock:
+            if lane not in _executors:
+                if lane not in EXECUTOR_CONFIG:
+                    raise ValueError(f"Unknown executor lane: {lane}")
+                config = dict(EXECUTOR_CONFIG[lane])
+                kind = config.pop("kind", "process" if lane == "process" else "thread")
+                _executors[lane] = BoundedExecutor(lane, kind=kind, **config)
+    return _executors[lane]
+
+
+async def run_in_thread(func: Callable, *args, **kwargs) -> Any:
+    """Untuk kode NumPy/torch/pandas yang melepas GIL (inference model, indikator)"""
+    return await get_executor("thread").run(func, *args, **kwargs)
+
+
+async def run_in_process(func: Callable, *args, **kwargs) -> Any:
+    """
+    Untuk kode pure-Python yang berat (fitting ARIMA, backtest loop).
+    func dan argumen harus bisa di-pickle (fungsi level modul).
+    """
+    return await get_executor("process").run(func, *args, **kwargs)
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Untuk I/O blocking (HTTP sinkron ke API eksternal) agar tidak memakai slot compute"""
+    return await get_executor("io").run(func, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {lane: executor.stats() for lane, executor in list(_executors.items())}
+
+
+def shutdown_executors(wait: bool = True):
+    for executor in list(_executors.values()):
+        executor.shutdown(wait=wait)
@@ -34,15 +34,21 @@ if sys.platform.startswith('win'):
 
 # Path handling
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config import API_HOST, API_PORT
+from config import API_HOST, API_PORT, PROCESSED_DIR
 
 # Import untuk fungsi training model dan processing
 from main import train_models, process_data
 
 # Import routers
-from src.api.recommend import router as recommend_router
+from src.api.recommend import (
+    router as recommend_router, invalidate_user_recommendations,
+    start_background_model_loading, startup_status
+)
 from src.api.analysis import router as analysis_router
 from src.api.blockchain import router as blockchain_router
+from src.data.interaction_log import get_interaction_log
+from src.api.executors import executor_stats, shutdown_executors, run_in_thread
+from src.models.model_registry import MODEL_TYPES, get_model_registry
 
 # ⚡ ENHANCED: Setup logging dengan Unicode support dan filter
 class UnicodeLoggingFilter(logging.Filter):
@@ -172,6 +178,17 @@ async def add_process_time_header(request: Request, call_next):
         
     return response
 
+# ⚡ OPTIMIZATION: Model dimuat di background, server langsung menerima request
+# (readiness dilaporkan lewat /health/ready)
+@app.on_event("startup")
+async def load_models_in_background():
+    start_background_model_loading()
+
+# Tutup executor (thread/process pool) saat server berhenti
+@app.on_event("shutdown")
+async def shutdown_compute_executors():
+    shutdown_executors(wait=False)
+
 # ⚡ ENHANCED: Exception handler dengan better error categorization
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -224,6 +241,13 @@ class TrainModelsRequest(BaseModel):
     force: bool = Field(False, description="Whether to force training despite data quality issues")
     test_only: bool = Field(False, description="Flag to mark request as testing only")
     fecf_params: Optional[Dict[str, Any]] = Field(None, description="Parameters specific to FECF model")
+    auto_swap: bool = Field(True, description="Hot-swap the newly trained versions into the API after training")
+
+# Model untuk swap versi model (registry)
+class ModelSwapRequest(BaseModel):
+    version: Optional[str] = Field(None, description="Version to activate (default: latest registered version)")
+    wait: bool = Field(False, description="Wait until the new version is loaded, warmed and active")
+    force: bool = Field(False, description="Reload even if the version is already active")
 
 # NEW: Model untuk production pipeline request
 class ProductionPipelineRequest(BaseModel):
@@ -333,39 +357,26 @@ async def record_interaction(interaction: InteractionRecord):
         return {"status": "success", "message": "Test mode - Interaction not recorded"}
         
     try:
-        # Buat path ke csv file
-        interactions_path = os.path.join("data", "processed", "interactions.csv")
-        
-        # PERBAIKAN: Pastikan direktori ada
-        os.makedirs(os.path.dirname(interactions_path), exist_ok=True)
-        
-        # Append interaction to CSV
-        import pandas as pd
-        from datetime import datetime
-        
-        # Buat DataFrame untuk satu baris
-        new_interaction = pd.DataFrame([{
-            'user_id': interaction.user_id,
-            'project_id': interaction.project_id,
-            'interaction_type': interaction.interaction_type,
-            'weight': interaction.weight,
-            'timestamp': interaction.timestamp or datetime.now().isoformat()
-        }])
-        
         # Log untuk debugging dengan safe string handling
         safe_user_id = interaction.user_id.encode('ascii', 'ignore').decode('ascii')
         safe_project_id = interaction.project_id.encode('ascii', 'ignore').decode('ascii')
         logger.info(f"Recording interaction: {safe_user_id} -> {safe_project_id} ({interaction.interaction_type})")
         
-        # Jika file sudah ada, append tanpa header
-        if os.path.exists(interactions_path):
-            new_interaction.to_csv(interactions_path, mode='a', header=False, index=False)
-        else:
-            # Jika file belum ada, buat dengan header
-            new_interaction.to_csv(interactions_path, index=False)
+        # OPTIMIZATION: Append satu baris ke interaction log (header dibuat jika file baru)
+        # dan update index per user, tanpa membangun DataFrame per request
+        get_interaction_log(os.path.join(PROCESSED_DIR, "interactions.csv")).append(
+            user_id=interaction.user_id,
+            project_id=interaction.project_id,
+            interaction_type=interaction.interaction_type,
+            weight=interaction.weight,
+            timestamp=interaction.timestamp
+        )
         
         logger.info(f"Recorded interaction for user {safe_user_id} with project {safe_project_id}")
         
+        # Request berikutnya menghitung ulang (interaksi baru di-fold-in ke FECF tanpa retrain)
+        invalidate_user_recommendations(interaction.user_id)
+        
         return {"status": "success", "message": "Interaction recorded successfully"}
     
     except Exception as e:
@@ -412,9 +423,18 @@ async def admin_train_models(request: TrainModelsRequest = Body(...)):
         result = train_models(args)
         
         if result:
+            # ⚡ OPTIMIZATION: Versi baru dimuat + di-warm di background lalu di-swap, tanpa restart API
+            swaps = {}
+            if request.auto_swap:
+                registry = get_model_registry()
+                swaps = {
+                    model_type: registry.swap_async(model_type)
+                    for model_type in request.models if model_type in MODEL_TYPES
+                }
             return {
                 "status": "success", 
-                "message": f"Models trained successfully: {request.models}"
+                "message": f"Models trained successfully: {request.models}",
+                "swaps": swaps
             }
         else:
             return {
@@ -427,6 +447,64 @@ async def admin_train_models(request: TrainModelsRequest = Body(...)):
         logger.error(f"Error training models: {safe_error}")
         raise HTTPException(status_code=500, detail=f"Error training models: {safe_error}")
 
+def _validate_model_type(model_type: str):
+    if model_type not in MODEL_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid model type: {model_type}. Choose from {list(MODEL_TYPES)}")
+
+@app.get("/admin/models", tags=["admin"])
+async def admin_model_status():
+    """Versi aktif, status swap, dan versi yang bisa di-rollback per model"""
+    return get_model_registry().status()
+
+@app.get("/admin/models/{model_type}/versions", tags=["admin"])
+async def admin_model_versions(model_type: str):
+    _validate_model_type(model_type)
+    # Discovery membaca direktori model dan bisa menulis manifest baru
+    versions = await run_in_thread(get_model_registry().versions, model_type)
+    return {"model_type": model_type, "versions": versions}
+
+@app.post("/admin/models/{model_type}/swap", tags=["admin"])
+async def admin_swap_model(model_type: str, request: ModelSwapRequest = Body(ModelSwapRequest())):
+    """Muat versi (default terbaru), warm-up, lalu swap atomik; request yang sedang jalan selesai di versi lama"""
+    _validate_model_type(model_type)
+    registry = get_model_registry()
+    
+    try:
+        if request.wait:
+            handle = await run_in_thread(registry.activate, model_type, request.version, request.force)
+            if handle is None:
+                raise HTTPException(status_code=404, detail=f"No registered {model_type} model version")
+            return {"status": "success", "model_type": model_type, "swap": registry.swap_status(model_type)}
+        
+        # Validasi versi sebelum memulai swap di background
+        if request.version is not None:
+            await run_in_thread(registry.resolve, model_type, request.version)
+        return {"status": "accepted", "model_type": model_type,
+                "swap": registry.swap_async(model_type, request.version, request.force)}
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        safe_error = str(e).encode('ascii', 'ignore').decode('ascii')
+        logger.error(f"Error swapping {model_type} model: {safe_error}")
+        raise HTTPException(status_code=500, detail=f"Error swapping model: {safe_error}")
+
+@app.post("/admin/models/{model_type}/rollback", tags=["admin"])
+async def admin_rollback_model(model_type: str):
+    """Kembali ke versi sebelumnya yang masih di memori (instan, tanpa reload)"""
+    _validate_model_type(model_type)
+    registry = get_model_registry()
+    
+    try:
+        handle = registry.rollback(model_type)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if handle is None:
+        raise HTTPException(status_code=409, detail=f"No previous {model_type} version available for rollback")
+    return {"status": "success", "model_type": model_type, "swap": registry.swap_status(model_type)}
+
 # Model untuk sinkronisasi data
 class SyncDataRequest(BaseModel):
     projects_updated: bool = Field(False, description="Whether projects data has been updated")
@@ -755,8 +833,11 @@ async def root():
 # ⚡ ENHANCED: Health check endpoint dengan better system info
 @app.get("/health")
 async def health_check():
+    startup = startup_status()
     return {
         "status": "healthy",
+        "ready": startup["ready"],
+        "startup": startup,
         "timestamp": time.time(),
         "system_info": {
             "platform": sys.platform,
@@ -774,6 +855,8 @@ async def health_check():
             "polygonscan": "configured" if os.environ.get("POLYGONSCAN_API_KEY") else "missing",
             "coingecko": "configured" if os.environ.get("COINGECKO_API_KEY") else "missing"
         },
+        "executors": executor_stats(),
+        "models": get_model_registry().status(),
         "performance_thresholds": {
             "blockchain_endpoints": "30s (normal for multi-chain data)",
             "analysis_endpoints": "10s",
@@ -788,6 +871,12 @@ async def health_check():
         }
     }
 
+# Readiness probe: 503 sampai model startup selesai dimuat
+@app.get("/health/ready")
+async def readiness_check():
+    startup = startup_status()
+    return JSONResponse(status_code=200 if startup["ready"] else 503, content=startup)
+
 # Run the API server
 if __name__ == "__main__":
     import uvicorn
@@ -1,24 +1,34 @@
 import os
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 import json
 import pickle
 from fastapi import APIRouter, HTTPException, Query, Depends, Body, Path
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Path handling
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-# Model imports
-from src.models.alt_fecf import FeatureEnhancedCF
-from src.models.ncf import NCFRecommender
-from src.models.hybrid import HybridRecommender
-from config import MODELS_DIR, PROCESSED_DIR
+# ⚡ OPTIMIZATION: Kelas model (torch, scikit-learn) tidak di-import di sini;
+# registry meng-import-nya saat model pertama kali dimuat
+from src.api.recommendation_cache import RecommendationCache
+from src.data.interaction_log import get_interaction_log
+from src.api.executors import run_in_thread
+from src.api.single_flight import SingleFlight
+from src.models.materialized_store import get_materialized_store, model_fingerprint
+from src.models.model_registry import MODEL_TYPES, ModelHandle, get_model_registry, import_model_modules
+from config import (
+    MODELS_DIR, PROCESSED_DIR, RECOMMENDATION_CACHE_CONFIG, RECOMMENDATION_BATCH_CONFIG, API_STARTUP_CONFIG
+)
 
 # Setup router
 router = APIRouter(
@@ -34,12 +44,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Global model dan cache
-_models = {
-    "fecf": None,
-    "ncf": None,
-    "hybrid": None
-}
+# Global model registry dan cache
+_model_registry = get_model_registry()
 
 # ⚡ PERBAIKAN: TTL cache (2-5 menit)
 _cache_ttl = {
@@ -53,12 +59,18 @@ _cache_ttl = {
 _cache_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'cache')
 os.makedirs(_cache_dir, exist_ok=True)
 
-# Cache in-memory
-_user_recommendations_cache = {
-    "fecf": {},
-    "ncf": {},
-    "hybrid": {}
-}
+# ⚡ OPTIMIZATION: Cache rekomendasi dengan batas ukuran (LRU + TTL) dan persistensi
+# write-behind ke SQLite, namespace per model ("fecf", "ncf", "hybrid")
+_user_recommendations_cache = RecommendationCache(
+    db_path=os.path.join(_cache_dir, "recommendations_cache.sqlite"),
+    max_entries=RECOMMENDATION_CACHE_CONFIG["max_entries"],
+    max_bytes=RECOMMENDATION_CACHE_CONFIG["max_bytes"],
+    flush_interval=RECOMMENDATION_CACHE_CONFIG["flush_interval"]
+)
+
+# ⚡ OPTIMIZATION: Single-flight untuk cache miss, request identik yang datang bersamaan
+# (fan-out frontend, TTL habis, setelah /cache/clear) menunggu satu komputasi yang sama
+_recommendation_flights = SingleFlight("recommendations")
 
 # ⚡ TAMBAHAN: Tracking untuk cold-start users yang baru dapat interaksi
 _cold_start_tracking = {}
@@ -68,39 +80,10 @@ def _get_cache_file_path(cache_type: str) -> str:
     return os.path.join(_cache_dir, f"{cache_type}_cache.pkl")
 
 def _load_persistent_cache():
-    """⚡ PERBAIKAN: Load cache dengan better error handling"""
-    global _user_recommendations_cache, _cold_start_tracking
+    """⚡ PERBAIKAN: Load cold-start tracking (cache rekomendasi di-load oleh RecommendationCache)"""
+    global _cold_start_tracking
     
     try:
-        # Load recommendation cache
-        for cache_type in ["fecf", "ncf", "hybrid"]:
-            cache_file = _get_cache_file_path(f"recommendations_{cache_type}")
-            if os.path.exists(cache_file):
-                try:
-                    with open(cache_file, 'rb') as f:
-                        cached_data = pickle.load(f)
-                        # Filter expired entries
-                        current_time = datetime.now()
-                        valid_cache = {}
-                        for key, value in cached_data.items():
-                            try:
-                                if current_time < value['expires']:
-                                    valid_cache[key] = value
-                            except (KeyError, TypeError) as e:
-                                logger.warning(f"Invalid cache entry {key}: {e}")
-                                continue
-                        _user_recommendations_cache[cache_type] = valid_cache
-                        logger.info(f"Loaded {len(valid_cache)} valid {cache_type} cache entries")
-                except (pickle.UnpicklingError, AttributeError, ImportError) as e:
-                    logger.warning(f"Failed to load {cache_type} cache, will recreate: {e}")
-                    # ⚡ PERBAIKAN: Delete corrupted cache file
-                    try:
-                        os.remove(cache_file)
-                        logger.info(f"Removed corrupted cache file: {cache_file}")
-                    except:
-                        pass
-                    _user_recommendations_cache[cache_type] = {}
-        
         # Load cold-start tracking
         tracking_file = _get_cache_file_path("cold_start_tracking")
         if os.path.exists(tracking_file):
@@ -119,27 +102,14 @@ def _load_persistent_cache():
                 
     except Exception as e:
         logger.warning(f"Error loading persistent cache: {e}")
-        # ⚡ PERBAIKAN: Initialize empty cache on any error
-        for cache_type in ["fecf", "ncf", "hybrid"]:
-            _user_recommendations_cache[cache_type] = {}
         _cold_start_tracking = {}
 
 def _save_persistent_cache():
-    """⚡ PERBAIKAN: Save cache dengan better error handling"""
+    """⚡ PERBAIKAN: Save cold-start tracking (cache rekomendasi dipersist write-behind)"""
     try:
         # Ensure cache directory exists
         os.makedirs(_cache_dir, exist_ok=True)
         
-        # Save recommendation cache
-        for cache_type, cache_data in _user_recommendations_cache.items():
-            try:
-                cache_file = _get_cache_file_path(f"recommendations_{cache_type}")
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(cache_data, f)
-                logger.debug(f"Saved {cache_type} cache with {len(cache_data)} entries")
-            except Exception as e:
-                logger.warning(f"Failed to save {cache_type} cache: {e}")
-        
         # Save cold-start tracking
         try:
             tracking_file = _get_cache_file_path("cold_start_tracking")
@@ -155,43 +125,32 @@ def _save_persistent_cache():
 def _check_recent_interactions(user_id: str) -> bool:
     """⚡ PERBAIKAN: Check apakah user memiliki interaksi baru dalam 5 menit terakhir"""
     try:
-        interactions_path = os.path.join(PROCESSED_DIR, "interactions.csv")
-        if not os.path.exists(interactions_path):
-            return False
-            
-        # Baca file interactions
-        interactions_df = pd.read_csv(interactions_path)
-        
-        # Filter untuk user ini
-        user_interactions = interactions_df[interactions_df['user_id'] == user_id].copy()  # ⚡ FIX: Tambah .copy()
-        
-        if user_interactions.empty:
+        # OPTIMIZATION: Query index per user, bukan scan seluruh interactions.csv per request
+        interaction_log = get_interaction_log(os.path.join(PROCESSED_DIR, "interactions.csv"))
+        if not interaction_log.has_user(user_id):
             return False
         
-        # Check timestamp kolom
-        if 'timestamp' in user_interactions.columns:
-            # Parse timestamp dan check 5 menit terakhir
-            try:
-                user_interactions.loc[:, 'timestamp'] = pd.to_datetime(user_interactions['timestamp'])  # ⚡ FIX: Gunakan .loc
-                recent_threshold = datetime.now() - timedelta(minutes=5)
-                recent_interactions = user_interactions[user_interactions['timestamp'] > recent_threshold]
-                
-                if not recent_interactions.empty:
-                    logger.info(f"Found {len(recent_interactions)} recent interactions for user {user_id}")
-                    return True
-            except Exception as e:
-                logger.warning(f"Error parsing timestamps: {e}")
+        recent_interactions = interaction_log.recent_interactions(user_id, within=timedelta(minutes=5))
+        if recent_interactions:
+            logger.info(f"Found {len(recent_interactions)} recent interactions for user {user_id}")
+            return True
                 
-        # Fallback: check jika user ada di file (tanpa timestamp check)
-        return len(user_interactions) > 0
+        # Fallback: user ada di log (tanpa timestamp check)
+        return True
         
     except Exception as e:
         logger.warning(f"Error checking recent interactions: {e}")
         return False
 
+def invalidate_user_recommendations(user_id: str) -> int:
+    """Hapus response rekomendasi user dari cache (semua model), mis. setelah interaksi baru direkam"""
+    keys = _user_recommendations_cache.invalidate_prefix(f"{user_id}_")
+    _recommendation_flights.forget_prefix(f"{user_id}_")
+    return len(keys)
+
 def _invalidate_cold_start_cache(user_id: str):
     """⚡ TAMBAHAN: Invalidate cache untuk user yang tidak lagi cold-start"""
-    global _user_recommendations_cache, _cold_start_tracking
+    global _cold_start_tracking
     
     try:
         # Mark user sebagai tidak cold-start lagi
@@ -202,13 +161,9 @@ def _invalidate_cold_start_cache(user_id: str):
         }
         
         # Hapus cache untuk user ini dari semua model
-        for cache_type in _user_recommendations_cache:
-            cache = _user_recommendations_cache[cache_type]
-            keys_to_remove = [key for key in cache.keys() if key.startswith(f"{user_id}_")]
-            
-            for key in keys_to_remove:
-                del cache[key]
-                logger.info(f"Invalidated cache key: {key}")
+        for key in _user_recommendations_cache.invalidate_prefix(f"{user_id}_"):
+            logger.info(f"Invalidated cache key: {key}")
+        _recommendation_flights.forget_prefix(f"{user_id}_")
         
         # Save persistent cache
         _save_persistent_cache()
@@ -263,153 +218,211 @@ class RecommendationResponse(BaseModel):
     cache_hit: bool = False  # ⚡ TAMBAHAN: Info apakah dari cache
     cold_start_invalidated: bool = False  # ⚡ TAMBAHAN: Info apakah cache cold-start di-invalidate
 
-# Load models function (tetap sama)
-def load_models_on_startup():
-    """Load recommendation models on API startup"""
-    logger.info("Loading recommendation models on startup...")
-    
+class BatchRecommendationRequest(BaseModel):
+    requests: List[RecommendationRequest]
+    stream: bool = False  # True: hasil dikirim per user sebagai NDJSON begitu siap
+
+class BatchRecommendationItem(BaseModel):
+    index: int  # Posisi di BatchRecommendationRequest.requests
+    user_id: str
+    model_type: str
+    status: str = "success"
+    response: Optional[RecommendationResponse] = None
+    error: Optional[str] = None
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[BatchRecommendationItem]
+    total: int
+    cache_hits: int
+    error_count: int
+    execution_time: float
+    timestamp: datetime
+
+# ⚡ OPTIMIZATION: Model dikelola registry (versi + manifest), bisa di-swap tanpa restart API
+def _on_model_swap(model_type: str, old_handle: Optional[ModelHandle], new_handle: ModelHandle):
+    """Response cache dan flight milik versi lama tidak boleh dipakai setelah swap"""
+    invalidated = _user_recommendations_cache.invalidate_prefix("", namespace=model_type)
+    _recommendation_flights.forget_all()
+    logger.info(f"{model_type} model swapped to version {new_handle.version}, "
+                f"invalidated {len(invalidated)} cached responses")
+
+_model_registry.add_listener(_on_model_swap)
+
+# ⚡ OPTIMIZATION: Status startup untuk readiness probe (/health/ready)
+_startup_state: Dict[str, Any] = {
+    'state': 'pending',
+    'started_at': None,
+    'finished_at': None,
+    'duration': None,
+    'models': {model_type: 'pending' for model_type in MODEL_TYPES}
+}
+_startup_lock = threading.Lock()
+_startup_thread: Optional[threading.Thread] = None
+
+def _set_startup_model_state(model_type: str, state: str):
+    with _startup_lock:
+        _startup_state['models'][model_type] = state
+
+def _load_startup_model(model_type: str):
+    _set_startup_model_state(model_type, 'loading')
     try:
-        # Check for FECF model files
-        fecf_files = [f for f in os.listdir(MODELS_DIR) 
-                     if f.startswith("fecf_model_") and f.endswith(".pkl")]
-        
-        if fecf_files:
-            latest_fecf = sorted(fecf_files)[-1]
-            fecf_path = os.path.join(MODELS_DIR, latest_fecf)
-            
-            logger.info(f"Loading FECF model from {fecf_path}")
-            model = FeatureEnhancedCF()
-            if model.load_data():
-                if model.load_model(fecf_path):
-                    _models["fecf"] = model
-                    logger.info("FECF model loaded successfully")
-                else:
-                    logger.error(f"Failed to load FECF model from {fecf_path}")
-            else:
-                logger.error("Failed to load data for FECF model")
+        if _model_registry.activate(model_type) is None:
+            logger.warning(f"No {model_type} model files found")
+            _set_startup_model_state(model_type, 'missing')
         else:
-            logger.warning("No FECF model files found")
-            
-        # Check for NCF model file
-        ncf_path = os.path.join(MODELS_DIR, "ncf_model.pkl")
-        if os.path.exists(ncf_path):
-            logger.info(f"Loading NCF model from {ncf_path}")
-            model = NCFRecommender()
-            if model.load_data():
-                if model.load_model(ncf_path):
-                    _models["ncf"] = model
-                    logger.info("NCF model loaded successfully")
-                else:
-                    logger.error(f"Failed to load NCF model from {ncf_path}")
-            else:
-                logger.error("Failed to load data for NCF model")
-        else:
-            logger.warning(f"NCF model file not found at {ncf_path}")
-            
-        # Check for Hybrid model files
-        hybrid_files = [f for f in os.listdir(MODELS_DIR) 
-                      if f.startswith("hybrid_model_") and f.endswith(".pkl")]
-        
-        if hybrid_files:
-            latest_hybrid = sorted(hybrid_files)[-1]
-            hybrid_path = os.path.join(MODELS_DIR, latest_hybrid)
-            
-            logger.info(f"Loading Hybrid model from {hybrid_path}")
-            model = HybridRecommender()
-            if model.load_data():
-                if model.load_model(hybrid_path):
-                    _models["hybrid"] = model
-                    logger.info("Hybrid model loaded successfully")
-                else:
-                    logger.error(f"Failed to load Hybrid model from {hybrid_path}")
-            else:
-                logger.error("Failed to load data for Hybrid model")
-        else:
-            logger.warning("No Hybrid model files found")
-            
-        logger.info(f"Models loaded on startup: {list(_models.keys())}")
-        
+            _set_startup_model_state(model_type, 'ready')
     except Exception as e:
-        logger.error(f"Error loading models on startup: {str(e)}")
+        logger.error(f"Error loading {model_type} model on startup: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
+        _set_startup_model_state(model_type, 'failed')
+
+def load_models_on_startup(parallel: Optional[bool] = None):
+    """Load recommendation models on API startup (versi terbaru di registry)"""
+    if parallel is None:
+        parallel = API_STARTUP_CONFIG.get('parallel', True)
+
+    logger.info(f"Loading recommendation models on startup ({'parallel' if parallel else 'sequential'})...")
+    start_time = time.time()
+    with _startup_lock:
+        _startup_state.update(state='loading', started_at=datetime.now().isoformat())
 
-load_models_on_startup()
+    try:
+        # Import sekali secara berurutan, lalu I/O + unpickle + warm-up per model berjalan bersamaan
+        import_model_modules()
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(MODEL_TYPES), thread_name_prefix="model-load") as pool:
+                list(pool.map(_load_startup_model, MODEL_TYPES))
+        else:
+            for model_type in MODEL_TYPES:
+                _load_startup_model(model_type)
+    except Exception as e:
+        logger.error(f"Error loading models on startup: {str(e)}")
+        for model_type, state in startup_status()['models'].items():
+            if state in ('pending', 'loading'):
+                _set_startup_model_state(model_type, 'failed')
+
+    duration = time.time() - start_time
+    with _startup_lock:
+        _startup_state.update(state='finished', finished_at=datetime.now().isoformat(), duration=duration)
+
+    logger.info(f"Models loaded on startup in {duration:.2f}s: "
+                f"{[m for m in MODEL_TYPES if _model_registry.get(m) is not None]}")
+
+def start_background_model_loading() -> bool:
+    """Jalankan load_models_on_startup di background thread (sekali per proses)"""
+    global _startup_thread
+    with _startup_lock:
+        if _startup_thread is not None or _startup_state['state'] != 'pending':
+            return False
+        _startup_thread = threading.Thread(
+            target=load_models_on_startup, name="model-startup", daemon=True
+        )
+    _startup_thread.start()
+    return True
+
+def startup_status() -> Dict[str, Any]:
+    """
+    ready = loading startup selesai dan semua model di required_models aktif
+    (model tanpa file hasil training tidak menahan readiness)
+    """
+    with _startup_lock:
+        status = dict(_startup_state)
+        status['models'] = dict(_startup_state['models'])
+    required = API_STARTUP_CONFIG.get('required_models', MODEL_TYPES)
+    status['ready'] = status['state'] == 'finished' and all(
+        status['models'].get(model_type) in ('ready', 'missing') for model_type in required
+    )
+    return status
+
+if not API_STARTUP_CONFIG.get('background_load', True):
+    load_models_on_startup()
 
-# Helper functions (get_model tetap sama)
 def get_model(model_type: str) -> Any:
-    global _models
-    
-    if model_type not in ["fecf", "ncf", "hybrid"]:
+    """Model versi aktif; dimuat dari registry jika belum ada versi aktif"""
+    if model_type not in MODEL_TYPES:
         raise ValueError(f"Invalid model type: {model_type}")
     
-    if _models[model_type] is not None:
-        return _models[model_type]
+    model = _model_registry.get(model_type)
+    if model is not None:
+        return model
     
     try:
-        if model_type == "fecf":
-            from src.models.alt_fecf import FeatureEnhancedCF
-            model = FeatureEnhancedCF()
-        elif model_type == "ncf":
-            from src.models.ncf import NCFRecommender
-            model = NCFRecommender()
-        else:  # hybrid
-            from src.models.hybrid import HybridRecommender
-            model = HybridRecommender()
-        
-        logger.info(f"Loading data for {model_type} model")
-        data_loaded = model.load_data()
-        if not data_loaded:
-            logger.error(f"Failed to load data for {model_type} model")
-            return None
-            
-        model_loaded = False
-        if model_type == "fecf":
-            fecf_files = [f for f in os.listdir(MODELS_DIR) 
-                        if f.startswith("fecf_model_") and f.endswith(".pkl")]
-            if fecf_files:
-                latest_fecf = sorted(fecf_files)[-1]
-                model_path = os.path.join(MODELS_DIR, latest_fecf)
-                logger.info(f"Loading {model_type} model from {model_path}")
-                model_loaded = model.load_model(model_path)
-        elif model_type == "ncf":
-            model_path = os.path.join(MODELS_DIR, "ncf_model.pkl")
-            if os.path.exists(model_path):
-                logger.info(f"Loading {model_type} model from {model_path}")
-                model_loaded = model.load_model(model_path)
-        else:  # hybrid
-            hybrid_files = [f for f in os.listdir(MODELS_DIR) 
-                         if f.startswith("hybrid_model_") and f.endswith(".pkl")]
-            if hybrid_files:
-                latest_hybrid = sorted(hybrid_files)[-1]
-                model_path = os.path.join(MODELS_DIR, latest_hybrid)
-                logger.info(f"Loading {model_type} model from {model_path}")
-                model_loaded = model.load_model(model_path)
-        
-        if model_loaded:
-            logger.info(f"{model_type} model loaded successfully")
-            _models[model_type] = model
-            return model
-        else:
-            logger.error(f"Failed to load {model_type} model file")
+        handle = _model_registry.activate(model_type)
+        if handle is None:
+            logger.error(f"No {model_type} model available in registry")
             return None
-            
+        return handle.model
+        
     except Exception as e:
         logger.error(f"Error initializing {model_type} model: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         return None
 
+def _fecf_component(model: Any) -> Optional[Any]:
+    """Model FECF yang bisa fold-in: model itu sendiri atau komponen FECF dari hybrid"""
+    # Cek lewat atribut (bukan isinstance) supaya modul FECF tidak perlu di-import di sini
+    if hasattr(model, 'is_folded_user') and hasattr(model, 'loaded_interaction_count'):
+        return model
+    fecf_model = getattr(model, 'fecf_model', None)
+    if hasattr(fecf_model, 'is_folded_user') and hasattr(fecf_model, 'loaded_interaction_count'):
+        return fecf_model
+    return None
+
+def _is_folded_user(user_id: str, model: Any) -> bool:
+    fecf_model = _fecf_component(model)
+    return fecf_model is not None and fecf_model.is_folded_user(user_id)
+
+def _fold_in_new_interactions(user_id: str, model: Any) -> bool:
+    """
+    ⚡ OPTIMIZATION: Interaksi yang direkam lewat /interactions/record setelah model dimuat
+    di-fold-in ke FECF (rating vector baru, tanpa retrain), sehingga user baru langsung
+    mendapat skor personal. Hanya interaksi di luar data yang dimuat model yang dipakai
+    (maks N interaksi terakhir per user dari index interaction log).
+    Return True jika user sekarang punya vector hasil fold-in.
+    """
+    fecf_model = _fecf_component(model)
+    if fecf_model is None or not hasattr(model, 'fold_in_user') or not fecf_model.is_trained():
+        return False
+    
+    try:
+        interaction_log = get_interaction_log(os.path.join(PROCESSED_DIR, "interactions.csv"))
+        total_count = interaction_log.interaction_count(user_id)
+        new_count = total_count - fecf_model.loaded_interaction_count(user_id)
+        if new_count <= 0:
+            return fecf_model.is_folded_user(user_id)
+        
+        # Fold-in terakhir sudah memakai semua interaksi yang ada di log
+        if fecf_model.folded_interaction_count(user_id) == total_count:
+            return True
+        
+        interactions = []
+        for record in interaction_log.recent_interactions(user_id)[-new_count:]:
+            try:
+                interactions.append((str(record.get('project_id')), float(record.get('weight', 0))))
+            except (TypeError, ValueError):
+                continue
+        
+        return model.fold_in_user(user_id, interactions, interaction_count=total_count)
+        
+    except Exception as e:
+        logger.warning(f"Error folding in interactions for user {user_id}: {e}")
+        return False
+
 def is_cold_start_user(user_id: str, model: Any) -> bool:
     """⚡ PERBAIKAN: Enhanced cold-start detection dengan proper matrix check"""
     
     # Check basic condition - apakah user ada di trained matrix
     user_in_matrix = False
     if hasattr(model, 'user_item_matrix') and model.user_item_matrix is not None:
-        user_in_matrix = user_id in model.user_item_matrix.index
+        user_in_matrix = model.user_item_matrix.has_user(user_id)
     
-    # ⚡ PERBAIKAN: Jika user TIDAK ada di matrix, SELALU cold-start
-    # Meskipun ada recent interactions, matrix belum ter-update
+    # ⚡ OPTIMIZATION: User baru yang interaksinya sudah di-fold-in ke FECF tidak cold-start
+    if not user_in_matrix and _is_folded_user(user_id, model):
+        return False
+    
+    # ⚡ PERBAIKAN: Jika user TIDAK ada di matrix (dan tidak bisa di-fold-in), SELALU cold-start
     if not user_in_matrix:
         logger.info(f"User {user_id} not in trained matrix, treating as cold-start (matrix needs retrain)")
         return True
@@ -417,254 +430,315 @@ def is_cold_start_user(user_id: str, model: Any) -> bool:
     # Jika user ada di matrix, tidak cold-start
     return False
 
-# Main recommendation endpoint
-@router.post("/projects", response_model=RecommendationResponse)
-async def recommend_projects(request: RecommendationRequest):
-    start_time = datetime.now()
-    logger.info(f"Recommendation request for user {request.user_id} using {request.model_type} model")
-    
-    # Cache checking (tetap sama)
-    cache = _user_recommendations_cache.get(request.model_type, {})
-    cache_key = f"{request.user_id}_{request.num_recommendations}_{request.category}_{request.chain}"
-    
-    cache_hit = False
-    cold_start_invalidated = False
-    
-    if cache_key in cache:
-        cache_entry = cache[cache_key]
-        if datetime.now() < cache_entry['expires']:
-            logger.info(f"Returning cached recommendations for {cache_key}")
-            
-            cached_response = cache_entry['response']
-            cached_response.timestamp = datetime.now()
-            cached_response.execution_time = (datetime.now() - start_time).total_seconds()
-            cached_response.cache_hit = True
-            
-            return cached_response
-
-    try:
-        # Get appropriate model
-        model = get_model(request.model_type)
-        if not model:
-            raise HTTPException(status_code=500, detail=f"Failed to load {request.model_type} model")
-        
-        # ⚡ PERBAIKAN: Simplified cold-start detection
-        is_cold_start = is_cold_start_user(request.user_id, model)
-        user_interaction_count = 0
+def _generate_recommendations(request: RecommendationRequest, model: Any, is_cold_start: bool):
+    """
+    Bagian sinkron (CPU-bound) dari recommend_projects: dijalankan di thread executor
+    supaya inference model tidak memblok event loop. Return (recommendations, is_cold_start).
+    """
+    if is_cold_start:
+        logger.info(f"Cold-start user detected: {request.user_id}")
         
-        # ⚡ PERBAIKAN: Hanya hitung interactions jika user ada di matrix
-        if not is_cold_start and hasattr(model, 'user_item_matrix') and model.user_item_matrix is not None:
-            try:
-                user_interactions = model.user_item_matrix.loc[request.user_id]
-                user_interaction_count = (user_interactions > 0).sum()
-            except KeyError:
-                # ⚡ SAFETY: Jika user tidak ada di matrix, fallback ke cold-start
-                logger.warning(f"User {request.user_id} missing from matrix, fallback to cold-start")
-                is_cold_start = True
-                user_interaction_count = 0
-        
-        # ⚡ TAMBAHAN: Check recent interactions untuk informasi saja (tidak affect logic)
-        has_recent_interactions = _check_recent_interactions(request.user_id)
-        if has_recent_interactions and is_cold_start:
-            logger.info(f"User {request.user_id} has recent interactions but matrix not updated - recommend model retrain")
-            # Bisa add flag untuk monitoring
-            cold_start_invalidated = True
-        
-        # Determine cache TTL
-        if is_cold_start:
-            cache_ttl = _cache_ttl["cold_start"]  # 2 menit
-        elif user_interaction_count < 10:
-            cache_ttl = _cache_ttl["low_activity"]  # 3 menit
-        elif user_interaction_count < 50:
-            cache_ttl = _cache_ttl["normal"]  # 4 menit
+        if hasattr(model, 'get_cold_start_recommendations'):
+            recommendations = model.get_cold_start_recommendations(
+                user_interests=request.user_interests,
+                n=request.num_recommendations
+            )
         else:
-            cache_ttl = _cache_ttl["active"]  # 5 menit
-
-        # Generate recommendations
-        if is_cold_start:
-            logger.info(f"Cold-start user detected: {request.user_id}")
-            
-            if hasattr(model, 'get_cold_start_recommendations'):
-                recommendations = model.get_cold_start_recommendations(
-                    user_interests=request.user_interests,
-                    n=request.num_recommendations
-                )
-            else:
-                logger.warning(f"Model {request.model_type} tidak memiliki method get_cold_start_recommendations, fallback ke popular_projects")
-                recommendations = model.get_popular_projects(n=request.num_recommendations)
-        else:
-            # ⚡ PERBAIKAN: Tambah safety check sebelum akses matrix
-            try:
-                # Regular recommendations logic (sama seperti sebelumnya)
-                if request.category and request.chain:
-                    logger.info(f"Filtering by both category '{request.category}' and chain '{request.chain}'")
-                    
-                    if hasattr(model, 'get_recommendations_by_category_and_chain'):
-                        recommendations = model.get_recommendations_by_category_and_chain(
-                            request.user_id, 
-                            request.category,
-                            request.chain,
-                            n=request.num_recommendations,
-                            strict=request.strict_filter
-                        )
-                    elif hasattr(model, 'get_recommendations_by_category'):
-                        if 'chain' in inspect.signature(model.get_recommendations_by_category).parameters:
-                            recommendations = model.get_recommendations_by_category(
-                                request.user_id, 
-                                request.category,
-                                n=request.num_recommendations,
-                                chain=request.chain,
-                                strict=request.strict_filter
-                            )
-                        else:
-                            category_recs = model.get_recommendations_by_category(
-                                request.user_id, 
-                                request.category,
-                                n=request.num_recommendations * 3
-                            )
-                            
-                            chain_filtered = []
-                            for rec in category_recs:
-                                if 'chain' in rec and rec['chain'] and request.chain.lower() in str(rec['chain']).lower():
-                                    rec['filter_match'] = 'exact'
-                                    chain_filtered.append(rec)
-                            
-                            recommendations = chain_filtered[:request.num_recommendations]
-                            
-                            if len(recommendations) < request.num_recommendations // 2:
-                                logger.warning(f"Too few results after chain filtering ({len(recommendations)}). Adding some category-only results.")
-                                remaining = request.num_recommendations - len(recommendations)
-                                existing_ids = [rec['id'] for rec in recommendations]
-                                additional = []
-                                for rec in category_recs:
-                                    if rec['id'] not in existing_ids:
-                                        rec['filter_match'] = 'category_only'
-                                        additional.append(rec)
-                                        if len(additional) >= remaining:
-                                            break
-                                recommendations.extend(additional)
-                    else:
-                        logger.warning(f"Model {request.model_type} doesn't support category and chain filtering. Using standard recommendations.")
-                        recommendations = model.recommend_projects(request.user_id, n=request.num_recommendations)
-                elif request.category:
-                    if hasattr(model, 'get_recommendations_by_category'):
+            logger.warning(f"Model {request.model_type} tidak memiliki method get_cold_start_recommendations, fallback ke popular_projects")
+            recommendations = model.get_popular_projects(n=request.num_recommendations)
+    else:
+        # ⚡ PERBAIKAN: Tambah safety check sebelum akses matrix
+        try:
+            # Regular recommendations logic (sama seperti sebelumnya)
+            if request.category and request.chain:
+                logger.info(f"Filtering by both category '{request.category}' and chain '{request.chain}'")
+                
+                if hasattr(model, 'get_recommendations_by_category_and_chain'):
+                    recommendations = model.get_recommendations_by_category_and_chain(
+                        request.user_id, 
+                        request.category,
+                        request.chain,
+                        n=request.num_recommendations,
+                        strict=request.strict_filter
+                    )
+                elif hasattr(model, 'get_recommendations_by_category'):
+                    if 'chain' in inspect.signature(model.get_recommendations_by_category).parameters:
                         recommendations = model.get_recommendations_by_category(
                             request.user_id, 
-                            request.category, 
+                            request.category,
                             n=request.num_recommendations,
+                            chain=request.chain,
                             strict=request.strict_filter
                         )
                     else:
-                        logger.warning(f"Model {request.model_type} doesn't support category filtering. Using standard recommendations.")
-                        recommendations = model.recommend_projects(request.user_id, n=request.num_recommendations)
-                elif request.chain:
-                    if hasattr(model, 'get_recommendations_by_chain'):
-                        recommendations = model.get_recommendations_by_chain(
+                        category_recs = model.get_recommendations_by_category(
                             request.user_id, 
-                            request.chain, 
-                            n=request.num_recommendations,
-                            strict=request.strict_filter
+                            request.category,
+                            n=request.num_recommendations * 3
                         )
-                    else:
-                        logger.warning(f"Model {request.model_type} doesn't support chain filtering. Using standard recommendations.")
-                        recommendations = model.recommend_projects(request.user_id, n=request.num_recommendations)
+                        
+                        chain_filtered = []
+                        for rec in category_recs:
+                            if 'chain' in rec and rec['chain'] and request.chain.lower() in str(rec['chain']).lower():
+                                rec['filter_match'] = 'exact'
+                                chain_filtered.append(rec)
+                        
+                        recommendations = chain_filtered[:request.num_recommendations]
+                        
+                        if len(recommendations) < request.num_recommendations // 2:
+                            logger.warning(f"Too few results after chain filtering ({len(recommendations)}). Adding some category-only results.")
+                            remaining = request.num_recommendations - len(recommendations)
+                            existing_ids = [rec['id'] for rec in recommendations]
+                            additional = []
+                            for rec in category_recs:
+                                if rec['id'] not in existing_ids:
+                                    rec['filter_match'] = 'category_only'
+                                    additional.append(rec)
+                                    if len(additional) >= remaining:
+                                        break
+                            recommendations.extend(additional)
                 else:
-                    recommendations = model.recommend_projects(
+                    logger.warning(f"Model {request.model_type} doesn't support category and chain filtering. Using standard recommendations.")
+                    recommendations = model.recommend_projects(request.user_id, n=request.num_recommendations)
+            elif request.category:
+                if hasattr(model, 'get_recommendations_by_category'):
+                    recommendations = model.get_recommendations_by_category(
                         request.user_id, 
-                        n=request.num_recommendations
+                        request.category, 
+                        n=request.num_recommendations,
+                        strict=request.strict_filter
                     )
-            except KeyError as e:
-                # ⚡ SAFETY: Jika ada KeyError saat generate recommendations, fallback ke cold-start
-                logger.error(f"KeyError during recommendation generation for user {request.user_id}: {e}")
-                logger.info(f"Falling back to cold-start recommendations")
-                
-                is_cold_start = True  # Update status
-                if hasattr(model, 'get_cold_start_recommendations'):
-                    recommendations = model.get_cold_start_recommendations(
-                        user_interests=request.user_interests,
-                        n=request.num_recommendations
+                else:
+                    logger.warning(f"Model {request.model_type} doesn't support category filtering. Using standard recommendations.")
+                    recommendations = model.recommend_projects(request.user_id, n=request.num_recommendations)
+            elif request.chain:
+                if hasattr(model, 'get_recommendations_by_chain'):
+                    recommendations = model.get_recommendations_by_chain(
+                        request.user_id, 
+                        request.chain, 
+                        n=request.num_recommendations,
+                        strict=request.strict_filter
                     )
                 else:
-                    recommendations = model.get_popular_projects(n=request.num_recommendations)
-        
-        # Process recommendations (tetap sama seperti sebelumnya)
-        project_responses = []
-        exact_match_count = 0
-        
-        for rec in recommendations:
-            try:
-                clean_rec = sanitize_project_data(rec)
-
-                if 'filter_match' in clean_rec and clean_rec['filter_match'] == 'exact':
-                    exact_match_count += 1
-                
-                if 'recommendation_score' in clean_rec:
-                    clean_rec['recommendation_score'] = float(clean_rec['recommendation_score'])
-                
-                project_responses.append(
-                    ProjectResponse(
-                        id=clean_rec.get('id'),
-                        name=clean_rec.get('name'),
-                        symbol=clean_rec.get('symbol'),
-                        image=clean_rec.get('image'),
-                        current_price=clean_rec.get('current_price'),
-                        price_change_24h=clean_rec.get('price_change_24h'),
-                        price_change_percentage_7d_in_currency=clean_rec.get('price_change_percentage_7d_in_currency'),
-                        market_cap=clean_rec.get('market_cap'),
-                        total_volume=clean_rec.get('total_volume'),
-                        popularity_score=clean_rec.get('popularity_score'),
-                        trend_score=clean_rec.get('trend_score'),
-                        category=clean_rec.get('primary_category', clean_rec.get('category')),
-                        chain=clean_rec.get('chain'),
-                        recommendation_score=clean_rec.get('recommendation_score', 0.5),
-                        filter_match=clean_rec.get('filter_match')
+                    logger.warning(f"Model {request.model_type} doesn't support chain filtering. Using standard recommendations.")
+                    recommendations = model.recommend_projects(request.user_id, n=request.num_recommendations)
+            else:
+                # ⚡ OPTIMIZATION: Tanpa filter, layani dari materialized top-N jika tersedia
+                # (kecuali user hasil fold-in: list offline belum memuat interaksi barunya)
+                precomputed = None
+                if not _is_folded_user(request.user_id, model):
+                    precomputed = _get_materialized_recommendations(request)
+                if precomputed is not None:
+                    recommendations = model.recommend_projects(
+                        request.user_id,
+                        n=request.num_recommendations,
+                        precomputed=precomputed
                     )
-                )
-            except Exception as e:
-                logger.warning(f"Error processing recommendation item: {e}. Skipping item.")
-                continue
-        
-        logger.info(f"Found {exact_match_count} exact matches out of {len(project_responses)} recommendations")
-        
-        response = RecommendationResponse(
-            user_id=request.user_id,
-            model_type=request.model_type,
-            recommendations=project_responses,
-            timestamp=datetime.now(),
-            is_cold_start=is_cold_start,
-            category_filter=request.category,
-            chain_filter=request.chain,
-            execution_time=(datetime.now() - start_time).total_seconds(),
-            exact_match_count=exact_match_count,
-            cache_hit=cache_hit,
-            cold_start_invalidated=cold_start_invalidated
-        )
-        
-        # Store in cache
-        if request.user_id not in _user_recommendations_cache:
-            _user_recommendations_cache[request.model_type] = {}
+                else:
+                    recommendations = model.recommend_projects(
+                        request.user_id, 
+                        n=request.num_recommendations
+                    )
+        except KeyError as e:
+            # ⚡ SAFETY: Jika ada KeyError saat generate recommendations, fallback ke cold-start
+            logger.error(f"KeyError during recommendation generation for user {request.user_id}: {e}")
+            logger.info(f"Falling back to cold-start recommendations")
             
-        _user_recommendations_cache[request.model_type][cache_key] = {
-            'response': response,
-            'expires': datetime.now() + timedelta(seconds=cache_ttl)
-        }
+            is_cold_start = True  # Update status
+            if hasattr(model, 'get_cold_start_recommendations'):
+                recommendations = model.get_cold_start_recommendations(
+                    user_interests=request.user_interests,
+                    n=request.num_recommendations
+                )
+            else:
+                recommendations = model.get_popular_projects(n=request.num_recommendations)
+    
+    return recommendations, is_cold_start
+
+def _get_materialized_recommendations(request: RecommendationRequest) -> Optional[List[Tuple[str, float]]]:
+    """
+    Top-n dari materialized store (python main.py materialize). None jika store tidak ada,
+    dibuat dari file model lain dari yang sedang dimuat, user tidak ada, atau n > N tersimpan.
+    """
+    store = get_materialized_store(request.model_type)
+    if store is None:
+        return None
+    
+    fingerprint = model_fingerprint(_model_registry.model_path(request.model_type))
+    if fingerprint is None or store.model != fingerprint:
+        logger.debug(f"Materialized {request.model_type} store does not match loaded model, scoring online")
+        return None
+    
+    return store.get(request.user_id, request.num_recommendations)
+
+def _recommendation_cache_key(request: RecommendationRequest) -> str:
+    return f"{request.user_id}_{request.num_recommendations}_{request.category}_{request.chain}"
+
+# Main recommendation endpoint
+@router.post("/projects", response_model=RecommendationResponse)
+async def recommend_projects(request: RecommendationRequest):
+    start_time = datetime.now()
+    logger.info(f"Recommendation request for user {request.user_id} using {request.model_type} model")
+    
+    # Cache checking (LRU + TTL)
+    cache_key = _recommendation_cache_key(request)
+    
+    cached_response = _user_recommendations_cache.get(request.model_type, cache_key)
+    if cached_response is not None:
+        logger.info(f"Returning cached recommendations for {cache_key}")
         
-        # Save persistent cache
-        try:
-            _save_persistent_cache()
-        except Exception as e:
-            logger.warning(f"Failed to save persistent cache: {e}")
+        cached_response.timestamp = datetime.now()
+        cached_response.execution_time = (datetime.now() - start_time).total_seconds()
+        cached_response.cache_hit = True
         
-        logger.info(f"Cached response for {cache_key} with TTL {cache_ttl} seconds")
+        return cached_response
+
+    # Cache miss: request konkuren dengan key yang sama berbagi satu komputasi
+    flight_key = f"{cache_key}:{request.model_type}"
+    return await _recommendation_flights.do(
+        flight_key,
+        lambda: _compute_recommendation_response(request, cache_key, flight_key, start_time)
+    )
+
+async def _compute_recommendation_response(request: RecommendationRequest, cache_key: str, flight_key: str,
+                                           start_time: datetime) -> RecommendationResponse:
+    """Generate response rekomendasi (cache miss) dan simpan ke cache"""
+    # Generasi flight saat mulai; invalidasi (interaksi baru, swap model) menggantinya
+    flight_generation = _recommendation_flights.generation(flight_key)
+    try:
+        # Get appropriate model
+        model = await run_in_thread(get_model, request.model_type)
+        if not model:
+            raise HTTPException(status_code=500, detail=f"Failed to load {request.model_type} model")
         
-        return response
+        # OPTIMIZATION: Inference model di thread executor (bounded), event loop tetap melayani request lain
+        return await run_in_thread(_build_recommendation_response, request, model, cache_key, start_time,
+                                   flight_key, flight_generation)
         
+    except HTTPException:
+        # Termasuk ExecutorBusyError (503) saat executor penuh
+        raise
     except Exception as e:
         logger.error(f"Error generating recommendations: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Recommendation error: {str(e)}")
 
+def _build_recommendation_response(request: RecommendationRequest, model: Any, cache_key: str,
+                                   start_time: datetime, flight_key: Optional[str] = None,
+                                   flight_generation: Optional[int] = None) -> RecommendationResponse:
+    """
+    Bagian sinkron recommend_projects setelah model didapat: generate, format, simpan ke cache.
+    flight_key/flight_generation diisi jika dipanggil dari SingleFlight (lihat recommend_projects);
+    path batch tidak memakai flight sehingga cache selalu ditulis.
+    """
+    cache_hit = False
+    cold_start_invalidated = False
+    
+    # Interaksi baru sejak model dimuat (user baru maupun lama) di-fold-in dulu
+    _fold_in_new_interactions(request.user_id, model)
+    
+    # ⚡ PERBAIKAN: Simplified cold-start detection
+    is_cold_start = is_cold_start_user(request.user_id, model)
+    user_interaction_count = 0
+    
+    # ⚡ PERBAIKAN: Hanya hitung interactions jika user ada di matrix
+    if not is_cold_start and hasattr(model, 'user_item_matrix') and model.user_item_matrix is not None:
+        if model.user_item_matrix.has_user(request.user_id):
+            user_interaction_count = model.user_item_matrix.interaction_count(request.user_id)
+        elif _is_folded_user(request.user_id, model):
+            user_interaction_count = _fecf_component(model).folded_interaction_count(request.user_id) or 0
+        else:
+            # ⚡ SAFETY: Jika user tidak ada di matrix, fallback ke cold-start
+            logger.warning(f"User {request.user_id} missing from matrix, fallback to cold-start")
+            is_cold_start = True
+            user_interaction_count = 0
+    
+    # ⚡ TAMBAHAN: Check recent interactions untuk informasi saja (tidak affect logic)
+    has_recent_interactions = _check_recent_interactions(request.user_id)
+    if has_recent_interactions and is_cold_start:
+        logger.info(f"User {request.user_id} has recent interactions but matrix not updated - recommend model retrain")
+        # Bisa add flag untuk monitoring
+        cold_start_invalidated = True
+    
+    # Determine cache TTL
+    if is_cold_start:
+        cache_ttl = _cache_ttl["cold_start"]  # 2 menit
+    elif user_interaction_count < 10:
+        cache_ttl = _cache_ttl["low_activity"]  # 3 menit
+    elif user_interaction_count < 50:
+        cache_ttl = _cache_ttl["normal"]  # 4 menit
+    else:
+        cache_ttl = _cache_ttl["active"]  # 5 menit
+
+    # Generate recommendations
+    recommendations, is_cold_start = _generate_recommendations(request, model, is_cold_start)
+    
+    # Process recommendations (tetap sama seperti sebelumnya)
+    project_responses = []
+    exact_match_count = 0
+    
+    for rec in recommendations:
+        try:
+            clean_rec = sanitize_project_data(rec)
+
+            if 'filter_match' in clean_rec and clean_rec['filter_match'] == 'exact':
+                exact_match_count += 1
+            
+            if 'recommendation_score' in clean_rec:
+                clean_rec['recommendation_score'] = float(clean_rec['recommendation_score'])
+            
+            project_responses.append(
+                ProjectResponse(
+                    id=clean_rec.get('id'),
+                    name=clean_rec.get('name'),
+                    symbol=clean_rec.get('symbol'),
+                    image=clean_rec.get('image'),
+                    current_price=clean_rec.get('current_price'),
+                    price_change_24h=clean_rec.get('price_change_24h'),
+                    price_change_percentage_7d_in_currency=clean_rec.get('price_change_percentage_7d_in_currency'),
+                    market_cap=clean_rec.get('market_cap'),
+                    total_volume=clean_rec.get('total_volume'),
+                    popularity_score=clean_rec.get('popularity_score'),
+                    trend_score=clean_rec.get('trend_score'),
+                    category=clean_rec.get('primary_category', clean_rec.get('category')),
+                    chain=clean_rec.get('chain'),
+                    recommendation_score=clean_rec.get('recommendation_score', 0.5),
+                    filter_match=clean_rec.get('filter_match')
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Error processing recommendation item: {e}. Skipping item.")
+            continue
+    
+    logger.info(f"Found {exact_match_count} exact matches out of {len(project_responses)} recommendations")
+    
+    response = RecommendationResponse(
+        user_id=request.user_id,
+        model_type=request.model_type,
+        recommendations=project_responses,
+        timestamp=datetime.now(),
+        is_cold_start=is_cold_start,
+        category_filter=request.category,
+        chain_filter=request.chain,
+        execution_time=(datetime.now() - start_time).total_seconds(),
+        exact_match_count=exact_match_count,
+        cache_hit=cache_hit,
+        cold_start_invalidated=cold_start_invalidated
+    )
+    
+    # PERBAIKAN: flight yang di-invalidate selama komputasi tidak boleh menulis hasil lama ke cache
+    if flight_key is not None and not _recommendation_flights.is_current(flight_key, flight_generation):
+        logger.info(f"Skipping cache write for {cache_key}: invalidated during computation")
+        return response
+    
+    # Store in cache (persistensi write-behind, tidak ada I/O disk di request path)
+    _user_recommendations_cache.set(request.model_type, cache_key, response, ttl=cache_ttl)
+    
+    logger.info(f"Cached response for {cache_key} with TTL {cache_ttl} seconds")
+    
+    return response
+
 # Sanitize function (tetap sama)
 def sanitize_project_data(project_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Sanitize project data dengan validasi score yang ketat"""
@@ -800,8 +874,8 @@ async def get_trending_projects(
     model_type: str = Query("fecf", enum=["fecf", "ncf", "hybrid"])
 ):
     try:
-        model = get_model(model_type)
-        trending = model.get_trending_projects(n=limit)
+        model = await run_in_thread(get_model, model_type)
+        trending = await run_in_thread(model.get_trending_projects, n=limit)
         
         project_responses = []
         for rec in trending:
@@ -846,6 +920,8 @@ async def get_trending_projects(
                 
         return project_responses
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting trending projects: {str(e)}")
         import traceback
@@ -860,8 +936,8 @@ async def get_popular_projects(
     order: str = Query("desc", enum=["desc", "asc"])
 ):
     try:
-        model = get_model(model_type)
-        popular = model.get_popular_projects(n=limit)
+        model = await run_in_thread(get_model, model_type)
+        popular = await run_in_thread(model.get_popular_projects, n=limit)
         
         if sort == "popularity_score":
             popular = sorted(popular, key=lambda x: x.get('popularity_score', 0), reverse=(order == "desc"))
@@ -913,6 +989,8 @@ async def get_popular_projects(
                 
         return project_responses
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting popular projects: {str(e)}")
         import traceback
@@ -926,12 +1004,12 @@ async def get_similar_projects(
     model_type: str = Query("fecf", enum=["fecf", "ncf", "hybrid"])
 ):
     try:
-        model = get_model(model_type)
+        model = await run_in_thread(get_model, model_type)
         
         if not hasattr(model, 'get_similar_projects'):
-            model = get_model("fecf")
+            model = await run_in_thread(get_model, "fecf")
         
-        similar = model.get_similar_projects(project_id, n=limit)
+        similar = await run_in_thread(model.get_similar_projects, project_id, n=limit)
         
         project_responses = []
         for rec in similar:
@@ -969,36 +1047,151 @@ async def get_similar_projects(
             
         return project_responses
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting similar projects: {str(e)}")
         import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+# ⚡ OPTIMIZATION: Batch endpoint, banyak user dalam satu request
+def _prefetch_batch_scores(model: Any, requests: List[RecommendationRequest]):
+    """
+    Scoring vectorized untuk request tanpa filter: recommend_for_users model mengisi
+    cache per user di model, sehingga _build_recommendation_response per user tinggal
+    membaca hasilnya. Request dengan filter category/chain tetap dihitung online.
+    """
+    if not hasattr(model, 'recommend_for_users'):
+        return
+    
+    users_by_n: Dict[int, List[str]] = {}
+    for request in requests:
+        if request.category or request.chain or is_cold_start_user(request.user_id, model):
+            continue
+        if not _is_folded_user(request.user_id, model) and _get_materialized_recommendations(request) is not None:
+            continue
+        users_by_n.setdefault(request.num_recommendations, []).append(request.user_id)
+    
+    for n, user_ids in users_by_n.items():
+        try:
+            model.recommend_for_users(user_ids, n=n)
+        except Exception as e:
+            logger.warning(f"Batch scoring failed for {len(user_ids)} users, falling back to per-user scoring: {e}")
+
+def _build_batch_items(model: Any, indexed_requests: List[Tuple[int, RecommendationRequest]],
+                       start_time: datetime) -> List[BatchRecommendationItem]:
+    """Satu chunk batch untuk satu model (dijalankan sebagai satu job di thread executor)"""
+    _prefetch_batch_scores(model, [request for _, request in indexed_requests])
+    
+    items = []
+    for index, request in indexed_requests:
+        try:
+            response = _build_recommendation_response(request, model, _recommendation_cache_key(request), start_time)
+            items.append(BatchRecommendationItem(index=index, user_id=request.user_id,
+                                                 model_type=request.model_type, response=response))
+        except Exception as e:
+            logger.warning(f"Batch recommendation failed for user {request.user_id}: {e}")
+            items.append(BatchRecommendationItem(index=index, user_id=request.user_id, model_type=request.model_type,
+                                                 status="error", error=str(e)))
+    return items
+
+async def _iter_batch_items(batch: BatchRecommendationRequest, start_time: datetime):
+    """Yield BatchRecommendationItem: cache hit dulu, lalu per chunk per model saat selesai"""
+    chunk_size = max(1, RECOMMENDATION_BATCH_CONFIG["chunk_size"])
+    pending_by_model: Dict[str, List[Tuple[int, RecommendationRequest]]] = {}
+    
+    for index, request in enumerate(batch.requests):
+        cached_response = _user_recommendations_cache.get(request.model_type, _recommendation_cache_key(request))
+        if cached_response is not None:
+            cached_response.timestamp = datetime.now()
+            cached_response.execution_time = (datetime.now() - start_time).total_seconds()
+            cached_response.cache_hit = True
+            yield BatchRecommendationItem(index=index, user_id=request.user_id,
+                                          model_type=request.model_type, response=cached_response)
+        else:
+            pending_by_model.setdefault(request.model_type, []).append((index, request))
+    
+    for model_type, indexed_requests in pending_by_model.items():
+        try:
+            model = await run_in_thread(get_model, model_type)
+        except ValueError as e:
+            model, load_error = None, str(e)
+        else:
+            load_error = f"Failed to load {model_type} model"
+        
+        if not model:
+            for index, request in indexed_requests:
+                yield BatchRecommendationItem(index=index, user_id=request.user_id, model_type=model_type,
+                                              status="error", error=load_error)
+            continue
+        
+        for start in range(0, len(indexed_requests), chunk_size):
+            chunk = indexed_requests[start:start + chunk_size]
+            for item in await run_in_thread(_build_batch_items, model, chunk, start_time):
+                yield item
+
+@router.post("/batch")
+async def recommend_batch(batch: BatchRecommendationRequest):
+    """
+    Rekomendasi untuk banyak user dalam satu call. Request dikelompokkan per model,
+    request tanpa filter di-score sekaligus (batch FECF/NCF/Hybrid), hasil disimpan ke
+    cache yang sama dengan /projects. Dengan stream=True hasil dikirim sebagai NDJSON.
+    """
+    start_time = datetime.now()
+    max_users = RECOMMENDATION_BATCH_CONFIG["max_users"]
+    if len(batch.requests) > max_users:
+        raise HTTPException(status_code=400, detail=f"Batch too large ({len(batch.requests)} > {max_users} requests)")
+    
+    logger.info(f"Batch recommendation request for {len(batch.requests)} users")
+    
+    if batch.stream:
+        async def ndjson_lines():
+            try:
+                async for item in _iter_batch_items(batch, start_time):
+                    yield item.json() + "\n"
+            except Exception as e:
+                # Header sudah terkirim: laporkan error sebagai baris terakhir
+                logger.error(f"Error streaming batch recommendations: {e}")
+                yield json.dumps({"status": "error", "error": str(e)}) + "\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    try:
+        results = [item async for item in _iter_batch_items(batch, start_time)]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating batch recommendations: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Batch recommendation error: {str(e)}")
+    
+    results.sort(key=lambda item: item.index)
+    return BatchRecommendationResponse(
+        results=results,
+        total=len(results),
+        cache_hits=sum(1 for item in results if item.response is not None and item.response.cache_hit),
+        error_count=sum(1 for item in results if item.status == "error"),
+        execution_time=(datetime.now() - start_time).total_seconds(),
+        timestamp=datetime.now()
+    )
+
 # ⚡ PERBAIKAN: Enhanced cache clear dengan persistent storage
 @router.post("/cache/clear")
 async def clear_cache(full_clear: bool = False):
-    global _user_recommendations_cache, _models, _cold_start_tracking
+    global _cold_start_tracking
     
     try:
         # Count items before clearing
-        total_items = sum(len(cache) for cache in _user_recommendations_cache.values())
         tracking_items = len(_cold_start_tracking)
         
-        # Clear recommendation cache
-        for model_type in _user_recommendations_cache:
-            _user_recommendations_cache[model_type] = {}
+        # Clear recommendation cache (memori + store persistent)
+        total_items = _user_recommendations_cache.clear()
         
         # Clear cold-start tracking
         _cold_start_tracking = {}
         
         # ⚡ TAMBAHAN: Clear persistent cache files
         try:
-            for cache_type in ["fecf", "ncf", "hybrid"]:
-                cache_file = _get_cache_file_path(f"recommendations_{cache_type}")
-                if os.path.exists(cache_file):
-                    os.remove(cache_file)
-            
             tracking_file = _get_cache_file_path("cold_start_tracking")
             if os.path.exists(tracking_file):
                 os.remove(tracking_file)
@@ -1009,12 +1202,26 @@ async def clear_cache(full_clear: bool = False):
         
         # Optionally clear loaded models
         if full_clear:
-            for model_type in _models:
-                _models[model_type] = None
+            _model_registry.unload_all()
+            # Komputasi yang sedang jalan memakai model lama, jangan di-share ke request baru
+            _recommendation_flights.forget_all()
             return {"message": f"All caches cleared ({total_items} recommendations, {tracking_items} tracking entries, and all loaded models)"}
         
         return {"message": f"All caches cleared ({total_items} recommendations, {tracking_items} tracking entries)"}
     
     except Exception as e:
         logger.error(f"Error clearing cache: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Statistik cache rekomendasi dan request coalescing (single-flight)"""
+    return {
+        "recommendation_cache": _user_recommendations_cache.stats(),
+        "single_flight": _recommendation_flights.stats(),
+        "materialized": {
+            model_type: store.info() if store is not None else None
+            for model_type, store in ((m, get_materialized_store(m)) for m in MODEL_TYPES)
+        },
+        "cold_start_tracking": len(_cold_start_tracking)
+    }
@@ -0,0 +1,294 @@
+import os
+import logging
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class RecommendationCache:
+    """
+    Cache response rekomendasi dengan batas jumlah entry dan ukuran (bytes),
+    eviction LRU dan TTL per entry.
+
+    Persistensi bersifat write-behind: perubahan dimasukkan ke queue dan ditulis
+    ke SQLite (WAL) oleh satu background thread, jadi request path tidak pernah
+    melakukan I/O disk. Setiap perubahan hanya menulis entry yang berubah,
+    bukan seluruh cache.
+    """
+
+    def __init__(self, db_path: Optional[str] = None,
+                 max_entries: int = 10000,
+                 max_bytes: int = 256 * 1024 * 1024,
+                 flush_interval: float = 2.0):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+
+        # (namespace, key) -> (value, expires, size)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Any, datetime, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+        # Write-behind queue: ('set', ns, key, payload, expires) / ('delete', ns, key) / ('clear',)
+        self._pending: "queue.Queue[Tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        if self.db_path:
+            self._init_db()
+            self._load()
+            self._writer = threading.Thread(target=self._writer_loop, name="recommendation-cache-writer", daemon=True)
+            self._writer.start()
+
+    # ------------------------------------------------------------------
+    # Persistent store
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS recommendation_cache (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    expires REAL NOT NULL,
+                    payload BLOB NOT NULL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            """)
+        logger.info(f"Recommendation cache store ready at {self.db_path}")
+
+    def _load(self):
+        """Load entry yang belum expired (terbaru dulu) sampai batas entry/bytes"""
+        now_ts = time.time()
+        loaded = 0
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM recommendation_cache WHERE expires <= ?", (now_ts,))
+                rows = conn.execute(
+                    "SELECT namespace, cache_key, expires, payload FROM recommendation_cache "
+                    "ORDER BY expires DESC LIMIT ?", (self.max_entries,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load recommendation cache, starting empty: {e}")
+            return
+
+        # Masukkan dari yang paling lama supaya yang terbaru berada di ujung MRU
+        for namespace, key, expires_ts, payload in reversed(rows):
+            if self._total_bytes + len(payload) > self.max_bytes:
+                continue
+            try:
+                value = pickle.loads(payload)
+            except (pickle.UnpicklingError, AttributeError, ImportError, EOFError) as e:
+                logger.warning(f"Invalid cache entry {namespace}/{key}: {e}")
+                self._pending.put(('delete', namespace, key))
+                continue
+            self._entries[(namespace, key)] = (value, datetime.fromtimestamp(expires_ts), len(payload))
+            self._total_bytes += len(payload)
+            loaded += 1
+
+        logger.info(f"Loaded {loaded} valid recommendation cache entries")
+
+    def _writer_loop(self):
+        """Background thread: drain queue dan tulis batch dalam satu transaksi"""
+        conn = None
+        try:
+            conn = self._connect()
+            while not self._stop_event.is_set() or not self._pending.empty():
+                try:
+                    first = self._pending.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+
+                batch = [first]
+                while True:
+                    try:
+                        batch.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+
+                try:
+                    with conn:
+                        for op in batch:
+                            if op[0] == 'set':
+                                _, namespace, key, payload, expires_ts = op
+                                conn.execute(
+                                    "INSERT OR REPLACE INTO recommendation_cache "
+                                    "(namespace, cache_key, expires, payload) VALUES (?, ?, ?, ?)",
+                                    (namespace, key, expires_ts, payload)
+                                )
+                            elif op[0] == 'delete':
+                                conn.execute(
+                                    "DELETE FROM recommendation_cache WHERE namespace = ? AND cache_key = ?",
+                                    (op[1], op[2])
+                                )
+                            elif op[0] == 'clear':
+                                conn.execute("DELETE FROM recommendation_cache")
+                    logger.debug(f"Persisted {len(batch)} recommendation cache changes")
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist recommendation cache changes: {e}")
+                finally:
+                    for _ in batch:
+                        self._pending.task_done()
+        except Exception as e:
+            logger.error(f"Recommendation cache writer stopped: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _enqueue(self, op: Tuple):
+        if self._writer is not None:
+            self._pending.put(op)
+
+    # ------------------------------------------------------------------
+    # Cache API
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Ambil value jika ada dan belum expired (entry ditandai most-recently-used)"""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            value, expires, _ = entry
+            if datetime.now() >= expires:
+                self._remove((namespace, key))
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end((namespace, key))
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float):
+        """Simpan value dengan TTL (detik); evict LRU jika melewati batas"""
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"Cannot cache {namespace}/{key}: {e}")
+            return
+
+        size = len(payload)
+        if size > self.max_bytes:
+            logger.warning(f"Cache entry {namespace}/{key} ({size} bytes) exceeds cache size limit")
+            return
+
+        expires = datetime.now() + timedelta(seconds=ttl)
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key), persist=False)
+
+            self._entries[(namespace, key)] = (value, expires, size)
+            self._total_bytes += size
+            # Enqueue di dalam lock supaya urutan set/delete di disk sama dengan di memori
+            self._enqueue(('set', namespace, key, payload, expires.timestamp()))
+            self._evict()
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            if (namespace, key) not in self._entries:
+                return False
+            self._remove((namespace, key))
+            return True
+
+    def invalidate_prefix(self, prefix: str, namespace: Optional[str] = None) -> List[str]:
+        """Hapus semua key yang diawali prefix (mis. "user_id_"), opsional per namespace"""
+        with self._lock:
+            keys = [
+                cache_key for cache_key in self._entries
+                if cache_key[1].startswith(prefix) and (namespace is None or cache_key[0] == namespace)
+            ]
+            for cache_key in keys:
+                self._remove(cache_key)
+        return [key for _, key in keys]
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+            self._enqueue(('clear',))
+        return count
+
+    def purge_expired(self) -> int:
+        now = datetime.now()
+        with self._lock:
+            expired = [cache_key for cache_key, (_, expires, _) in self._entries.items() if now >= expires]
+            for cache_key in expired:
+                self._remove(cache_key)
+        return len(expired)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Tunggu sampai semua perubahan tertulis ke disk (untuk shutdown)"""
+        if self._writer is None:
+            return True
+        deadline = time.time() + timeout
+        while self._pending.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+        return self._pending.unfinished_tasks == 0
+
+    def close(self):
+        self.flush()
+        self._stop_event.set()
+        if self._writer is not None:
+            self._writer.join(timeout=self.flush_interval + 1)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        if namespace is None:
+            return len(self._entries)
+        with self._lock:
+            return sum(1 for ns, _ in self._entries if ns == namespace)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'pending_writes': self._pending.qsize(),
+                **self._stats
+            }
+
+    # ------------------------------------------------------------------
+    # Internal helpers (dipanggil dengan lock)
+    # ------------------------------------------------------------------
+
+    def _remove(self, cache_key: Tuple[str, str], persist: bool = True):
+        _, _, size = self._entries.pop(cache_key)
+        self._total_bytes -= size
+        if persist:
+            self._enqueue(('delete', cache_key[0], cache_key[1]))
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            cache_key = next(iter(self._entries))
+            self._remove(cache_key)
+            self._stats['evictions'] += 1
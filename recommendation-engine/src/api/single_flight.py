@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Request coalescing per key: caller konkuren dengan key yang sama menunggu
+    satu komputasi yang sedang berjalan dan berbagi hasilnya (termasuk exception).
+
+    Komputasi dijalankan sebagai task terpisah, jadi jika request leader
+    dibatalkan (client disconnect) follower tetap mendapat hasil.
+
+    Setiap flight mendapat nomor generasi. forget*() tidak membatalkan task yang sedang
+    jalan, jadi compute() yang menulis cache harus mengambil generation(key) di awal dan
+    melewati penulisan jika is_current(key, generation) sudah False.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        self._next_generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'leaders': 0, 'coalesced': 0, 'errors': 0, 'max_waiters': 0}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Jalankan compute() sekali untuk semua caller konkuren dengan key yang sama"""
+        with self._lock:
+            self._stats['calls'] += 1
+            task = self._flights.get(key)
+            if task is not None and not task.done():
+                self._stats['coalesced'] += 1
+                self._waiters[key] = self._waiters.get(key, 1) + 1
+                self._stats['max_waiters'] = max(self._stats['max_waiters'], self._waiters[key])
+                logger.debug(f"[{self.name}] Joining in-flight computation for {key}")
+            else:
+                self._stats['leaders'] += 1
+                self._next_generation += 1
+                self._generations[key] = self._next_generation
+                task = asyncio.ensure_future(self._run(key, compute))
+                self._flights[key] = task
+                self._waiters[key] = 1
+
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        start_time = time.time()
+        try:
+            return await compute()
+        except BaseException:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                # Key bisa sudah di-forget dan diganti flight baru
+                if self._flights.get(key) is asyncio.current_task():
+                    del self._flights[key]
+                    self._generations.pop(key, None)
+                    waiters = self._waiters.pop(key, 1)
+                else:
+                    waiters = 1
+            if waiters > 1:
+                logger.info(f"[{self.name}] {key}: 1 computation served {waiters} requests "
+                            f"in {time.time() - start_time:.2f}s")
+
+    def generation(self, key: str) -> Optional[int]:
+        """Generasi flight yang sedang terdaftar untuk key (None jika tidak ada)"""
+        with self._lock:
+            return self._generations.get(key)
+
+    def is_current(self, key: str, generation: Optional[int]) -> bool:
+        """False jika flight dengan generasi ini sudah di-forget (hasilnya basi)"""
+        with self._lock:
+            return generation is not None and self._generations.get(key) == generation
+
+    def forget(self, key: str) -> bool:
+        """Lepas flight yang sedang jalan: caller berikutnya memulai komputasi baru"""
+        with self._lock:
+            self._waiters.pop(key, None)
+            self._generations.pop(key, None)
+            return self._flights.pop(key, None) is not None
+
+    def forget_prefix(self, prefix: str) -> List[str]:
+        with self._lock:
+            keys = [key for key in self._flights if key.startswith(prefix)]
+            for key in keys:
+                self._flights.pop(key, None)
+                self._waiters.pop(key, None)
+                self._generations.pop(key, None)
+        return keys
+
+    def forget_all(self) -> int:
+        with self._lock:
+            count = len(self._flights)
+            self._flights.clear()
+            self._waiters.clear()
+            self._generations.clear()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._flights)
+        stats['coalescing_rate'] = stats['coalesced'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
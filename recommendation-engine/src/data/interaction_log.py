@@ -0,0 +1,274 @@
+import os
+import csv
+import io
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Tambahkan path root ke sys.path
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import PROCESSED_DIR
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+INTERACTION_COLUMNS = ['user_id', 'project_id', 'interaction_type', 'weight', 'timestamp']
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    # Simpan sebagai naive datetime supaya bisa dibandingkan dengan datetime.now()
+    return timestamp.replace(tzinfo=None)
+
+
+class UserInteractionSummary:
+    """Ringkasan interaksi satu user: jumlah, timestamp terakhir, dan N interaksi terakhir"""
+
+    __slots__ = ('count', 'last_timestamp', 'recent')
+
+    def __init__(self, max_recent: int):
+        self.count = 0
+        self.last_timestamp: Optional[datetime] = None
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=max_recent)
+
+    def add(self, record: Dict[str, Any]):
+        self.count += 1
+        timestamp = record.get('timestamp')
+        if timestamp is not None and (self.last_timestamp is None or timestamp > self.last_timestamp):
+            self.last_timestamp = timestamp
+        self.recent.append(record)
+
+
+class InteractionLog:
+    """
+    Index in-memory per user di atas interactions.csv yang bersifat append-only.
+
+    File CSV tetap menjadi segmen on-disk (training loader tetap membacanya
+    sekaligus dengan pd.read_csv). Index dibangun sekali, lalu hanya tail file
+    yang baru (sejak offset terakhir) yang di-parse, sehingga query
+    "interaksi terbaru user X" adalah O(1) dan append tidak membuat DataFrame.
+    Jika file diganti/dipotong (mis. pipeline menulis ulang), index dibangun ulang.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_recent_per_user: int = 20):
+        self.path = path or os.path.join(PROCESSED_DIR, "interactions.csv")
+        self.max_recent_per_user = max_recent_per_user
+
+        self._lock = threading.RLock()
+        self._users: Dict[str, UserInteractionSummary] = {}
+        self._columns: List[str] = list(INTERACTION_COLUMNS)
+        self._offset = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._total = 0
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Sinkronkan index dengan file (rebuild penuh atau baca tail saja)"""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return
+
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id or stat.st_size < self._offset:
+                self._rebuild(file_id)
+            elif stat.st_size > self._offset:
+                self._read_tail()
+
+    def _reset(self):
+        self._users = {}
+        self._columns = list(INTERACTION_COLUMNS)
+        self._offset = 0
+        self._file_id = None
+        self._total = 0
+
+    def _rebuild(self, file_id: Tuple[int, int]):
+        """Bangun index penuh dari file (dibaca sekaligus dengan pandas)"""
+        self._reset()
+        self._file_id = file_id
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        # Hanya proses sampai baris lengkap terakhir
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return
+
+        try:
+            df = pd.read_csv(io.BytesIO(data[:end]), dtype={'user_id': str, 'project_id': str})
+        except pd.errors.EmptyDataError:
+            self._offset = end
+            return
+
+        self._columns = list(df.columns)
+        self._offset = end
+
+        if df.empty or 'user_id' not in df.columns:
+            return
+
+        if 'timestamp' in df.columns:
+            timestamps = [_parse_timestamp(value) for value in df['timestamp'].tolist()]
+        else:
+            timestamps = [None] * len(df)
+
+        records = df.to_dict('records')
+        for record, timestamp in zip(records, timestamps):
+            record['timestamp'] = timestamp
+            self._add(record)
+
+        logger.info(f"Indexed {self._total} interactions for {len(self._users)} users from {self.path}")
+
+    def _read_tail(self):
+        """Parse hanya baris baru sejak offset terakhir"""
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return
+
+        reader = csv.reader(io.StringIO(data[:end].decode('utf-8')))
+        for row in reader:
+            if not row:
+                continue
+            record = dict(zip(self._columns, row))
+            record['timestamp'] = _parse_timestamp(record.get('timestamp'))
+            try:
+                record['weight'] = float(record.get('weight', 0))
+            except ValueError:
+                pass
+            self._add(record)
+
+        self._offset += end
+
+    def _add(self, record: Dict[str, Any]):
+        user_id = str(record.get('user_id'))
+        summary = self._users.get(user_id)
+        if summary is None:
+            summary = self._users[user_id] = UserInteractionSummary(self.max_recent_per_user)
+        summary.add(record)
+        self._total += 1
+
+    # ------------------------------------------------------------------
+    # Append
+    # ------------------------------------------------------------------
+
+    def append(self, user_id: str, project_id: str, interaction_type: str,
+               weight: float, timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Tambahkan satu interaksi ke file dan index (tanpa DataFrame)"""
+        timestamp = timestamp or datetime.now().isoformat()
+        values = {
+            'user_id': user_id,
+            'project_id': project_id,
+            'interaction_type': interaction_type,
+            'weight': weight,
+            'timestamp': timestamp
+        }
+
+        with self._lock:
+            # Sinkronkan dulu supaya header/kolom dan offset up-to-date
+            self.refresh()
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            columns = INTERACTION_COLUMNS if write_header else self._columns
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            if write_header:
+                writer.writerow(columns)
+            writer.writerow([values.get(column, '') for column in columns])
+
+            with open(self.path, 'a', encoding='utf-8', newline='') as f:
+                f.write(buffer.getvalue())
+
+            # Baris baru (dan header jika file baru) dibaca lewat jalur tail yang sama
+            self.refresh()
+
+        return values
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def has_user(self, user_id: str) -> bool:
+        self.refresh()
+        return str(user_id) in self._users
+
+    def interaction_count(self, user_id: str) -> int:
+        self.refresh()
+        summary = self._users.get(str(user_id))
+        return summary.count if summary else 0
+
+    def last_interaction_time(self, user_id: str) -> Optional[datetime]:
+        self.refresh()
+        summary = self._users.get(str(user_id))
+        return summary.last_timestamp if summary else None
+
+    def recent_interactions(self, user_id: str, within: Optional[timedelta] = None) -> List[Dict[str, Any]]:
+        """N interaksi terakhir user, opsional hanya yang lebih baru dari `within`"""
+        self.refresh()
+        summary = self._users.get(str(user_id))
+        if summary is None:
+            return []
+
+        records = list(summary.recent)
+        if within is not None:
+            threshold = datetime.now() - within
+            records = [
+                record for record in records
+                if record['timestamp'] is not None and record['timestamp'] > threshold
+            ]
+        return records
+
+    def has_recent_interactions(self, user_id: str, within: timedelta) -> bool:
+        """O(1): cek timestamp terakhir user terhadap threshold"""
+        last_timestamp = self.last_interaction_time(user_id)
+        if last_timestamp is None:
+            return False
+        return last_timestamp > datetime.now() - within
+
+    def load_dataframe(self) -> pd.DataFrame:
+        """Baca seluruh log sekaligus (untuk training/evaluasi)"""
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=INTERACTION_COLUMNS)
+        return pd.read_csv(self.path)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return self._total
+
+
+_interaction_logs: Dict[str, InteractionLog] = {}
+_interaction_logs_lock = threading.Lock()
+
+
+def get_interaction_log(path: Optional[str] = None) -> InteractionLog:
+    """Instance InteractionLog bersama per path (dipakai oleh semua endpoint API)"""
+    path = os.path.abspath(path or os.path.join(PROCESSED_DIR, "interactions.csv"))
+    with _interaction_logs_lock:
+        if path not in _interaction_logs:
+            _interaction_logs[path] = InteractionLog(path)
+        return _interaction_logs[path]
@@ -2,6 +2,12 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional, Union, Tuple, Any
 import logging
+import os
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.technical.indicator_graph import get_indicator_graph
 
 # Setup logging
 logging.basicConfig(
@@ -55,21 +61,34 @@ def calculate_market_metrics(price_df: pd.DataFrame,
     # Hitung persentase perubahan harga (returns)
     result_df['daily_return'] = result_df[price_col].pct_change()
     
+    # ⚡ OPTIMIZATION: Series turunan (MA, std, true range, EMA) diambil dari indicator graph:
+    # dihitung sekali per (data, periode) dan dipakai bersama signals.py / indicators.py
+    graph = get_indicator_graph()
+    
+    true_range = None
+    if 'high' in result_df.columns and 'low' in result_df.columns:
+        high, low, price = result_df['high'], result_df['low'], result_df[price_col]
+        
+        def compute_true_range() -> pd.Series:
+            tr1 = (high - low).abs()
+            tr2 = (high - price.shift(1)).abs()
+            tr3 = (low - price.shift(1)).abs()
+            return pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+        
+        true_range = graph.compute('true_range_abs', (high, low, price), {}, compute_true_range)
+    
     # Hitung metrik untuk berbagai ukuran window
     for window in window_sizes:
         # 1. Volatilitas (standar deviasi returns)
-        result_df[f'volatility_{window}d'] = result_df['daily_return'].rolling(window).std() * np.sqrt(window)
+        result_df[f'volatility_{window}d'] = graph.rolling_std(result_df['daily_return'], window) * np.sqrt(window)
         
         # 2. Average True Range (ATR) - ukuran volatilitas
-        if 'high' in result_df.columns and 'low' in result_df.columns:
-            tr1 = (result_df['high'] - result_df['low']).abs()
-            tr2 = (result_df['high'] - result_df[price_col].shift(1)).abs()
-            tr3 = (result_df['low'] - result_df[price_col].shift(1)).abs()
-            result_df['true_range'] = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            result_df[f'atr_{window}d'] = result_df['true_range'].rolling(window).mean()
+        if true_range is not None:
+            result_df['true_range'] = true_range
+            result_df[f'atr_{window}d'] = graph.sma(result_df['true_range'], window)
         
         # 3. Moving Averages
-        result_df[f'ma_{window}d'] = result_df[price_col].rolling(window).mean()
+        result_df[f'ma_{window}d'] = graph.sma(result_df[price_col], window)
         
         # 4. Relative Strength Index (RSI)
         delta = result_df[price_col].diff()
@@ -85,8 +104,8 @@ def calculate_market_metrics(price_df: pd.DataFrame,
                                       result_df[price_col].shift(window) - 1) * 100
         
         # 6. Bollinger Bands
-        ma = result_df[price_col].rolling(window).mean()
-        std = result_df[price_col].rolling(window).std()
+        ma = graph.sma(result_df[price_col], window)
+        std = graph.rolling_std(result_df[price_col], window)
         result_df[f'bollinger_upper_{window}d'] = ma + 2 * std
         result_df[f'bollinger_lower_{window}d'] = ma - 2 * std
         result_df[f'bollinger_pct_{window}d'] = (result_df[price_col] - result_df[f'bollinger_lower_{window}d']) / (
@@ -117,10 +136,10 @@ def calculate_market_metrics(price_df: pd.DataFrame,
     macd_slow = periods['macd_slow']
     macd_signal = periods['macd_signal']
     
-    ema_fast = result_df[price_col].ewm(span=macd_fast, adjust=False).mean()
-    ema_slow = result_df[price_col].ewm(span=macd_slow, adjust=False).mean()
+    ema_fast = graph.ema(result_df[price_col], macd_fast, adjust=False)
+    ema_slow = graph.ema(result_df[price_col], macd_slow, adjust=False)
     result_df['macd'] = ema_fast - ema_slow
-    result_df['macd_signal'] = result_df['macd'].ewm(span=macd_signal, adjust=False).mean()
+    result_df['macd_signal'] = graph.ema(result_df['macd'], macd_signal, adjust=False)
     result_df['macd_histogram'] = result_df['macd'] - result_df['macd_signal']
     
     # 10. Average Directional Index (ADX) - trend strength
@@ -138,7 +157,7 @@ def calculate_market_metrics(price_df: pd.DataFrame,
             0
         )
         
-        atr14 = result_df['true_range'].rolling(adx_period).mean()
+        atr14 = graph.sma(result_df['true_range'], adx_period)
         result_df['di_plus'] = 100 * (result_df['dm_plus'].rolling(adx_period).mean() / atr14)
         result_df['di_minus'] = 100 * (result_df['dm_minus'].rolling(adx_period).mean() / atr14)
         
@@ -8,6 +8,8 @@ import pickle
 from datetime import datetime
 from pathlib import Path
 import json
+import threading
+from collections import OrderedDict
 
 from sklearn.decomposition import TruncatedSVD
 from sklearn.metrics.pairwise import cosine_similarity
@@ -16,7 +18,10 @@ from scipy.sparse import csr_matrix
 # Path handling
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config import FECF_PARAMS, MODELS_DIR, PROCESSED_DIR, CRYPTO_DOMAIN_WEIGHTS
+from config import FECF_PARAMS, MODELS_DIR, PROCESSED_DIR, CRYPTO_DOMAIN_WEIGHTS, MODEL_ARTIFACTS_CONFIG
+from src.models.user_item_matrix import UserItemMatrix
+from src.models.item_catalog import ItemCatalog
+from src.models.model_artifacts import array_dir, load_arrays, save_arrays
 
 # Setup logging
 logging.basicConfig(
@@ -46,6 +51,7 @@ class FeatureEnhancedCF:
         
         # Project data
         self.projects_df = None
+        self.item_catalog = None
         self.user_item_matrix = None
         self.interactions_df = None
         self.features_df = None
@@ -53,6 +59,12 @@ class FeatureEnhancedCF:
         # Item similarities
         self.item_similarity_matrix = None
         
+        # Opsional: top-K neighbour index (CSR float32) pengganti matrix N x N
+        self.item_neighbors = None
+        
+        # Similarity matrix yang sudah di-clip ke [0,1] untuk scoring engine
+        self._scoring_matrix = None
+        
         # Domain-specific weights for cryptocurrency
         self.crypto_weights = CRYPTO_DOMAIN_WEIGHTS if 'CRYPTO_DOMAIN_WEIGHTS' in globals() else {
             "trend_importance": 0.7,
@@ -71,6 +83,12 @@ class FeatureEnhancedCF:
         self._trending_items = None
         self._category_distributions = None
         self._category_item_mapping = None
+        
+        # Online fold-in: rating vector user baru/ter-update (LRU), tanpa retrain
+        self._folded_users = OrderedDict()
+        self._folded_lock = threading.Lock()
+        self._loaded_interaction_counts = None
+        self._loaded_item_counts = None
     
     def load_data(self, projects_path: Optional[str] = None, interactions_path: Optional[str] = None,features_path: Optional[str] = None) -> bool:
         
@@ -87,6 +105,9 @@ class FeatureEnhancedCF:
             if os.path.exists(projects_path):
                 self.projects_df = pd.read_csv(projects_path)
                 logger.info(f"Loaded {len(self.projects_df)} projects from {projects_path}")
+                
+                # Metadata item (kategori, chain, market cap, trend) sebagai array
+                self.item_catalog = ItemCatalog(self.projects_df)
             else:
                 logger.error(f"Projects file not found: {projects_path}")
                 return False
@@ -96,18 +117,16 @@ class FeatureEnhancedCF:
                 self.interactions_df = pd.read_csv(interactions_path)
                 logger.info(f"Loaded {len(self.interactions_df)} interactions from {interactions_path}")
                 
-                # Create user-item matrix
-                self.user_item_matrix = pd.pivot_table(
-                    self.interactions_df,
-                    values='weight',
-                    index='user_id',
-                    columns='project_id',
-                    fill_value=0
-                )
-                logger.info(f"Created user-item matrix with shape {self.user_item_matrix.shape}")
+                # Create sparse user-item matrix
+                self.user_item_matrix = UserItemMatrix.from_interactions(self.interactions_df)
+                logger.info(f"Created user-item matrix with shape {self.user_item_matrix.shape} "
+                           f"({self.user_item_matrix.matrix.nnz} non-zero)")
                 
                 # Create user and item mappings
                 self._create_mappings()
+                
+                # Matrix baru sudah memuat semua interaksi di file, fold-in lama tidak berlaku
+                self._reset_folded_users()
             else:
                 logger.error(f"Interactions file not found: {interactions_path}")
                 return False
@@ -141,8 +160,8 @@ class FeatureEnhancedCF:
     def _create_mappings(self):
         """Create user and item ID mappings"""
         # Get unique users and items
-        users = list(self.user_item_matrix.index)
-        items = list(self.user_item_matrix.columns)
+        users = self.user_item_matrix.users
+        items = self.user_item_matrix.items
         
         # Create mappings
         self._user_mapping = {user: idx for idx, user in enumerate(users)}
@@ -204,7 +223,7 @@ class FeatureEnhancedCF:
             return
             
         # Calculate item popularity from interaction matrix
-        item_interactions = (self.user_item_matrix > 0).sum()
+        item_interactions = self.user_item_matrix.item_interaction_counts()
         item_popularity = pd.Series(0, index=self.projects_df['id'])
         item_popularity.update(item_interactions)
         
@@ -334,8 +353,8 @@ class FeatureEnhancedCF:
         logger.info("Training Feature-Enhanced CF model with SVD")
         
         try:
-            # Convert user-item matrix to numpy array
-            user_item_array = self.user_item_matrix.values
+            # Sparse CSR user-item matrix (TruncatedSVD menerima input sparse)
+            user_item_array = self.user_item_matrix.matrix
             
             # Tentukan jumlah komponen yang optimal
             # Avoid exceeding 10% of the minimum dimension
@@ -370,7 +389,6 @@ class FeatureEnhancedCF:
             # Enhanced content feature weighting for crypto domain
             if self._item_features is not None:
                 logger.info("Enhancing with content features (domain-optimized weighting)")
-                content_similarity = cosine_similarity(self._item_features)
                 
                 # Get content alpha from params
                 alpha = max(0.3, min(0.7, self.params.get('content_alpha', 0.55)))
@@ -384,16 +402,23 @@ class FeatureEnhancedCF:
                     alpha = alpha * 0.9
                 
                 # Blend both similarity matrices
-                for i in range(self.item_similarity_matrix.shape[0]):
-                    for j in range(self.item_similarity_matrix.shape[1]):
-                        if content_similarity[i, j] > 0:
-                            self.item_similarity_matrix[i, j] = (
-                                alpha * self.item_similarity_matrix[i, j] + 
-                                (1 - alpha) * content_similarity[i, j]
-                            )
+                self._blend_content_similarity(alpha, self.params.get('blend_block_size'))
                 
                 logger.info(f"Content features blended with CF with alpha={alpha:.2f}")
             
+            # Ringkas ke top-K neighbour index jika dikonfigurasi
+            neighbor_k = self.params.get('neighbor_k', 0)
+            if neighbor_k and neighbor_k > 0:
+                self.item_neighbors = self._build_neighbor_index(neighbor_k, self.params.get('blend_block_size'))
+                self.item_similarity_matrix = None
+                logger.info(f"Built top-{neighbor_k} neighbour index with {self.item_neighbors.nnz} entries")
+            else:
+                self.item_neighbors = None
+            
+            # Siapkan scoring engine dari similarity matrix yang baru
+            self._build_scoring_matrix()
+            self._recommendation_cache = {}
+            
             training_time = time.time() - start_time
             metrics = {
                 "training_time": training_time,
@@ -414,6 +439,56 @@ class FeatureEnhancedCF:
             logger.error(traceback.format_exc())
             return {"error": str(e), "training_time": time.time() - start_time}
     
+    def _blend_content_similarity(self, alpha: float, block_size: Optional[int] = None):
+        """
+        Blend content cosine similarity ke item_similarity_matrix (in-place)
+        hanya pada pasangan dengan content similarity > 0.
+        Diproses per blok baris supaya matrix content N x N tidak pernah
+        dibuat utuh; block_size None/0 berarti satu blok penuh.
+        """
+        n_items = self.item_similarity_matrix.shape[0]
+        if not block_size or block_size <= 0 or block_size > n_items:
+            block_size = n_items
+        
+        for start in range(0, n_items, block_size):
+            end = min(start + block_size, n_items)
+            
+            content_block = cosine_similarity(self._item_features[start:end], self._item_features)
+            cf_block = self.item_similarity_matrix[start:end]
+            
+            mask = content_block > 0
+            cf_block[mask] = alpha * cf_block[mask] + (1 - alpha) * content_block[mask]
+    
+    def _build_neighbor_index(self, k: int, block_size: Optional[int] = None) -> csr_matrix:
+        """
+        Simpan hanya top-K neighbour per item (termasuk item itu sendiri)
+        sebagai CSR float32, sehingga ukuran model skala N*K bukan N^2
+        """
+        n_items = self.item_similarity_matrix.shape[0]
+        k = min(k, n_items)
+        if not block_size or block_size <= 0 or block_size > n_items:
+            block_size = n_items
+        
+        indices = np.empty((n_items, k), dtype=np.int32)
+        data = np.empty((n_items, k), dtype=np.float32)
+        
+        for start in range(0, n_items, block_size):
+            end = min(start + block_size, n_items)
+            block = self.item_similarity_matrix[start:end]
+            
+            if k < n_items:
+                top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(n_items), (end - start, 1))
+            
+            # Urutkan indeks kolom per baris agar CSR valid (sorted indices)
+            top.sort(axis=1)
+            indices[start:end] = top
+            data[start:end] = np.take_along_axis(block, top, axis=1)
+        
+        indptr = np.arange(0, n_items * k + 1, k, dtype=np.int64)
+        return csr_matrix((data.ravel(), indices.ravel(), indptr), shape=(n_items, n_items))
+    
     def save_model(self, filepath: Optional[str] = None) -> str:
         if filepath is None:
             # Create default path
@@ -424,6 +499,7 @@ class FeatureEnhancedCF:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         # Save model
+        saved_at = datetime.now().isoformat()
         model_state = {
             'model': self.model,
             'user_mapping': self._user_mapping,
@@ -431,10 +507,25 @@ class FeatureEnhancedCF:
             'reverse_user_mapping': self._reverse_user_mapping,
             'reverse_item_mapping': self._reverse_item_mapping,
             'item_similarity_matrix': self.item_similarity_matrix,
+            'item_neighbors': self.item_neighbors,
             'params': self.params,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': saved_at
         }
         
+        # ⚡ OPTIMIZATION: Similarity/neighbour index (+ scoring matrix yang sudah di-clip) ke .npy,
+        # dibuka dengan mmap saat load sehingga semua worker API berbagi satu salinan fisik
+        if MODEL_ARTIFACTS_CONFIG.get('split_arrays', True):
+            if self._scoring_matrix is None:
+                self._build_scoring_matrix()
+            save_arrays(array_dir(filepath), {
+                'item_similarity_matrix': self.item_similarity_matrix,
+                'item_neighbors': self.item_neighbors,
+                'scoring_matrix': self._scoring_matrix
+            }, saved_at)
+            model_state['item_similarity_matrix'] = None
+            model_state['item_neighbors'] = None
+            model_state['array_artifacts'] = os.path.basename(array_dir(filepath))
+        
         with open(filepath, 'wb') as f:
             pickle.dump(model_state, f)
             
@@ -465,8 +556,25 @@ class FeatureEnhancedCF:
             self._reverse_user_mapping = model_state.get('reverse_user_mapping', {})
             self._reverse_item_mapping = model_state.get('reverse_item_mapping', {})
             self.item_similarity_matrix = model_state.get('item_similarity_matrix')
+            self.item_neighbors = model_state.get('item_neighbors')
             self.params = model_state.get('params', self.params)
             
+            if model_state.get('array_artifacts'):
+                # Format split: array besar di-mmap read-only dari direktori di samping pickle
+                arrays = load_arrays(array_dir(filepath), model_state.get('timestamp'))
+                if arrays is None:
+                    logger.error(f"Model arrays not found for {filepath}")
+                    return False
+                self.item_similarity_matrix = arrays.get('item_similarity_matrix')
+                self.item_neighbors = arrays.get('item_neighbors')
+                self._scoring_matrix = arrays.get('scoring_matrix')
+                if self._scoring_matrix is None:
+                    self._build_scoring_matrix()
+            else:
+                # Pickle lama (array di dalam pickle): siapkan scoring engine dari similarity matrix
+                self._build_scoring_matrix()
+            self._recommendation_cache = {}
+            
             # Precompute cold-start candidates if not already done
             if self._popular_items is None or self._trending_items is None:
                 self._precompute_cold_start_candidates()
@@ -490,35 +598,314 @@ class FeatureEnhancedCF:
             return False
         return True
     
+    def _has_item_similarity(self) -> bool:
+        """Cek apakah dense matrix atau neighbour index tersedia"""
+        return self.item_similarity_matrix is not None or self.item_neighbors is not None
+    
+    def _build_scoring_matrix(self):
+        """Clip similarity matrix ke [0,1] sekali saja, bukan di setiap request"""
+        if self.item_neighbors is not None:
+            scoring = self.item_neighbors.copy()
+            np.clip(scoring.data, 0.0, 1.0, out=scoring.data)
+            scoring.eliminate_zeros()
+            self._scoring_matrix = scoring
+        elif self.item_similarity_matrix is not None:
+            self._scoring_matrix = np.clip(self.item_similarity_matrix, 0.0, 1.0)
+        else:
+            self._scoring_matrix = None
+    
+    def _score_items(self, rated_indices: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Hitung weighted-average similarity untuk semua item dengan satu
+        matrix-vector product atas baris item yang sudah dirating
+        """
+        if self._scoring_matrix is None:
+            self._build_scoring_matrix()
+        
+        n_items = self._scoring_matrix.shape[0]
+        weight_sum = weights.sum()
+        if len(rated_indices) == 0 or weight_sum <= 0:
+            return np.zeros(n_items)
+        
+        # Baris item yang dirating: untuk dense matrix simetris sama dengan kolomnya,
+        # untuk neighbour index berarti neighbour dari item yang dirating
+        scores = self._scoring_matrix[rated_indices].T.dot(weights) / weight_sum
+        scores = np.asarray(scores).ravel()
+        
+        scores = np.nan_to_num(scores, nan=0.0, posinf=1.0, neginf=0.0)
+        return np.clip(scores, 0.0, 1.0)
+    
+    def _get_item_neighbors(self, item_idx: int, k: int) -> List[Tuple[str, float]]:
+        """Top-k item paling mirip (tanpa item itu sendiri) dari dense matrix atau neighbour index"""
+        if self.item_neighbors is not None:
+            row = self.item_neighbors.getrow(item_idx)
+            other_indices = row.indices
+            similarities = row.data.astype(float)
+        else:
+            other_indices = np.arange(self.item_similarity_matrix.shape[0])
+            similarities = self.item_similarity_matrix[item_idx]
+        
+        keep = other_indices != item_idx
+        other_indices = other_indices[keep]
+        similarities = similarities[keep]
+        
+        top = self._top_k_indices(similarities, k)
+        return [(self._reverse_item_mapping[other_indices[pos]], similarities[pos]) for pos in top]
+    
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+        """Pilih posisi top-k dengan argpartition lalu urutkan descending"""
+        if k <= 0 or len(scores) == 0:
+            return np.array([], dtype=np.int64)
+        
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        
+        # Stable sort supaya urutan item dengan score sama tetap konsisten
+        order = np.argsort(-scores[top], kind='stable')
+        return top[order]
+    
     def recommend_for_user(self, user_id: str, n: int = 10, exclude_known: bool = True) -> List[Tuple[str, float]]:
         """
         PERBAIKAN: Generate recommendations dengan score normalization yang ketat
         """
         # Check cache for performance
         cache_key = f"{user_id}_{n}_{exclude_known}"
-        if cache_key in self._recommendation_cache:
-            cache_time, cache_results = self._recommendation_cache[cache_key]
-            if time.time() - cache_time < 3600:
-                # PERBAIKAN: Validasi dan clip score dari cache
-                validated_cache = [(item_id, min(1.0, max(0.0, score))) for item_id, score in cache_results]
-                validated_cache.sort(key=lambda x: x[1], reverse=True)
-                return validated_cache
+        cached = self._get_cached_recommendations(cache_key)
+        if cached is not None:
+            return cached
         
-        if self.model is None or self.item_similarity_matrix is None:
+        if self.model is None or not self._has_item_similarity():
             logger.error("Model not trained or loaded")
             return []
             
-        # Check if user exists
-        if user_id not in self.user_item_matrix.index:
+        # Check if user exists (di matrix training atau hasil fold-in online)
+        if not self.has_user_vector(user_id):
             logger.warning(f"User {user_id} not found in the user-item matrix")
             return self._get_cold_start_recommendations(n)
             
-        # Get user's ratings - use copy to avoid modifying original
-        user_ratings = self.user_item_matrix.loc[user_id].copy()
+        rated_indices, weights, known_items = self._user_rating_vector(user_id, exclude_known)
+        
+        try:
+            # Score semua item sekaligus
+            item_scores = self._score_items(rated_indices, weights)
+        except Exception as e:
+            logger.error(f"Error in similarity calculation: {e}")
+            # Fallback ke cold-start jika ada error
+            return self._get_cold_start_recommendations(n)
+        
+        return self._rank_item_scores(item_scores, known_items, n, cache_key)
+    
+    def recommend_for_users(self, user_ids: List[str], n: int = 10,
+                            exclude_known: bool = True) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        OPTIMIZATION: Rekomendasi untuk banyak user sekaligus. Weight rating semua user
+        disusun menjadi sparse matrix (users x items) sehingga scoring satu blok user
+        adalah satu matrix product dengan similarity matrix, bukan satu product per user.
+        Hasil identik dengan recommend_for_user dan ikut disimpan di cache per user.
+        """
+        results: Dict[str, List[Tuple[str, float]]] = {}
+        pending: List[str] = []
+        
+        for user_id in dict.fromkeys(user_ids):
+            cached = self._get_cached_recommendations(f"{user_id}_{n}_{exclude_known}")
+            if cached is not None:
+                results[user_id] = cached
+            else:
+                pending.append(user_id)
+        
+        if not pending:
+            return results
+        
+        if self.model is None or not self._has_item_similarity():
+            logger.error("Model not trained or loaded")
+            return {**results, **{user_id: [] for user_id in pending}}
         
-        # Get positive interactions once
-        positive_indices = user_ratings.index[user_ratings > 0].tolist()
-        positive_weights = user_ratings[positive_indices].values
+        warm_users = []
+        for user_id in pending:
+            if self.has_user_vector(user_id):
+                warm_users.append(user_id)
+            else:
+                results[user_id] = self._get_cold_start_recommendations(n)
+        
+        if self._scoring_matrix is None:
+            self._build_scoring_matrix()
+        n_items = self._scoring_matrix.shape[0]
+        block_size = max(1, self.params.get('batch_block_size', 256))
+        
+        for start in range(0, len(warm_users), block_size):
+            block_users = warm_users[start:start + block_size]
+            
+            rows, cols, data = [], [], []
+            known_per_user = []
+            for row, user_id in enumerate(block_users):
+                rated_indices, weights, known_items = self._user_rating_vector(user_id, exclude_known)
+                known_per_user.append(known_items)
+                weight_sum = weights.sum()
+                if len(rated_indices) == 0 or weight_sum <= 0:
+                    continue
+                rows.append(np.full(len(rated_indices), row, dtype=np.int64))
+                cols.append(rated_indices)
+                data.append(weights / weight_sum)
+            
+            if rows:
+                user_weights = csr_matrix(
+                    (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                    shape=(len(block_users), n_items)
+                )
+            else:
+                user_weights = csr_matrix((len(block_users), n_items))
+            
+            try:
+                block_scores = user_weights.dot(self._scoring_matrix)
+                if hasattr(block_scores, 'toarray'):
+                    block_scores = block_scores.toarray()
+                block_scores = np.clip(np.nan_to_num(np.asarray(block_scores), nan=0.0, posinf=1.0, neginf=0.0), 0.0, 1.0)
+            except Exception as e:
+                logger.error(f"Error in batch similarity calculation: {e}")
+                for user_id in block_users:
+                    results[user_id] = self._get_cold_start_recommendations(n)
+                continue
+            
+            for row, user_id in enumerate(block_users):
+                results[user_id] = self._rank_item_scores(
+                    block_scores[row], known_per_user[row], n, f"{user_id}_{n}_{exclude_known}"
+                )
+        
+        return results
+    
+    def fold_in_user(self, user_id: str, interactions: List[Tuple[str, float]],
+                     interaction_count: Optional[int] = None) -> bool:
+        """
+        OPTIMIZATION: Online fold-in user baru (atau interaksi baru user lama) tanpa retrain.
+        
+        FECF men-score user sebagai weighted average item similarity (dari faktor item
+        TruncatedSVD + content features) atas item yang diinteraksi, jadi user baru cukup
+        dinyatakan sebagai rating vector: baris training (jika ada) digabung dengan
+        `interactions` (mean per item atas semua interaksi, seperti pivot matrix). Tidak ada re-fit SVD, rebuild
+        similarity, atau reload pickle. `interactions` adalah semua interaksi yang belum ada
+        di matrix; fold-in berikutnya untuk user yang sama menggantikan yang lama.
+        
+        Args:
+            user_id: User ID
+            interactions: List (project_id, weight)
+            interaction_count: Penanda versi (mis. jumlah interaksi di log) untuk caller
+            
+        Returns:
+            True jika user sekarang punya rating vector yang bisa di-score
+        """
+        if self.model is None or not self._has_item_similarity():
+            return False
+        
+        # PERBAIKAN: nilai matrix adalah mean atas n interaksi training, jadi digabung sebagai
+        # (sum, count) agar hasilnya mean atas semua interaksi user, bukan mean dari mean
+        totals: Dict[str, List[float]] = {}
+        if self.user_item_matrix is not None and self.user_item_matrix.has_user(user_id):
+            item_counts = self._loaded_item_counts_for(user_id)
+            for item_id, weight in self.user_item_matrix.user_ratings(user_id).items():
+                count = item_counts.get(item_id, 1)
+                totals[item_id] = [float(weight) * count, count]
+        
+        for item_id, weight in interactions:
+            # Item yang tidak ada di similarity matrix tidak bisa ikut scoring
+            if item_id in self._item_mapping:
+                total = totals.setdefault(item_id, [0.0, 0])
+                total[0] += float(weight)
+                total[1] += 1
+        
+        ratings = pd.Series({item_id: total / count for item_id, (total, count) in totals.items()}, dtype=float)
+        ratings = ratings[ratings > 0]
+        if ratings.empty:
+            return False
+        
+        with self._folded_lock:
+            self._folded_users[user_id] = {
+                'ratings': ratings,
+                'interaction_count': interaction_count,
+                'time': time.time()
+            }
+            self._folded_users.move_to_end(user_id)
+            max_users = self.params.get('fold_in_max_users', 10000)
+            while len(self._folded_users) > max_users:
+                self._folded_users.popitem(last=False)
+        
+        self._invalidate_user_cache(user_id)
+        logger.info(f"Folded in user {user_id} with {len(ratings)} rated items")
+        return True
+    
+    def is_folded_user(self, user_id: str) -> bool:
+        return user_id in self._folded_users
+    
+    def folded_interaction_count(self, user_id: str) -> Optional[int]:
+        folded = self._folded_users.get(user_id)
+        return folded['interaction_count'] if folded is not None else None
+    
+    def has_user_vector(self, user_id: str) -> bool:
+        """User bisa di-score secara personal (ada di matrix atau sudah di-fold-in)"""
+        if user_id in self._folded_users:
+            return True
+        return self.user_item_matrix is not None and self.user_item_matrix.has_user(user_id)
+    
+    def loaded_interaction_count(self, user_id: str) -> int:
+        """Jumlah baris interaksi user di interactions_df yang dimuat load_data (basis fold-in)"""
+        if self._loaded_interaction_counts is None:
+            if self.interactions_df is None or 'user_id' not in self.interactions_df.columns:
+                self._loaded_interaction_counts = {}
+            else:
+                self._loaded_interaction_counts = self.interactions_df['user_id'].astype(str).value_counts().to_dict()
+        return int(self._loaded_interaction_counts.get(str(user_id), 0))
+    
+    def _loaded_item_counts_for(self, user_id: str) -> Dict[str, int]:
+        """Jumlah interaksi (weight non-null) per item user di interactions_df, bobot mean pivot"""
+        if self._loaded_item_counts is None:
+            if self.interactions_df is None or not {'user_id', 'project_id', 'weight'}.issubset(self.interactions_df.columns):
+                self._loaded_item_counts = pd.Series(dtype=int)
+            else:
+                self._loaded_item_counts = self.interactions_df.groupby(
+                    ['user_id', 'project_id'], sort=True
+                )['weight'].count()
+        try:
+            return self._loaded_item_counts.loc[user_id].to_dict()
+        except (KeyError, TypeError):
+            return {}
+    
+    def forget_folded_user(self, user_id: str) -> bool:
+        with self._folded_lock:
+            removed = self._folded_users.pop(user_id, None) is not None
+        if removed:
+            self._invalidate_user_cache(user_id)
+        return removed
+    
+    def _reset_folded_users(self):
+        with self._folded_lock:
+            self._folded_users.clear()
+        self._loaded_interaction_counts = None
+        self._loaded_item_counts = None
+    
+    def _invalidate_user_cache(self, user_id: str):
+        prefix = f"{user_id}_"
+        for key in [key for key in list(self._recommendation_cache) if key.startswith(prefix)]:
+            self._recommendation_cache.pop(key, None)
+    
+    def _get_cached_recommendations(self, cache_key: str) -> Optional[List[Tuple[str, float]]]:
+        if cache_key in self._recommendation_cache:
+            cache_time, cache_results = self._recommendation_cache[cache_key]
+            if time.time() - cache_time < 3600:
+                # PERBAIKAN: Validasi dan clip score dari cache
+                validated_cache = [(item_id, min(1.0, max(0.0, score))) for item_id, score in cache_results]
+                validated_cache.sort(key=lambda x: x[1], reverse=True)
+                return validated_cache
+        return None
+    
+    def _user_rating_vector(self, user_id: str, exclude_known: bool) -> Tuple[np.ndarray, np.ndarray, set]:
+        """Index item yang dirating, weight ternormalisasi, dan item yang di-exclude untuk satu user"""
+        # Get positive interactions once (sparse row access, atau vector hasil fold-in)
+        folded = self._folded_users.get(user_id)
+        user_ratings = folded['ratings'] if folded is not None else self.user_item_matrix.user_ratings(user_id)
+        positive_indices = user_ratings.index.tolist()
+        positive_weights = user_ratings.values
         
         # PERBAIKAN: Normalisasi weights untuk menghindari score explosion
         if len(positive_weights) > 0:
@@ -529,60 +916,44 @@ class FeatureEnhancedCF:
         # Get known items to exclude
         known_items = set(positive_indices) if exclude_known else set()
         
-        # Prepare items for vectorized computation
-        all_items = [item for item in self.user_item_matrix.columns if item not in known_items]
-        if not all_items:
+        rated_indices = np.array(
+            [self._item_mapping[item] for item in positive_indices if item in self._item_mapping],
+            dtype=np.int64
+        )
+        weights = np.asarray(positive_weights[:len(rated_indices)], dtype=float)
+        return rated_indices, weights, known_items
+    
+    def _rank_item_scores(self, all_scores: np.ndarray, known_items: set, n: int,
+                          cache_key: str) -> List[Tuple[str, float]]:
+        """Exclude known items, top-k, diversity, lalu simpan ke cache"""
+        # Candidate mask atas seluruh item index di similarity matrix
+        n_items = len(self._item_mapping)
+        candidate_mask = np.ones(n_items, dtype=bool)
+        if known_items:
+            candidate_mask[[self._item_mapping[item] for item in known_items if item in self._item_mapping]] = False
+        candidate_indices = np.flatnonzero(candidate_mask)
+        
+        if len(candidate_indices) == 0:
             logger.warning("No items available for recommendation after excluding known items")
             return []
         
-        # Get similarity scores in a vectorized way
-        item_scores = np.zeros(len(all_items))
-        
-        try:
-            rated_indices = [self._item_mapping[item] for item in positive_indices if item in self._item_mapping]
-            candidate_indices = [self._item_mapping[item] for item in all_items if item in self._item_mapping]
-            
-            # PERBAIKAN: Clip similarity matrix values untuk memastikan [0,1]
-            clipped_similarity_matrix = np.clip(self.item_similarity_matrix, 0.0, 1.0)
-            
-            for i, item_idx in enumerate(candidate_indices):
-                similarities = np.array([clipped_similarity_matrix[item_idx, rated_idx] for rated_idx in rated_indices])
-                weights = np.array(positive_weights[:len(rated_indices)])
-                
-                if len(similarities) > 0 and weights.sum() > 0:
-                    # PERBAIKAN: Gunakan weighted average dengan normalisasi yang ketat
-                    weighted_sim = np.sum(similarities * weights) / weights.sum()
-                    # Clip hasil untuk memastikan dalam range [0,1]
-                    item_scores[i] = np.clip(weighted_sim, 0.0, 1.0)
-            
-        except Exception as e:
-            logger.error(f"Error in similarity calculation: {e}")
-            # Fallback ke cold-start jika ada error
-            return self._get_cold_start_recommendations(n)
-        
-        # PERBAIKAN: Final validation dan normalisasi score
-        # Pastikan tidak ada NaN atau infinity
-        item_scores = np.nan_to_num(item_scores, nan=0.0, posinf=1.0, neginf=0.0)
-        
-        # Clip semua score ke range [0,1]
-        item_scores = np.clip(item_scores, 0.0, 1.0)
+        item_scores = all_scores[candidate_indices]
         
         # PERBAIKAN: Normalisasi ulang jika semua score 0 (edge case)
         if np.max(item_scores) == 0:
             logger.warning("All similarity scores are 0, using fallback scoring")
             # Gunakan popularity-based scoring sebagai fallback
+            all_items = [self._reverse_item_mapping[idx] for idx in candidate_indices]
             fallback_scores = self._get_fallback_scores(all_items)
             item_scores = np.array(fallback_scores)
         
-        # Create list of (item_id, score) tuples
-        scores = list(zip(all_items, item_scores))
-        
-        # PERBAIKAN: Sort dengan validation tambahan
-        scores.sort(key=lambda x: x[1], reverse=True)
-        
-        # OPTIMIZATION: Get more candidates for diversity but limit to reasonable number
+        # OPTIMIZATION: Top-k dengan argpartition, bukan sort penuh
         candidate_size = min(n * 3, 100)
-        top_candidates = scores[:candidate_size]
+        top_positions = self._top_k_indices(item_scores, candidate_size)
+        top_candidates = [
+            (self._reverse_item_mapping[candidate_indices[pos]], item_scores[pos])
+            for pos in top_positions
+        ]
         
         # PERBAIKAN: Final score validation sebelum apply diversity
         validated_candidates = []
@@ -667,129 +1038,70 @@ class FeatureEnhancedCF:
         # Sort validated candidates  
         validated_candidates.sort(key=lambda x: x[1], reverse=True)
         
-        # OPTIMIZATION: Create item metadata lookup only once
-        item_metadata = {}
-        for _, row in self.projects_df.iterrows():
-            if 'id' in row:
-                item_id = row['id']
-                
-                # Extract categories
-                categories = []
-                if 'categories_list' in row:
-                    cats = row['categories_list']
-                    if isinstance(cats, list):
-                        categories = cats
-                    elif isinstance(cats, str) and cats.startswith('[') and cats.endswith(']'):
-                        try:
-                            categories = eval(cats)
-                        except:
-                            categories = [cats]
-                    else:
-                        categories = [cats]
-                elif 'primary_category' in row:
-                    categories = [row['primary_category']]
-                
-                # Extract chain and market cap
-                chain = row.get('chain', 'unknown')
-                market_cap = row.get('market_cap', 0)
-                
-                item_metadata[item_id] = {
-                    'categories': categories,
-                    'chain': chain,
-                    'market_cap': market_cap
-                }
+        # OPTIMIZATION: Metadata dari item catalog (dibangun sekali saat load_data)
+        catalog = self.item_catalog
+        if catalog is None:
+            catalog = self.item_catalog = ItemCatalog(self.projects_df)
+        
+        # Market cap thresholds
+        high_cap_threshold = 1e9  # $1B
+        medium_cap_threshold = 1e8  # $100M
+        item_tiers = catalog.market_cap_tiers(high_cap_threshold, medium_cap_threshold)
         
         # Select top items unconditionally first (20% by pure score)
         top_count = max(n // 5, 1)
         result_items = [item for item, _ in validated_candidates[:top_count]]
         result_scores = [score for _, score in validated_candidates[:top_count]]
         
-        # Track diversity
-        category_counts = {}
-        chain_counts = {}
-        market_cap_tiers = {'high': 0, 'medium': 0, 'low': 0}
+        # Track diversity (dihitung per kode integer)
+        category_counts = np.zeros(len(catalog.category_names), dtype=np.int64)
+        chain_counts = np.zeros(len(catalog.chain_names), dtype=np.int64)
+        market_cap_tiers = np.zeros(3, dtype=np.int64)
         
-        # Market cap thresholds
-        high_cap_threshold = 1e9  # $1B
-        medium_cap_threshold = 1e8  # $100M
+        def track(catalog_idx: int):
+            if catalog_idx < 0:
+                return
+            np.add.at(category_counts, catalog.category_codes_of(catalog_idx), 1)
+            chain_counts[catalog.chain_codes[catalog_idx]] += 1
+            market_cap_tiers[item_tiers[catalog_idx]] += 1
         
         # Initialize tracking for selected items
-        for item in result_items:
-            if item in item_metadata:
-                meta = item_metadata[item]
-                
-                # Update category counts
-                for category in meta['categories']:
-                    category_counts[category] = category_counts.get(category, 0) + 1
-                
-                # Update chain counts
-                chain_counts[meta['chain']] = chain_counts.get(meta['chain'], 0) + 1
-                
-                # Update market cap tier counts
-                market_cap = meta['market_cap']
-                if market_cap >= high_cap_threshold:
-                    market_cap_tiers['high'] += 1
-                elif market_cap >= medium_cap_threshold:
-                    market_cap_tiers['medium'] += 1
-                else:
-                    market_cap_tiers['low'] += 1
+        for catalog_idx in catalog.indices(result_items):
+            track(catalog_idx)
         
         # Diversity limits
         max_per_category = max(2, int(n * 0.3))
         max_per_chain = max(3, int(n * 0.4))
         
-        # Target market cap distribution
-        target_market_cap_distribution = {
-            'high': int(n * 0.4),
-            'medium': int(n * 0.4), 
-            'low': int(n * 0.2)
-        }
+        # Target market cap distribution (index = TIER_LOW, TIER_MEDIUM, TIER_HIGH)
+        target_market_cap_distribution = np.array([int(n * 0.2), int(n * 0.4), int(n * 0.4)])
         
         # Remaining candidates with diversity adjustments
         remaining = validated_candidates[top_count:]
+        remaining_indices = catalog.indices(item_id for item_id, _ in remaining)
         diversity_adjustments = []
         
-        for item_id, score in remaining:
-            if item_id in item_metadata:
-                meta = item_metadata[item_id]
-                total_adjustment = 0.0
-                
+        for (item_id, score), catalog_idx in zip(remaining, remaining_indices):
+            if catalog_idx >= 0:
                 # Category diversity adjustment
                 category_adjustment = 0.0
-                has_overrepresented_category = False
-                has_new_category = False
+                cat_counts = category_counts[catalog.category_codes_of(catalog_idx)]
                 
-                for category in meta['categories']:
-                    cat_count = category_counts.get(category, 0)
-                    if cat_count >= max_per_category:
-                        has_overrepresented_category = True
-                    elif cat_count == 0:
-                        has_new_category = True
-                
-                if has_overrepresented_category:
+                if (cat_counts >= max_per_category).any():
                     category_adjustment = -0.2
-                elif has_new_category:
+                elif (cat_counts == 0).any():
                     category_adjustment = 0.15
                 
                 # Chain adjustment
                 chain_adjustment = 0.0
-                chain_count = chain_counts.get(meta['chain'], 0)
+                chain_count = chain_counts[catalog.chain_codes[catalog_idx]]
                 if chain_count >= max_per_chain:
                     chain_adjustment = -0.15
                 elif chain_count == 0:
                     chain_adjustment = 0.1
                 
                 # Market cap adjustment
-                market_cap_adjustment = 0.0
-                market_cap = meta['market_cap']
-                
-                if market_cap >= high_cap_threshold:
-                    tier = 'high'
-                elif market_cap >= medium_cap_threshold:
-                    tier = 'medium'
-                else:
-                    tier = 'low'
-                
+                tier = item_tiers[catalog_idx]
                 current_count = market_cap_tiers[tier]
                 target_count = target_market_cap_distribution[tier]
                 
@@ -810,43 +1122,31 @@ class FeatureEnhancedCF:
                 adjusted_score = score + total_adjustment * 0.3  # Reduce adjustment impact
                 adjusted_score = np.clip(adjusted_score, 0.0, 1.0)
                 
-                diversity_adjustments.append((item_id, score, adjusted_score))
+                diversity_adjustments.append((item_id, score, adjusted_score, catalog_idx))
             else:
                 # No metadata, use original score
-                diversity_adjustments.append((item_id, score, score))
+                diversity_adjustments.append((item_id, score, score, catalog_idx))
         
         # Sort by adjusted score
         diversity_adjustments.sort(key=lambda x: x[2], reverse=True)
         
         # Add remaining items based on adjusted scores
-        for item_id, original_score, _ in diversity_adjustments:
+        selected = set(result_items)
+        for item_id, original_score, _, catalog_idx in diversity_adjustments:
             if len(result_items) >= n:
                 break
                 
-            if item_id in result_items:
+            if item_id in selected:
                 continue
                 
             # PERBAIKAN: Use original score for final result (not adjusted)
             validated_score = float(np.clip(original_score, 0.0, 1.0))
             result_items.append(item_id)
             result_scores.append(validated_score)
+            selected.add(item_id)
             
             # Update tracking
-            if item_id in item_metadata:
-                meta = item_metadata[item_id]
-                
-                for category in meta['categories']:
-                    category_counts[category] = category_counts.get(category, 0) + 1
-                
-                chain_counts[meta['chain']] = chain_counts.get(meta['chain'], 0) + 1
-                
-                market_cap = meta['market_cap']
-                if market_cap >= high_cap_threshold:
-                    market_cap_tiers['high'] += 1
-                elif market_cap >= medium_cap_threshold:
-                    market_cap_tiers['medium'] += 1
-                else:
-                    market_cap_tiers['low'] += 1
+            track(catalog_idx)
         
         # PERBAIKAN: Build final result dengan validation ketat
         result = []
@@ -994,9 +1294,10 @@ class FeatureEnhancedCF:
         
         return final_recommendations
     
-    def recommend_projects(self, user_id: str, n: int = 10) -> List[Dict[str, Any]]:
-        # Get recommendations as (project_id, score) tuples
-        recommendations = self.recommend_for_user(user_id, n)
+    def recommend_projects(self, user_id: str, n: int = 10,
+                           precomputed: Optional[List[Tuple[str, float]]] = None) -> List[Dict[str, Any]]:
+        # Get recommendations as (project_id, score) tuples (precomputed: dari materialized store)
+        recommendations = precomputed if precomputed is not None else self.recommend_for_user(user_id, n)
         
         # Convert to detailed project dictionaries
         detailed_recommendations = []
@@ -1255,7 +1556,7 @@ class FeatureEnhancedCF:
         logger.info(f"Getting chain-filtered recommendations for user {user_id}, chain={chain}, category={category}, strict={strict}")
         
         # Check if project exists
-        if user_id not in self._user_mapping and user_id not in self.user_item_matrix.index:
+        if user_id not in self._user_mapping and not self.user_item_matrix.has_user(user_id):
             logger.warning(f"User {user_id} not found in the model")
             # Fallback to popular projects with chain filter
             chain_popular = []
@@ -1405,7 +1706,7 @@ class FeatureEnhancedCF:
         return self.get_recommendations_by_category(user_id, category, n=n, chain=chain, strict=strict)
     
     def get_similar_projects(self, project_id: str, n: int = 10) -> List[Dict[str, Any]]:
-        if self.model is None or self.item_similarity_matrix is None:
+        if self.model is None or not self._has_item_similarity():
             logger.error("Model not trained or loaded")
             # Fallback to popular projects
             return self.get_popular_projects(n)
@@ -1481,17 +1782,8 @@ class FeatureEnhancedCF:
         # Get item index
         item_idx = self._item_mapping[project_id]
         
-        # Get all similarities
-        item_similarities = []
-        for other_id, other_idx in self._item_mapping.items():
-            if other_id == project_id:
-                continue
-                
-            similarity = self.item_similarity_matrix[item_idx, other_idx]
-            item_similarities.append((other_id, similarity))
-            
-        # Sort by similarity
-        item_similarities.sort(key=lambda x: x[1], reverse=True)
+        # Get top similarities (sorted descending)
+        item_similarities = self._get_item_neighbors(item_idx, n * 3)
         
         # IMPROVED: Get project details for enhancing similarity scores
         target_project = self.projects_df[self.projects_df['id'] == project_id].iloc[0]
@@ -22,6 +22,7 @@ from config import (
     MODELS_DIR,
     COLD_START_EVAL_CONFIG
 )
+from src.models.user_item_matrix import UserItemMatrix, as_user_item_matrix
 
 # Setup logging
 logging.basicConfig(
@@ -405,7 +406,7 @@ def evaluate_model(model_name: str,
     
     return results
 
-def prepare_test_data(user_item_matrix: pd.DataFrame, 
+def prepare_test_data(user_item_matrix: UserItemMatrix, 
                      interactions_df: pd.DataFrame,
                      test_ratio: float = EVAL_TEST_RATIO, 
                      min_interactions: int = 10,
@@ -420,15 +421,16 @@ def prepare_test_data(user_item_matrix: pd.DataFrame,
                f"min_interactions={min_interactions}, random_seed={random_seed}, "
                f"temporal_split={temporal_split}")
     
+    user_item_matrix = as_user_item_matrix(user_item_matrix)
+    
     # Filter users with minimum number of interactions
     user_interactions = {}
     test_interactions = {}
     test_users = []
     
     for user_id in user_item_matrix.index:
-        # Get positive interactions
-        user_items = user_item_matrix.loc[user_id]
-        positive_items = user_items[user_items > 0].index.tolist()
+        # Get positive interactions (sparse row access)
+        positive_items = user_item_matrix.known_items(user_id)
         
         if len(positive_items) >= min_interactions:
             user_interactions[user_id] = positive_items
@@ -589,7 +591,7 @@ def prepare_test_data(user_item_matrix: pd.DataFrame,
 
 
 def evaluate_all_models(models: Dict[str, Any], 
-                       user_item_matrix: pd.DataFrame,
+                       user_item_matrix: UserItemMatrix,
                        test_ratio: float = EVAL_TEST_RATIO,
                        min_interactions: int = 10,
                        k_values: List[int] = EVAL_K_VALUES,
@@ -608,6 +610,7 @@ def evaluate_all_models(models: Dict[str, Any],
     # Main evaluation start time
     evaluation_start_time = time.perf_counter()
     
+    user_item_matrix = as_user_item_matrix(user_item_matrix)
     interactions_df = None
 
     for model_name, model in models.items():
@@ -822,7 +825,7 @@ def evaluate_all_models(models: Dict[str, Any],
 
 def evaluate_cold_start(model: Any,
                        model_name: str,
-                       user_item_matrix: pd.DataFrame,
+                       user_item_matrix: UserItemMatrix,
                        cold_start_users: Optional[int] = None,     
                        k_values: List[int] = [5, 10], 
                        debug: bool = False,
@@ -846,6 +849,8 @@ def evaluate_cold_start(model: Any,
     
     logger.info(f"Evaluating {model_name} on cold-start scenario with {cold_start_users} users, {n_runs} runs")
     
+    user_item_matrix = as_user_item_matrix(user_item_matrix)
+    
     # Verify model before evaluation
     if hasattr(model, 'model') and model.model is None:
         logger.error(f"Model {model_name} not trained or loaded")
@@ -869,7 +874,7 @@ def evaluate_cold_start(model: Any,
         rng = np.random.RandomState(run_seed)
         
         # Identify popular items for this run
-        item_popularity = user_item_matrix.sum()
+        item_popularity = user_item_matrix.item_totals()
         popular_threshold = item_popularity.quantile(1 - popular_exclude_ratio)
         extremely_popular_items = set(item_popularity[item_popularity > popular_threshold].index)
         
@@ -879,7 +884,7 @@ def evaluate_cold_start(model: Any,
             logger.debug(f"Using seed {run_seed} for run {run+1}")
         
         # Find eligible users with predictable order
-        user_counts = (user_item_matrix > 0).sum(axis=1)
+        user_counts = user_item_matrix.user_interaction_counts()
         eligible_users = user_counts[user_counts >= min_interactions].index.tolist()
         
         if not eligible_users or len(eligible_users) < min(30, cold_start_users):
@@ -898,8 +903,7 @@ def evaluate_cold_start(model: Any,
         test_interactions = {}
         
         for user_id in cold_start_user_ids:
-            user_items = user_item_matrix.loc[user_id]
-            positive_items = user_items[user_items > 0].index.tolist()
+            positive_items = user_item_matrix.known_items(user_id)
             
             # Create a user-specific RNG for consistent filtering
             user_seed = run_seed + hash(user_id) % 10000
@@ -18,6 +18,7 @@ from config import HYBRID_PARAMS, MODELS_DIR, PROCESSED_DIR, CRYPTO_DOMAIN_WEIGH
 # Import model components
 from src.models.alt_fecf import FeatureEnhancedCF
 from src.models.ncf import NCFRecommender
+from src.models.item_catalog import ItemCatalog, TIER_LOW, TIER_MEDIUM, TIER_HIGH
 
 # Setup logging
 logging.basicConfig(
@@ -70,6 +71,7 @@ class HybridRecommender:
         self.projects_df = None
         self.interactions_df = None
         self.user_item_matrix = None
+        self.item_catalog = None
         
         # Track recommendation sources for analytics
         self.recommendation_sources = {}
@@ -124,8 +126,12 @@ class HybridRecommender:
                 self.interactions_df = self.fecf_model.interactions_df
                 self.user_item_matrix = self.fecf_model.user_item_matrix
                 
+                # Share satu sparse matrix untuk kedua model (dibangun dari file yang sama)
+                self.ncf_model.user_item_matrix = self.user_item_matrix
+                
                 # Pre-process kategori untuk memudahkan penanganan
                 self.preprocess_categories()
+                self._build_item_catalog()
                 
                 # Calculate interaction statistics for adaptive weighting
                 self._calculate_interaction_statistics()
@@ -146,10 +152,10 @@ class HybridRecommender:
             return
             
         # Calculate user interaction counts
-        self.user_interaction_counts = (self.user_item_matrix > 0).sum(axis=1)
+        self.user_interaction_counts = self.user_item_matrix.user_interaction_counts()
         
         # Calculate item popularity
-        self.item_popularity = (self.user_item_matrix > 0).sum(axis=0)
+        self.item_popularity = self.user_item_matrix.item_interaction_counts()
         
         # Calculate quantiles for user interactions
         self.interaction_quantiles = {
@@ -221,6 +227,22 @@ class HybridRecommender:
                     return [category_value]
             return [category_value]  # Wrap string tunggal dalam list
         return ['unknown']  # Default fallback
+    
+    def _build_item_catalog(self):
+        """Bangun ItemCatalog dari projects_df (setelah categories_list distandarisasi)"""
+        if self.projects_df is None:
+            self.item_catalog = None
+            return
+        
+        self.item_catalog = ItemCatalog(self.projects_df)
+        logger.info(f"Built item catalog for {len(self.item_catalog)} projects "
+                   f"({len(self.item_catalog.category_names)} categories, "
+                   f"{len(self.item_catalog.chain_names)} chains)")
+    
+    def _get_item_catalog(self) -> Optional[ItemCatalog]:
+        if self.item_catalog is None and self.projects_df is not None:
+            self._build_item_catalog()
+        return self.item_catalog
         
     def train(self, fecf_params: Optional[Dict[str, Any]] = None, ncf_params: Optional[Dict[str, Any]] = None, save_model: bool = True) -> Dict[str, Any]:
         metrics = {}
@@ -388,6 +410,7 @@ class HybridRecommender:
         
         # Preprocess categories
         self.preprocess_categories()
+        self._build_item_catalog()
         
         # Calculate interaction statistics
         self._calculate_interaction_statistics()
@@ -619,9 +642,8 @@ class HybridRecommender:
         
         # Check user interaction count
         user_interaction_count = 0
-        if self.user_item_matrix is not None and user_id in self.user_item_matrix.index:
-            user_interactions = self.user_item_matrix.loc[user_id]
-            user_interaction_count = (user_interactions > 0).sum()
+        if self.user_item_matrix is not None:
+            user_interaction_count = self.user_item_matrix.interaction_count(user_id)
         
         # PERBAIKAN: Adaptive weighting berdasarkan interaction count menggunakan thresholds dari params
         if user_interaction_count < threshold_low:
@@ -702,8 +724,8 @@ class HybridRecommender:
         }
         
         # Menghitung jumlah interaksi
-        if self.user_item_matrix is not None and user_id in self.user_item_matrix.index:
-            user_interactions = self.user_item_matrix.loc[user_id]
+        if self.user_item_matrix is not None and self.user_item_matrix.has_user(user_id):
+            user_interactions = self.user_item_matrix.user_ratings(user_id)
             positive_interactions = user_interactions[user_interactions > 0]
             context['interaction_count'] = len(positive_interactions)
             
@@ -1032,8 +1054,7 @@ class HybridRecommender:
         }
         
         for user_id in self.user_item_matrix.index[:100]:  # Sample 100 users
-            user_interactions = self.user_item_matrix.loc[user_id]
-            interaction_count = (user_interactions > 0).sum()
+            interaction_count = self.user_item_matrix.interaction_count(user_id)
             
             fecf_w, ncf_w, _ = self.get_effective_weights(user_id)
             
@@ -1434,13 +1455,13 @@ class HybridRecommender:
             trend_boost_factor = boost_factor if boost_factor is not None else self.params.get('trending_boost_factor', 0.15)
             
             if trend_boost_factor > 0:
-                # Create item to trend lookup
-                item_to_trend = dict(zip(self.projects_df['id'], self.projects_df['trend_score']))
+                catalog = self._get_item_catalog()
                 
                 # Apply trend boosting
-                for item in list(results.keys()):
-                    if item in item_to_trend:
-                        trend_score = item_to_trend[item]
+                items = list(results.keys())
+                for item, catalog_idx in zip(items, catalog.indices(items)):
+                    if catalog_idx >= 0:
+                        trend_score = catalog.trend_score[catalog_idx]
                         
                         # Normalize trend score to [0, 1]
                         norm_trend = min(1.0, max(0.0, trend_score / 100.0))
@@ -1460,47 +1481,11 @@ class HybridRecommender:
             recommendations.sort(key=lambda x: x[1], reverse=True)
             return recommendations
             
-        # Prepare item metadata
-        item_categories = {}
-        item_chains = {}
-        item_market_caps = {}
-        
-        if self.projects_df is not None:
-            # Extract item metadata dengan error handling
-            for _, row in self.projects_df.iterrows():
-                if 'id' not in row:
-                    continue
-                    
-                item_id = row['id']
-                
-                # Extract multiple categories if available
-                if 'categories_list' in row:
-                    try:
-                        item_categories[item_id] = row['categories_list']
-                    except:
-                        item_categories[item_id] = ['unknown']
-                elif 'primary_category' in row:
-                    try:
-                        item_categories[item_id] = self.process_categories(row['primary_category'])
-                    except:
-                        item_categories[item_id] = ['unknown']
-                
-                # Extract chain information
-                if 'chain' in row:
-                    try:
-                        item_chains[item_id] = row['chain']
-                    except:
-                        item_chains[item_id] = 'unknown'
-                    
-                # Extract market cap for balance between new/established projects
-                if 'market_cap' in row:
-                    try:
-                        item_market_caps[item_id] = row['market_cap']
-                    except:
-                        item_market_caps[item_id] = 0
+        # OPTIMIZATION: Metadata item diambil dari ItemCatalog (array + kode integer)
+        catalog = self._get_item_catalog()
         
         # If no category/chain data available, just return top-n terurut
-        if not item_categories and not item_chains:
+        if catalog is None or len(catalog) == 0 or not (catalog.has_categories or catalog.has_chain):
             result = recommendations[:n]
             result.sort(key=lambda x: x[1], reverse=True)
             return result
@@ -1512,48 +1497,34 @@ class HybridRecommender:
         top_count = max(n // 4, 1)  # ~25% by pure score
         result = recommendations[:top_count]
         
-        # Track selected categories and chains
-        selected_categories = {}
-        selected_chains = {}
+        # Define market cap thresholds (can be derived from data)
+        market_cap_high, market_cap_medium = catalog.market_cap_quantile_thresholds()
+        tiers = catalog.market_cap_tiers(market_cap_high, market_cap_medium)
+        tier_names = {TIER_HIGH: 'high', TIER_MEDIUM: 'medium', TIER_LOW: 'low'}
+        
+        # Track selected categories and chains (counter per kode)
+        category_counts = np.zeros(len(catalog.category_names), dtype=np.int64)
+        chain_counts = np.zeros(len(catalog.chain_names), dtype=np.int64)
         selected_market_cap_tiers = {'high': 0, 'medium': 0, 'low': 0, 'unknown': 0}
         
-        # Define market cap thresholds (can be derived from data)
-        if item_market_caps:
-            market_caps = [cap for cap in item_market_caps.values() if cap > 0]
-            if market_caps:
-                market_caps.sort()
-                market_cap_high = market_caps[int(len(market_caps) * 0.9)] if len(market_caps) > 10 else 1e9
-                market_cap_medium = market_caps[int(len(market_caps) * 0.5)] if len(market_caps) > 5 else 1e8
-            else:
-                market_cap_high = 1e9
-                market_cap_medium = 1e8
-        else:
-            market_cap_high = 1e9
-            market_cap_medium = 1e8
+        def item_tier(catalog_idx: int) -> str:
+            if catalog_idx < 0 or not catalog.has_market_cap:
+                return 'unknown'
+            return tier_names[int(tiers[catalog_idx])]
+        
+        def track(catalog_idx: int):
+            selected_market_cap_tiers[item_tier(catalog_idx)] += 1
+            if catalog_idx < 0:
+                return
+            np.add.at(category_counts, catalog.category_codes_of(catalog_idx), 1)
+            if catalog.has_chain:
+                chain_counts[catalog.chain_codes[catalog_idx]] += 1
+        
+        candidate_idx = catalog.indices([item_id for item_id, _ in recommendations])
         
         # Populate initial tracking
-        for item_id, _ in result:
-            # Track categories
-            if item_id in item_categories:
-                for category in item_categories[item_id]:
-                    selected_categories[category] = selected_categories.get(category, 0) + 1
-            
-            # Track chains
-            if item_id in item_chains:
-                chain = item_chains[item_id]
-                selected_chains[chain] = selected_chains.get(chain, 0) + 1
-                
-            # Track market cap tiers
-            if item_id in item_market_caps:
-                market_cap = item_market_caps[item_id]
-                if market_cap >= market_cap_high:
-                    selected_market_cap_tiers['high'] += 1
-                elif market_cap >= market_cap_medium:
-                    selected_market_cap_tiers['medium'] += 1
-                else:
-                    selected_market_cap_tiers['low'] += 1
-            else:
-                selected_market_cap_tiers['unknown'] += 1
+        for catalog_idx in candidate_idx[:top_count]:
+            track(catalog_idx)
         
         # Calculate diversity limits dengan lebih konservatif
         max_per_category = max(2, int(n * 0.3))  # Maximum ~30% per category
@@ -1567,59 +1538,48 @@ class HybridRecommender:
             'unknown': int(n * 0.05)  # 5% unknown
         }
         
-        # Process remaining candidates dengan preserve ordering
-        remaining = recommendations[top_count:]
-        
         # PERBAIKAN: Calculate diversity adjusted scores untuk ranking yang lebih baik
         diversity_candidates = []
         
-        for item_id, original_score in remaining:
+        for pos in range(top_count, len(recommendations)):
+            item_id, original_score = recommendations[pos]
+            catalog_idx = candidate_idx[pos]
             diversity_score = 0
             
-            # Category diversity adjustment
-            if item_id in item_categories:
-                item_cats = item_categories[item_id]
-                cat_adjustments = []
+            if catalog_idx >= 0:
+                # Category diversity adjustment
+                cat_counts = category_counts[catalog.category_codes_of(catalog_idx)]
+                if cat_counts.size:
+                    cat_adjustments = np.where(
+                        cat_counts >= max_per_category, -0.15,  # Penalty untuk over-representation
+                        np.where(cat_counts == 0, 0.1,          # Bonus untuk kategori baru
+                                 0.05 * (1 - cat_counts / max_per_category))  # Gradual penalty
+                    )
+                    # Use average of category adjustments
+                    diversity_score += float(cat_adjustments.mean())
                 
-                for category in item_cats:
-                    cat_count = selected_categories.get(category, 0)
+                # Chain diversity adjustment
+                if catalog.has_chain:
+                    chain_count = chain_counts[catalog.chain_codes[catalog_idx]]
                     
-                    if cat_count >= max_per_category:
-                        cat_adjustments.append(-0.15)  # Penalty untuk over-representation
-                    elif cat_count == 0:
-                        cat_adjustments.append(0.1)   # Bonus untuk kategori baru
+                    if chain_count >= max_per_chain:
+                        diversity_score -= 0.1
+                    elif chain_count == 0:
+                        diversity_score += 0.08
                     else:
-                        # Gradual penalty
-                        cat_adjustments.append(0.05 * (1 - cat_count / max_per_category))
-                
-                # Use average of category adjustments
-                if cat_adjustments:
-                    diversity_score += sum(cat_adjustments) / len(cat_adjustments)
-            
-            # Chain diversity adjustment
-            if item_id in item_chains:
-                chain = item_chains[item_id]
-                chain_count = selected_chains.get(chain, 0)
-                
-                if chain_count >= max_per_chain:
-                    diversity_score -= 0.1
-                elif chain_count == 0:
-                    diversity_score += 0.08
-                else:
-                    diversity_score += 0.02 * (1 - chain_count / max_per_chain)
-            
-            # Market cap diversity adjustment
-            if item_id in item_market_caps:
-                market_cap = item_market_caps[item_id]
-                tier = 'high' if market_cap >= market_cap_high else 'medium' if market_cap >= market_cap_medium else 'low'
-                
-                tier_count = selected_market_cap_tiers[tier]
-                tier_target = market_cap_targets[tier]
+                        diversity_score += 0.02 * (1 - chain_count / max_per_chain)
                 
-                if tier_count >= tier_target:
-                    diversity_score -= 0.05
-                else:
-                    diversity_score += 0.05 * (1 - tier_count / tier_target if tier_target > 0 else 0)
+                # Market cap diversity adjustment
+                if catalog.has_market_cap:
+                    tier = item_tier(catalog_idx)
+                    
+                    tier_count = selected_market_cap_tiers[tier]
+                    tier_target = market_cap_targets[tier]
+                    
+                    if tier_count >= tier_target:
+                        diversity_score -= 0.05
+                    else:
+                        diversity_score += 0.05 * (1 - tier_count / tier_target if tier_target > 0 else 0)
             
             # PERBAIKAN: Kombinasi score dengan weight yang reasonable
             # Jangan sampai diversity weight terlalu besar
@@ -1629,36 +1589,18 @@ class HybridRecommender:
             adjusted_score = min(original_score + 0.1, adjusted_score)
             adjusted_score = max(original_score - 0.2, adjusted_score)  # Juga jangan terlalu rendah
             
-            diversity_candidates.append((item_id, original_score, adjusted_score))
+            diversity_candidates.append((item_id, original_score, adjusted_score, catalog_idx))
         
         # Sort by adjusted score
         diversity_candidates.sort(key=lambda x: x[2], reverse=True)
         
         # Select remaining items berdasarkan adjusted ranking
-        for item_id, original_score, adjusted_score in diversity_candidates:
+        for item_id, original_score, adjusted_score, catalog_idx in diversity_candidates:
             if len(result) >= n:
                 break
                 
             # Update tracking
-            if item_id in item_categories:
-                for category in item_categories[item_id]:
-                    selected_categories[category] = selected_categories.get(category, 0) + 1
-            
-            if item_id in item_chains:
-                chain = item_chains[item_id]
-                selected_chains[chain] = selected_chains.get(chain, 0) + 1
-                
-            # Update market cap tracking
-            if item_id in item_market_caps:
-                market_cap = item_market_caps[item_id]
-                if market_cap >= market_cap_high:
-                    selected_market_cap_tiers['high'] += 1
-                elif market_cap >= market_cap_medium:
-                    selected_market_cap_tiers['medium'] += 1
-                else:
-                    selected_market_cap_tiers['low'] += 1
-            else:
-                selected_market_cap_tiers['unknown'] += 1
+            track(catalog_idx)
             
             # PERBAIKAN: Add dengan original score untuk menjaga consistency
             result.append((item_id, original_score))
@@ -1693,8 +1635,19 @@ class HybridRecommender:
         # Check if this is a cold-start user
         is_cold_start = True
         if self.user_item_matrix is not None:
-            is_cold_start = user_id not in self.user_item_matrix.index
-            
+            is_cold_start = not self.user_item_matrix.has_user(user_id)
+            
+        # User hasil fold-in online: hanya FECF yang bisa men-score tanpa retrain
+        # (embedding NCF untuk user baru belum ada)
+        if is_cold_start and self.fecf_model is not None and hasattr(self.fecf_model, 'is_folded_user') \
+                and self.fecf_model.is_folded_user(user_id):
+            folded_recs = self.fecf_model.recommend_for_user(user_id, n=n, exclude_known=exclude_known)
+            if folded_recs:
+                return sorted(
+                    [(item_id, float(np.clip(score, 0.0, 1.0))) for item_id, score in folded_recs],
+                    key=lambda x: x[1], reverse=True
+                )
+        
         # Handle cold-start case
         if is_cold_start:
             cold_start_recs = self._get_cold_start_recommendations(user_id, n)
@@ -2044,22 +1997,69 @@ class HybridRecommender:
         
         return diversified[:n]
     
-    def recommend_projects(self, user_id: str, n: int = 10) -> List[Dict[str, Any]]:
+    def fold_in_user(self, user_id: str, interactions: List[Tuple[str, float]],
+                     interaction_count: Optional[int] = None) -> bool:
+        """Online fold-in lewat komponen FECF (lihat FeatureEnhancedCF.fold_in_user)"""
+        if self.fecf_model is None or not hasattr(self.fecf_model, 'fold_in_user'):
+            return False
+        folded = self.fecf_model.fold_in_user(user_id, interactions, interaction_count=interaction_count)
+        if folded:
+            prefix = f"{user_id}_"
+            for key in [key for key in list(self._recommendation_cache) if key.startswith(prefix)]:
+                self._recommendation_cache.pop(key, None)
+        return folded
+    
+    def recommend_for_users(self, user_ids: List[str], n: int = 10,
+                            exclude_known: bool = True) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        OPTIMIZATION: Rekomendasi untuk banyak user sekaligus. Kandidat FECF dan NCF untuk
+        semua warm user dihitung dengan batch scoring sub-model (hasilnya masuk cache per user
+        di sub-model), lalu ensemble dan diversity per user memakai kandidat tersebut.
+        """
+        unique_users = list(dict.fromkeys(user_ids))
+        n_candidates = min(n * self.params.get('n_candidates_factor', 3), 150)
+        
+        # Hanya warm user yang belum ada di cache hybrid yang perlu kandidat baru
+        cache = getattr(self, '_recommendation_cache', {})
+        now = time.time()
+        warm_users = []
+        for user_id in unique_users:
+            cache_entry = cache.get(f"{user_id}_{n}_{exclude_known}")
+            if cache_entry is not None and now - cache_entry.get('time', 0) < 900:
+                continue
+            if self.user_item_matrix is not None and self.user_item_matrix.has_user(user_id):
+                warm_users.append(user_id)
+        
+        if warm_users:
+            for name, model in (('FECF', self.fecf_model), ('NCF', self.ncf_model)):
+                if model is None or not hasattr(model, 'recommend_for_users') or not model.is_trained():
+                    continue
+                try:
+                    start_time = time.time()
+                    model.recommend_for_users(warm_users, n=n_candidates, exclude_known=exclude_known)
+                    logger.debug(f"{name} batch candidates for {len(warm_users)} users took {time.time() - start_time:.3f}s")
+                except Exception as e:
+                    # recommend_for_user tetap menghitung per user jika batch gagal
+                    logger.warning(f"Error getting batch {name} recommendations: {e}")
+        
+        return {user_id: self.recommend_for_user(user_id, n=n, exclude_known=exclude_known) for user_id in unique_users}
+    
+    def recommend_projects(self, user_id: str, n: int = 10,
+                           precomputed: Optional[List[Tuple[str, float]]] = None) -> List[Dict[str, Any]]:
         start_time = time.time()
         
         # Check if this is a cold-start user
         is_cold_start = False
         if self.user_item_matrix is not None:
-            is_cold_start = user_id not in self.user_item_matrix.index
+            is_cold_start = not self.user_item_matrix.has_user(user_id)
             
         # Get user interaction count for context
         user_interaction_count = 0
         if not is_cold_start and self.user_item_matrix is not None:
-            user_interactions = self.user_item_matrix.loc[user_id]
-            user_interaction_count = (user_interactions > 0).sum()
+            user_interaction_count = self.user_item_matrix.interaction_count(user_id)
         
-        # Get recommendations as (project_id, score) tuples
-        recommendations = self.recommend_for_user(user_id, n)
+        # Get recommendations as (project_id, score) tuples (precomputed: dari materialized store)
+        recommendations = precomputed if precomputed is not None else self.recommend_for_user(user_id, n)
         
         # Convert to detailed project dictionaries
         detailed_recommendations = []
@@ -2075,8 +2075,8 @@ class HybridRecommender:
                 # Add recommendation score
                 project_dict['recommendation_score'] = float(score)
                 
-                # Add recommendation source info if available
-                if project_id in self.recommendation_sources:
+                # Add recommendation source info if available (sources hanya valid untuk scoring online)
+                if precomputed is None and project_id in self.recommendation_sources:
                     sources = self.recommendation_sources[project_id]
                     project_dict['recommendation_source'] = '+'.join(sources)
                 
@@ -2517,7 +2517,7 @@ class HybridRecommender:
         logger.info(f"Getting chain-filtered recommendations for user {user_id}, chain={chain}, category={category}, strict={strict}")
         
         # Check if user exists
-        if user_id not in self.user_item_matrix.index:
+        if not self.user_item_matrix.has_user(user_id):
             logger.warning(f"User {user_id} not found in training data, falling back to chain-based popular items")
             return self._get_chain_based_recommendations(chain, n, category, strict=strict)
         
@@ -0,0 +1,141 @@
+import ast
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Kode tier market cap
+TIER_LOW = 0
+TIER_MEDIUM = 1
+TIER_HIGH = 2
+
+
+def parse_categories(value: Any) -> List[Any]:
+    """
+    Parse nilai categories_list/primary_category menjadi list kategori.
+    Pengganti eval(): list dikembalikan apa adanya, string berformat list
+    di-parse dengan json/ast.literal_eval, string biasa dibungkus list.
+    """
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        if value.startswith('[') and value.endswith(']'):
+            for parser in (json.loads, ast.literal_eval):
+                try:
+                    parsed = parser(value)
+                    if isinstance(parsed, list):
+                        return parsed
+                except (ValueError, SyntaxError):
+                    continue
+            return [value]
+        return [value]
+    return ['unknown']
+
+
+class ItemCatalog:
+    """
+    Metadata item yang dihitung sekali saat load_data: kategori dan chain
+    dalam bentuk kode integer, plus array market cap dan trend score,
+    semuanya diindeks dengan posisi baris projects_df.
+
+    Dipakai oleh langkah diversity/boost/filter supaya tidak perlu
+    iterrows() atas projects_df di setiap request.
+    """
+
+    def __init__(self, projects_df: pd.DataFrame):
+        ids = projects_df['id'].tolist() if 'id' in projects_df.columns else []
+        self.item_ids = ids
+        self.id_to_index = {item_id: idx for idx, item_id in enumerate(ids)}
+        n_items = len(ids)
+
+        # Kategori: format CSR (indptr + codes) karena satu item bisa punya banyak kategori
+        self.has_categories = 'categories_list' in projects_df.columns or 'primary_category' in projects_df.columns
+        category_column = 'categories_list' if 'categories_list' in projects_df.columns else 'primary_category'
+
+        self.category_names: List[Any] = []
+        self.category_to_code: Dict[Any, int] = {}
+        codes: List[int] = []
+        indptr = [0]
+        if self.has_categories:
+            for value in projects_df[category_column].tolist():
+                for category in parse_categories(value):
+                    code = self.category_to_code.get(category)
+                    if code is None:
+                        code = len(self.category_names)
+                        self.category_to_code[category] = code
+                        self.category_names.append(category)
+                    codes.append(code)
+                indptr.append(len(codes))
+        else:
+            indptr.extend([0] * n_items)
+        self.category_codes = np.asarray(codes, dtype=np.int32)
+        self.category_indptr = np.asarray(indptr, dtype=np.int64)
+
+        # Chain: satu kode per item
+        self.has_chain = 'chain' in projects_df.columns
+        if self.has_chain:
+            chain_codes, chain_names = pd.factorize(projects_df['chain'], use_na_sentinel=False)
+            self.chain_codes = chain_codes.astype(np.int32)
+            self.chain_names = list(chain_names)
+        else:
+            self.chain_codes = np.zeros(n_items, dtype=np.int32)
+            self.chain_names = ['unknown']
+
+        self.has_market_cap = 'market_cap' in projects_df.columns
+        self.market_cap = self._numeric_column(projects_df, 'market_cap', n_items)
+
+        self.has_trend = 'trend_score' in projects_df.columns
+        self.trend_score = self._numeric_column(projects_df, 'trend_score', n_items)
+
+        self.has_popularity = 'popularity_score' in projects_df.columns
+        self.popularity_score = self._numeric_column(projects_df, 'popularity_score', n_items)
+
+        self._market_cap_quantiles: Optional[Tuple[float, float]] = None
+        self._tier_cache: Dict[Tuple[float, float], np.ndarray] = {}
+
+    @staticmethod
+    def _numeric_column(df: pd.DataFrame, column: str, n_items: int) -> np.ndarray:
+        if column not in df.columns:
+            return np.full(n_items, np.nan)
+        return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def indices(self, item_ids: Iterable[Any]) -> np.ndarray:
+        """Posisi item di catalog; -1 untuk item yang tidak ada"""
+        return np.fromiter((self.id_to_index.get(item_id, -1) for item_id in item_ids), dtype=np.int64)
+
+    def category_codes_of(self, idx: int) -> np.ndarray:
+        if idx < 0:
+            return self.category_codes[:0]
+        return self.category_codes[self.category_indptr[idx]:self.category_indptr[idx + 1]]
+
+    def categories_of(self, idx: int) -> List[Any]:
+        return [self.category_names[code] for code in self.category_codes_of(idx)]
+
+    def chain_of(self, idx: int) -> Any:
+        return self.chain_names[self.chain_codes[idx]]
+
+    def market_cap_tiers(self, high_threshold: float, medium_threshold: float) -> np.ndarray:
+        """Tier market cap per item (TIER_LOW/MEDIUM/HIGH); NaN masuk tier low"""
+        key = (high_threshold, medium_threshold)
+        if key not in self._tier_cache:
+            tiers = np.full(len(self.market_cap), TIER_LOW, dtype=np.int8)
+            tiers[self.market_cap >= medium_threshold] = TIER_MEDIUM
+            tiers[self.market_cap >= high_threshold] = TIER_HIGH
+            self._tier_cache[key] = tiers
+        return self._tier_cache[key]
+
+    def market_cap_quantile_thresholds(self) -> Tuple[float, float]:
+        """
+        Threshold (high, medium) dari persentil 90 dan 50 market cap positif,
+        dengan default $1B/$100M jika data terlalu sedikit
+        """
+        if self._market_cap_quantiles is None:
+            caps = np.sort(self.market_cap[self.market_cap > 0])
+            high = caps[int(len(caps) * 0.9)] if len(caps) > 10 else 1e9
+            medium = caps[int(len(caps) * 0.5)] if len(caps) > 5 else 1e8
+            self._market_cap_quantiles = (float(high), float(medium))
+        return self._market_cap_quantiles
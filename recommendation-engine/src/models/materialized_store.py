@@ -0,0 +1,304 @@
+import os
+import json
+import shutil
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Tambahkan path root ke sys.path
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import MATERIALIZED_PARAMS
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+def model_fingerprint(model_path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Identitas file model (nama + mtime) untuk mendeteksi store yang sudah basi"""
+    if not model_path or not os.path.exists(model_path):
+        return None
+    return {
+        'file': os.path.basename(model_path),
+        'mtime': int(os.path.getmtime(model_path))
+    }
+
+
+class MaterializedStore:
+    """
+    Top-N rekomendasi yang sudah dihitung offline untuk satu model.
+
+    Layout per versi (semua array dibuka dengan mmap, jadi beberapa worker API
+    berbagi page cache yang sama dan load hanya membaca manifest):
+      user_ids.npy  (U,)    id user, urutan = index user di user-item matrix
+      item_ids.npy  (I,)    vocabulary item
+      items.npy     (U, N)  int32 index ke item_ids, -1 = padding
+      scores.npy    (U, N)  float32 skor rekomendasi
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(os.path.join(path, MANIFEST_FILE), 'r') as f:
+            self.manifest = json.load(f)
+
+        self.user_ids = np.load(os.path.join(path, "user_ids.npy"), mmap_mode='r')
+        self.item_ids = np.load(os.path.join(path, "item_ids.npy"), mmap_mode='r')
+        self.items = np.load(os.path.join(path, "items.npy"), mmap_mode='r')
+        self.scores = np.load(os.path.join(path, "scores.npy"), mmap_mode='r')
+
+        self._user_rows = {user_id: row for row, user_id in enumerate(self.user_ids.tolist())}
+
+    @property
+    def model_type(self) -> str:
+        return self.manifest.get('model_type')
+
+    @property
+    def top_n(self) -> int:
+        return int(self.manifest.get('top_n', self.items.shape[1]))
+
+    @property
+    def model(self) -> Optional[Dict[str, Any]]:
+        return self.manifest.get('model')
+
+    def __len__(self) -> int:
+        return len(self._user_rows)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._user_rows
+
+    def user_index(self, user_id: str) -> Optional[int]:
+        return self._user_rows.get(user_id)
+
+    def get_by_index(self, user_index: int, n: Optional[int] = None) -> List[Tuple[str, float]]:
+        n = self.top_n if n is None else min(n, self.top_n)
+        item_row = self.items[user_index, :n]
+        score_row = self.scores[user_index, :n]
+        valid = item_row >= 0
+        return [
+            (str(self.item_ids[item_idx]), float(score))
+            for item_idx, score in zip(item_row[valid], score_row[valid])
+        ]
+
+    def get(self, user_id: str, n: Optional[int] = None) -> Optional[List[Tuple[str, float]]]:
+        """Top-n (project_id, score) untuk user, None jika user tidak ada atau n > N tersimpan"""
+        row = self._user_rows.get(user_id)
+        if row is None or (n is not None and n > self.top_n):
+            return None
+        return self.get_by_index(row, n)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'model_type': self.model_type,
+            'top_n': self.top_n,
+            'num_users': len(self),
+            'num_items': len(self.item_ids),
+            'created_at': self.manifest.get('created_at'),
+            'model': self.model
+        }
+
+
+def _model_dir(model_type: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(base_dir or MATERIALIZED_PARAMS['directory'], model_type)
+
+
+def write_materialized_store(model_type: str, user_ids: List[str],
+                             recommendations: Dict[str, List[Tuple[str, float]]],
+                             top_n: int, item_ids: Optional[List[str]] = None,
+                             metadata: Optional[Dict[str, Any]] = None,
+                             base_dir: Optional[str] = None) -> str:
+    """
+    Tulis satu versi store lalu pindahkan pointer CURRENT secara atomik.
+    Versi lama yang masih di-mmap oleh proses API tetap valid sampai di-prune.
+    """
+    model_dir = _model_dir(model_type, base_dir)
+    version = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    tmp_path = os.path.join(model_dir, f".{version}.tmp")
+    final_path = os.path.join(model_dir, version)
+    os.makedirs(tmp_path, exist_ok=True)
+
+    # Vocabulary item: item dari model dulu (urutan stabil), lalu item lain yang muncul di hasil
+    vocabulary = [str(item_id) for item_id in (item_ids or [])]
+    item_index = {item_id: idx for idx, item_id in enumerate(vocabulary)}
+    for user_id in user_ids:
+        for item_id, _ in recommendations.get(user_id, []):
+            item_id = str(item_id)
+            if item_id not in item_index:
+                item_index[item_id] = len(vocabulary)
+                vocabulary.append(item_id)
+
+    items = np.full((len(user_ids), top_n), -1, dtype=np.int32)
+    scores = np.zeros((len(user_ids), top_n), dtype=np.float32)
+    for row, user_id in enumerate(user_ids):
+        recs = recommendations.get(user_id, [])[:top_n]
+        for col, (item_id, score) in enumerate(recs):
+            items[row, col] = item_index[str(item_id)]
+            scores[row, col] = score
+
+    # Unicode fixed-width (bukan object array) supaya bisa di-mmap
+    np.save(os.path.join(tmp_path, "user_ids.npy"), np.array([str(u) for u in user_ids], dtype=np.str_))
+    np.save(os.path.join(tmp_path, "item_ids.npy"), np.array(vocabulary, dtype=np.str_))
+    np.save(os.path.join(tmp_path, "items.npy"), items)
+    np.save(os.path.join(tmp_path, "scores.npy"), scores)
+
+    manifest = {
+        'model_type': model_type,
+        'version': version,
+        'top_n': top_n,
+        'num_users': len(user_ids),
+        'num_items': len(vocabulary),
+        'created_at': datetime.now().isoformat(),
+        **(metadata or {})
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(tmp_path, final_path)
+
+    current_tmp = os.path.join(model_dir, f".{CURRENT_FILE}.tmp")
+    with open(current_tmp, 'w') as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(model_dir, CURRENT_FILE))
+
+    _prune_versions(model_dir, keep=MATERIALIZED_PARAMS.get('keep_versions', 2))
+
+    logger.info(f"Materialized {model_type} top-{top_n} for {len(user_ids)} users to {final_path}")
+    return final_path
+
+
+def _prune_versions(model_dir: str, keep: int):
+    versions = sorted(
+        name for name in os.listdir(model_dir)
+        if not name.startswith('.') and os.path.isdir(os.path.join(model_dir, name))
+    )
+    for name in versions[:-max(1, keep)]:
+        shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+
+
+def load_materialized_store(model_type: str, base_dir: Optional[str] = None) -> Optional[MaterializedStore]:
+    model_dir = _model_dir(model_type, base_dir)
+    current_path = os.path.join(model_dir, CURRENT_FILE)
+    if not os.path.exists(current_path):
+        return None
+
+    with open(current_path, 'r') as f:
+        version = f.read().strip()
+
+    try:
+        return MaterializedStore(os.path.join(model_dir, version))
+    except Exception as e:
+        logger.error(f"Error loading materialized {model_type} store version {version}: {e}")
+        return None
+
+
+def materialize_recommendations(model: Any, model_type: str, n: Optional[int] = None,
+                                user_ids: Optional[List[str]] = None,
+                                workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                                model_path: Optional[str] = None,
+                                base_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Hitung top-N semua user (atau user_ids) dengan recommend_for_users model per chunk,
+    chunk dijalankan paralel di thread pool (scoring NumPy/torch melepas GIL), lalu tulis store.
+    """
+    n = n or MATERIALIZED_PARAMS['top_n']
+    workers = workers or MATERIALIZED_PARAMS['workers']
+    chunk_size = max(1, chunk_size or MATERIALIZED_PARAMS['chunk_size'])
+
+    matrix = getattr(model, 'user_item_matrix', None)
+    if user_ids is None:
+        if matrix is None:
+            raise ValueError(f"{model_type} model has no user-item matrix to materialize")
+        user_ids = matrix.users
+    user_ids = [str(user_id) for user_id in user_ids]
+
+    def score_chunk(chunk: List[str]) -> Dict[str, List[Tuple[str, float]]]:
+        if hasattr(model, 'recommend_for_users'):
+            return model.recommend_for_users(chunk, n=n)
+        return {user_id: model.recommend_for_user(user_id, n=n) for user_id in chunk}
+
+    chunks = [user_ids[start:start + chunk_size] for start in range(0, len(user_ids), chunk_size)]
+    recommendations: Dict[str, List[Tuple[str, float]]] = {}
+    failed_users = 0
+    start_time = time.time()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"materialize-{model_type}") as pool:
+        futures = [(chunk, pool.submit(score_chunk, chunk)) for chunk in chunks]
+        for done, (chunk, future) in enumerate(futures, 1):
+            try:
+                recommendations.update(future.result())
+            except Exception as e:
+                failed_users += len(chunk)
+                logger.error(f"Error materializing {model_type} chunk of {len(chunk)} users: {e}")
+            if done % 10 == 0 or done == len(futures):
+                logger.info(f"Materialized {model_type}: {done}/{len(futures)} chunks")
+
+    build_time = time.time() - start_time
+    # User dari chunk yang gagal tidak ditulis (baris kosong akan menghasilkan []),
+    # sehingga store mengembalikan None dan user tersebut dilayani online
+    materialized_users = [user_id for user_id in user_ids if user_id in recommendations]
+    path = write_materialized_store(
+        model_type, materialized_users, recommendations, n,
+        item_ids=matrix.items if matrix is not None else None,
+        metadata={
+            'model': model_fingerprint(model_path),
+            'build_time': build_time,
+            'failed_users': failed_users
+        },
+        base_dir=base_dir
+    )
+
+    return {
+        'model_type': model_type,
+        'path': path,
+        'num_users': len(materialized_users),
+        'failed_users': failed_users,
+        'top_n': n,
+        'build_time': build_time
+    }
+
+
+_stores: Dict[str, Tuple[Optional[MaterializedStore], Optional[float], float]] = {}
+_stores_lock = threading.Lock()
+
+
+def get_materialized_store(model_type: str) -> Optional[MaterializedStore]:
+    """
+    Store aktif untuk model_type. Pointer CURRENT dicek paling sering setiap
+    reload_interval detik, sehingga `main.py materialize` baru langsung dipakai API.
+    """
+    if not MATERIALIZED_PARAMS.get('enabled', True):
+        return None
+
+    now = time.time()
+    with _stores_lock:
+        store, current_mtime, checked_at = _stores.get(model_type, (None, None, 0.0))
+        if now - checked_at < MATERIALIZED_PARAMS.get('reload_interval', 30.0):
+            return store
+
+        current_path = os.path.join(_model_dir(model_type), CURRENT_FILE)
+        try:
+            mtime = os.path.getmtime(current_path)
+        except OSError:
+            mtime = None
+
+        if mtime != current_mtime:
+            store = load_materialized_store(model_type) if mtime is not None else None
+            if store is not None:
+                logger.info(f"Loaded materialized {model_type} store ({len(store)} users, top-{store.top_n})")
+
+        _stores[model_type] = (store, mtime, now)
+        return store
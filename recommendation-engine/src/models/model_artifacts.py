@@ -0,0 +1,106 @@
+import os
+import json
+import shutil
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Tambahkan path root ke sys.path
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import MODEL_ARTIFACTS_CONFIG
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_FILE = "manifest.json"
+ARRAYS_SUFFIX = "_arrays"
+
+
+def mmap_enabled() -> bool:
+    return MODEL_ARTIFACTS_CONFIG.get('mmap', True)
+
+
+def array_dir(model_path: str) -> str:
+    """Direktori array di samping file model (mis. fecf_model_x.pkl -> fecf_model_x_arrays/)"""
+    return f"{os.path.splitext(model_path)[0]}{ARRAYS_SUFFIX}"
+
+
+def save_arrays(directory: str, arrays: Dict[str, Any], model_timestamp: str) -> str:
+    """
+    Simpan array besar model sebagai file .npy (dense) atau tiga file .npy per
+    csr_matrix (data/indices/indptr). Direktori ditulis ke tmp lalu di-rename,
+    sehingga worker yang masih mmap versi lama tidak terganggu.
+    """
+    parent = os.path.dirname(os.path.abspath(directory))
+    name = os.path.basename(directory)
+    tmp_path = os.path.join(parent, f".{name}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    entries = {}
+    for key, value in arrays.items():
+        if value is None:
+            continue
+        if isinstance(value, csr_matrix):
+            for part in ('data', 'indices', 'indptr'):
+                np.save(os.path.join(tmp_path, f"{key}.{part}.npy"), np.ascontiguousarray(getattr(value, part)))
+            entries[key] = {'kind': 'csr', 'shape': list(value.shape)}
+        else:
+            np.save(os.path.join(tmp_path, f"{key}.npy"), np.ascontiguousarray(value))
+            entries[key] = {'kind': 'dense'}
+
+    manifest = {'model_timestamp': model_timestamp, 'arrays': entries}
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Versi lama dipindah dulu (rename atomik), baru dihapus: file yang sudah di-mmap tetap valid
+    old_path = os.path.join(parent, f".{name}.old")
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, old_path)
+    os.rename(tmp_path, directory)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+    logger.info(f"Saved {len(entries)} model arrays to {directory}")
+    return directory
+
+
+def load_arrays(directory: str, model_timestamp: Optional[str] = None,
+                mmap: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    """
+    Buka array model read-only dengan mmap (page cache dibagi antar proses worker).
+    Return None jika direktori tidak ada atau bukan milik model yang sama.
+    """
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+
+    if model_timestamp is not None and manifest.get('model_timestamp') != model_timestamp:
+        logger.warning(f"Model arrays {directory} do not match the loaded model")
+        return None
+
+    mmap_mode = 'r' if (mmap_enabled() if mmap is None else mmap) else None
+    arrays = {}
+    for key, entry in manifest['arrays'].items():
+        if entry['kind'] == 'csr':
+            data, indices, indptr = (
+                np.load(os.path.join(directory, f"{key}.{part}.npy"), mmap_mode=mmap_mode)
+                for part in ('data', 'indices', 'indptr')
+            )
+            arrays[key] = csr_matrix((data, indices, indptr), shape=tuple(entry['shape']), copy=False)
+        else:
+            # asarray: view ndarray biasa atas memmap (hasil operasi tidak ikut bertipe memmap)
+            arrays[key] = np.asarray(np.load(os.path.join(directory, f"{key}.npy"), mmap_mode=mmap_mode))
+
+    return arrays
@@ -0,0 +1,443 @@
+import os
+import re
+import importlib
+import json
+import shutil
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Tambahkan path root ke sys.path
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import MODELS_DIR, MODEL_REGISTRY_CONFIG
+from src.models.model_artifacts import array_dir
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+MODEL_TYPES = ("fecf", "ncf", "hybrid")
+MANIFEST_FILE = "manifest.json"
+
+# Modul kelas model; torch/scikit-learn baru di-import saat modul ini di-import
+_MODEL_MODULES = ("src.models.alt_fecf", "src.models.ncf", "src.models.hybrid")
+
+# Nama file hasil training yang sudah unik per versi (mis. hybrid_model_20250624_091928.pkl)
+_TIMESTAMP_PATTERN = re.compile(r"(\d{8}_\d{6})")
+
+
+def _create_model(model_type: str) -> Any:
+    if model_type == "fecf":
+        from src.models.alt_fecf import FeatureEnhancedCF
+        return FeatureEnhancedCF()
+    if model_type == "ncf":
+        from src.models.ncf import NCFRecommender
+        return NCFRecommender()
+    if model_type == "hybrid":
+        from src.models.hybrid import HybridRecommender
+        return HybridRecommender()
+    raise ValueError(f"Invalid model type: {model_type}")
+
+
+def import_model_modules():
+    """
+    Import modul model secara berurutan. Dipanggil sekali sebelum beberapa model
+    dimuat paralel, supaya thread loader tidak saling menunggu import lock torch/sklearn.
+    """
+    for module_name in _MODEL_MODULES:
+        importlib.import_module(module_name)
+
+
+class ModelHandle:
+    """Satu versi model yang sudah dimuat dan di-warm (immutable setelah aktif)"""
+
+    __slots__ = ('model_type', 'version', 'model', 'manifest', 'loaded_at', 'load_time')
+
+    def __init__(self, model_type: str, version: str, model: Any, manifest: Dict[str, Any], load_time: float):
+        self.model_type = model_type
+        self.version = version
+        self.model = model
+        self.manifest = manifest
+        self.loaded_at = datetime.now().isoformat()
+        self.load_time = load_time
+
+    @property
+    def model_path(self) -> Optional[str]:
+        return self.manifest.get('files', {}).get('model')
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'model_path': self.model_path,
+            'loaded_at': self.loaded_at,
+            'load_time': round(self.load_time, 3)
+        }
+
+
+class ModelRegistry:
+    """
+    Registry model dengan manifest per versi dan hot-swap atomik.
+
+    Setiap file model hasil training didaftarkan sebagai versi dengan manifest
+    ({registry}/{model_type}/{version}/manifest.json). File dengan nama tetap
+    (ncf_model.pkl ditimpa setiap training) di-snapshot ke direktori versi supaya
+    versi lama tetap bisa dimuat ulang.
+
+    Swap: versi baru dimuat dan di-warm di background thread, lalu referensi model
+    aktif diganti di bawah lock. Request yang sedang berjalan sudah memegang
+    referensi model lama dan selesai dengan versi itu; request berikutnya memakai
+    versi baru. Versi sebelumnya tetap di memori untuk rollback instan.
+    """
+
+    def __init__(self, models_dir: Optional[str] = None, registry_dir: Optional[str] = None):
+        self.models_dir = models_dir or MODELS_DIR
+        self.registry_dir = registry_dir or MODEL_REGISTRY_CONFIG['directory']
+
+        self._lock = threading.RLock()
+        self._active: Dict[str, ModelHandle] = {}
+        self._previous: Dict[str, List[ModelHandle]] = {}
+        self._swap_state: Dict[str, Dict[str, Any]] = {}
+        self._swap_locks = {model_type: threading.Lock() for model_type in MODEL_TYPES}
+        self._listeners: List[Callable[[str, Optional[ModelHandle], ModelHandle], None]] = []
+
+    # ------------------------------------------------------------------
+    # Manifests
+    # ------------------------------------------------------------------
+
+    def _version_dir(self, model_type: str, version: str) -> str:
+        return os.path.join(self.registry_dir, model_type, version)
+
+    def _model_files(self, model_type: str) -> List[str]:
+        if not os.path.isdir(self.models_dir):
+            return []
+        prefix = f"{model_type}_model"
+        return [
+            os.path.join(self.models_dir, name) for name in os.listdir(self.models_dir)
+            if name.startswith(prefix) and name.endswith(".pkl") and not name.endswith("_serving.pkl")
+        ]
+
+    @staticmethod
+    def _fingerprint(path: str) -> Dict[str, Any]:
+        stat = os.stat(path)
+        return {'file': os.path.basename(path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+    def _read_manifests(self, model_type: str) -> List[Dict[str, Any]]:
+        model_dir = os.path.join(self.registry_dir, model_type)
+        if not os.path.isdir(model_dir):
+            return []
+
+        manifests = []
+        for version in os.listdir(model_dir):
+            manifest_path = os.path.join(model_dir, version, MANIFEST_FILE)
+            if not os.path.exists(manifest_path):
+                continue
+            try:
+                with open(manifest_path, 'r') as f:
+                    manifests.append(json.load(f))
+            except Exception as e:
+                logger.warning(f"Invalid manifest {manifest_path}: {e}")
+        return manifests
+
+    def register(self, model_type: str, model_path: str,
+                 metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Daftarkan file model sebagai versi baru (manifest ditulis atomik)"""
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"Invalid model type: {model_type}")
+
+        fingerprint = self._fingerprint(model_path)
+        match = _TIMESTAMP_PATTERN.search(os.path.basename(model_path))
+        version = match.group(1) if match else datetime.fromtimestamp(fingerprint['mtime']).strftime("%Y%m%d_%H%M%S")
+
+        existing = {manifest['version'] for manifest in self._read_manifests(model_type)}
+        base_version, suffix = version, 1
+        while version in existing:
+            version = f"{base_version}_{suffix}"
+            suffix += 1
+
+        version_dir = self._version_dir(model_type, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        files = {'model': model_path}
+        if not match:
+            # Nama file tidak unik per versi (akan ditimpa training berikutnya): snapshot
+            snapshot_path = os.path.join(version_dir, os.path.basename(model_path))
+            shutil.copy2(model_path, snapshot_path)
+            files['model'] = snapshot_path
+
+            serving_path = f"{os.path.splitext(model_path)[0]}_serving.pkl"
+            if os.path.exists(serving_path):
+                shutil.copy2(serving_path, os.path.join(version_dir, os.path.basename(serving_path)))
+
+            arrays_path = array_dir(model_path)
+            if os.path.isdir(arrays_path):
+                shutil.copytree(arrays_path, os.path.join(version_dir, os.path.basename(arrays_path)),
+                                dirs_exist_ok=True)
+
+        manifest = {
+            'model_type': model_type,
+            'version': version,
+            'files': files,
+            'source': fingerprint,
+            'created_at': datetime.fromtimestamp(fingerprint['mtime']).isoformat(),
+            'registered_at': datetime.now().isoformat(),
+            'metrics': metrics or {}
+        }
+
+        tmp_path = os.path.join(version_dir, f".{MANIFEST_FILE}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+        os.replace(tmp_path, os.path.join(version_dir, MANIFEST_FILE))
+
+        logger.info(f"Registered {model_type} model version {version} ({fingerprint['file']})")
+        return manifest
+
+    def discover(self, model_type: str) -> List[Dict[str, Any]]:
+        """Daftarkan file model di MODELS_DIR yang belum punya manifest (training lama/baru)"""
+        with self._lock:
+            manifests = self._read_manifests(model_type)
+            known = {
+                (manifest['source']['file'], manifest['source']['size'], manifest['source']['mtime'])
+                for manifest in manifests if manifest.get('source')
+            }
+
+            for path in self._model_files(model_type):
+                try:
+                    fingerprint = self._fingerprint(path)
+                except OSError:
+                    continue
+                if (fingerprint['file'], fingerprint['size'], fingerprint['mtime']) not in known:
+                    manifests.append(self.register(model_type, path))
+
+            return sorted(manifests, key=lambda manifest: (manifest['created_at'], manifest['version']))
+
+    def versions(self, model_type: str) -> List[Dict[str, Any]]:
+        manifests = self.discover(model_type) if MODEL_REGISTRY_CONFIG.get('auto_discover', True) \
+            else sorted(self._read_manifests(model_type), key=lambda m: (m['created_at'], m['version']))
+        active = self._active.get(model_type)
+        return [
+            {
+                **manifest,
+                'available': os.path.exists(manifest['files']['model']),
+                'active': active is not None and active.version == manifest['version']
+            }
+            for manifest in manifests
+        ]
+
+    def resolve(self, model_type: str, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        candidates = [manifest for manifest in self.versions(model_type) if manifest['available']]
+        if version is None:
+            return candidates[-1] if candidates else None
+        for manifest in candidates:
+            if manifest['version'] == version:
+                return manifest
+        raise ValueError(f"Unknown or unavailable {model_type} version: {version}")
+
+    # ------------------------------------------------------------------
+    # Load, warm, swap
+    # ------------------------------------------------------------------
+
+    def load(self, model_type: str, version: Optional[str] = None, warm: bool = True) -> Optional[ModelHandle]:
+        """Muat (dan warm) satu versi tanpa mengaktifkannya. None jika belum ada versi"""
+        manifest = self.resolve(model_type, version)
+        if manifest is None:
+            logger.warning(f"No registered {model_type} model version")
+            return None
+
+        start_time = time.time()
+        model_path = manifest['files']['model']
+        self._set_state(model_type, state='loading', target_version=manifest['version'])
+
+        model = _create_model(model_type)
+        logger.info(f"Loading data for {model_type} model version {manifest['version']}")
+        if not model.load_data():
+            raise RuntimeError(f"Failed to load data for {model_type} model")
+
+        logger.info(f"Loading {model_type} model from {model_path}")
+        if not model.load_model(model_path):
+            raise RuntimeError(f"Failed to load {model_type} model file {model_path}")
+
+        if warm:
+            self._set_state(model_type, state='warming')
+            self._warm(model_type, model)
+
+        return ModelHandle(model_type, manifest['version'], model, manifest, time.time() - start_time)
+
+    def _warm(self, model_type: str, model: Any):
+        """Isi cache/struktur lazy model dengan sample user sebelum menerima traffic"""
+        warm_users = MODEL_REGISTRY_CONFIG.get('warm_users', 0)
+        matrix = getattr(model, 'user_item_matrix', None)
+        if not warm_users or matrix is None:
+            return
+
+        user_ids = matrix.users[:warm_users]
+        n = MODEL_REGISTRY_CONFIG.get('warm_n', 10)
+        start_time = time.time()
+        try:
+            if hasattr(model, 'recommend_for_users'):
+                model.recommend_for_users(user_ids, n=n)
+            else:
+                for user_id in user_ids:
+                    model.recommend_for_user(user_id, n=n)
+            logger.info(f"Warmed {model_type} model with {len(user_ids)} users in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            # Warm-up gagal tidak menggagalkan swap, model tetap valid
+            logger.warning(f"Error warming {model_type} model: {e}")
+
+    def activate(self, model_type: str, version: Optional[str] = None,
+                 force: bool = False) -> Optional[ModelHandle]:
+        """Muat versi (default: terbaru) lalu swap secara atomik. Sinkron"""
+        with self._swap_locks[model_type]:
+            try:
+                active = self._active.get(model_type)
+                if active is not None and not force:
+                    manifest = self.resolve(model_type, version)
+                    if manifest is not None and manifest['version'] == active.version:
+                        logger.info(f"{model_type} model version {active.version} already active")
+                        self._set_state(model_type, state='active', finished_at=datetime.now().isoformat())
+                        return active
+
+                handle = self.load(model_type, version)
+            except Exception as e:
+                self._set_state(model_type, state='failed', error=str(e), finished_at=datetime.now().isoformat())
+                raise
+
+            if handle is None:
+                self._set_state(model_type, state='idle')
+                return None
+
+            self._swap(handle)
+            return handle
+
+    def swap_async(self, model_type: str, version: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        """Jalankan activate() di background thread; return status swap saat ini"""
+        if model_type not in MODEL_TYPES:
+            raise ValueError(f"Invalid model type: {model_type}")
+
+        if self._swap_locks[model_type].locked():
+            return self.swap_status(model_type)
+
+        self._set_state(model_type, state='pending', target_version=version, error=None,
+                        started_at=datetime.now().isoformat(), finished_at=None)
+
+        def run():
+            try:
+                self.activate(model_type, version, force=force)
+            except Exception as e:
+                logger.error(f"Background swap of {model_type} model failed: {e}")
+
+        threading.Thread(target=run, name=f"model-swap-{model_type}", daemon=True).start()
+        return self.swap_status(model_type)
+
+    def _swap(self, handle: ModelHandle):
+        with self._lock:
+            previous = self._active.get(handle.model_type)
+            self._active[handle.model_type] = handle
+            if previous is not None and previous.version != handle.version:
+                history = self._previous.setdefault(handle.model_type, [])
+                history.append(previous)
+                del history[:-max(0, MODEL_REGISTRY_CONFIG.get('keep_previous', 1))]
+
+        self._set_state(handle.model_type, state='active', target_version=handle.version, error=None,
+                        finished_at=datetime.now().isoformat())
+        logger.info(f"Activated {handle.model_type} model version {handle.version}"
+                    + (f" (was {previous.version})" if previous is not None else ""))
+
+        for listener in list(self._listeners):
+            try:
+                listener(handle.model_type, previous, handle)
+            except Exception as e:
+                logger.warning(f"Model swap listener failed: {e}")
+
+    def rollback(self, model_type: str) -> Optional[ModelHandle]:
+        """Aktifkan kembali versi sebelumnya yang masih di memori (tanpa reload)"""
+        if not self._swap_locks[model_type].acquire(blocking=False):
+            raise RuntimeError(f"A {model_type} model swap is in progress")
+        try:
+            with self._lock:
+                history = self._previous.get(model_type)
+                if not history:
+                    return None
+                handle = history.pop()
+                current = self._active.get(model_type)
+                self._active[model_type] = handle
+
+            self._set_state(model_type, state='active', target_version=handle.version, error=None,
+                            finished_at=datetime.now().isoformat())
+            logger.info(f"Rolled back {model_type} model to version {handle.version}"
+                        + (f" (from {current.version})" if current is not None else ""))
+
+            for listener in list(self._listeners):
+                try:
+                    listener(model_type, current, handle)
+                except Exception as e:
+                    logger.warning(f"Model swap listener failed: {e}")
+            return handle
+        finally:
+            self._swap_locks[model_type].release()
+
+    def add_listener(self, listener: Callable[[str, Optional[ModelHandle], ModelHandle], None]):
+        """listener(model_type, old_handle, new_handle) dipanggil setelah setiap swap/rollback"""
+        self._listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def get(self, model_type: str) -> Optional[Any]:
+        handle = self._active.get(model_type)
+        return handle.model if handle is not None else None
+
+    def get_handle(self, model_type: str) -> Optional[ModelHandle]:
+        return self._active.get(model_type)
+
+    def model_path(self, model_type: str) -> Optional[str]:
+        handle = self._active.get(model_type)
+        return handle.model_path if handle is not None else None
+
+    def unload(self, model_type: str):
+        with self._lock:
+            self._active.pop(model_type, None)
+            self._previous.pop(model_type, None)
+
+    def unload_all(self):
+        with self._lock:
+            self._active.clear()
+            self._previous.clear()
+
+    def _set_state(self, model_type: str, **values):
+        with self._lock:
+            self._swap_state.setdefault(model_type, {}).update(values)
+
+    def swap_status(self, model_type: str) -> Dict[str, Any]:
+        with self._lock:
+            state = dict(self._swap_state.get(model_type, {'state': 'idle'}))
+            active = self._active.get(model_type)
+            previous = self._previous.get(model_type, [])
+            state['active'] = active.info() if active is not None else None
+            state['rollback_versions'] = [handle.version for handle in previous]
+        state['swapping'] = self._swap_locks[model_type].locked()
+        return state
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {model_type: self.swap_status(model_type) for model_type in MODEL_TYPES}
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Registry bersama untuk proses ini (dipakai API dan CLI)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -7,20 +7,25 @@ import time
 import pickle
 import random
 import copy
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 
 # Path handling
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from config import NCF_PARAMS, MODELS_DIR, PROCESSED_DIR
+from config import NCF_PARAMS, MODELS_DIR, PROCESSED_DIR, MODEL_ARTIFACTS_CONFIG
+from src.models.user_item_matrix import UserItemMatrix
+from src.models.item_catalog import ItemCatalog
+from src.models.model_artifacts import array_dir, load_arrays, save_arrays
 
 # Setup logging
 logging.basicConfig(
@@ -71,11 +76,17 @@ class NCFDataset(Dataset):
         else:
             self.all_items = np.unique(item_indices)
         
+        # Precompute distribusi sampling (popularitas, kategori, trend) sekali saja
+        self._prepare_negative_sampling()
+        
         # Generate negative samples di awal untuk konsistensi
-        self.neg_samples = self._pregenerate_negative_samples()
+        self.neg_user_indices, self.neg_item_indices = self._pregenerate_negative_samples()
         
         # Panjang total dataset: sampel positif + sampel negatif
-        self.length = len(ratings) + len(self.neg_samples)
+        self.length = len(ratings) + len(self.neg_item_indices)
+        
+        # Positives + negatives dalam tensor kontigu untuk iterasi per batch
+        self._materialize_tensors()
 
     def _create_user_category_map(self):
         """Buat pemetaan minat kategori pengguna berdasarkan histori interaksi"""
@@ -93,154 +104,255 @@ class NCFDataset(Dataset):
                         self.user_category_map[user_idx][category] = 0
                     self.user_category_map[user_idx][category] += 1
 
-    def _pregenerate_negative_samples(self):
+    def _prepare_negative_sampling(self):
         """
-        Generate negative samples dengan strategi sampling yang lebih canggih:
-        1. Sampling dari kategori yang mirip (in-category negative sampling)
-        2. Anti-popularity sampling untuk lebih merata
-        3. Hard negative mining (near-miss examples)
+        OPTIMIZATION: Precompute semua yang dibutuhkan sampler dalam bentuk array
+        (posisi item, distribusi anti-popularity, item per kategori, bobot trend,
+        dan grouping baris positif per user), supaya sampling bisa dilakukan bulk.
         """
-        neg_samples = []
+        self.all_items = np.asarray(self.all_items)
+        num_items = len(self.all_items)
+        
+        # Lookup item index -> posisi di all_items (-1 jika tidak ada)
+        max_item = int(max(self.all_items.max(initial=0), np.max(self.item_indices, initial=0)))
+        self._item_position = np.full(max_item + 1, -1, dtype=np.int64)
+        self._item_position[self.all_items] = np.arange(num_items)
         
         # Pertama, hitung popularitas item berdasarkan frekuensi interaksi
         if self.item_popularity is None:
-            item_popularity = np.zeros(len(self.all_items))
-            for user_idx in self.user_item_map:
-                for item_idx in self.user_item_map[user_idx]:
-                    # Cari indeks item dalam all_items array
-                    item_pos = np.nonzero(self.all_items == item_idx)[0]
-                    if len(item_pos) > 0:
-                        item_popularity[item_pos[0]] += 1
+            positions = self._item_position[np.asarray(self.item_indices, dtype=np.int64)]
+            item_popularity = np.bincount(positions[positions >= 0], minlength=num_items).astype(np.float64)
             
             # Normalisasi popularitas
-            max_pop = item_popularity.max()
+            max_pop = item_popularity.max(initial=0)
             if max_pop > 0:
                 item_popularity = item_popularity / max_pop
         else:
             # Use provided popularity if available
-            item_popularity = np.array([self.item_popularity.get(item, 0) for item in self.all_items])
+            item_popularity = np.array([self.item_popularity.get(item, 0) for item in self.all_items], dtype=np.float64)
+            item_popularity = np.nan_to_num(item_popularity)
         
         # Buat distribusi probabilitas inverse untuk mendorong diversity
         # Formula: 1 - (pop^0.5) * 0.75
         # Ini membuat item populer tetap ada kesempatan, tapi menurunkan dominasinya
         item_probability = 1.0 - (np.power(item_popularity, 0.5) * 0.75)
-        item_probability = item_probability / item_probability.sum()
+        self._item_probability = item_probability / item_probability.sum()
         
-        # Prepare untuk hard negative sampling - group items by category
-        category_to_items = {}
+        # Prepare untuk hard negative sampling - posisi item per kategori
+        category_to_positions = {}
         if self.item_categories:
-            for item_idx in self.all_items:
+            for position, item_idx in enumerate(self.all_items.tolist()):
                 if item_idx in self.item_categories:
                     categories = self.item_categories[item_idx]
                     if not isinstance(categories, list):
                         categories = [categories]
-                        
-                    for category in categories:
-                        if category not in category_to_items:
-                            category_to_items[category] = []
-                        category_to_items[category].append(item_idx)
-        
-        for i, user_idx in enumerate(self.user_indices):
-            # Get items yang sudah diinteraksi
-            interacted_items = set(self.user_item_map.get(user_idx, []))
-            
-            # Dapatkan kategori yang disukai user berdasarkan frekuensi interaksi
-            user_preferred_categories = []
-            if user_idx in self.user_category_map:
-                user_preferred_categories = sorted(
-                    self.user_category_map[user_idx].items(), 
-                    key=lambda x: x[1], 
-                    reverse=True
-                )
-                user_preferred_categories = [cat for cat, _ in user_preferred_categories]
-            
-            # Generate negative samples untuk user ini dengan 3 strategi:
-            # 1. In-category negatives (40%)
-            # 2. Trending negatives (30%)
-            # 3. Diverse negatives (30%)
-            
-            for _ in range(self.num_negative):
-                neg_item_idx = None
-                
-                # Randomly choose sampling strategy
-                sampling_strategy = self.rng.choice(['in-category', 'trending', 'diverse'], p=[0.4, 0.3, 0.3])
-                
-                if sampling_strategy == 'in-category' and user_preferred_categories and category_to_items:
-                    # In-category negative sampling
-                    for category in user_preferred_categories[:3]:  # Try top 3 categories
-                        if category in category_to_items:
-                            # Get items in this category
-                            cat_items = category_to_items[category]
-                            # Filter out already interacted items
-                            available_items = [item for item in cat_items if item not in interacted_items]
-                            
-                            if available_items:
-                                # Select random item from same category
-                                neg_item_idx = self.rng.choice(available_items)
-                                break
-                
-                elif sampling_strategy == 'trending' and self.item_trend_scores:
-                    # Trending negative sampling - focus on trending items
-                    # Convert trend scores to probabilities
-                    trend_items = []
-                    trend_scores = []
-                    
-                    for item in self.all_items:
-                        if item not in interacted_items and item in self.item_trend_scores:
-                            trend_items.append(item)
-                            trend_scores.append(max(0.1, self.item_trend_scores[item]))
-                    
-                    if trend_items:
-                        # Normalize scores to probabilities
-                        trend_probs = np.array(trend_scores)
-                        trend_probs = trend_probs / trend_probs.sum()
-                        
-                        # Sample based on trend scores
-                        neg_item_idx = self.rng.choice(trend_items, p=trend_probs)
-                
-                # If previous strategies failed or we're using diverse strategy, use anti-popularity sampling
-                if neg_item_idx is None:
-                    # Try anti-popularity sampling a few times
-                    for _ in range(5):
-                        candidate = self.rng.choice(self.all_items, p=item_probability)
-                        if candidate not in interacted_items:
-                            neg_item_idx = candidate
-                            break
                     
-                    # If still no valid item, just pick any non-interacted item
-                    if neg_item_idx is None:
-                        available_items = np.array([item for item in self.all_items if item not in interacted_items])
-                        if len(available_items) > 0:
-                            neg_item_idx = self.rng.choice(available_items)
-                        else:
-                            # Last resort - pick any item (could be duplicate in extreme cases)
-                            neg_item_idx = self.rng.choice(self.all_items)
-                
-                # Add negative sample
-                neg_samples.append((user_idx, neg_item_idx, 0.0))
+                    for category in categories:
+                        category_to_positions.setdefault(category, []).append(position)
+        self._category_positions = {
+            category: np.asarray(positions, dtype=np.int64)
+            for category, positions in category_to_positions.items()
+        }
         
-        return neg_samples
+        # Bobot trending: max(0.1, trend) untuk item yang punya trend score, 0 untuk yang tidak
+        self._trend_weights = None
+        if self.item_trend_scores:
+            trend_weights = np.zeros(num_items, dtype=np.float64)
+            for position, item_idx in enumerate(self.all_items.tolist()):
+                if item_idx in self.item_trend_scores:
+                    trend_weights[position] = np.fmax(0.1, self.item_trend_scores[item_idx])
+            self._trend_weights = trend_weights
+        
+        # Kategori favorit per user (top 3 berdasarkan frekuensi interaksi)
+        self._user_top_categories = {
+            user_idx: [cat for cat, _ in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:3]]
+            for user_idx, counts in self.user_category_map.items()
+        }
         
+        # Exclusion bitmap per user (bit = item sudah diinteraksi), dikemas 8 item per byte
+        # sehingga resampling per epoch tidak perlu membangun ulang set interaksi
+        self._bitmap_row = {user_idx: row for row, user_idx in enumerate(self.user_item_map.keys())}
+        self._exclusion_bitmaps = np.zeros((len(self._bitmap_row), (num_items + 7) // 8), dtype=np.uint8)
+        if len(self.user_indices):
+            rows = np.array([self._bitmap_row[user_idx] for user_idx in np.asarray(self.user_indices).tolist()], dtype=np.int64)
+            positions = self._item_position[np.asarray(self.item_indices, dtype=np.int64)]
+            valid = positions >= 0
+            rows, positions = rows[valid], positions[valid]
+            bits = np.left_shift(1, 7 - (positions & 7)).astype(np.uint8)
+            np.bitwise_or.at(self._exclusion_bitmaps, (rows, positions >> 3), bits)
+        
+        # Baris positif per user (untuk menempatkan negatives di slot yang sama dengan loop lama)
+        user_indices = np.asarray(self.user_indices)
+        order = np.argsort(user_indices, kind='stable')
+        unique_users, starts = np.unique(user_indices[order], return_index=True)
+        self._user_rows = dict(zip(unique_users.tolist(), np.split(order, starts[1:])))
+
+    def _sample_user_negatives(self, user_idx: int, num_samples: int,
+                               rng: np.random.RandomState) -> np.ndarray:
+        """
+        Draw `num_samples` negatives (posisi di all_items) untuk satu user sekaligus
+        dengan 3 strategi:
+        1. In-category negatives (40%)
+        2. Trending negatives (30%)
+        3. Diverse / anti-popularity negatives (30%)
+        """
+        num_items = len(self.all_items)
+        row = self._bitmap_row.get(user_idx)
+        if row is not None:
+            available_mask = ~np.unpackbits(self._exclusion_bitmaps[row], count=num_items).astype(bool)
+        else:
+            available_mask = np.ones(num_items, dtype=bool)
+        
+        samples = np.full(num_samples, -1, dtype=np.int64)
+        
+        # Randomly choose sampling strategy per negative: 0=in-category, 1=trending, 2=diverse
+        strategies = rng.choice(3, size=num_samples, p=[0.4, 0.3, 0.3])
+        
+        # In-category negative sampling: kategori favorit pertama yang masih punya item tersedia
+        in_category = np.nonzero(strategies == 0)[0]
+        if len(in_category) and self._category_positions:
+            for category in self._user_top_categories.get(user_idx, []):
+                cat_positions = self._category_positions.get(category)
+                if cat_positions is None:
+                    continue
+                available_items = cat_positions[available_mask[cat_positions]]
+                if len(available_items):
+                    samples[in_category] = rng.choice(available_items, size=len(in_category))
+                    break
+        
+        # Trending negative sampling - probabilitas sebanding dengan trend score
+        trending = np.nonzero(strategies == 1)[0]
+        if len(trending) and self._trend_weights is not None:
+            trend_weights = np.where(available_mask, self._trend_weights, 0.0)
+            total_weight = trend_weights.sum()
+            if total_weight > 0:
+                samples[trending] = rng.choice(num_items, size=len(trending), p=trend_weights / total_weight)
+        
+        # If previous strategies failed or we're using diverse strategy, use anti-popularity sampling
+        pending = np.nonzero(samples < 0)[0]
+        if len(pending):
+            # Try anti-popularity sampling a few times (rejection mask atas item yang sudah diinteraksi)
+            candidates = rng.choice(num_items, size=(len(pending), 5), p=self._item_probability)
+            accepted = available_mask[candidates]
+            has_accepted = accepted.any(axis=1)
+            first_accepted = accepted.argmax(axis=1)
+            samples[pending[has_accepted]] = candidates[has_accepted, first_accepted[has_accepted]]
+            
+            # If still no valid item, just pick any non-interacted item
+            still_pending = pending[~has_accepted]
+            if len(still_pending):
+                available_items = np.nonzero(available_mask)[0]
+                if len(available_items) > 0:
+                    samples[still_pending] = rng.choice(available_items, size=len(still_pending))
+                else:
+                    # Last resort - pick any item (could be duplicate in extreme cases)
+                    samples[still_pending] = rng.choice(num_items, size=len(still_pending))
+        
+        return samples
+
+    def _pregenerate_negative_samples(self, rng: Optional[np.random.RandomState] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate negative samples dengan strategi sampling yang lebih canggih:
+        1. Sampling dari kategori yang mirip (in-category negative sampling)
+        2. Anti-popularity sampling untuk lebih merata
+        3. Hard negative mining (near-miss examples)
+        
+        OPTIMIZATION: Semua negatives satu user di-draw sekaligus; negatives untuk
+        baris positif ke-i ditempatkan di slot [i * num_negative, (i + 1) * num_negative).
+        """
+        rng = rng if rng is not None else self.rng
+        num_rows = len(self.user_indices)
+        neg_users = np.repeat(np.asarray(self.user_indices, dtype=np.int64), self.num_negative)
+        neg_positions = np.zeros(num_rows * self.num_negative, dtype=np.int64)
+        
+        if self.num_negative <= 0 or num_rows == 0:
+            return neg_users, self.all_items[neg_positions]
+        
+        offsets = np.arange(self.num_negative)
+        for user_idx, rows in self._user_rows.items():
+            slots = (rows[:, None] * self.num_negative + offsets).ravel()
+            neg_positions[slots] = self._sample_user_negatives(user_idx, len(slots), rng)
+        
+        return neg_users, self.all_items[neg_positions].astype(np.int64)
+        
+    def sample_negatives(self, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw satu set negatives baru tanpa mengubah dataset.
+        Dengan seed, sampler memakai RandomState sendiri sehingga aman dipanggil
+        dari background worker selama epoch berjalan.
+        """
+        rng = np.random.RandomState(seed) if seed is not None else self.rng
+        return self._pregenerate_negative_samples(rng)
+    
+    def set_negatives(self, neg_user_indices: np.ndarray, neg_item_indices: np.ndarray):
+        """Ganti negatives dan materialisasi ulang tensor (dipanggil di antara epoch)"""
+        self.neg_user_indices = neg_user_indices
+        self.neg_item_indices = neg_item_indices
+        self.length = len(self.ratings) + len(self.neg_item_indices)
+        self._materialize_tensors()
+    
+    def resample_negatives(self, seed: Optional[int] = None):
+        """Hook resampling per epoch: negatives baru dari distribusi dan bitmap yang sudah di-precompute"""
+        self.set_negatives(*self.sample_negatives(seed))
+    
+    def _materialize_tensors(self):
+        """Gabungkan positives dan negatives ke tiga tensor kontigu (user, item, rating)"""
+        self.all_user_tensor = torch.cat([
+            self.user_indices_tensor,
+            torch.from_numpy(np.ascontiguousarray(self.neg_user_indices, dtype=np.int64))
+        ])
+        self.all_item_tensor = torch.cat([
+            self.item_indices_tensor,
+            torch.from_numpy(np.ascontiguousarray(self.neg_item_indices, dtype=np.int64))
+        ])
+        self.all_rating_tensor = torch.cat([
+            self.ratings_tensor,
+            torch.zeros(len(self.neg_item_indices), dtype=torch.float)
+        ])
+    
+    def num_batches(self, batch_size: int, drop_last: bool = False) -> int:
+        if drop_last:
+            return self.length // batch_size
+        return (self.length + batch_size - 1) // batch_size
+    
+    def iter_batches(self, batch_size: int, shuffle: bool = True, drop_last: bool = False,
+                     device: Optional[torch.device] = None,
+                     generator: Optional[torch.Generator] = None):
+        """
+        OPTIMIZATION: Iterasi per batch dengan slicing tensor, pengganti DataLoader.
+        Data di-shuffle sekali per epoch (satu permutation untuk semua tensor) dan
+        dipindah ke device sekaligus, jadi tidak ada kerja Python per sampel.
+        
+        Yields:
+            Tuple (user_indices, item_indices, ratings) per batch
+        """
+        users, items, ratings = self.all_user_tensor, self.all_item_tensor, self.all_rating_tensor
+        
+        if shuffle:
+            permutation = torch.randperm(self.length, generator=generator)
+            users, items, ratings = users[permutation], items[permutation], ratings[permutation]
+        
+        if device is not None and device.type != 'cpu':
+            users = users.pin_memory().to(device, non_blocking=True)
+            items = items.pin_memory().to(device, non_blocking=True)
+            ratings = ratings.pin_memory().to(device, non_blocking=True)
+        
+        for start in range(0, self.length, batch_size):
+            end = start + batch_size
+            if drop_last and end > self.length:
+                break
+            yield users[start:end], items[start:end], ratings[start:end]
+    
     def __len__(self):
         return self.length
     
     def __getitem__(self, idx):
-        # Positive samples diakses langsung
-        if idx < len(self.ratings):
-            return (
-                self.user_indices_tensor[idx],
-                self.item_indices_tensor[idx], 
-                self.ratings_tensor[idx]
-            )
-        
-        # Negative samples diakses dari list yang sudah digenerate
-        neg_idx = idx - len(self.ratings)
-        if neg_idx < len(self.neg_samples):
-            user_idx, item_idx, rating = self.neg_samples[neg_idx]
+        # Positive dan negative samples diakses dari tensor yang sudah dimaterialisasi
+        if idx < self.length:
             return (
-                torch.tensor(user_idx, dtype=torch.long),
-                torch.tensor(item_idx, dtype=torch.long),
-                torch.tensor(rating, dtype=torch.float)
+                self.all_user_tensor[idx],
+                self.all_item_tensor[idx],
+                self.all_rating_tensor[idx]
             )
         
         # Fallback jika indeks terlalu besar (seharusnya tidak terjadi)
@@ -368,6 +480,55 @@ class CryptoNCFModel(nn.Module):
         # Final prediction
         output = self.output_layer(combined)
         return self.sigmoid(output).view(-1)
+    
+    def build_serving_cache(self) -> Dict[str, torch.Tensor]:
+        """
+        Precompute representasi per-user dan per-item untuk serving (mode eval):
+        - GMF embedding yang sudah dikalikan attention
+        - Layer MLP pertama dipecah jadi bagian user (+bias) dan bagian item
+        
+        Per request hanya tersisa: elemen-wise product GMF, penjumlahan dua proyeksi,
+        sisa layer MLP dan output layer.
+        """
+        embedding_dim = self.user_embedding_gmf.embedding_dim
+        first_linear = self.mlp_layers[0][0]
+        
+        with torch.no_grad():
+            user_gmf = self.user_embedding_gmf.weight
+            item_gmf = self.item_embedding_gmf.weight
+            user_gmf = user_gmf * self.attention(user_gmf)
+            item_gmf = item_gmf * self.attention(item_gmf)
+            
+            # Linear(cat[u, i]) = W_u @ u + W_i @ i + b
+            user_weight = first_linear.weight[:, :embedding_dim]
+            item_weight = first_linear.weight[:, embedding_dim:]
+            user_mlp = self.user_embedding_mlp.weight @ user_weight.T
+            if first_linear.bias is not None:
+                user_mlp = user_mlp + first_linear.bias
+            item_mlp = self.item_embedding_mlp.weight @ item_weight.T
+        
+        return {
+            'user_gmf': user_gmf.detach().clone(),
+            'item_gmf': item_gmf.detach().clone(),
+            'user_mlp': user_mlp.detach().clone(),
+            'item_mlp': item_mlp.detach().clone()
+        }
+    
+    def forward_cached(self, cache: Dict[str, torch.Tensor], user_indices, item_indices):
+        """Forward pass (eval) memakai representasi dari build_serving_cache"""
+        gmf_vector = cache['user_gmf'][user_indices] * cache['item_gmf'][item_indices]
+        
+        mlp_vector = cache['user_mlp'][user_indices] + cache['item_mlp'][item_indices]
+        
+        # Sisa blok pertama (tanpa Linear) lalu layer MLP berikutnya
+        for module in list(self.mlp_layers[0])[1:]:
+            mlp_vector = module(mlp_vector)
+        for layer in self.mlp_layers[1:]:
+            mlp_vector = layer(mlp_vector)
+        
+        combined = torch.cat([gmf_vector, mlp_vector], dim=-1)
+        output = self.output_layer(combined)
+        return self.sigmoid(output).view(-1)
 
 
 class ResidualBlock(nn.Module):
@@ -422,10 +583,14 @@ class NCFRecommender:
         self.item_categories = None
         self.item_popularity = None
         self.item_trend_scores = None
+        self.item_catalog = None
         
         # Cache untuk mempercepat rekomendasi
         self._recommendation_cache = {}
         self._popular_items = None  # Cache for cold-start
+        
+        # Precomputed tower embeddings untuk serving (lihat CryptoNCFModel.build_serving_cache)
+        self._serving_cache = None
     
     def load_data(self, projects_path: Optional[str] = None, interactions_path: Optional[str] = None) -> bool:
         # Use default paths if not specified
@@ -440,49 +605,33 @@ class NCFRecommender:
                 self.projects_df = pd.read_csv(projects_path)
                 logger.info(f"Loaded {len(self.projects_df)} projects from {projects_path}")
                 
+                # OPTIMIZATION: Metadata item dihitung sekali dalam bentuk array
+                self.item_catalog = ItemCatalog(self.projects_df)
+                catalog = self.item_catalog
+                
                 # Extract category information for better sampling
                 self.item_categories = {}
                 if 'primary_category' in self.projects_df.columns:
-                    for _, row in self.projects_df.iterrows():
-                        if 'id' in row:
-                            item_id = row['id']
-                            
-                            # Try to get multiple categories if available
-                            categories = []
-                            if 'categories_list' in row:
-                                # Process categories list
-                                cats = row['categories_list']
-                                if isinstance(cats, list):
-                                    categories = cats
-                                elif isinstance(cats, str) and cats.startswith('[') and cats.endswith(']'):
-                                    try:
-                                        categories = eval(cats)
-                                    except:
-                                        categories = [cats]
-                                else:
-                                    categories = [cats]
-                            elif 'primary_category' in row:
-                                categories = [row['primary_category']]
-                            
-                            self.item_categories[item_id] = categories
+                    self.item_categories = {
+                        item_id: catalog.categories_of(idx)
+                        for idx, item_id in enumerate(catalog.item_ids)
+                    }
                     
                     logger.info(f"Extracted categories for {len(self.item_categories)} items")
                 
                 # Extract popularity for sampling
                 self.item_popularity = {}
-                if 'popularity_score' in self.projects_df.columns:
-                    for _, row in self.projects_df.iterrows():
-                        if 'id' in row and 'popularity_score' in row:
-                            self.item_popularity[row['id']] = row['popularity_score'] / 100  # Normalize to 0-1
+                if catalog.has_popularity:
+                    # Normalize to 0-1
+                    self.item_popularity = dict(zip(catalog.item_ids, (catalog.popularity_score / 100).tolist()))
                     
                     logger.info(f"Extracted popularity scores for {len(self.item_popularity)} items")
                 
                 # Extract trend scores for sampling
                 self.item_trend_scores = {}
-                if 'trend_score' in self.projects_df.columns:
-                    for _, row in self.projects_df.iterrows():
-                        if 'id' in row and 'trend_score' in row:
-                            self.item_trend_scores[row['id']] = row['trend_score'] / 100  # Normalize to 0-1
+                if catalog.has_trend:
+                    # Normalize to 0-1
+                    self.item_trend_scores = dict(zip(catalog.item_ids, (catalog.trend_score / 100).tolist()))
                     
                     logger.info(f"Extracted trend scores for {len(self.item_trend_scores)} items")
                 
@@ -497,19 +646,14 @@ class NCFRecommender:
                 self.interactions_df = pd.read_csv(interactions_path)
                 logger.info(f"Loaded {len(self.interactions_df)} interactions from {interactions_path}")
                 
-                # Create user-item matrix
-                self.user_item_matrix = pd.pivot_table(
-                    self.interactions_df,
-                    values='weight',
-                    index='user_id',
-                    columns='project_id',
-                    fill_value=0
-                )
-                logger.info(f"Created user-item matrix with shape {self.user_item_matrix.shape}")
+                # Create sparse user-item matrix
+                self.user_item_matrix = UserItemMatrix.from_interactions(self.interactions_df)
+                logger.info(f"Created user-item matrix with shape {self.user_item_matrix.shape} "
+                           f"({self.user_item_matrix.matrix.nnz} non-zero)")
                 
                 # Extract unique users and items
-                self.users = self.user_item_matrix.index.tolist()
-                self.items = self.user_item_matrix.columns.tolist()
+                self.users = self.user_item_matrix.users
+                self.items = self.user_item_matrix.items
                 
                 # Fit encoders
                 self.user_encoder.fit(self.users)
@@ -604,33 +748,24 @@ class NCFRecommender:
     
     def _prepare_data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict, Dict, Dict, np.ndarray]:
         """Prepare data for training with enhanced metadata for better sampling"""
-        # Convert interactions to training format
-        interactions = []
-        
         # Determine max rating dynamically
         max_rating = float(self.interactions_df['weight'].max())
         logger.info(f"Detected max rating value: {max_rating}")
         
-        for user in self.users:
-            user_interactions = self.user_item_matrix.loc[user]
-            for item in self.items:
-                rating = user_interactions[item]
-                if rating > 0:  # Only positive interactions
-                    user_idx = self.user_encoder.transform([user])[0]
-                    item_idx = self.item_encoder.transform([item])[0]
-                    # Normalize rating to 0-1 range dynamically
-                    normalized_rating = float(rating) / max_rating
-                    interactions.append((user_idx, item_idx, normalized_rating))
-        
-        # Convert to arrays
-        interaction_array = np.array(interactions)
-        
-        if len(interaction_array) == 0:
+        # Ambil interaksi positif langsung dari CSR (urutan user, lalu item)
+        coo = self.user_item_matrix.matrix.tocoo()
+        positive = coo.data > 0  # Only positive interactions
+        
+        if not positive.any():
             raise ValueError("No interactions found in the data")
         
-        user_indices = interaction_array[:, 0].astype(np.int64)
-        item_indices = interaction_array[:, 1].astype(np.int64)
-        ratings = interaction_array[:, 2].astype(np.float32)
+        matrix_users = np.asarray(self.user_item_matrix.users, dtype=object)
+        matrix_items = np.asarray(self.user_item_matrix.items, dtype=object)
+        
+        user_indices = self.user_encoder.transform(matrix_users[coo.row[positive]]).astype(np.int64)
+        item_indices = self.item_encoder.transform(matrix_items[coo.col[positive]]).astype(np.int64)
+        # Normalize rating to 0-1 range dynamically
+        ratings = (coo.data[positive] / max_rating).astype(np.float32)
         
         # Get all unique items
         all_items = np.array([self.item_encoder.transform([item])[0] for item in self.items])
@@ -847,24 +982,9 @@ class NCFRecommender:
             seed=43  # Different seed for validation
         )
         
-        # Create dataloaders with pin_memory for faster transfer to GPU
-        train_loader = DataLoader(
-            train_dataset, 
-            batch_size=batch_size, 
-            shuffle=True, 
-            num_workers=0,  # No multiprocessing for stability
-            pin_memory=self.use_cuda,
-            drop_last=True  # Drop last batch if not full size
-        )
-        
-        val_loader = DataLoader(
-            val_dataset, 
-            batch_size=batch_size, 
-            shuffle=False, 
-            num_workers=0,
-            pin_memory=self.use_cuda,
-            drop_last=True
-        )
+        # OPTIMIZATION: Batch diambil langsung dari tensor dataset (lihat NCFDataset.iter_batches)
+        # Drop last batch if not full size
+        num_train_batches = train_dataset.num_batches(batch_size, drop_last=True)
         
         # Initialize model with improved architecture
         num_users = len(self.user_encoder.classes_)
@@ -894,7 +1014,7 @@ class NCFRecommender:
         )
         
         # Learning rate scheduler with warm-up and cosine annealing
-        total_steps = len(train_loader) * num_epochs
+        total_steps = num_train_batches * num_epochs
         warmup_steps = int(total_steps * 0.1)  # 10% of steps for warm-up
         
         def lr_lambda(step):
@@ -920,69 +1040,42 @@ class NCFRecommender:
         consecutive_no_improvement = 0  # Counter for epochs without improvement
         max_consecutive_no_improvement = kwargs.get('patience', self.params.get('patience', 7))  # Max consecutive epochs without improvement
 
+        # Fresh negatives per epoch (opsional), bisa disiapkan di background worker
+        resample_negatives = kwargs.get('resample_negatives', self.params.get('resample_negatives', False))
+        background_resampling = kwargs.get('background_resampling', self.params.get('background_resampling', False))
+        resample_executor = None
+        resample_future = None
+        if resample_negatives and background_resampling and num_epochs > 1:
+            resample_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ncf-resample")
+        
         logger.info(f"Starting training for {num_epochs} epochs with patience {patience}")
         
-        for epoch in range(1, num_epochs + 1):
-            epoch_start_time = time.time()
-            
-            # Training
-            self.model.train()
-            train_loss = 0
-            train_batches = 0
-            
-            for batch_idx, (user_indices, item_indices, ratings) in enumerate(train_loader):
-                try:
-                    # Shape validation
-                    if user_indices.dim() > 1 and user_indices.size(1) == 1:
-                        user_indices = user_indices.squeeze(1)
-                    if item_indices.dim() > 1 and item_indices.size(1) == 1:
-                        item_indices = item_indices.squeeze(1)
-                    if ratings.dim() > 1 and ratings.size(1) == 1:
-                        ratings = ratings.squeeze(1)
-                    
-                    # Skip batch if size = 1 (to avoid batch norm issues)
-                    if user_indices.size(0) <= 1:
-                        continue
-                    
-                    # Move to device
-                    user_indices = user_indices.to(self.device)
-                    item_indices = item_indices.to(self.device)
-                    ratings = ratings.to(self.device)
-                    
-                    # Forward pass
-                    outputs = self.model(user_indices, item_indices)
-                    loss = criterion(outputs, ratings)
-                    
-                    # Backward pass and optimize
-                    optimizer.zero_grad()
-                    loss.backward()
-                    
-                    # Clip gradients to prevent explosion
-                    torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
-                    
-                    optimizer.step()
-                    scheduler.step()  # Update learning rate
-                    
-                    train_loss += loss.item()
-                    train_batches += 1
-                    
-                    if batch_idx % 10 == 0:
-                        logger.debug(f"Epoch {epoch}, Batch {batch_idx}: Loss {loss.item():.4f}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error in training batch {batch_idx}: {e}")
-                    continue
+        try:
+            for epoch in range(1, num_epochs + 1):
+                epoch_start_time = time.time()
             
-            avg_train_loss = train_loss / max(train_batches, 1)
-            train_losses.append(avg_train_loss)
+                if resample_negatives:
+                    if epoch > 1:
+                        if resample_future is not None:
+                            train_dataset.set_negatives(*resample_future.result())
+                        else:
+                            train_dataset.resample_negatives(seed=42 + epoch)
+                        logger.debug(f"Resampled {len(train_dataset.neg_item_indices)} negatives for epoch {epoch}")
+                
+                    # Siapkan negatives epoch berikutnya selagi epoch ini berjalan
+                    resample_future = None
+                    if resample_executor is not None and epoch < num_epochs:
+                        resample_future = resample_executor.submit(train_dataset.sample_negatives, 42 + epoch + 1)
             
-            # Validation
-            self.model.eval()
-            val_loss = 0
-            val_batches = 0
+                # Training
+                self.model.train()
+                train_loss = 0
+                train_batches = 0
             
-            with torch.no_grad():
-                for batch_idx, (user_indices, item_indices, ratings) in enumerate(val_loader):
+                train_batches_iter = train_dataset.iter_batches(
+                    batch_size, shuffle=True, drop_last=True, device=self.device
+                )
+                for batch_idx, (user_indices, item_indices, ratings) in enumerate(train_batches_iter):
                     try:
                         # Shape validation
                         if user_indices.dim() > 1 and user_indices.size(1) == 1:
@@ -991,76 +1084,135 @@ class NCFRecommender:
                             item_indices = item_indices.squeeze(1)
                         if ratings.dim() > 1 and ratings.size(1) == 1:
                             ratings = ratings.squeeze(1)
-                        
-                        # Skip small batches
+                    
+                        # Skip batch if size = 1 (to avoid batch norm issues)
                         if user_indices.size(0) <= 1:
                             continue
-                        
+                    
                         # Move to device
                         user_indices = user_indices.to(self.device)
                         item_indices = item_indices.to(self.device)
                         ratings = ratings.to(self.device)
-                        
+                    
                         # Forward pass
                         outputs = self.model(user_indices, item_indices)
                         loss = criterion(outputs, ratings)
-                        
-                        val_loss += loss.item()
-                        val_batches += 1
+                    
+                        # Backward pass and optimize
+                        optimizer.zero_grad()
+                        loss.backward()
+                    
+                        # Clip gradients to prevent explosion
+                        torch.nn.utils.clip_grad_norm_(self.model.parameters(), max_norm=1.0)
+                    
+                        optimizer.step()
+                        scheduler.step()  # Update learning rate
+                    
+                        train_loss += loss.item()
+                        train_batches += 1
+                    
+                        if batch_idx % 10 == 0:
+                            logger.debug(f"Epoch {epoch}, Batch {batch_idx}: Loss {loss.item():.4f}")
                         
                     except Exception as e:
-                        logger.warning(f"Error in validation batch {batch_idx}: {e}")
+                        logger.warning(f"Error in training batch {batch_idx}: {e}")
                         continue
             
-            avg_val_loss = val_loss / max(val_batches, 1)
-            val_losses.append(avg_val_loss)
-            
-            # Get current learning rate
-            current_lr = optimizer.param_groups[0]['lr']
-            
-            # Early stopping with improvement threshold
-            if avg_val_loss < best_val_loss * (1 - improvement_threshold):
-                # Significant improvement
-                improvement_percent = 100 * (best_val_loss - avg_val_loss) / best_val_loss
-                best_val_loss = avg_val_loss
-                patience_counter = 0
-                consecutive_no_improvement = 0
-                # Save best model state
-                best_model_state = copy.deepcopy(self.model.state_dict())
-                logger.info(f"New best validation loss: {best_val_loss:.4f} (improved by {improvement_percent:.2f}%)")
-            else:
-                patience_counter += 1
-                consecutive_no_improvement += 1
-                logger.info(f"Validation loss did not improve significantly. Patience: {patience_counter}/{patience}")
-                
-                # If small improvement but not significant, still track as best
-                if avg_val_loss < best_val_loss:
-                    consecutive_no_improvement = 0
-                    logger.info(f"Small improvement detected: {best_val_loss:.4f} -> {avg_val_loss:.4f}")
-                    best_val_loss = avg_val_loss
+                avg_train_loss = train_loss / max(train_batches, 1)
+                train_losses.append(avg_train_loss)
+            
+                # Validation
+                self.model.eval()
+                val_loss = 0
+                val_batches = 0
+            
+                with torch.no_grad():
+                    val_batches_iter = val_dataset.iter_batches(
+                        batch_size, shuffle=False, drop_last=True, device=self.device
+                    )
+                    for batch_idx, (user_indices, item_indices, ratings) in enumerate(val_batches_iter):
+                        try:
+                            # Shape validation
+                            if user_indices.dim() > 1 and user_indices.size(1) == 1:
+                                user_indices = user_indices.squeeze(1)
+                            if item_indices.dim() > 1 and item_indices.size(1) == 1:
+                                item_indices = item_indices.squeeze(1)
+                            if ratings.dim() > 1 and ratings.size(1) == 1:
+                                ratings = ratings.squeeze(1)
+                        
+                            # Skip small batches
+                            if user_indices.size(0) <= 1:
+                                continue
+                        
+                            # Move to device
+                            user_indices = user_indices.to(self.device)
+                            item_indices = item_indices.to(self.device)
+                            ratings = ratings.to(self.device)
+                        
+                            # Forward pass
+                            outputs = self.model(user_indices, item_indices)
+                            loss = criterion(outputs, ratings)
+                        
+                            val_loss += loss.item()
+                            val_batches += 1
+                        
+                        except Exception as e:
+                            logger.warning(f"Error in validation batch {batch_idx}: {e}")
+                            continue
             
-            # Log progress
-            epoch_time = time.time() - epoch_start_time
-            logger.info(f"Epoch {epoch}/{num_epochs} - "
-                    f"Train Loss: {avg_train_loss:.4f}, "
-                    f"Val Loss: {avg_val_loss:.4f}, "
-                    f"Time: {epoch_time:.2f}s, "
-                    f"LR: {current_lr:.6f}")
-            
-            # Check early stopping criteria
-            if patience_counter >= patience or consecutive_no_improvement >= max_consecutive_no_improvement:
-                if patience_counter >= patience:
-                    logger.info(f"Early stopping triggered after {epoch} epochs (patience exceeded)")
+                avg_val_loss = val_loss / max(val_batches, 1)
+                val_losses.append(avg_val_loss)
+            
+                # Get current learning rate
+                current_lr = optimizer.param_groups[0]['lr']
+            
+                # Early stopping with improvement threshold
+                if avg_val_loss < best_val_loss * (1 - improvement_threshold):
+                    # Significant improvement
+                    improvement_percent = 100 * (best_val_loss - avg_val_loss) / best_val_loss
+                    best_val_loss = avg_val_loss
+                    patience_counter = 0
+                    consecutive_no_improvement = 0
+                    # Save best model state
+                    best_model_state = copy.deepcopy(self.model.state_dict())
+                    logger.info(f"New best validation loss: {best_val_loss:.4f} (improved by {improvement_percent:.2f}%)")
                 else:
-                    logger.info(f"Early stopping triggered after {epoch} epochs (no significant improvement for {max_consecutive_no_improvement} epochs)")
-                break
+                    patience_counter += 1
+                    consecutive_no_improvement += 1
+                    logger.info(f"Validation loss did not improve significantly. Patience: {patience_counter}/{patience}")
+                
+                    # If small improvement but not significant, still track as best
+                    if avg_val_loss < best_val_loss:
+                        consecutive_no_improvement = 0
+                        logger.info(f"Small improvement detected: {best_val_loss:.4f} -> {avg_val_loss:.4f}")
+                        best_val_loss = avg_val_loss
+            
+                # Log progress
+                epoch_time = time.time() - epoch_start_time
+                logger.info(f"Epoch {epoch}/{num_epochs} - "
+                        f"Train Loss: {avg_train_loss:.4f}, "
+                        f"Val Loss: {avg_val_loss:.4f}, "
+                        f"Time: {epoch_time:.2f}s, "
+                        f"LR: {current_lr:.6f}")
+            
+                # Check early stopping criteria
+                if patience_counter >= patience or consecutive_no_improvement >= max_consecutive_no_improvement:
+                    if patience_counter >= patience:
+                        logger.info(f"Early stopping triggered after {epoch} epochs (patience exceeded)")
+                    else:
+                        logger.info(f"Early stopping triggered after {epoch} epochs (no significant improvement for {max_consecutive_no_improvement} epochs)")
+                    break
             
-            # Learning rate reduction if loss plateaus
-            if epoch > 5 and avg_train_loss > 0.9 * train_losses[-2]:
-                new_lr = current_lr * 0.5
-                for param_group in optimizer.param_groups:
-                    param_group['lr'] = new_lr
-                logger.info(f"Learning rate reduced to {new_lr:.6f} due to plateauing loss")
+                # Learning rate reduction if loss plateaus
+                if epoch > 5 and avg_train_loss > 0.9 * train_losses[-2]:
+                    new_lr = current_lr * 0.5
+                    for param_group in optimizer.param_groups:
+                        param_group['lr'] = new_lr
+                    logger.info(f"Learning rate reduced to {new_lr:.6f} due to plateauing loss")
+        finally:
+            # Worker resampling dihentikan juga saat training gagal di tengah epoch
+            if resample_executor is not None:
+                resample_executor.shutdown(wait=False, cancel_futures=True)
         
         # Restore best model if we did early stopping
         if best_model_state is not None and (patience_counter >= patience or consecutive_no_improvement >= max_consecutive_no_improvement):
@@ -1073,6 +1225,9 @@ class NCFRecommender:
         # Calculate validation metrics for performance comparison
         validation_metrics = self._calculate_validation_metrics(val_dataset)
         
+        # Precompute serving cache dari bobot final
+        self._build_serving_cache()
+        
         # Save model if requested
         if save_model:
             model_path = os.path.join(MODELS_DIR, "ncf_model.pkl")
@@ -1185,6 +1340,7 @@ class NCFRecommender:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         # Save model
+        saved_at = datetime.now().isoformat()
         model_state = {
             'model_state_dict': self.model.state_dict(),
             'user_encoder': self.user_encoder,
@@ -1196,15 +1352,98 @@ class NCFRecommender:
                 'layers': self.params['layers'],
                 'dropout': self.params['dropout']
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': saved_at
         }
         
+        # ⚡ OPTIMIZATION: Bobot dan serving cache ke .npy (mmap read-only saat load),
+        # semua worker API berbagi satu salinan fisik lewat page cache
+        split_arrays = MODEL_ARTIFACTS_CONFIG.get('split_arrays', True)
+        if split_arrays:
+            arrays = {
+                f"weights.{name}": tensor.detach().cpu().numpy()
+                for name, tensor in model_state['model_state_dict'].items()
+            }
+            if self._serving_cache is not None:
+                arrays.update({
+                    f"serving.{name}": tensor.detach().cpu().numpy()
+                    for name, tensor in self._serving_cache.items()
+                })
+            save_arrays(array_dir(filepath), arrays, saved_at)
+            model_state['model_state_dict'] = None
+            model_state['array_artifacts'] = os.path.basename(array_dir(filepath))
+        
         with open(filepath, 'wb') as f:
             pickle.dump(model_state, f)
             
         logger.info(f"Model saved to {filepath}")
+        
+        # Simpan serving cache di samping file model (format pickle)
+        if self._serving_cache is not None and not split_arrays:
+            self._save_serving_cache(self._serving_cache_path(filepath), saved_at)
+        
         return filepath
     
+    @staticmethod
+    def _serving_cache_path(model_path: str) -> str:
+        """Path serving cache untuk file model (mis. ncf_model.pkl -> ncf_model_serving.pkl)"""
+        return f"{os.path.splitext(model_path)[0]}_serving.pkl"
+    
+    def _build_serving_cache(self):
+        """Precompute representasi tower user/item dari model saat ini"""
+        if self.model is None or not self.params.get('serving_cache', True):
+            self._serving_cache = None
+            return
+        
+        self.model.eval()
+        self._serving_cache = self.model.build_serving_cache()
+        logger.info(f"Built NCF serving cache for {self._serving_cache['user_gmf'].shape[0]} users "
+                   f"and {self._serving_cache['item_gmf'].shape[0]} items")
+    
+    def _save_serving_cache(self, filepath: str, model_timestamp: str):
+        cache_state = {
+            'model_timestamp': model_timestamp,
+            'tensors': {name: tensor.cpu().numpy() for name, tensor in self._serving_cache.items()}
+        }
+        with open(filepath, 'wb') as f:
+            pickle.dump(cache_state, f)
+        logger.info(f"Serving cache saved to {filepath}")
+    
+    def _load_serving_cache(self, filepath: str, model_timestamp: Optional[str]) -> bool:
+        """Load serving cache; ditolak jika bukan milik model yang sama"""
+        if not os.path.exists(filepath):
+            return False
+        
+        try:
+            with open(filepath, 'rb') as f:
+                cache_state = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Error loading serving cache {filepath}: {e}")
+            return False
+        
+        if model_timestamp is None or cache_state.get('model_timestamp') != model_timestamp:
+            logger.warning(f"Serving cache {filepath} does not match the loaded model, rebuilding")
+            return False
+        
+        self._serving_cache = {
+            name: torch.from_numpy(array).to(self.device)
+            for name, array in cache_state['tensors'].items()
+        }
+        logger.info(f"Serving cache loaded from {filepath}")
+        return True
+    
+    def _shared_tensor(self, array: np.ndarray) -> torch.Tensor:
+        """Tensor di atas array mmap tanpa copy (CPU); device lain tetap butuh salinan"""
+        with warnings.catch_warnings():
+            # Array mmap read-only: aman karena bobot hanya dibaca saat inference
+            warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+            return torch.from_numpy(array).to(self.device)
+    
+    def _predict_pairs(self, user_tensor: torch.Tensor, item_tensor: torch.Tensor) -> torch.Tensor:
+        """Skor pasangan (user, item) dalam mode eval, lewat serving cache jika tersedia"""
+        if self._serving_cache is not None:
+            return self.model.forward_cached(self._serving_cache, user_tensor, item_tensor)
+        return self.model(user_tensor, item_tensor)
+    
     def load_model(self, filepath: str) -> bool:
         try:
             logger.info(f"Loading NCF model from {filepath}")
@@ -1221,6 +1460,21 @@ class NCFRecommender:
                 
             # Extract components
             state_dict = model_state.get('model_state_dict')
+            serving_arrays = None
+            if model_state.get('array_artifacts'):
+                arrays = load_arrays(array_dir(filepath), model_state.get('timestamp'))
+                if arrays is None:
+                    logger.error(f"NCF model arrays not found for {filepath}")
+                    return False
+                state_dict = {
+                    name[len("weights."):]: self._shared_tensor(array)
+                    for name, array in arrays.items() if name.startswith("weights.")
+                }
+                serving_arrays = {
+                    name[len("serving."):]: array
+                    for name, array in arrays.items() if name.startswith("serving.")
+                }
+            
             if state_dict is None:
                 logger.error("No 'model_state_dict' key in loaded NCF model")
                 return False
@@ -1245,15 +1499,19 @@ class NCFRecommender:
                     dropout=config['dropout']
                 ).to(self.device)
                 
+                # Bobot mmap di CPU dipasang langsung (assign) supaya parameter berbagi memori
+                # dengan file .npy, bukan di-copy ke tensor parameter milik proses ini
+                assign = serving_arrays is not None and self.device.type == 'cpu'
+                
                 # Try to load state dict - may need adjusting if architecture changed
                 try:
-                    self.model.load_state_dict(state_dict)
+                    self.model.load_state_dict(state_dict, assign=assign)
                 except Exception as e:
                     logger.warning(f"Error loading state dict with CryptoNCFModel: {e}")
                     logger.warning("Loading with strict=False to accommodate architecture differences")
                     
                     # Try loading with strict=False
-                    self.model.load_state_dict(state_dict, strict=False)
+                    self.model.load_state_dict(state_dict, strict=False, assign=assign)
                     logger.info("Model loaded with architecture accommodations")
             except Exception as e:
                 logger.error(f"Error creating model with enhanced architecture: {e}")
@@ -1262,6 +1520,17 @@ class NCFRecommender:
             # Set model to evaluation mode
             self.model.eval()
             
+            # Serving cache: pakai file di samping model jika cocok, kalau tidak precompute ulang
+            self._serving_cache = None
+            if self.params.get('serving_cache', True):
+                if serving_arrays:
+                    self._serving_cache = {
+                        name: self._shared_tensor(array) for name, array in serving_arrays.items()
+                    }
+                    logger.info(f"Serving cache mapped from {array_dir(filepath)}")
+                elif not self._load_serving_cache(self._serving_cache_path(filepath), model_state.get('timestamp')):
+                    self._build_serving_cache()
+            
             # Precompute popular items if not already done
             if self._popular_items is None:
                 self._precompute_popular_items()
@@ -1302,7 +1571,7 @@ class NCFRecommender:
         # Make prediction
         self.model.eval()
         with torch.no_grad():
-            prediction = self.model(user_tensor, item_tensor).item()
+            prediction = self._predict_pairs(user_tensor, item_tensor).item()
         
         return prediction
     
@@ -1338,46 +1607,7 @@ class NCFRecommender:
         # Get known items to exclude
         known_items = set()
         if exclude_known and self.user_item_matrix is not None:
-            if user_id in self.user_item_matrix.index:
-                user_interactions = self.user_item_matrix.loc[user_id]
-                known_items = set(user_interactions[user_interactions > 0].index)
-
-        # Get metadata untuk diversity tracking
-        category_counts = {}
-        item_to_category = {}
-        item_to_chain = {}
-        item_to_trend = {}
-
-        try:
-            if self.projects_df is not None:
-                if 'primary_category' in self.projects_df.columns:
-                    for _, row in self.projects_df.iterrows():
-                        if 'id' in row:
-                            item_id = row['id']
-                            
-                            categories = []
-                            if 'categories_list' in row:
-                                cats = row['categories_list']
-                                if isinstance(cats, list):
-                                    categories = cats
-                                elif isinstance(cats, str) and cats.startswith('[') and cats.endswith(']'):
-                                    try:
-                                        categories = eval(cats)
-                                    except:
-                                        categories = [cats]
-                                else:
-                                    categories = [cats]
-                            elif 'primary_category' in row:
-                                categories = [row['primary_category']]
-                            
-                            item_to_category[item_id] = categories
-                
-                if 'chain' in self.projects_df.columns:
-                    item_to_chain = dict(zip(self.projects_df['id'], self.projects_df['chain']))
-                if 'trend_score' in self.projects_df.columns:
-                    item_to_trend = dict(zip(self.projects_df['id'], self.projects_df['trend_score']))
-        except Exception as e:
-            logger.warning(f"Error getting item metadata: {str(e)}")
+            known_items = set(self.user_item_matrix.known_items(user_id))
 
         # Get potential items to recommend
         candidate_items = [item for item in self.items if item not in known_items]
@@ -1404,7 +1634,7 @@ class NCFRecommender:
                 
                 self.model.eval()
                 with torch.no_grad():
-                    batch_predictions = self.model(batch_user_tensor, item_tensor).cpu().numpy()
+                    batch_predictions = self._predict_pairs(batch_user_tensor, item_tensor).cpu().numpy()
                     
                     # PERBAIKAN: Clip dan validate predictions
                     batch_predictions = np.clip(batch_predictions, 0.0, 1.0)
@@ -1420,6 +1650,146 @@ class NCFRecommender:
                 logger.warning(f"Error in batch prediction: {e}")
                 continue
 
+        valid_predictions = self._rank_predictions(predictions, n, known_items)
+        
+        # Store in cache
+        self._recommendation_cache[cache_key] = (time.time(), valid_predictions)
+        
+        return valid_predictions
+    
+    def recommend_for_users(self, user_ids: List[str], n: int = 10,
+                            exclude_known: bool = True,
+                            max_batch_pairs: Optional[int] = None) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Batch inference: skor blok user terhadap semua item dalam satu forward pass,
+        lalu masking known items dan top-k dilakukan dalam tensor.
+        
+        Hasil per user sama dengan recommend_for_user (fallback + diversity) dan
+        disimpan ke cache yang sama, sehingga bisa dipakai untuk evaluasi,
+        cache warm-up dan precompute massal.
+        
+        Args:
+            user_ids: Daftar user ID
+            n: Jumlah rekomendasi per user
+            exclude_known: Exclude item yang sudah diinteraksi
+            max_batch_pairs: Maks pasangan (user, item) per forward pass
+            
+        Returns:
+            Dict user_id -> list (item_id, score)
+        """
+        results = {}
+        pending = []
+        now = time.time()
+        
+        for user_id in dict.fromkeys(user_ids):
+            cache_key = f"{user_id}_{n}_{exclude_known}"
+            if cache_key in self._recommendation_cache:
+                cache_time, cache_results = self._recommendation_cache[cache_key]
+                if now - cache_time < 3600:
+                    results[user_id] = cache_results
+                    continue
+            pending.append(user_id)
+        
+        if not pending:
+            return results
+        
+        if self.model is None:
+            logger.error("Model not trained or loaded")
+            for user_id in pending:
+                results[user_id] = []
+            return results
+        
+        # User baru tidak punya embedding - langsung cold-start
+        known_users = set(self.users)
+        warm_users = [user_id for user_id in pending if user_id in known_users]
+        for user_id in pending:
+            if user_id not in known_users:
+                results[user_id] = self._get_cold_start_recommendations(n)
+        
+        if not warm_users:
+            return results
+        
+        item_ids = self.item_encoder.classes_
+        num_items = len(item_ids)
+        k = min(num_items, n * 3)
+        
+        max_batch_pairs = max_batch_pairs or self.params.get('inference_batch_pairs', 262144)
+        users_per_block = max(1, max_batch_pairs // max(num_items, 1))
+        
+        # Mapping kolom user_item_matrix -> index item di encoder (untuk masking known items)
+        matrix = None
+        column_to_item_idx = None
+        if exclude_known and self.user_item_matrix is not None:
+            matrix = self.user_item_matrix
+            item_to_idx = {item_id: idx for idx, item_id in enumerate(item_ids.tolist())}
+            column_to_item_idx = np.array([item_to_idx.get(item_id, -1) for item_id in matrix.items],
+                                          dtype=np.int64)
+        
+        all_items_tensor = torch.arange(num_items, dtype=torch.long, device=self.device)
+        self.model.eval()
+        
+        for start in range(0, len(warm_users), users_per_block):
+            block_users = warm_users[start:start + users_per_block]
+            block_size = len(block_users)
+            
+            user_indices = self.user_encoder.transform(block_users)
+            user_tensor = torch.as_tensor(user_indices, dtype=torch.long, device=self.device)
+            
+            with torch.no_grad():
+                scores = self._predict_pairs(
+                    user_tensor.repeat_interleave(num_items),
+                    all_items_tensor.repeat(block_size)
+                ).view(block_size, num_items)
+                
+                # PERBAIKAN: Clip dan validate predictions
+                scores = torch.nan_to_num(scores, nan=0.0, posinf=1.0, neginf=0.0).clamp_(0.0, 1.0)
+                
+                # Mask known items dengan -1 agar tidak pernah masuk top-k
+                if matrix is not None:
+                    rows, cols = [], []
+                    for row, user_id in enumerate(block_users):
+                        columns, _ = matrix.user_row(user_id)
+                        item_idx = column_to_item_idx[columns]
+                        item_idx = item_idx[item_idx >= 0]
+                        rows.append(np.full(len(item_idx), row, dtype=np.int64))
+                        cols.append(item_idx)
+                    rows = np.concatenate(rows)
+                    cols = np.concatenate(cols).astype(np.int64)
+                    if len(rows):
+                        scores[torch.from_numpy(rows).to(self.device),
+                               torch.from_numpy(cols).to(self.device)] = -1.0
+                
+                top_scores, top_indices = torch.topk(scores, k, dim=1)
+            
+            top_scores = top_scores.cpu().numpy()
+            top_indices = top_indices.cpu().numpy()
+            
+            for row, user_id in enumerate(block_users):
+                valid = top_scores[row] >= 0
+                predictions = list(zip(item_ids[top_indices[row][valid]].tolist(),
+                                       top_scores[row][valid].astype(float).tolist()))
+                
+                if not predictions:
+                    results[user_id] = []
+                    continue
+                
+                known_items = set(matrix.known_items(user_id)) if matrix is not None else set()
+                user_recs = self._rank_predictions(predictions, n, known_items)
+                
+                self._recommendation_cache[f"{user_id}_{n}_{exclude_known}"] = (time.time(), user_recs)
+                results[user_id] = user_recs
+        
+        logger.info(f"Batch inference selesai untuk {len(warm_users)} users "
+                   f"({len(pending) - len(warm_users)} cold-start)")
+        
+        return results
+    
+    def _rank_predictions(self, predictions: List[Tuple[str, float]], n: int,
+                          known_items: set) -> List[Tuple[str, float]]:
+        """
+        Fallback, sorting dan diversity re-ranking atas prediksi (item_id, score).
+        Dipakai bersama oleh recommend_for_user dan recommend_for_users.
+        """
         # PERBAIKAN: Fallback jika predictions terlalu sedikit
         if len(predictions) < n and self.projects_df is not None:
             fallback_recs = self._get_fallback_recommendations(n, exclude_ids=known_items)
@@ -1445,80 +1815,76 @@ class NCFRecommender:
         valid_predictions.sort(key=lambda x: x[1], reverse=True)
 
         if len(valid_predictions) <= n:
-            # Store in cache
-            self._recommendation_cache[cache_key] = (time.time(), valid_predictions)
             return valid_predictions
 
         # Take more candidates for better diversity
         top_candidates = valid_predictions[:min(len(valid_predictions), n*3)]
 
+        # Metadata diversity dari ItemCatalog (dihitung sekali di load_data)
+        catalog = self.item_catalog
+        if catalog is None and self.projects_df is not None:
+            catalog = self.item_catalog = ItemCatalog(self.projects_df)
+        use_category_diversity = (
+            catalog is not None and 'primary_category' in self.projects_df.columns
+        )
+
         # PERBAIKAN: Enhanced diversity dengan score validation
-        if item_to_category:
+        if use_category_diversity:
+            # OPTIMIZATION: Kategori/chain sebagai kode integer dan counter berupa array
+            candidate_idx = catalog.indices([item_id for item_id, _ in top_candidates])
+            candidate_scores = np.array([score for _, score in top_candidates], dtype=np.float64)
+            
+            category_counts = np.zeros(len(catalog.category_names), dtype=np.int64)
+            chain_counts = np.zeros(len(catalog.chain_names), dtype=np.int64)
+            
+            def track(catalog_idx: int):
+                if catalog_idx < 0:
+                    return
+                np.add.at(category_counts, catalog.category_codes_of(catalog_idx), 1)
+                if catalog.has_chain:
+                    chain_counts[catalog.chain_codes[catalog_idx]] += 1
+            
             # Select top items unconditionally (25% by pure score)
             top_count = max(n // 4, 1)
             result = top_candidates[:top_count]
-            
-            # Track selected categories and chains
-            selected_categories = {}
-            selected_chains = {}
-            
-            for item_id, _ in result:
-                if item_id in item_to_category:
-                    categories = item_to_category[item_id]
-                    for category in categories:
-                        selected_categories[category] = selected_categories.get(category, 0) + 1
-                
-                if item_id in item_to_chain:
-                    chain = item_to_chain[item_id]
-                    selected_chains[chain] = selected_chains.get(chain, 0) + 1
+            for catalog_idx in candidate_idx[:top_count]:
+                track(catalog_idx)
 
             # Diversity limits
             max_per_category = max(1, int(n * 0.25))
             max_per_chain = max(2, int(n * 0.4))
             
-            # Remaining candidates
-            remaining = top_candidates[top_count:]
+            # Remaining candidates (posisi di top_candidates)
+            remaining = list(range(top_count, len(top_candidates)))
             
             # Apply diversity balancing
             while len(result) < n and remaining:
                 best_score = -float('inf')
                 best_idx = -1
                 
-                for idx, (item_id, score) in enumerate(remaining):
-                    adjusted_score = score
-                    
-                    # Category diversity adjustments
-                    if item_id in item_to_category:
-                        categories = item_to_category[item_id]
-                        
-                        category_penalty = 0
-                        for category in categories:
-                            cat_count = selected_categories.get(category, 0)
-                            if cat_count >= max_per_category:
-                                category_penalty -= 0.2
-                                break
-                        
-                        category_bonus = 0
-                        for category in categories:
-                            if category not in selected_categories:
-                                category_bonus += 0.1
-                                break
+                for idx, candidate_pos in enumerate(remaining):
+                    adjusted_score = candidate_scores[candidate_pos]
+                    catalog_idx = candidate_idx[candidate_pos]
+                    
+                    if catalog_idx >= 0:
+                        # Category diversity adjustments
+                        counts = category_counts[catalog.category_codes_of(catalog_idx)]
+                        if counts.size:
+                            if (counts >= max_per_category).any():
+                                adjusted_score -= 0.2
+                            if (counts == 0).any():
+                                adjusted_score += 0.1
                         
-                        adjusted_score += category_penalty + category_bonus
-                    
-                    # Chain diversity
-                    if item_id in item_to_chain:
-                        chain = item_to_chain[item_id]
-                        chain_count = selected_chains.get(chain, 0)
+                        # Chain diversity
+                        if catalog.has_chain:
+                            chain_count = chain_counts[catalog.chain_codes[catalog_idx]]
+                            if chain_count >= max_per_chain:
+                                adjusted_score -= 0.15
+                            elif chain_count == 0:
+                                adjusted_score += 0.05
                         
-                        if chain_count >= max_per_chain:
-                            adjusted_score -= 0.15
-                        elif chain_count == 0:
-                            adjusted_score += 0.05
-                    
-                    # Trend boost
-                    if item_id in item_to_trend:
-                        trend_score = item_to_trend[item_id]
+                        # Trend boost
+                        trend_score = catalog.trend_score[catalog_idx]
                         if trend_score > 80:
                             adjusted_score += 0.15
                         elif trend_score > 65:
@@ -1532,21 +1898,15 @@ class NCFRecommender:
                         best_idx = idx
                 
                 if best_idx >= 0:
-                    item_id, original_score = remaining.pop(best_idx)
+                    candidate_pos = remaining.pop(best_idx)
+                    item_id, original_score = top_candidates[candidate_pos]
                     
                     # PERBAIKAN: Use original score, not adjusted
                     clean_score = float(np.clip(original_score, 0.0, 1.0))
                     result.append((item_id, clean_score))
                     
                     # Update tracking
-                    if item_id in item_to_category:
-                        categories = item_to_category[item_id]
-                        for category in categories:
-                            selected_categories[category] = selected_categories.get(category, 0) + 1
-                    
-                    if item_id in item_to_chain:
-                        chain = item_to_chain[item_id]
-                        selected_chains[chain] = selected_chains.get(chain, 0) + 1
+                    track(candidate_idx[candidate_pos])
                 else:
                     break
             
@@ -1559,9 +1919,6 @@ class NCFRecommender:
             
             final_result.sort(key=lambda x: x[1], reverse=True)
             
-            # Store in cache
-            self._recommendation_cache[cache_key] = (time.time(), final_result)
-            
             return final_result[:n]
 
         # PERBAIKAN: Jika tidak ada category data, return validated top candidates
@@ -1573,9 +1930,6 @@ class NCFRecommender:
         
         validated_top.sort(key=lambda x: x[1], reverse=True)
         
-        # Store in cache
-        self._recommendation_cache[cache_key] = (time.time(), validated_top)
-        
         return validated_top
     
     def _get_fallback_recommendations(self, n: int, exclude_ids: set = None) -> List[Tuple[str, float]]:
@@ -1679,12 +2033,13 @@ class NCFRecommender:
         validated_fallback.sort(key=lambda x: x[1], reverse=True)
         return validated_fallback
     
-    def recommend_projects(self, user_id: str, n: int = 10) -> List[Dict[str, Any]]:
+    def recommend_projects(self, user_id: str, n: int = 10,
+                           precomputed: Optional[List[Tuple[str, float]]] = None) -> List[Dict[str, Any]]:
         """
         Get recommendations as project dictionaries with all available fields
         """
-        # Get recommendations as (project_id, score) tuples
-        recommendations = self.recommend_for_user(user_id, n)
+        # Get recommendations as (project_id, score) tuples (precomputed: dari materialized store)
+        recommendations = precomputed if precomputed is not None else self.recommend_for_user(user_id, n)
         
         # Convert to detailed project dictionaries
         detailed_recommendations = []
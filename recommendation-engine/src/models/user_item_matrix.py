@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+from typing import Any, List, Optional, Tuple
+
+from scipy.sparse import csr_matrix
+
+
+class UserItemMatrix:
+    """
+    User-item interaction matrix berbasis scipy.sparse.csr_matrix dengan
+    mapping id <-> index, pengganti pivot table pandas yang dense.
+
+    Urutan user dan item sama dengan pd.pivot_table (keduanya di-sort),
+    sehingga index posisi tetap kompatibel dengan mapping model yang sudah ada.
+    Akses baris user O(nnz baris), bukan O(jumlah item).
+    """
+
+    def __init__(self, matrix: csr_matrix, users: List[Any], items: List[Any]):
+        self.matrix = csr_matrix(matrix, dtype=np.float64)
+        self.matrix.eliminate_zeros()
+        self.matrix.sort_indices()
+
+        # Index pandas agar kode lama (`user_id in m.index`, `m.columns`) tetap jalan
+        self.index = pd.Index(users)
+        self.columns = pd.Index(items)
+
+        self.user_to_index = {user: idx for idx, user in enumerate(users)}
+        self.item_to_index = {item: idx for idx, item in enumerate(items)}
+
+    @classmethod
+    def from_interactions(cls, interactions_df: pd.DataFrame,
+                          user_col: str = 'user_id',
+                          item_col: str = 'project_id',
+                          value_col: str = 'weight') -> 'UserItemMatrix':
+        """Bangun matrix dari interactions DataFrame (agregasi mean seperti pivot_table)"""
+        grouped = interactions_df.groupby([user_col, item_col], sort=False)[value_col].mean().dropna()
+
+        user_ids = grouped.index.get_level_values(0)
+        item_ids = grouped.index.get_level_values(1)
+
+        users = pd.Index(user_ids.unique()).sort_values()
+        items = pd.Index(item_ids.unique()).sort_values()
+
+        rows = users.get_indexer(user_ids)
+        cols = items.get_indexer(item_ids)
+
+        matrix = csr_matrix(
+            (grouped.to_numpy(dtype=np.float64), (rows, cols)),
+            shape=(len(users), len(items))
+        )
+
+        return cls(matrix, users.tolist(), items.tolist())
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'UserItemMatrix':
+        """Konversi dense pivot DataFrame (format lama) ke UserItemMatrix"""
+        return cls(csr_matrix(df.to_numpy(dtype=np.float64)), df.index.tolist(), df.columns.tolist())
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.matrix.shape
+
+    @property
+    def empty(self) -> bool:
+        return self.matrix.shape[0] == 0 or self.matrix.shape[1] == 0
+
+    @property
+    def users(self) -> List[Any]:
+        return self.index.tolist()
+
+    @property
+    def items(self) -> List[Any]:
+        return self.columns.tolist()
+
+    def __contains__(self, user_id: Any) -> bool:
+        return user_id in self.user_to_index
+
+    def has_user(self, user_id: Any) -> bool:
+        return user_id in self.user_to_index
+
+    def user_row(self, user_id: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """Item index dan nilai interaksi positif user; array kosong jika user tidak ada"""
+        user_idx = self.user_to_index.get(user_id)
+        if user_idx is None:
+            return np.array([], dtype=np.int32), np.array([], dtype=np.float64)
+
+        start, end = self.matrix.indptr[user_idx], self.matrix.indptr[user_idx + 1]
+        item_indices = self.matrix.indices[start:end]
+        values = self.matrix.data[start:end]
+
+        positive = values > 0
+        return item_indices[positive], values[positive]
+
+    def user_ratings(self, user_id: Any) -> pd.Series:
+        """Interaksi positif user sebagai Series (index = item id)"""
+        item_indices, values = self.user_row(user_id)
+        return pd.Series(values, index=self.columns[item_indices])
+
+    def known_items(self, user_id: Any) -> List[Any]:
+        """Item id yang sudah diinteraksi user (weight > 0)"""
+        item_indices, _ = self.user_row(user_id)
+        return self.columns[item_indices].tolist()
+
+    def interaction_count(self, user_id: Any) -> int:
+        """Jumlah item dengan weight > 0 untuk user"""
+        item_indices, _ = self.user_row(user_id)
+        return int(len(item_indices))
+
+    def user_interaction_counts(self) -> pd.Series:
+        """Jumlah interaksi positif per user (setara `(df > 0).sum(axis=1)`)"""
+        positive = self.matrix > 0
+        return pd.Series(np.asarray(positive.sum(axis=1)).ravel(), index=self.index)
+
+    def item_interaction_counts(self) -> pd.Series:
+        """Jumlah user dengan interaksi positif per item (setara `(df > 0).sum()`)"""
+        positive = self.matrix > 0
+        return pd.Series(np.asarray(positive.sum(axis=0)).ravel(), index=self.columns)
+
+    def item_totals(self) -> pd.Series:
+        """Total weight per item (setara `df.sum()`)"""
+        return pd.Series(np.asarray(self.matrix.sum(axis=0)).ravel(), index=self.columns)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Dense pivot DataFrame, hanya untuk debugging atau dataset kecil"""
+        return pd.DataFrame(self.matrix.toarray(), index=self.index, columns=self.columns)
+
+
+def as_user_item_matrix(matrix: Any) -> Optional[UserItemMatrix]:
+    """Terima UserItemMatrix atau dense DataFrame lama dan kembalikan UserItemMatrix"""
+    if matrix is None or isinstance(matrix, UserItemMatrix):
+        return matrix
+    if isinstance(matrix, pd.DataFrame):
+        return UserItemMatrix.from_dataframe(matrix)
+    raise TypeError(f"Unsupported user-item matrix type: {type(matrix).__name__}")
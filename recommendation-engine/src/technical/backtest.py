@@ -0,0 +1,490 @@
+import os
+import logging
+import warnings
+import itertools
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import BACKTEST_CONFIG
+from src.technical.signals import calculate_macd, calculate_rsi, calculate_bollinger_bands
+from src.technical.indicator_graph import get_indicator_graph
+from src.technical.panel import (
+    PricePanel, panel_ema, panel_sma, panel_rolling_std, panel_rsi
+)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MIN_BACKTEST_POINTS = 50
+
+# Parameter yang dipakai tiap strategi beserta default-nya (sama dengan backtest_strategy)
+STRATEGY_PARAMETERS: Dict[str, Dict[str, float]] = {
+    'macd': {'macd_fast': 12, 'macd_slow': 26, 'macd_signal': 9},
+    'rsi': {'rsi_period': 14, 'rsi_oversold': 30, 'rsi_overbought': 70},
+    'bollinger': {'bb_period': 20, 'bb_std': 2.0},
+    'ma': {'ma_short': 20, 'ma_medium': 50},
+}
+
+_INTEGER_PARAMETERS = {'macd_fast', 'macd_slow', 'macd_signal', 'rsi_period', 'bb_period', 'ma_short', 'ma_medium'}
+
+# Metrik Pareto: (nama, True = makin besar makin baik)
+PARETO_OBJECTIVES: Tuple[Tuple[str, bool], ...] = (
+    ('total_return', True),
+    ('sharpe_ratio', True),
+    ('max_drawdown', False),
+)
+
+METRIC_NAMES = ('total_return', 'annual_return', 'max_drawdown', 'sharpe_ratio', 'win_rate', 'num_trades')
+
+
+def strategy_key(strategy_type: str) -> str:
+    """Strategi selain macd/rsi/bollinger jatuh ke MA crossover, seperti backtest_strategy"""
+    return strategy_type if strategy_type in ('macd', 'rsi', 'bollinger') else 'ma'
+
+
+def resolve_parameters(strategy_type: str, indicator_periods: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Parameter strategi dari indicator_periods, sisanya default"""
+    defaults = STRATEGY_PARAMETERS[strategy_key(strategy_type)]
+    params = {}
+    for name, default in defaults.items():
+        value = indicator_periods.get(name, default) if indicator_periods else default
+        params[name] = int(value) if name in _INTEGER_PARAMETERS else float(value)
+    return params
+
+
+def _first_valid_row(columns: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Baris pertama tiap kolom yang lolos df.dropna() di backtest_strategy: semua indikator
+    terisi dan bukan baris pertama (returns/position_change NaN). Tidak ada -> T.
+    """
+    valid = np.logical_and.reduce([~np.isnan(column) for column in columns])
+    valid[0] = False
+    T = valid.shape[0]
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), T)
+
+
+def _crossing_positions(upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """+1 saat upper > lower, -1 saat upper < lower, 0 selain itu (termasuk NaN)"""
+    with np.errstate(invalid='ignore'):
+        return np.where(upper > lower, 1.0, np.where(upper < lower, -1.0, 0.0))
+
+
+def _band_positions(values: np.ndarray, buy_level: np.ndarray, sell_level: np.ndarray,
+                    inclusive: bool) -> np.ndarray:
+    """+1 saat di bawah buy_level, -1 saat di atas sell_level (sell menimpa buy)"""
+    with np.errstate(invalid='ignore'):
+        if inclusive:
+            buy, sell = values <= buy_level, values >= sell_level
+        else:
+            buy, sell = values < buy_level, values > sell_level
+    return np.where(sell, -1.0, np.where(buy, 1.0, 0.0))
+
+
+# ----------------------------------------------------------------------
+# Simulasi tervektorisasi (waktu x parameter set)
+# ----------------------------------------------------------------------
+
+def _trade_events(close: np.ndarray, position: np.ndarray, start: int,
+                  initial_capital: float) -> Dict[str, np.ndarray]:
+    """
+    Trade satu kolom posisi tanpa loop baris, semantik sama dengan loop iterrows lama:
+    setiap perubahan posisi naik = buy (holdings = capital / harga, juga saat sudah
+    memegang), perubahan turun = sell hanya jika sedang memegang. Holdings > 0 tepat
+    saat event sebelumnya adalah buy, sehingga sell yang berlaku = sell setelah buy.
+    """
+    change = position[start:] - position[start - 1:-1]
+    rows = np.flatnonzero(change) + start
+    is_buy = change[rows - start] > 0
+    after_buy = np.concatenate(([False], is_buy[:-1]))
+    keep = is_buy | after_buy
+    rows, is_buy = rows[keep], is_buy[keep]
+
+    prices = close[rows]
+    ratio = np.ones(len(rows))
+    sells = np.flatnonzero(~is_buy)
+    # Event sebelum sell selalu buy (buy tidak pernah dibuang)
+    ratio[sells] = prices[sells] / prices[sells - 1]
+    capital = initial_capital * np.cumprod(ratio)
+
+    if len(rows) and is_buy[-1]:
+        final_capital = capital[-1] / prices[-1] * close[-1]
+    else:
+        final_capital = capital[-1] if len(rows) else initial_capital
+
+    return {
+        'rows': rows,
+        'is_buy': is_buy,
+        'prices': prices,
+        'capital': capital,
+        'holdings': np.where(is_buy, capital / prices, 0.0),
+        'final_capital': final_capital
+    }
+
+
+def _win_rate(trade_capital: np.ndarray) -> float:
+    count = len(trade_capital)
+    if count < 2:
+        return 0
+    closing = trade_capital[1::2]
+    wins = int(np.sum(closing > trade_capital[0:2 * len(closing):2]))
+    return wins / ((count // 2) or 1)
+
+
+def simulate_positions(close: np.ndarray, positions: np.ndarray, starts: np.ndarray,
+                       initial_capital: float = 10000.0) -> Dict[str, np.ndarray]:
+    """
+    Metrik backtest untuk K parameter set sekaligus.
+
+    close: (T,), positions: (T x K) posisi -1/0/+1, starts: (K,) baris pertama yang
+    dievaluasi per kolom. Return, equity dan drawdown dihitung sebagai operasi array
+    (T x K); hanya event trade (jauh lebih sedikit dari T) yang diproses per kolom.
+    """
+    close = np.asarray(close, dtype=float)
+    positions = np.asarray(positions, dtype=float)
+    if positions.ndim == 1:
+        positions = positions[:, None]
+    T, K = positions.shape
+    starts = np.asarray(starts, dtype=int)
+    rows = np.arange(T)[:, None]
+    active = rows >= starts[None, :]
+    evaluated = active.sum(axis=0)
+
+    returns = np.full(T, np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+    strategy_returns = np.full((T, K), np.nan)
+    strategy_returns[1:] = positions[:-1] * returns[1:, None]
+    strategy_returns = np.where(active, strategy_returns, np.nan)
+
+    # Equity kumulatif: sebelum start = 1 sehingga cummax/drawdown tidak terpengaruh
+    cumulative = np.cumprod(1 + np.where(active, strategy_returns, 0.0), axis=0)
+    cumulative_max = np.maximum.accumulate(cumulative, axis=0)
+    drawdown = (cumulative_max - cumulative) / cumulative_max
+
+    # Kolom tanpa baris evaluasi menghasilkan NaN (dan RuntimeWarning) yang tidak dipakai
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nanmean(strategy_returns, axis=0)
+        std = np.nanstd(strategy_returns, axis=0, ddof=1)
+        sharpe = np.where(std != 0, np.sqrt(252) * mean / std, 0.0)
+
+    metrics = {name: np.full(K, np.nan) for name in METRIC_NAMES}
+    metrics['evaluated_points'] = evaluated
+    for k in range(K):
+        if evaluated[k] == 0:
+            continue
+        events = _trade_events(close, positions[:, k], int(starts[k]), initial_capital)
+        total_return = (events['final_capital'] - initial_capital) / initial_capital
+        metrics['total_return'][k] = total_return
+        metrics['annual_return'][k] = total_return * (252 / evaluated[k])
+        metrics['max_drawdown'][k] = drawdown[starts[k]:, k].max()
+        metrics['sharpe_ratio'][k] = sharpe[k]
+        metrics['win_rate'][k] = _win_rate(events['capital'])
+        metrics['num_trades'][k] = len(events['rows']) // 2
+
+    metrics['_drawdown'] = drawdown
+    metrics['_cumulative'] = cumulative
+    metrics['_strategy_returns'] = strategy_returns
+    return metrics
+
+
+# ----------------------------------------------------------------------
+# Backtest tunggal (pengganti loop iterrows di signals.backtest_strategy)
+# ----------------------------------------------------------------------
+
+def _single_positions(close: pd.Series, strategy_type: str,
+                      params: Dict[str, Any]) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """Posisi satu parameter set memakai calculate_* dari signals.py (node graph bersama)"""
+    values = close.to_numpy(dtype=float)
+    key = strategy_key(strategy_type)
+    if key == 'macd':
+        macd, signal, hist = calculate_macd(close, params['macd_fast'], params['macd_slow'], params['macd_signal'])
+        macd, signal, hist = (s.to_numpy(dtype=float) for s in (macd, signal, hist))
+        return _crossing_positions(macd, signal), [macd, signal, hist]
+    if key == 'rsi':
+        rsi = calculate_rsi(close, params['rsi_period']).to_numpy(dtype=float)
+        return _band_positions(rsi, params['rsi_oversold'], params['rsi_overbought'], inclusive=False), [rsi]
+    if key == 'bollinger':
+        upper, middle, lower = calculate_bollinger_bands(close, params['bb_period'], params['bb_std'])
+        upper, middle, lower = (s.to_numpy(dtype=float) for s in (upper, middle, lower))
+        return _band_positions(values, lower, upper, inclusive=True), [upper, middle, lower]
+    short_ma = close.rolling(window=params['ma_short']).mean().to_numpy(dtype=float)
+    long_ma = close.rolling(window=params['ma_medium']).mean().to_numpy(dtype=float)
+    return _crossing_positions(short_ma, long_ma), [short_ma, long_ma]
+
+
+def run_backtest(prices_df: pd.DataFrame, strategy_type: str = 'macd',
+                 indicator_periods: Optional[Dict[str, Any]] = None,
+                 initial_capital: float = 10000.0) -> Dict[str, Any]:
+    """Backtest satu strategi; hasil dan format sama dengan signals.backtest_strategy"""
+    if len(prices_df) < MIN_BACKTEST_POINTS:
+        logger.warning("Tidak cukup data untuk backtest. Minimal 50 titik data diperlukan.")
+        return {"error": "Insufficient data for backtesting"}
+
+    params = resolve_parameters(strategy_type, indicator_periods)
+    close = prices_df['close']
+    position, indicator_columns = _single_positions(close, strategy_type, params)
+
+    start = int(_first_valid_row([column[:, None] for column in indicator_columns])[0])
+    if start >= len(prices_df):
+        logger.warning("Indikator belum terbentuk di seluruh data, backtest tidak bisa dijalankan.")
+        return {"error": "Insufficient data for backtesting"}
+
+    values = close.to_numpy(dtype=float)
+    metrics = simulate_positions(values, position[:, None], np.array([start]), initial_capital)
+    events = _trade_events(values, position, start, initial_capital)
+
+    index = prices_df.index
+    trades = [
+        {
+            'type': 'buy' if buy else 'sell',
+            'date': index[row],
+            'price': price,
+            'holdings': holdings,
+            'capital': capital
+        }
+        for row, buy, price, holdings, capital in zip(
+            events['rows'], events['is_buy'], events['prices'], events['holdings'], events['capital']
+        )
+    ]
+
+    kept = index[start:]
+    return {
+        'total_return': float(metrics['total_return'][0]),
+        'annual_return': float(metrics['annual_return'][0]),
+        'max_drawdown': float(metrics['max_drawdown'][0]),
+        'sharpe_ratio': float(metrics['sharpe_ratio'][0]),
+        'win_rate': float(metrics['win_rate'][0]),
+        'num_trades': int(metrics['num_trades'][0]),
+        'trades': trades,
+        'returns_series': pd.Series(metrics['_strategy_returns'][start:, 0], index=kept, name='strategy_returns'),
+        'cumulative_returns': pd.Series(metrics['_cumulative'][start:, 0], index=kept, name='cumulative_returns'),
+        'drawdown_series': pd.Series(metrics['_drawdown'][start:, 0], index=kept, name='drawdown')
+    }
+
+
+# ----------------------------------------------------------------------
+# Grid search parameter
+# ----------------------------------------------------------------------
+
+def _valid_combination(strategy: str, params: Dict[str, Any]) -> bool:
+    if any(params[name] < 2 for name in params if name in _INTEGER_PARAMETERS):
+        return False
+    if strategy == 'macd':
+        return params['macd_fast'] < params['macd_slow'] and params['macd_signal'] >= 2
+    if strategy == 'rsi':
+        return 0 <= params['rsi_oversold'] < params['rsi_overbought'] <= 100
+    if strategy == 'bollinger':
+        return params['bb_std'] > 0
+    return params['ma_short'] < params['ma_medium']
+
+
+def expand_grid(strategy_type: str, grid: Optional[Dict[str, Sequence[Any]]] = None,
+                max_combinations: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Kombinasi parameter dari grid {nama: [nilai, ...]}. Parameter yang tidak ada di grid
+    memakai grid default dari BACKTEST_CONFIG; kombinasi tidak valid (fast >= slow, dst) dibuang.
+    """
+    strategy = strategy_key(strategy_type)
+    defaults = STRATEGY_PARAMETERS[strategy]
+    default_grid = BACKTEST_CONFIG.get('default_grids', {}).get(strategy, {})
+    grid = grid or {}
+
+    unknown = set(grid) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {strategy} strategy: {', '.join(sorted(unknown))}")
+
+    names = list(defaults)
+    axes = []
+    for name in names:
+        values = grid.get(name) or default_grid.get(name) or [defaults[name]]
+        cast = int if name in _INTEGER_PARAMETERS else float
+        axes.append(sorted({cast(v) for v in values}))
+
+    # PERBAIKAN: cek ukuran produk sebelum ekspansi; grid besar tidak pernah dimaterialisasi
+    limit = max_combinations or BACKTEST_CONFIG.get('max_combinations', 5000)
+    total = math.prod(len(axis) for axis in axes)
+    if total > limit:
+        raise ValueError(f"Parameter grid has {total} combinations, maximum is {limit}")
+
+    combinations = [
+        dict(zip(names, values)) for values in itertools.product(*axes)
+        if _valid_combination(strategy, dict(zip(names, values)))
+    ]
+    return combinations
+
+
+def _column_indices(combinations: List[Dict[str, Any]], names: Sequence[str]) -> Tuple[List[Tuple], np.ndarray]:
+    """Nilai unik (tuple parameter) dan indeks kolom tiap kombinasi"""
+    keys = [tuple(combo[name] for name in names) for combo in combinations]
+    unique = sorted(set(keys))
+    lookup = {key: j for j, key in enumerate(unique)}
+    return unique, np.array([lookup[key] for key in keys], dtype=int)
+
+
+def _series(name: str, close: np.ndarray, compute, **params) -> np.ndarray:
+    """Seri indikator per periode sebagai node graph (dipakai ulang lintas grid/request)"""
+    return get_indicator_graph().compute(f'backtest_{name}', (close,), params, compute)
+
+
+def grid_positions(close: np.ndarray, strategy_type: str,
+                   combinations: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Posisi (T x K) untuk semua kombinasi dalam satu pass, beserta baris awal evaluasi
+    per kolom. Seri indikator dihitung sekali per nilai unik (mis. EMA per span, RSI per
+    periode, SMA/std per periode BB) lalu dipakai bersama oleh semua kombinasi.
+    """
+    strategy = strategy_key(strategy_type)
+    close = np.asarray(close, dtype=float)
+    T = len(close)
+    panel = PricePanel(['close'], close[:, None])
+
+    if strategy == 'macd':
+        spans = sorted({c['macd_fast'] for c in combinations} | {c['macd_slow'] for c in combinations})
+        emas = {
+            span: _series('ema', close, lambda span=span: panel_ema(panel.close, span=span, adjust=True,
+                                                                   min_periods=span)[:, 0], span=span)
+            for span in spans
+        }
+        pairs, pair_index = _column_indices(combinations, ('macd_fast', 'macd_slow', 'macd_signal'))
+        macd = np.column_stack([emas[fast] - emas[slow] for fast, slow, _ in pairs])
+        signal = np.empty_like(macd)
+        # Satu EMA (T x kolom) per span signal untuk semua pasangan fast/slow
+        for span in sorted({s for _, _, s in pairs}):
+            columns = [j for j, (_, _, s) in enumerate(pairs) if s == span]
+            signal[:, columns] = panel_ema(macd[:, columns], span=span, adjust=True, min_periods=span)
+        insufficient = np.array([T < slow + s + 5 for _, slow, s in pairs])
+        macd[:, insufficient] = np.nan
+        signal[:, insufficient] = np.nan
+        macd, signal = macd[:, pair_index], signal[:, pair_index]
+        return _crossing_positions(macd, signal), _first_valid_row([macd, signal])
+
+    if strategy == 'rsi':
+        periods, period_index = _column_indices(combinations, ('rsi_period',))
+        rsi = np.column_stack([
+            _series('rsi', close, lambda p=period: panel_rsi(panel, p)[:, 0], window=period)
+            for (period,) in periods
+        ])[:, period_index]
+        oversold = np.array([c['rsi_oversold'] for c in combinations], dtype=float)
+        overbought = np.array([c['rsi_overbought'] for c in combinations], dtype=float)
+        return _band_positions(rsi, oversold[None, :], overbought[None, :], inclusive=False), _first_valid_row([rsi])
+
+    if strategy == 'bollinger':
+        periods, period_index = _column_indices(combinations, ('bb_period',))
+        middle = np.column_stack([
+            _series('sma', close, lambda p=p: panel_sma(panel.close, p)[:, 0], window=p) for (p,) in periods
+        ])[:, period_index]
+        std = np.column_stack([
+            _series('std', close, lambda p=p: panel_rolling_std(panel.close, p)[:, 0], window=p) for (p,) in periods
+        ])[:, period_index]
+        num_std = np.array([c['bb_std'] for c in combinations], dtype=float)[None, :]
+        upper, lower = middle + std * num_std, middle - std * num_std
+        return _band_positions(close[:, None], lower, upper, inclusive=True), _first_valid_row([upper, middle, lower])
+
+    windows = sorted({c['ma_short'] for c in combinations} | {c['ma_medium'] for c in combinations})
+    smas = {w: _series('sma', close, lambda w=w: panel_sma(panel.close, w)[:, 0], window=w) for w in windows}
+    short_ma = np.column_stack([smas[c['ma_short']] for c in combinations])
+    long_ma = np.column_stack([smas[c['ma_medium']] for c in combinations])
+    return _crossing_positions(short_ma, long_ma), _first_valid_row([short_ma, long_ma])
+
+
+def evaluate_parameter_grid(close: np.ndarray, strategy_type: str, combinations: List[Dict[str, Any]],
+                            initial_capital: float = 10000.0) -> Dict[str, List[float]]:
+    """
+    Metrik backtest semua kombinasi (fungsi level modul agar bisa dijalankan di
+    process executor per potongan grid).
+    """
+    close = np.asarray(close, dtype=float)
+    if not combinations:
+        return {name: [] for name in METRIC_NAMES}
+    positions, starts = grid_positions(close, strategy_type, combinations)
+    metrics = simulate_positions(close, positions, starts, initial_capital)
+    return {name: metrics[name].tolist() for name in METRIC_NAMES}
+
+
+def pareto_front(metrics: Dict[str, Sequence[float]],
+                 objectives: Sequence[Tuple[str, bool]] = PARETO_OBJECTIVES) -> np.ndarray:
+    """Indeks kombinasi yang tidak didominasi kombinasi lain pada semua objective"""
+    # Orientasi: semua objective dimaksimalkan, NaN = nilai terburuk
+    scores = np.column_stack([
+        np.nan_to_num(np.asarray(metrics[name], dtype=float) * (1 if maximize else -1), nan=-np.inf)
+        for name, maximize in objectives
+    ])
+    finite = np.isfinite(np.asarray(metrics[objectives[0][0]], dtype=float))
+    others = scores[finite]
+    front = []
+    for i in np.flatnonzero(finite):
+        dominated = np.any(np.all(others >= scores[i], axis=1) & np.any(others > scores[i], axis=1))
+        if not dominated:
+            front.append(i)
+    return np.array(front, dtype=int)
+
+
+def merge_grid_results(chunks: Sequence[Dict[str, List[float]]]) -> Dict[str, np.ndarray]:
+    return {
+        name: np.concatenate([np.asarray(chunk[name], dtype=float) for chunk in chunks]) if chunks else np.array([])
+        for name in METRIC_NAMES
+    }
+
+
+def split_combinations(combinations: List[Dict[str, Any]], max_chunks: int) -> List[List[Dict[str, Any]]]:
+    """
+    Maksimal max_chunks potongan kontigu berisi minimal BACKTEST_CONFIG['min_chunk_size']
+    kombinasi (kombinasi dengan periode sama tetap berdekatan sehingga seri indikatornya
+    dipakai bersama di dalam satu worker)
+    """
+    min_size = max(1, BACKTEST_CONFIG.get('min_chunk_size', 25))
+    chunks = max(1, min(max_chunks, len(combinations) // min_size))
+    size = -(-len(combinations) // chunks)
+    return [combinations[i:i + size] for i in range(0, len(combinations), size)]
+
+
+def summarize_sweep(combinations: List[Dict[str, Any]], metrics: Dict[str, np.ndarray],
+                    top_n: Optional[int] = None) -> Dict[str, Any]:
+    """Parameter set Pareto-terbaik (urut total_return) dan terbaik per objective"""
+    def entry(i: int) -> Dict[str, Any]:
+        result = {'parameters': combinations[i]}
+        for name in METRIC_NAMES:
+            value = float(metrics[name][i])
+            result[name] = int(value) if name == 'num_trades' else value
+        return result
+
+    front = pareto_front(metrics)
+    front = front[np.argsort(-metrics['total_return'][front], kind='stable')]
+    if top_n:
+        front = front[:top_n]
+
+    best = {}
+    for name, maximize in PARETO_OBJECTIVES:
+        values = metrics[name]
+        if np.isfinite(values).any():
+            filled = np.where(np.isfinite(values), values, -np.inf if maximize else np.inf)
+            best[name] = entry(int(np.argmax(filled) if maximize else np.argmin(filled)))
+
+    return {
+        'evaluated': len(combinations),
+        'valid': int(np.isfinite(metrics['total_return']).sum()),
+        'pareto_front': [entry(int(i)) for i in front],
+        'best_by_objective': best
+    }
+
+
+def sweep_strategy(prices_df: pd.DataFrame, strategy_type: str = 'macd',
+                   grid: Optional[Dict[str, Sequence[Any]]] = None,
+                   initial_capital: float = 10000.0, top_n: Optional[int] = None) -> Dict[str, Any]:
+    """Grid search satu proses (untuk pemakaian di luar API)"""
+    if len(prices_df) < MIN_BACKTEST_POINTS:
+        return {"error": "Insufficient data for backtesting"}
+    combinations = expand_grid(strategy_type, grid)
+    close = prices_df['close'].to_numpy(dtype=float)
+    metrics = merge_grid_results([evaluate_parameter_grid(close, strategy_type, combinations, initial_capital)])
+    return summarize_sweep(combinations, metrics, top_n)
@@ -0,0 +1,277 @@
+import os
+import copy
+import hashlib
+import inspect
+import functools
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import INDICATOR_GRAPH_CONFIG
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _update_array(h: "hashlib._Hash", values: Any):
+    array = np.asarray(values)
+    if array.dtype.kind in 'biufcmM':
+        h.update(str(array.dtype).encode())
+        h.update(np.ascontiguousarray(array).view(np.uint8).tobytes())
+    else:
+        # Object/string/extension: hash per elemen dari pandas
+        h.update(pd.util.hash_array(array.astype(object), categorize=False).tobytes())
+
+
+def _update_index(h: "hashlib._Hash", index: pd.Index):
+    if isinstance(index, pd.RangeIndex):
+        h.update(repr(('range', index.start, index.stop, index.step)).encode())
+    elif isinstance(index, pd.DatetimeIndex):
+        h.update(repr(('datetime', str(index.tz))).encode())
+        h.update(index.asi8.tobytes())
+    else:
+        _update_array(h, index.to_numpy())
+
+
+def fingerprint(obj: Any) -> str:
+    """
+    Identitas isi Series/DataFrame (nilai, index, nama, dtype). Dua objek berbeda
+    dengan data sama punya fingerprint sama, sehingga hasil indikator bisa dipakai ulang.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(obj, pd.DataFrame):
+        h.update(repr(('frame', list(obj.columns), [str(dtype) for dtype in obj.dtypes])).encode())
+        _update_index(h, obj.index)
+        for position in range(obj.shape[1]):
+            _update_array(h, obj.iloc[:, position].to_numpy())
+    elif isinstance(obj, pd.Series):
+        h.update(repr(('series', obj.name, str(obj.dtype))).encode())
+        _update_index(h, obj.index)
+        _update_array(h, obj.to_numpy())
+    else:
+        _update_array(h, obj)
+    return h.hexdigest()
+
+
+def _freeze(value: Any) -> Hashable:
+    """Parameter node -> bagian key yang hashable (pandas/ndarray diwakili fingerprint)"""
+    if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray)):
+        return ('data', fingerprint(value))
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, float) and np.isnan(value):
+        return 'nan'
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _copy_result(value: Any) -> Any:
+    """Salinan hasil untuk caller; node di graph tidak boleh ikut termodifikasi"""
+    if isinstance(value, (pd.Series, pd.DataFrame, np.ndarray)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy_result(v) for v in value)
+    if isinstance(value, list):
+        return [_copy_result(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    if isinstance(value, (str, int, float, bool, type(None), np.generic)):
+        return value
+    return copy.deepcopy(value)
+
+
+def _result_bytes(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sum(_result_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_result_bytes(v) for v in value.values())
+    return 64
+
+
+class IndicatorGraph:
+    """
+    Memo node indikator dengan key (nama indikator, fingerprint input, parameter).
+
+    Satu request /analysis/* memanggil RSI, MACD, ADX, frame TechnicalIndicators, dst.
+    berkali-kali atas data harga yang sama (detect_market_regime, generate_trading_signals,
+    generate_reversal_signals, predict_price_trend). Setiap node cukup dihitung sekali;
+    request berikutnya untuk data harga yang sama juga memakai hasil yang sama (LRU).
+    """
+
+    enabled = True
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 128 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name: str, *inputs: Any, **params: Any) -> Tuple:
+        return (name, tuple(_freeze(value) for value in inputs), _freeze(params))
+
+    def _lookup(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        found, value = self._lookup(key)
+        if found:
+            return _copy_result(value)
+
+        # Satu thread menghitung node, thread lain dengan key sama menunggu hasilnya
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                found, value = self._lookup(key)
+                if not found:
+                    value = compute()
+                    self._store(key, value)
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return _copy_result(value)
+
+    def compute(self, name: str, inputs: Tuple, params: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """Node ad-hoc: hasil fn() untuk (name, inputs, params)"""
+        return self.get_or_compute(self.key(name, *inputs, **params), fn)
+
+    def _store(self, key: Tuple, value: Any):
+        size = _result_bytes(value)
+        with self._lock:
+            self.misses += 1
+            if size > self.max_bytes:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    # ------------------------------------------------------------------
+    # Node primitif yang dipakai bersama signals.py, indicators.py dan market_features.py
+    # ------------------------------------------------------------------
+
+    def sma(self, series: pd.Series, window: int) -> pd.Series:
+        return self.compute('sma', (series,), {'window': window},
+                            lambda: series.rolling(window=window, min_periods=window).mean())
+
+    def rolling_std(self, series: pd.Series, window: int) -> pd.Series:
+        return self.compute('rolling_std', (series,), {'window': window},
+                            lambda: series.rolling(window=window, min_periods=window).std())
+
+    def rolling_max(self, series: pd.Series, window: int) -> pd.Series:
+        return self.compute('rolling_max', (series,), {'window': window},
+                            lambda: series.rolling(window=window, min_periods=window).max())
+
+    def rolling_min(self, series: pd.Series, window: int) -> pd.Series:
+        return self.compute('rolling_min', (series,), {'window': window},
+                            lambda: series.rolling(window=window, min_periods=window).min())
+
+    def ema(self, series: pd.Series, span: int, adjust: bool = False, min_periods: int = 0) -> pd.Series:
+        return self.compute('ema', (series,), {'span': span, 'adjust': adjust, 'min_periods': min_periods},
+                            lambda: series.ewm(span=span, adjust=adjust, min_periods=min_periods).mean())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class _PassthroughGraph(IndicatorGraph):
+    """Graph nonaktif (INDICATOR_GRAPH_CONFIG['enabled'] = False): selalu hitung ulang"""
+
+    enabled = False
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        return compute()
+
+    def compute(self, name: str, inputs: Tuple, params: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        return fn()
+
+
+_graph: Optional[IndicatorGraph] = None
+_graph_lock = threading.Lock()
+
+
+def get_indicator_graph() -> IndicatorGraph:
+    """Graph indikator bersama untuk proses ini"""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                if INDICATOR_GRAPH_CONFIG.get('enabled', True):
+                    _graph = IndicatorGraph(
+                        max_entries=INDICATOR_GRAPH_CONFIG.get('max_entries', 2048),
+                        max_bytes=INDICATOR_GRAPH_CONFIG.get('max_bytes', 128 * 1024 * 1024)
+                    )
+                else:
+                    _graph = _PassthroughGraph()
+    return _graph
+
+
+def memoized_indicator(name: str):
+    """
+    Decorator: fungsi indikator menjadi node graph. Argumen pandas di-fingerprint,
+    argumen lain (periode, flag) menjadi bagian key.
+    """
+    def decorator(fn: Callable) -> Callable:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            graph = get_indicator_graph()
+            if not graph.enabled:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = graph.key(name, **bound.arguments)
+            return graph.get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+    return decorator
@@ -19,6 +19,7 @@ except ImportError:
 # Path handling
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from src.technical.indicator_graph import get_indicator_graph
 
 # Setup logging
 logging.basicConfig(
@@ -37,12 +38,8 @@ warnings.filterwarnings("ignore", message="No supported index is available")
 warnings.filterwarnings("ignore", message="A date index has been provided")
 warnings.filterwarnings("ignore", message="Do not pass an `input_shape`/`input_dim` argument to a layer")
 
-# Untuk statsmodels
-try:
-    from statsmodels.tools.sm_exceptions import ValueWarning
-    warnings.filterwarnings("ignore", category=ValueWarning)
-except ImportError:
-    pass
+# Untuk statsmodels: filter ValueWarning dipasang di predict_price_arima saat statsmodels
+# pertama kali di-import (tidak di-import di sini supaya startup API tetap ringan)
 
 class TechnicalIndicators:
     """
@@ -196,6 +193,18 @@ class TechnicalIndicators:
         logger.info(f"Parameters optimized for {regime} market regime")
     
     def add_indicators(self) -> pd.DataFrame:
+        """
+        Frame harga + semua indikator. ⚡ OPTIMIZATION: frame di-memo di indicator graph
+        per (data harga, periode), sehingga generate_trading_signals, generate_reversal_signals,
+        predict_price_trend dan generate_alerts tidak membangun ulang frame yang sama.
+        """
+        columns = (self.close_col, self.high_col, self.low_col, self.open_col, self.volume_col)
+        return get_indicator_graph().compute(
+            'indicator_frame', (self.prices_df,), {'periods': self.periods, 'columns': columns},
+            self._build_indicator_frame
+        )
+    
+    def _build_indicator_frame(self) -> pd.DataFrame:
         try:
             # Create a copy to avoid modifying the original
             df = self.prices_df.copy()
@@ -263,11 +272,12 @@ class TechnicalIndicators:
         ma_long = self.periods['ma_long']
         
         ma_periods = [ma_short, ma_medium, ma_long]
+        graph = get_indicator_graph()
         
         for period in ma_periods:
             if len(df) >= period:
-                df[f'sma_{period}'] = df[self.close_col].rolling(window=period).mean()
-                df[f'ema_{period}'] = df[self.close_col].ewm(span=period, adjust=False).mean()
+                df[f'sma_{period}'] = graph.sma(df[self.close_col], period)
+                df[f'ema_{period}'] = graph.ema(df[self.close_col], period, adjust=False)
             else:
                 # Jika data tidak cukup, dibuat NaN untuk semua baris
                 df[f'sma_{period}'] = np.nan
@@ -294,9 +304,10 @@ class TechnicalIndicators:
                     df['macd_hist'] = histogram
                 except Exception as e:
                     logger.error(f"Error calculating MACD with TA-Lib: {str(e)}")
-                    self._calculate_macd_pandas(df)
+                    self._calculate_macd_pandas(df, macd_fast, macd_slow, macd_signal)
             else:
-                self._calculate_macd_pandas(df)
+                # PERBAIKAN: Fallback pandas memakai periode dinamis yang sama dengan TA-Lib
+                self._calculate_macd_pandas(df, macd_fast, macd_slow, macd_signal)
         else:
             # Jika data tidak cukup, buat kolom dengan NaN
             df['macd'] = np.nan
@@ -691,8 +702,9 @@ class TechnicalIndicators:
         
         try:
             # Calculate %K - Fast Stochastic Oscillator
-            low_min = df[self.low_col].rolling(window=stoch_k).min()
-            high_max = df[self.high_col].rolling(window=stoch_k).max()
+            graph = get_indicator_graph()
+            low_min = graph.rolling_min(df[self.low_col], stoch_k)
+            high_max = graph.rolling_max(df[self.high_col], stoch_k)
             
             # Avoid division by zero
             range_diff = high_max - low_min
@@ -930,10 +942,11 @@ class TechnicalIndicators:
         
         try:
             # Calculate middle band - Simple Moving Average
-            df['bb_middle'] = df[self.close_col].rolling(window=bb_period).mean()
+            graph = get_indicator_graph()
+            df['bb_middle'] = graph.sma(df[self.close_col], bb_period)
             
             # Calculate standard deviation
-            df['bb_std'] = df[self.close_col].rolling(window=bb_period).std()
+            df['bb_std'] = graph.rolling_std(df[self.close_col], bb_period)
             
             # Calculate upper and lower bands
             df['bb_upper'] = df['bb_middle'] + (2 * df['bb_std'])
@@ -1159,21 +1172,22 @@ class TechnicalIndicators:
         
         try:
             # Tenkan-sen (Conversion Line): (highest high + lowest low) / 2 for past 9 periods
-            high_conv = df[self.high_col].rolling(window=conversion_period).max()
-            low_conv = df[self.low_col].rolling(window=conversion_period).min()
+            graph = get_indicator_graph()
+            high_conv = graph.rolling_max(df[self.high_col], conversion_period)
+            low_conv = graph.rolling_min(df[self.low_col], conversion_period)
             df['tenkan_sen'] = (high_conv + low_conv) / 2
             
             # Kijun-sen (Base Line): (highest high + lowest low) / 2 for past 26 periods
-            high_base = df[self.high_col].rolling(window=base_period).max()
-            low_base = df[self.low_col].rolling(window=base_period).min()
+            high_base = graph.rolling_max(df[self.high_col], base_period)
+            low_base = graph.rolling_min(df[self.low_col], base_period)
             df['kijun_sen'] = (high_base + low_base) / 2
             
             # Senkou Span A (Leading Span A): (Conversion Line + Base Line) / 2, plotted 26 periods ahead
             df['senkou_span_a'] = ((df['tenkan_sen'] + df['kijun_sen']) / 2).shift(displacement)
             
             # Senkou Span B (Leading Span B): (highest high + lowest low) / 2 for past 52 periods, plotted 26 periods ahead
-            high_span_b = df[self.high_col].rolling(window=span_b_period).max()
-            low_span_b = df[self.low_col].rolling(window=span_b_period).min()
+            high_span_b = graph.rolling_max(df[self.high_col], span_b_period)
+            low_span_b = graph.rolling_min(df[self.low_col], span_b_period)
             df['senkou_span_b'] = ((high_span_b + low_span_b) / 2).shift(displacement)
             
             # Chikou Span (Lagging Span): Close price plotted 26 periods behind
@@ -0,0 +1,540 @@
+import os
+import logging
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import CONFIDENCE_THRESHOLD
+from src.technical.signals import get_optimal_parameters, regime_weights
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+EPS = np.finfo(float).eps
+
+# Batas elemen sementara (waktu x coin x window) per potongan kolom untuk rolling reduction
+_ROLLING_CHUNK_ELEMENTS = 4_000_000
+
+
+class PricePanel:
+    """
+    Harga banyak coin sebagai array 2-D (waktu x coin). Setiap kolom adalah histori
+    satu coin yang dirata-kanan: baris terakhir = candle terakhir coin tersebut, coin
+    dengan histori lebih pendek di-pad NaN di bagian atas. Dengan begitu indikator per
+    kolom identik dengan indikator yang dihitung dari DataFrame coin itu sendiri.
+    """
+
+    def __init__(self, coins: Sequence[str], close: np.ndarray, high: Optional[np.ndarray] = None,
+                 low: Optional[np.ndarray] = None, volume: Optional[np.ndarray] = None):
+        self.coins = list(coins)
+        self.close = np.asarray(close, dtype=float)
+        if self.close.ndim != 2 or self.close.shape[1] != len(self.coins):
+            raise ValueError("close must be a (time x coin) array with one column per coin")
+        self.has_high_low = high is not None and low is not None
+        self.high = np.asarray(high, dtype=float) if self.has_high_low else self.close
+        self.low = np.asarray(low, dtype=float) if self.has_high_low else self.close
+        self.volume = np.asarray(volume, dtype=float) if volume is not None else None
+
+        # Jumlah candle valid per coin (NaN hanya di awal kolom)
+        self.lengths = (~np.isnan(self.close)).sum(axis=0)
+        self.starts = self.close.shape[0] - self.lengths
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> "PricePanel":
+        """Panel dari DataFrame harga per coin (kolom close, opsional high/low/volume)"""
+        coins = [coin for coin, df in frames.items() if df is not None and len(df) and 'close' in df.columns]
+        if not coins:
+            raise ValueError("No price data to build a panel from")
+
+        length = max(len(frames[coin]) for coin in coins)
+        has_high_low = all('high' in frames[c].columns and 'low' in frames[c].columns for c in coins)
+        has_volume = all('volume' in frames[c].columns for c in coins)
+
+        def stack(column: str) -> np.ndarray:
+            array = np.full((length, len(coins)), np.nan)
+            for j, coin in enumerate(coins):
+                # Gap di tengah histori diisi nilai sebelumnya; NaN hanya boleh di awal kolom
+                values = pd.to_numeric(frames[coin][column], errors='coerce').ffill().to_numpy(dtype=float)
+                array[length - len(values):, j] = values
+            return array
+
+        return cls(
+            coins,
+            stack('close'),
+            stack('high') if has_high_low else None,
+            stack('low') if has_high_low else None,
+            stack('volume') if has_volume else None
+        )
+
+    def subset(self, columns: Sequence[int]) -> "PricePanel":
+        columns = list(columns)
+        return PricePanel(
+            [self.coins[j] for j in columns],
+            self.close[:, columns],
+            self.high[:, columns] if self.has_high_low else None,
+            self.low[:, columns] if self.has_high_low else None,
+            self.volume[:, columns] if self.volume is not None else None
+        )
+
+
+# ----------------------------------------------------------------------
+# Primitif (waktu x coin), semantik sama dengan pandas rolling/ewm per kolom
+# ----------------------------------------------------------------------
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if periods < values.shape[0]:
+        out[periods:] = values[:values.shape[0] - periods]
+    return out
+
+
+def _rolling(values: np.ndarray, window: int, reducer: Callable[..., np.ndarray]) -> np.ndarray:
+    """rolling(window, min_periods=window) per kolom; window berisi NaN menghasilkan NaN"""
+    T, N = values.shape
+    out = np.full((T, N), np.nan)
+    if window > T or N == 0:
+        return out
+    chunk = max(1, _ROLLING_CHUNK_ELEMENTS // (T * window))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for begin in range(0, N, chunk):
+            windows = np.lib.stride_tricks.sliding_window_view(values[:, begin:begin + chunk], window, axis=0)
+            out[window - 1:, begin:begin + chunk] = reducer(windows, axis=-1)
+    return out
+
+
+def panel_sma(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, np.mean)
+
+
+def panel_rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, lambda w, axis: np.std(w, axis=axis, ddof=1))
+
+
+def panel_rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, np.max)
+
+
+def panel_rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(values, window, np.min)
+
+
+def panel_ema(values: np.ndarray, span: Optional[float] = None, alpha: Optional[float] = None,
+              adjust: bool = True, min_periods: int = 0) -> np.ndarray:
+    """ewm(...).mean() per kolom; loop di sumbu waktu, vektor di sumbu coin"""
+    if alpha is None:
+        alpha = 2 / (span + 1)
+    decay = 1 - alpha
+    T, N = values.shape
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    required = max(min_periods, 1)
+
+    out = np.full((T, N), np.nan)
+    count = np.zeros(N)
+    if adjust:
+        numerator = np.zeros(N)
+        denominator = np.zeros(N)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for t in range(T):
+                numerator = decay * numerator + filled[t]
+                denominator = decay * denominator + valid[t]
+                count += valid[t]
+                out[t] = np.where(count >= required, numerator / denominator, np.nan)
+    else:
+        current = np.full(N, np.nan)
+        for t in range(T):
+            started = ~np.isnan(current)
+            current = np.where(valid[t], np.where(started, decay * current + alpha * filled[t], filled[t]), current)
+            count += valid[t]
+            out[t] = np.where(count >= required, current, np.nan)
+    return out
+
+
+def _mask_before_start(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    rows = np.arange(values.shape[0])[:, None]
+    return np.where(rows >= starts[None, :], values, np.nan)
+
+
+def _true_range(panel: PricePanel) -> np.ndarray:
+    """True range seperti signals.py (komponen NaN di candle pertama diisi 0)"""
+    prev_close = _shift(panel.close, 1)
+    with np.errstate(invalid='ignore'):
+        tr1 = np.nan_to_num(panel.high - panel.low, nan=0.0)
+        tr2 = np.nan_to_num(np.abs(panel.high - prev_close), nan=0.0)
+        tr3 = np.nan_to_num(np.abs(panel.low - prev_close), nan=0.0)
+    return _mask_before_start(np.maximum(np.maximum(tr1, tr2), tr3), panel.starts)
+
+
+# ----------------------------------------------------------------------
+# Indikator (padanan calculate_* di signals.py, jalur pandas)
+# ----------------------------------------------------------------------
+
+def panel_rsi(panel: PricePanel, window: int = 14) -> np.ndarray:
+    """RSI Wilder seperti signals._calculate_rsi_pandas (seed = rata-rata `window` gain pertama)"""
+    close = panel.close
+    T, N = close.shape
+    delta = close - _shift(close, 1)
+    with np.errstate(invalid='ignore'):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+
+    out = np.full((T, N), np.nan)
+    gain_sum = np.zeros(N)
+    loss_sum = np.zeros(N)
+    avg_gain = np.zeros(N)
+    avg_loss = np.zeros(N)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for t in range(T):
+            position = t - panel.starts
+            seeding = (position >= 0) & (position < window)
+            gain_sum += np.where(seeding, gain[t], 0.0)
+            loss_sum += np.where(seeding, loss[t], 0.0)
+            seeded = position == window - 1
+            avg_gain = np.where(seeded, gain_sum / window, avg_gain)
+            avg_loss = np.where(seeded, loss_sum / window, avg_loss)
+
+            smoothing = position >= window
+            avg_gain = np.where(smoothing, (avg_gain * (window - 1) + gain[t]) / window, avg_gain)
+            avg_loss = np.where(smoothing, (avg_loss * (window - 1) + loss[t]) / window, avg_loss)
+            rsi = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+            out[t] = np.where(smoothing, rsi, np.nan)
+
+    # calculate_rsi: butuh minimal 2 x window data
+    out[:, panel.lengths < window * 2] = np.nan
+    return out
+
+
+def panel_macd(panel: PricePanel, fast_period: int = 12, slow_period: int = 26,
+               signal_period: int = 9) -> Dict[str, np.ndarray]:
+    close = panel.close
+    fast_ema = panel_ema(close, span=fast_period, adjust=True, min_periods=fast_period)
+    slow_ema = panel_ema(close, span=slow_period, adjust=True, min_periods=slow_period)
+    macd = fast_ema - slow_ema
+    signal = panel_ema(macd, span=signal_period, adjust=True, min_periods=signal_period)
+
+    insufficient = panel.lengths < slow_period + signal_period + 5
+    macd[:, insufficient] = np.nan
+    signal[:, insufficient] = np.nan
+    return {'macd': macd, 'macd_signal': signal, 'macd_hist': macd - signal}
+
+
+def panel_bollinger_bands(panel: PricePanel, window: int = 20, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+    middle = panel_sma(panel.close, window)
+    std = panel_rolling_std(panel.close, window)
+    return {'bb_upper': middle + std * num_std, 'bb_middle': middle, 'bb_lower': middle - std * num_std}
+
+
+def panel_stochastic(panel: PricePanel, k_period: int = 14, d_period: int = 3) -> Dict[str, np.ndarray]:
+    lowest_low = panel_rolling_min(panel.low, k_period)
+    highest_high = panel_rolling_max(panel.high, k_period)
+    denominator = highest_high - lowest_low
+    denominator = np.where(denominator == 0, EPS, denominator)
+    with np.errstate(invalid='ignore'):
+        k = np.clip(((panel.close - lowest_low) / denominator) * 100, 0, 100)
+    d = panel_sma(k, d_period)
+
+    insufficient = panel.lengths < k_period + d_period
+    k[:, insufficient] = np.nan
+    d[:, insufficient] = np.nan
+    return {'stoch_k': k, 'stoch_d': d}
+
+
+def panel_adx(panel: PricePanel, window: int = 14) -> Dict[str, np.ndarray]:
+    """ADX seperti signals._calculate_adx_pandas (ewm span=window, adjust=True)"""
+    true_range = _true_range(panel)
+    atr = panel_ema(true_range, span=window, min_periods=window)
+
+    with np.errstate(invalid='ignore'):
+        up_move = np.nan_to_num(panel.high - _shift(panel.high, 1), nan=0.0)
+        down_move = np.nan_to_num(_shift(panel.low, 1) - panel.low, nan=0.0)
+        plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+        minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    plus_dm = _mask_before_start(plus_dm, panel.starts)
+    minus_dm = _mask_before_start(minus_dm, panel.starts)
+
+    smooth_plus_dm = panel_ema(plus_dm, span=window, min_periods=window)
+    smooth_minus_dm = panel_ema(minus_dm, span=window, min_periods=window)
+
+    atr_safe = np.where(atr == 0, EPS, atr)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plus_di = 100 * (smooth_plus_dm / atr_safe)
+        minus_di = 100 * (smooth_minus_dm / atr_safe)
+        di_sum = plus_di + minus_di
+        dx = 100 * (np.abs(plus_di - minus_di) / np.where(di_sum == 0, EPS, di_sum))
+    adx = panel_ema(dx, span=window, min_periods=window)
+
+    insufficient = panel.lengths < window * 3
+    for values in (adx, plus_di, minus_di):
+        values[:, insufficient] = np.nan
+    return {'adx': adx, 'plus_di': plus_di, 'minus_di': minus_di}
+
+
+def panel_atr(panel: PricePanel, window: int = 14) -> np.ndarray:
+    atr = panel_ema(_true_range(panel), alpha=1 / window, adjust=False, min_periods=window)
+    atr[:, panel.lengths < window + 1] = np.nan
+    return atr
+
+
+# ----------------------------------------------------------------------
+# Regime dan sinyal (padanan detect_market_regime / generate_trading_signals)
+# ----------------------------------------------------------------------
+
+def _last(values: np.ndarray, offset: int = 1) -> np.ndarray:
+    if values.shape[0] < offset:
+        return np.full(values.shape[1], np.nan)
+    return values[-offset]
+
+
+def detect_market_regimes(panel: PricePanel, window: int = 30) -> np.ndarray:
+    """detect_market_regime untuk semua coin sekaligus; return array string regime"""
+    close = panel.close
+    N = close.shape[1]
+    lengths = panel.lengths
+    latest = _last(close)
+    first = close[np.minimum(panel.starts, close.shape[0] - 1), np.arange(N)]
+    regimes = np.full(N, 'unknown', dtype=object)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Data terbatas (< 2 x window): return 5 candle dan arah awal-akhir
+        returns_5 = close / _shift(close, 5) - 1
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            volatility_short = np.nanstd(returns_5, axis=0, ddof=1) * np.sqrt(252)
+        trend = latest / first - 1
+
+        # Data cukup: volatilitas `window` return terakhir, ADX(14), slope SMA 20
+        returns = close / _shift(close, 1) - 1
+        recent = returns[-window:] if close.shape[0] >= window else returns
+        volatility = np.std(recent, axis=0, ddof=1) * np.sqrt(252)
+        volatility = np.where(np.isnan(volatility), 0.3, volatility)
+
+        if panel.has_high_low:
+            adx = panel_adx(panel, window=14)
+            current_adx = np.nan_to_num(_last(adx['adx']), nan=15.0)
+            current_plus_di = np.nan_to_num(_last(adx['plus_di']), nan=15.0)
+            current_minus_di = np.nan_to_num(_last(adx['minus_di']), nan=15.0)
+        else:
+            current_adx = current_plus_di = current_minus_di = np.full(N, 15.0)
+
+        ma_short = panel_sma(close, 20)
+        ma_past = _last(ma_short, window)
+        ma_slope = np.where(lengths > window, (_last(ma_short) - ma_past) / ma_past, 0.0)
+
+    for j in range(N):
+        if lengths[j] < window * 2:
+            if lengths[j] >= 6:
+                if volatility_short[j] > 0.5:
+                    regimes[j] = ("volatile_bullish" if trend[j] > 0.05 else
+                                  "volatile_bearish" if trend[j] < -0.05 else "ranging_volatile")
+                else:
+                    regimes[j] = ("trending_bullish" if trend[j] > 0.03 else
+                                  "trending_bearish" if trend[j] < -0.03 else "ranging_low_volatility")
+            continue
+
+        if current_adx[j] > 25:
+            volatile = volatility[j] > 0.5
+            if ma_slope[j] > 0 and current_plus_di[j] > current_minus_di[j]:
+                regimes[j] = "trending_bullish_volatile" if volatile else "trending_bullish"
+            elif ma_slope[j] < 0 and current_minus_di[j] > current_plus_di[j]:
+                regimes[j] = "trending_bearish_volatile" if volatile else "trending_bearish"
+            else:
+                regimes[j] = "trending_neutral"
+        else:
+            regimes[j] = "ranging_volatile" if volatility[j] > 0.5 else "ranging_low_volatility"
+
+    return regimes
+
+
+def compute_panel_signals(panel: PricePanel, indicator_periods: Dict[str, Any],
+                          market_regimes: np.ndarray) -> pd.DataFrame:
+    """
+    Skor buy/sell generate_trading_signals untuk semua coin dengan set periode yang sama.
+    Satu baris per coin: action, confidence, buy_score, sell_score dan nilai indikator terakhir.
+    """
+    rsi_period = indicator_periods.get('rsi_period', 14)
+    macd_fast = indicator_periods.get('macd_fast', 12)
+    macd_slow = indicator_periods.get('macd_slow', 26)
+    macd_signal = indicator_periods.get('macd_signal', 9)
+    bb_period = indicator_periods.get('bb_period', 20)
+    stoch_k = indicator_periods.get('stoch_k', 14)
+    stoch_d = indicator_periods.get('stoch_d', 3)
+    ma_short = indicator_periods.get('ma_short', 20)
+
+    close = panel.close
+    lengths = panel.lengths
+    N = close.shape[1]
+    latest_close = _last(close)
+
+    rsi = panel_rsi(panel, rsi_period)
+    macd = panel_macd(panel, macd_fast, macd_slow, macd_signal)
+    bands = panel_bollinger_bands(panel, bb_period)
+    stochastic = panel_stochastic(panel, stoch_k, stoch_d)
+    adx = panel_adx(panel, 14)
+    atr = panel_atr(panel, 14)
+
+    valid_rsi = lengths >= 2 * rsi_period
+    valid_macd = lengths >= macd_slow + macd_signal + 5
+    valid_stoch = lengths >= stoch_k + stoch_d
+    valid_adx = lengths >= 3 * 14
+    valid_ma = lengths >= ma_short
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        latest_rsi = np.nan_to_num(_last(rsi), nan=50.0)
+        rsi_slope = _last(rsi) - _last(rsi, 4)
+
+        latest_macd = _last(macd['macd'])
+        latest_signal = _last(macd['macd_signal'])
+        macd_slope = latest_macd - _last(macd['macd'], 4)
+        macd_cross_up = (latest_macd > latest_signal) & (_last(macd['macd'], 2) <= _last(macd['macd_signal'], 2))
+        macd_cross_down = (latest_macd < latest_signal) & (_last(macd['macd'], 2) >= _last(macd['macd_signal'], 2))
+
+        raw_upper, raw_lower = _last(bands['bb_upper']), _last(bands['bb_lower'])
+        latest_upper = np.where(np.isnan(raw_upper), latest_close * 1.05, raw_upper)
+        latest_lower = np.where(np.isnan(raw_lower), latest_close * 0.95, raw_lower)
+        valid_bb = (lengths >= bb_period) & (latest_upper > latest_lower)
+        bb_percent = (latest_close - latest_lower) / (latest_upper - latest_lower)
+        price_change = np.where(lengths > 3, latest_close / _last(close, 4) - 1, 0.0)
+
+    # Signal per indikator: arah (+1 buy, -1 sell, 0 hold) dan kekuatan, urutan kondisi sama
+    # dengan generate_trading_signals
+    rsi_direction = np.select(
+        [~valid_rsi, latest_rsi < 30, latest_rsi > 70,
+         (rsi_slope > 3) & (latest_rsi > 50), (rsi_slope < -3) & (latest_rsi < 50)],
+        [0, 1, -1, 1, -1], default=0
+    )
+    rsi_strength = np.select(
+        [~valid_rsi, latest_rsi < 30, latest_rsi > 70,
+         (rsi_slope > 3) & (latest_rsi > 50), (rsi_slope < -3) & (latest_rsi < 50)],
+        [0.5, np.minimum(1.0, (30 - latest_rsi) / 10), np.minimum(1.0, (latest_rsi - 70) / 10),
+         0.5 + np.minimum(0.3, np.abs(rsi_slope) / 10), 0.5 + np.minimum(0.3, np.abs(rsi_slope) / 10)],
+        default=0.5
+    )
+
+    macd_conditions = [
+        ~valid_macd, macd_cross_up, macd_cross_down,
+        (latest_macd > latest_signal) & (macd_slope > 0), latest_macd > latest_signal,
+        (latest_macd < latest_signal) & (macd_slope < 0), latest_macd < latest_signal
+    ]
+    macd_direction = np.select(macd_conditions, [0, 1, -1, 1, 1, -1, -1], default=0)
+    macd_strength = np.select(
+        macd_conditions,
+        [0.5, 0.8, 0.8, 0.6 + np.minimum(0.2, np.abs(macd_slope) / 100), 0.6,
+         0.6 + np.minimum(0.2, np.abs(macd_slope) / 100), 0.6],
+        default=0.5
+    )
+
+    bb_conditions = [
+        ~valid_bb,
+        latest_close < latest_lower, latest_close > latest_upper,
+        (bb_percent > 0.8) & (price_change > 0), bb_percent > 0.8,
+        (bb_percent < 0.2) & (price_change < 0), bb_percent < 0.2
+    ]
+    bb_direction = np.select(bb_conditions, [0, 1, -1, 0, -1, 0, 1], default=0)
+    bb_strength = np.select(
+        bb_conditions,
+        [0.5,
+         np.where(price_change < 0, 0.7 + np.minimum(0.2, np.abs(price_change) * 5), 0.7),
+         np.where(price_change > 0, 0.7 + np.minimum(0.2, np.abs(price_change) * 5), 0.7),
+         0.5, 0.6, 0.5, 0.6],
+        default=0.5
+    )
+
+    # Bobot ensemble per regime (lihat regime_weights); stochastic/ADX/MA hanya ikut
+    # sebagai sinyal hold saat datanya tidak cukup, sama seperti generate_trading_signals
+    weights = {name: np.array([regime_weights(regime)[name] for regime in market_regimes])
+               for name in ('rsi', 'macd', 'bollinger', 'stochastic', 'adx', 'moving_avg')}
+    total_weight = (weights['rsi'] + weights['macd'] + weights['bollinger']
+                    + np.where(valid_stoch, 0.0, weights['stochastic'])
+                    + np.where(valid_adx, 0.0, weights['adx'])
+                    + np.where(valid_ma, 0.0, weights['moving_avg']))
+
+    buy_score = np.zeros(N)
+    sell_score = np.zeros(N)
+    for direction, strength, weight in ((rsi_direction, rsi_strength, weights['rsi']),
+                                        (macd_direction, macd_strength, weights['macd']),
+                                        (bb_direction, bb_strength, weights['bollinger'])):
+        buy_score += np.where(direction == 1, strength * weight, 0.0)
+        sell_score += np.where(direction == -1, strength * weight, 0.0)
+    buy_score /= total_weight
+    sell_score /= total_weight
+
+    threshold = 0.2
+    action = np.where(buy_score > sell_score + threshold, 'buy',
+                      np.where(sell_score > buy_score + threshold, 'sell', 'hold'))
+    confidence = np.where(action == 'buy', buy_score,
+                          np.where(action == 'sell', sell_score, 1.0 - np.abs(buy_score - sell_score)))
+    confidence = np.clip(confidence, 0.0, 1.0)
+
+    trend_direction = np.array([
+        "bullish" if "bullish" in regime else "bearish" if "bearish" in regime else "neutral"
+        for regime in market_regimes
+    ])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw_percent_b = (latest_close - raw_lower) / (raw_upper - raw_lower)
+    bollinger_percent = np.where(np.isnan(raw_upper) | np.isnan(raw_lower) | (raw_upper == raw_lower),
+                                 0.5, raw_percent_b)
+
+    return pd.DataFrame({
+        'close': latest_close,
+        'data_points': lengths,
+        'market_regime': market_regimes,
+        'trend_direction': trend_direction,
+        'action': action,
+        'confidence': confidence,
+        'strong_signal': confidence >= CONFIDENCE_THRESHOLD,
+        'buy_score': buy_score,
+        'sell_score': sell_score,
+        'rsi': latest_rsi,
+        'macd': np.nan_to_num(latest_macd),
+        'macd_signal': np.nan_to_num(latest_signal),
+        'macd_histogram': np.nan_to_num(_last(macd['macd_hist'])),
+        'bollinger_percent': np.nan_to_num(bollinger_percent),
+        'stochastic_k': np.nan_to_num(_last(stochastic['stoch_k']), nan=50.0),
+        'stochastic_d': np.nan_to_num(_last(stochastic['stoch_d']), nan=50.0),
+        'adx': np.nan_to_num(_last(adx['adx']), nan=15.0),
+        'plus_di': np.nan_to_num(_last(adx['plus_di']), nan=20.0),
+        'minus_di': np.nan_to_num(_last(adx['minus_di']), nan=20.0),
+        'atr': _last(atr)
+    }, index=pd.Index(panel.coins, name='coin'))
+
+
+def screen_panel(panel: PricePanel, trading_style: str = 'standard',
+                 indicator_periods: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Sinyal trading untuk semua coin di panel. Tanpa indicator_periods, periode dipilih
+    per regime (get_optimal_parameters) dan coin dengan periode sama dihitung bersama.
+    """
+    regimes = detect_market_regimes(panel)
+
+    if indicator_periods:
+        result = compute_panel_signals(panel, indicator_periods, regimes)
+        result['indicator_periods'] = [dict(indicator_periods)] * len(result)
+        return result
+
+    groups: Dict[tuple, List[int]] = {}
+    group_periods: Dict[tuple, Dict[str, Any]] = {}
+    periods_by_regime: Dict[str, Dict[str, Any]] = {}
+    for j, regime in enumerate(regimes):
+        if regime not in periods_by_regime:
+            periods_by_regime[regime] = get_optimal_parameters(None, regime, trading_style)
+        periods = periods_by_regime[regime]
+        key = tuple(sorted(periods.items()))
+        groups.setdefault(key, []).append(j)
+        group_periods[key] = periods
+
+    frames = []
+    for key, columns in groups.items():
+        result = compute_panel_signals(panel.subset(columns), group_periods[key], regimes[columns])
+        result['indicator_periods'] = [dict(group_periods[key])] * len(result)
+        frames.append(result)
+
+    return pd.concat(frames).reindex(panel.coins)
@@ -0,0 +1,346 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import PARAMETER_OPTIMIZER_CONFIG
+from src.technical.signals import detect_market_regime, get_optimal_parameters
+from src.technical.backtest import expand_grid, grid_positions, resolve_parameters
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Keluarga parameter yang dioptimasi, urut prioritas (dievaluasi selama budget waktu masih ada).
+# Setiap keluarga dinilai dengan strategi backtest yang memakai parameter tersebut.
+PARAMETER_FAMILIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('macd', ('macd_fast', 'macd_slow', 'macd_signal')),
+    ('rsi', ('rsi_period',)),
+    ('bollinger', ('bb_period',)),
+    ('ma', ('ma_short', 'ma_medium')),
+)
+
+# Batas bawah periode kandidat (sama dengan batas di get_optimal_parameters)
+_MIN_PERIODS = {
+    'rsi_period': 5, 'macd_fast': 5, 'macd_slow': 7, 'macd_signal': 7,
+    'bb_period': 7, 'ma_short': 2, 'ma_medium': 3
+}
+
+
+def _scaled_values(name: str, base: int, scales: Sequence[float]) -> List[int]:
+    return sorted({max(_MIN_PERIODS.get(name, 2), int(round(base * scale))) for scale in scales} | {int(base)})
+
+
+def _prefix_sums(strategy_returns: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Prefix sum (T+1 x K) return, return^2 dan jumlah baris valid untuk statistik per jendela"""
+    valid = ~np.isnan(strategy_returns)
+    filled = np.where(valid, strategy_returns, 0.0)
+    pad = np.zeros((1, strategy_returns.shape[1]))
+    return (
+        np.vstack([pad, np.cumsum(filled, axis=0)]),
+        np.vstack([pad, np.cumsum(filled * filled, axis=0)]),
+        np.vstack([pad, np.cumsum(valid, axis=0)])
+    )
+
+
+def _window_sharpe(sums: np.ndarray, squares: np.ndarray, counts: np.ndarray,
+                   begin: int, end: int) -> np.ndarray:
+    """Sharpe (annualized) semua kandidat di baris [begin, end); < 2 baris valid -> NaN"""
+    n = counts[end] - counts[begin]
+    total = sums[end] - sums[begin]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / n
+        variance = np.maximum((squares[end] - squares[begin] - n * mean * mean) / (n - 1), 0.0)
+        std = np.sqrt(variance)
+        sharpe = np.where(std > 1e-12, np.sqrt(252) * mean / std, 0.0)
+    return np.where(n >= 2, sharpe, np.nan)
+
+
+def _best(scores: np.ndarray) -> int:
+    return int(np.argmax(np.where(np.isnan(scores), -np.inf, scores)))
+
+
+def _walk_forward_family(close: np.ndarray, strategy: str, names: Sequence[str],
+                         baseline: Dict[str, Any], config: Dict[str, Any],
+                         deadline: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Walk-forward satu keluarga parameter. Seri indikator dihitung sekali atas seluruh
+    histori (kausal, jadi potongan jendela training sama dengan menghitung di prefix)
+    dan dipakai bersama oleh semua kandidat dan fold. Di setiap fold kandidat dengan
+    Sharpe training terbaik dipilih, lalu dinilai di jendela test berikutnya.
+
+    Kandidat dievaluasi per batch (baseline lebih dulu); jika deadline lewat, hanya
+    kandidat yang sudah dievaluasi yang ikut dipilih (complete=False).
+    """
+    fixed = resolve_parameters(strategy, baseline)
+    grid = {name: [value] for name, value in fixed.items()}
+    for name in names:
+        grid[name] = _scaled_values(name, fixed[name], config.get('scales', [1.0]))
+    combinations = expand_grid(strategy, grid)
+    if not combinations:
+        return None
+
+    T = len(close)
+    folds = max(1, int(config.get('folds', 4)))
+    min_train = int(config.get('min_train', 60))
+    test_size = (T - min_train) // folds
+    if test_size < 10:
+        return None
+
+    baseline_key = tuple(fixed[name] for name in fixed)
+    baseline_index = next(
+        (k for k, combo in enumerate(combinations) if tuple(combo[name] for name in fixed) == baseline_key),
+        None
+    )
+    if baseline_index is not None:
+        combinations.insert(0, combinations.pop(baseline_index))
+        baseline_index = 0
+
+    returns = np.full(T, np.nan)
+    returns[1:] = close[1:] / close[:-1] - 1
+    chunk = max(1, int(config.get('candidate_chunk', 25)))
+    blocks = []
+    evaluated = 0
+    while evaluated < len(combinations):
+        if blocks and deadline is not None and time.time() >= deadline:
+            break
+        batch = combinations[evaluated:evaluated + chunk]
+        positions, starts = grid_positions(close, strategy, batch)
+        block = np.full(positions.shape, np.nan)
+        block[1:] = positions[:-1] * returns[1:, None]
+        block[np.arange(T)[:, None] < starts[None, :]] = np.nan
+        blocks.append(block)
+        evaluated += len(batch)
+
+    complete = evaluated == len(combinations)
+    combinations = combinations[:evaluated]
+    sums, squares, counts = _prefix_sums(np.hstack(blocks))
+
+    selected_oos, baseline_oos = [], []
+    for fold in range(folds):
+        test_begin = T - (folds - fold) * test_size
+        train_scores = _window_sharpe(sums, squares, counts, 0, test_begin)
+        if np.isnan(train_scores).all():
+            continue
+        test_scores = _window_sharpe(sums, squares, counts, test_begin, test_begin + test_size)
+        selected_oos.append(test_scores[_best(train_scores)])
+        baseline_oos.append(test_scores[baseline_index] if baseline_index is not None else np.nan)
+
+    if not selected_oos:
+        return None
+
+    walk_forward_score = float(np.nanmean(selected_oos)) if not np.isnan(selected_oos).all() else float('nan')
+    baseline_score = float(np.nanmean(baseline_oos)) if not np.isnan(baseline_oos).all() else float('nan')
+    # Pilihan akhir: kandidat terbaik atas seluruh histori (langkah walk-forward berikutnya)
+    selected = combinations[_best(_window_sharpe(sums, squares, counts, 0, T))]
+
+    improvement = config.get('min_improvement', 0.1)
+    adopted = bool(
+        not np.isnan(walk_forward_score)
+        and (np.isnan(baseline_score) or walk_forward_score >= baseline_score + improvement)
+    )
+    return {
+        'strategy': strategy,
+        'candidates': len(combinations),
+        'complete': complete,
+        'folds': len(selected_oos),
+        'baseline_score': baseline_score,
+        'walk_forward_score': walk_forward_score,
+        'selected': {name: selected[name] for name in names},
+        'adopted': adopted
+    }
+
+
+def optimize_parameters(prices_df: pd.DataFrame, market_regime: Optional[str] = None,
+                        trading_style: str = 'standard',
+                        time_budget: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Periode indikator untuk satu coin: kandidat di sekitar tabel get_optimal_parameters
+    (periode x PARAMETER_OPTIMIZER_CONFIG['scales']) dinilai walk-forward pada histori
+    coin itu sendiri. Kandidat hanya menggantikan nilai tabel jika Sharpe out-of-sample
+    walk-forward lebih baik minimal min_improvement.
+
+    time_budget (detik): keluarga parameter yang belum sempat dievaluasi tetap memakai
+    nilai tabel (hasil ditandai complete=False).
+    """
+    started = time.time()
+    config = PARAMETER_OPTIMIZER_CONFIG
+    if market_regime is None:
+        market_regime = detect_market_regime(prices_df)
+
+    baseline = get_optimal_parameters(None, market_regime, trading_style)
+    result = {
+        'market_regime': market_regime,
+        'trading_style': trading_style,
+        'parameters': dict(baseline),
+        'baseline': dict(baseline),
+        'families': {},
+        'data_points': len(prices_df),
+        'status': 'insufficient_data',
+        'complete': False,
+        'elapsed': 0.0
+    }
+
+    close = prices_df['close'].to_numpy(dtype=float) if 'close' in prices_df.columns else np.array([])
+    if len(close) < config.get('min_history', 120) or np.isnan(close).any():
+        result['elapsed'] = time.time() - started
+        return result
+
+    complete = True
+    deadline = started + time_budget if time_budget is not None else None
+    for strategy, names in PARAMETER_FAMILIES:
+        if deadline is not None and time.time() >= deadline:
+            complete = False
+            logger.info(f"Budget optimasi parameter habis sebelum keluarga {strategy}, pakai nilai tabel")
+            break
+        evaluation = _walk_forward_family(close, strategy, names, baseline, config, deadline)
+        if evaluation is None:
+            continue
+        complete = complete and evaluation['complete']
+        result['families'][strategy] = evaluation
+        if evaluation['adopted']:
+            result['parameters'].update(evaluation['selected'])
+
+    adopted = [name for name, evaluation in result['families'].items() if evaluation['adopted']]
+    result['status'] = 'optimized' if adopted else 'baseline'
+    result['complete'] = complete
+    result['elapsed'] = time.time() - started
+    return result
+
+
+def precompute_parameters(prices_df: pd.DataFrame, trading_styles: Sequence[str]) -> List[Dict[str, Any]]:
+    """Optimasi tanpa budget untuk beberapa trading style (job precompute, bisa di process executor)"""
+    market_regime = detect_market_regime(prices_df)
+    return [optimize_parameters(prices_df, market_regime, style) for style in trading_styles]
+
+
+class OptimizedParameterStore:
+    """
+    Hasil optimize_parameters per (coin, trading style), LRU dengan TTL. Diisi oleh job
+    precompute (histori panjang) atau on-demand dari request /analysis/* yang membawa
+    histori cukup (dengan budget waktu).
+
+    Key sengaja tidak memuat regime: regime request dideteksi dari jendela pendek
+    (30-40 hari) sehingga hampir tidak pernah sama dengan regime histori panjang yang
+    dipakai saat optimasi. Regime dan jumlah candle histori optimasi tersimpan di hasil.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None,
+                 partial_ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else PARAMETER_OPTIMIZER_CONFIG.get('ttl', 6 * 3600)
+        self.partial_ttl = partial_ttl if partial_ttl is not None else PARAMETER_OPTIMIZER_CONFIG.get('partial_ttl', 300)
+        self.max_entries = max_entries or PARAMETER_OPTIMIZER_CONFIG.get('max_entries', 5000)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.optimizations = 0
+
+    def get(self, coin: str, trading_style: str) -> Optional[Dict[str, Any]]:
+        key = (coin, trading_style)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() >= entry[1]:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, coin: str, result: Dict[str, Any]):
+        """Simpan hasil; hasil yang terpotong time_budget hanya bertahan partial_ttl"""
+        key = (coin, result['trading_style'])
+        ttl = self.ttl if result.get('complete') else self.partial_ttl
+        with self._lock:
+            self._entries[key] = (result, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def resolve(self, coin: str, prices_df: pd.DataFrame, trading_style: str = 'standard',
+                time_budget: Optional[float] = None) -> Dict[str, Any]:
+        """Hasil dari cache, atau optimasi sekarang (satu komputasi per key untuk request bersamaan)"""
+        cached = self.get(coin, trading_style)
+        if cached is not None:
+            return cached
+
+        key = (coin, trading_style)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                cached = self.get(coin, trading_style)
+                if cached is not None:
+                    return cached
+                result = optimize_parameters(prices_df, None, trading_style, time_budget)
+                with self._lock:
+                    self.optimizations += 1
+                # Histori terlalu pendek tidak di-cache: request/precompute dengan histori cukup bisa mengisinya
+                if result['status'] != 'insufficient_data':
+                    self.put(coin, result)
+                return result
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'optimizations': self.optimizations,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_store: Optional[OptimizedParameterStore] = None
+_store_lock = threading.Lock()
+
+
+def get_parameter_store() -> OptimizedParameterStore:
+    """Store hasil optimasi parameter bersama untuk proses ini"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = OptimizedParameterStore()
+    return _store
+
+
+def get_optimized_parameters(coin: str, prices_df: pd.DataFrame, market_regime: Optional[str] = None,
+                             trading_style: str = 'standard') -> Dict[str, Any]:
+    """
+    Pengganti get_optimal_parameters untuk coin yang diketahui: periode hasil walk-forward
+    (cache per coin/style, budget waktu request). Tanpa hasil optimasi (histori pendek dan
+    belum di-precompute) atau jika optimizer nonaktif: tabel untuk regime request.
+    """
+    if market_regime is None:
+        market_regime = detect_market_regime(prices_df)
+    if PARAMETER_OPTIMIZER_CONFIG.get('enabled', True):
+        result = get_parameter_store().resolve(
+            coin, prices_df, trading_style,
+            time_budget=PARAMETER_OPTIMIZER_CONFIG.get('time_budget')
+        )
+        if result['status'] != 'insufficient_data':
+            return dict(result['parameters'])
+    return get_optimal_parameters(prices_df, market_regime, trading_style)
@@ -21,6 +21,7 @@ except ImportError:
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from config import TRADING_SIGNAL_WINDOW, CONFIDENCE_THRESHOLD
+from src.technical.indicator_graph import get_indicator_graph, memoized_indicator
 
 # Setup logging
 logging.basicConfig(
@@ -30,6 +31,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+@memoized_indicator("market_regime")
 def detect_market_regime(prices_df: pd.DataFrame, window: int = 30) -> str:
     # Pastikan ada cukup data
     if len(prices_df) < window * 2:
@@ -96,7 +98,7 @@ def detect_market_regime(prices_df: pd.DataFrame, window: int = 30) -> str:
         current_minus_di = 15
     
     # Hitung slope dari moving average untuk arah tren
-    ma_short = close_prices.rolling(window=20).mean()
+    ma_short = get_indicator_graph().sma(close_prices, 20)
     ma_slope = (ma_short.iloc[-1] - ma_short.iloc[-window]) / ma_short.iloc[-window] if len(ma_short) > window else 0
     
     # Logika deteksi regime
@@ -230,8 +232,8 @@ def get_optimal_parameters(prices_df: pd.DataFrame, market_regime: str = None,
     return params
 
 
-def weighted_signal_ensemble(signals: Dict[str, Dict[str, Any]], 
-                           market_regime: str) -> Dict[str, Any]:
+def regime_weights(market_regime: str) -> Dict[str, float]:
+    """Bobot tiap indikator di ensemble sinyal untuk market regime tertentu"""
     # Default weights
     weights = {
         'rsi': 0.15,
@@ -284,6 +286,12 @@ def weighted_signal_ensemble(signals: Dict[str, Dict[str, Any]],
             'moving_avg': 0.15   # MA untuk dukungan/resistensi
         }
     
+    return weights
+
+def weighted_signal_ensemble(signals: Dict[str, Dict[str, Any]], 
+                           market_regime: str) -> Dict[str, Any]:
+    weights = regime_weights(market_regime)
+    
     # Hitung weighted scores
     buy_score = 0
     sell_score = 0
@@ -348,6 +356,7 @@ def weighted_signal_ensemble(signals: Dict[str, Dict[str, Any]],
     }
 
 
+@memoized_indicator("rsi")
 def calculate_rsi(prices: pd.Series, window: int = 14) -> pd.Series:
     # Pastikan ada cukup data untuk perhitungan
     if len(prices) < window * 2:
@@ -406,6 +415,7 @@ def _calculate_rsi_pandas(prices: pd.Series, window: int = 14) -> pd.Series:
     return pd.Series(rsi_values, index=prices.index)
 
 
+@memoized_indicator("macd")
 def calculate_macd(prices: pd.Series, 
                   fast_period: int = 12, 
                   slow_period: int = 26, 
@@ -468,6 +478,7 @@ def _calculate_macd_pandas(prices: pd.Series,
     return macd, signal, histogram
 
 
+@memoized_indicator("bollinger")
 def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
     # Pastikan ada cukup data untuk perhitungan
     if len(prices) < window:
@@ -514,8 +525,9 @@ def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: floa
 def _calculate_bollinger_pandas(prices: pd.Series, window: int = 20, num_std: float = 2.0) -> Tuple[pd.Series, pd.Series, pd.Series]:
     """Implementasi Bollinger Bands menggunakan pandas"""
     # Gunakan SMA yang sebenarnya untuk konsistensi
-    middle = prices.rolling(window=window, min_periods=window).mean()
-    std = prices.rolling(window=window, min_periods=window).std()
+    graph = get_indicator_graph()
+    middle = graph.sma(prices, window)
+    std = graph.rolling_std(prices, window)
     
     upper = middle + (std * num_std)
     lower = middle - (std * num_std)
@@ -523,6 +535,7 @@ def _calculate_bollinger_pandas(prices: pd.Series, window: int = 20, num_std: fl
     return upper, middle, lower
 
 
+@memoized_indicator("stochastic")
 def calculate_stochastic(prices: pd.Series, 
                         high_prices: pd.Series, 
                         low_prices: pd.Series,
@@ -586,8 +599,9 @@ def _calculate_stochastic_pandas(prices: pd.Series,
     # Stochastic %K = (Current Close - Lowest Low) / (Highest High - Lowest Low) * 100
     
     # Hitung range k_period
-    lowest_low = low_prices.rolling(window=k_period, min_periods=k_period).min()
-    highest_high = high_prices.rolling(window=k_period, min_periods=k_period).max()
+    graph = get_indicator_graph()
+    lowest_low = graph.rolling_min(low_prices, k_period)
+    highest_high = graph.rolling_max(high_prices, k_period)
     
     # Hindari pembagian dengan nol
     denominator = highest_high - lowest_low
@@ -603,6 +617,7 @@ def _calculate_stochastic_pandas(prices: pd.Series,
     return k, d
 
 
+@memoized_indicator("adx")
 def calculate_adx(high_prices: pd.Series, 
                 low_prices: pd.Series, 
                 close_prices: pd.Series, 
@@ -742,6 +757,7 @@ def _calculate_adx_pandas(high_prices: pd.Series,
         return empty_series, empty_series, empty_series
 
 
+@memoized_indicator("atr")
 def calculate_atr(high_prices: pd.Series, 
                 low_prices: pd.Series, 
                 close_prices: pd.Series, 
@@ -811,6 +827,7 @@ def _calculate_atr_pandas(high_prices: pd.Series,
     return atr
 
 
+@memoized_indicator("ichimoku")
 def calculate_ichimoku(prices_df: pd.DataFrame, 
                       conversion_period: int = 9, 
                       base_period: int = 26,
@@ -862,153 +879,10 @@ def backtest_strategy(prices_df: pd.DataFrame,
                     strategy_type: str = 'macd', 
                     indicator_periods: Optional[Dict[str, Any]] = None,
                     initial_capital: float = 10000.0) -> Dict[str, Any]:
-    # Cek apakah data cukup
-    if len(prices_df) < 50:
-        logger.warning("Tidak cukup data untuk backtest. Minimal 50 titik data diperlukan.")
-        return {"error": "Insufficient data for backtesting"}
-    
-    # Copy data agar tidak mengubah original
-    df = prices_df.copy()
-    
-    # Tambahkan indikator sesuai strategi
-    if strategy_type == 'macd':
-        macd_fast = indicator_periods.get('macd_fast', 12) if indicator_periods else 12
-        macd_slow = indicator_periods.get('macd_slow', 26) if indicator_periods else 26
-        macd_signal = indicator_periods.get('macd_signal', 9) if indicator_periods else 9
-        
-        macd, signal, hist = calculate_macd(df['close'], macd_fast, macd_slow, macd_signal)
-        
-        df['macd'] = macd
-        df['macd_signal'] = signal
-        df['macd_hist'] = hist
-        df['position'] = 0
-        
-        # Generate signals
-        df.loc[macd > signal, 'position'] = 1  # Buy signal
-        df.loc[macd < signal, 'position'] = -1  # Sell signal
-        
-    elif strategy_type == 'rsi':
-        rsi_period = indicator_periods.get('rsi_period', 14) if indicator_periods else 14
-        rsi_overbought = indicator_periods.get('rsi_overbought', 70) if indicator_periods else 70
-        rsi_oversold = indicator_periods.get('rsi_oversold', 30) if indicator_periods else 30
-        
-        df['rsi'] = calculate_rsi(df['close'], rsi_period)
-        df['position'] = 0
-        
-        # Generate signals - buy when oversold, sell when overbought
-        df.loc[df['rsi'] < rsi_oversold, 'position'] = 1  # Buy signal
-        df.loc[df['rsi'] > rsi_overbought, 'position'] = -1  # Sell signal
-        
-    elif strategy_type == 'bollinger':
-        bb_period = indicator_periods.get('bb_period', 20) if indicator_periods else 20
-        bb_std = indicator_periods.get('bb_std', 2.0) if indicator_periods else 2.0
-        
-        upper, middle, lower = calculate_bollinger_bands(df['close'], bb_period, bb_std)
-        
-        df['bb_upper'] = upper
-        df['bb_middle'] = middle
-        df['bb_lower'] = lower
-        df['position'] = 0
-        
-        # Buy when price touches lower band, sell when it touches upper band
-        df.loc[df['close'] <= df['bb_lower'], 'position'] = 1
-        df.loc[df['close'] >= df['bb_upper'], 'position'] = -1
-        
-    else:
-        # Default strategy: simple moving average crossover
-        short_ma = indicator_periods.get('ma_short', 20) if indicator_periods else 20
-        long_ma = indicator_periods.get('ma_medium', 50) if indicator_periods else 50
-        
-        df['short_ma'] = df['close'].rolling(window=short_ma).mean()
-        df['long_ma'] = df['close'].rolling(window=long_ma).mean()
-        df['position'] = 0
-        
-        # Buy when short MA crosses above long MA, sell when it crosses below
-        df.loc[df['short_ma'] > df['long_ma'], 'position'] = 1
-        df.loc[df['short_ma'] < df['long_ma'], 'position'] = -1
-    
-    # Hitung perubahan posisi untuk trade signals
-    df['position_change'] = df['position'].diff()
-    
-    # Simulasi trading
-    df['returns'] = df['close'].pct_change()
-    df['strategy_returns'] = df['position'].shift(1) * df['returns']
-    
-    # Hapus NaN di awal
-    df = df.dropna()
-    
-    # Hitung metrik
-    capital = initial_capital
-    holdings = 0
-    trades = []
-    entries = []
-    exits = []
-    
-    for i, row in df.iterrows():
-        if row['position_change'] > 0:  # Enter long position
-            entry_price = row['close']
-            entry_date = i
-            holdings = capital / entry_price
-            entries.append((entry_date, entry_price))
-            trades.append({
-                'type': 'buy',
-                'date': entry_date,
-                'price': entry_price,
-                'holdings': holdings,
-                'capital': capital
-            })
-        elif row['position_change'] < 0 and holdings > 0:  # Exit long position
-            exit_price = row['close']
-            exit_date = i
-            capital = holdings * exit_price
-            exits.append((exit_date, exit_price))
-            trades.append({
-                'type': 'sell',
-                'date': exit_date,
-                'price': exit_price,
-                'holdings': 0,
-                'capital': capital
-            })
-            holdings = 0
-    
-    # Hitung hasil akhir
-    final_capital = capital if holdings == 0 else holdings * df['close'].iloc[-1]
-    total_return = (final_capital - initial_capital) / initial_capital
-    annual_return = total_return * (252 / len(df))  # Annualized return
-    
-    # Hitung drawdown
-    df['cumulative_returns'] = (1 + df['strategy_returns']).cumprod()
-    df['cumulative_max'] = df['cumulative_returns'].cummax()
-    df['drawdown'] = (df['cumulative_max'] - df['cumulative_returns']) / df['cumulative_max']
-    
-    max_drawdown = df['drawdown'].max()
-    
-    # Hitung Sharpe ratio (annualized, assuming risk-free rate of 0)
-    sharpe_ratio = np.sqrt(252) * df['strategy_returns'].mean() / df['strategy_returns'].std() if df['strategy_returns'].std() != 0 else 0
-    
-    # Hitung win rate
-    if len(trades) < 2:
-        win_rate = 0
-    else:
-        wins = 0
-        for i in range(1, len(trades), 2):
-            if i < len(trades):
-                if trades[i]['capital'] > trades[i-1]['capital']:
-                    wins += 1
-        win_rate = wins / ((len(trades) // 2) or 1)  # Avoid division by zero
-    
-    return {
-        'total_return': total_return,
-        'annual_return': annual_return,
-        'max_drawdown': max_drawdown,
-        'sharpe_ratio': sharpe_ratio,
-        'win_rate': win_rate,
-        'num_trades': len(trades) // 2,  # Bagi 2 karena setiap trade = entry + exit
-        'trades': trades,
-        'returns_series': df['strategy_returns'],
-        'cumulative_returns': df['cumulative_returns'],
-        'drawdown_series': df['drawdown']
-    }
+    # ⚡ OPTIMIZATION: Posisi, trade, equity dan drawdown dihitung sebagai operasi array
+    # (src.technical.backtest) menggantikan loop df.iterrows(); hasil identik
+    from src.technical.backtest import run_backtest
+    return run_backtest(prices_df, strategy_type, indicator_periods, initial_capital)
 
 
 def generate_trading_signals(prices_df: pd.DataFrame, 
@@ -1229,20 +1103,20 @@ def generate_trading_signals(prices_df: pd.DataFrame,
     try:
         # Hitung MA hanya jika panjang data cukup
         if len(close_prices) >= ma_short:
-            indicators_result['sma_short'] = close_prices.rolling(window=ma_short).mean()
+            indicators_result['sma_short'] = get_indicator_graph().sma(close_prices, ma_short)
             valid_indicators['ma'] = True
         else:
             # Buat SMA kosong
             indicators_result['sma_short'] = pd.Series(np.nan, index=close_prices.index)
             
         if len(close_prices) >= ma_medium:
-            indicators_result['sma_medium'] = close_prices.rolling(window=ma_medium).mean()
+            indicators_result['sma_medium'] = get_indicator_graph().sma(close_prices, ma_medium)
         else:
             # Buat SMA kosong
             indicators_result['sma_medium'] = pd.Series(np.nan, index=close_prices.index)
             
         if len(close_prices) >= ma_long:
-            indicators_result['sma_long'] = close_prices.rolling(window=ma_long).mean()
+            indicators_result['sma_long'] = get_indicator_graph().sma(close_prices, ma_long)
         else:
             # Buat SMA kosong
             indicators_result['sma_long'] = pd.Series(np.nan, index=close_prices.index)
@@ -0,0 +1,709 @@
+import os
+import math
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Path handling
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config import STREAMING_INDICATOR_CONFIG
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+EPS = float(np.finfo(float).eps)
+
+SNAPSHOT_VERSION = 1
+
+# Periode default sama dengan TechnicalIndicators.__init__
+DEFAULT_PERIODS = {
+    'rsi_period': 14,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'bb_period': 20,
+    'stoch_k': 14,
+    'stoch_d': 3,
+    'ma_short': 20,
+    'ma_medium': 50,
+    'ma_long': 200,
+    'atr_period': 14,
+    'adx_period': 14,
+    'ichimoku_conversion': 9,
+    'ichimoku_base': 26,
+    'ichimoku_span_b': 52,
+    'ichimoku_displacement': 26
+}
+
+
+def _is_nan(value: float) -> bool:
+    return value is None or value != value
+
+
+def _gt(a: float, b: float) -> bool:
+    """Perbandingan ala pandas: NaN selalu False"""
+    return not _is_nan(a) and not _is_nan(b) and a > b
+
+
+def _lt(a: float, b: float) -> bool:
+    return not _is_nan(a) and not _is_nan(b) and a < b
+
+
+def _le(a: float, b: float) -> bool:
+    return not _is_nan(a) and not _is_nan(b) and a <= b
+
+
+def _ge(a: float, b: float) -> bool:
+    return not _is_nan(a) and not _is_nan(b) and a >= b
+
+
+def _nonzero(value: float) -> float:
+    """Padanan series.replace(0, eps)"""
+    return EPS if value == 0 else value
+
+
+def _div(a: float, b: float) -> float:
+    """Pembagian float64 (x/0 -> inf/NaN seperti pandas, bukan ZeroDivisionError)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.float64(a) / np.float64(b))
+
+
+def _cross_up(a: float, b: float, prev_a: float, prev_b: float) -> bool:
+    return _gt(a, b) and _le(prev_a, prev_b)
+
+
+def _cross_down(a: float, b: float, prev_a: float, prev_b: float) -> bool:
+    return _lt(a, b) and _ge(prev_a, prev_b)
+
+
+def period_key(periods: Dict[str, Any]) -> Tuple:
+    """Key set periode (urutan dict tidak berpengaruh)"""
+    return tuple(sorted((k, periods[k]) for k in DEFAULT_PERIODS if k in periods))
+
+
+# ----------------------------------------------------------------------
+# State primitif: setiap update O(1) (rolling extremum O(1) amortized)
+# ----------------------------------------------------------------------
+
+class _Ema:
+    """ewm(adjust=False).mean(): nilai pertama = observasi pertama"""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if _is_nan(self.value):
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.value = state['value']
+
+
+class _RollingWindow:
+    """
+    rolling(window).mean() dan .std() (ddof=1) dengan Welford add/remove.
+    Setiap resync_interval update, mean dan M2 dihitung ulang dari isi window
+    supaya drift floating point tidak menumpuk di stream yang panjang.
+    """
+
+    def __init__(self, window: int, resync_interval: int = 1000):
+        self.window = window
+        self.resync_interval = max(1, resync_interval)
+        self.values: deque = deque(maxlen=window)
+        self.mean_value = 0.0
+        self.m2 = 0.0
+        self.since_resync = 0
+
+    def update(self, x: float):
+        if len(self.values) < self.window:
+            self.values.append(x)
+            delta = x - self.mean_value
+            self.mean_value += delta / len(self.values)
+            self.m2 += delta * (x - self.mean_value)
+        else:
+            old = self.values[0]
+            self.values.append(x)
+            new_mean = self.mean_value + (x - old) / self.window
+            self.m2 += (x - old) * (x - new_mean + old - self.mean_value)
+            self.mean_value = new_mean
+
+        self.since_resync += 1
+        if self.since_resync >= self.resync_interval:
+            self._resync()
+
+    def _resync(self):
+        n = len(self.values)
+        self.mean_value = math.fsum(self.values) / n if n else 0.0
+        self.m2 = math.fsum((v - self.mean_value) ** 2 for v in self.values)
+        self.since_resync = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    def mean(self) -> float:
+        return self.mean_value if self.full else NAN
+
+    def std(self) -> float:
+        if not self.full or self.window < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.window - 1))
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'values': list(self.values), 'mean': self.mean_value, 'm2': self.m2,
+                'since_resync': self.since_resync}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.values = deque(state['values'], maxlen=self.window)
+        self.mean_value = state['mean']
+        self.m2 = state['m2']
+        self.since_resync = state['since_resync']
+
+
+class _RollingExtremum:
+    """rolling(window).max()/.min() dengan monotonic deque (amortized O(1))"""
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        self.candidates: deque = deque()  # (posisi, nilai)
+        self.position = -1
+
+    def update(self, x: float) -> float:
+        self.position += 1
+        if self.is_max:
+            while self.candidates and self.candidates[-1][1] <= x:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= x:
+                self.candidates.pop()
+        self.candidates.append((self.position, x))
+        while self.candidates[0][0] <= self.position - self.window:
+            self.candidates.popleft()
+        return self.value()
+
+    def value(self) -> float:
+        if self.position + 1 < self.window or not self.candidates:
+            return NAN
+        return self.candidates[0][1]
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'candidates': [list(c) for c in self.candidates], 'position': self.position}
+
+    def set_state(self, state: Dict[str, Any]):
+        self.candidates = deque(tuple(c) for c in state['candidates'])
+        self.position = state['position']
+
+
+class _WilderRsi:
+    """
+    RSI seperti TechnicalIndicators._calculate_rsi_pandas: rata-rata sederhana
+    `period` gain/loss pertama (gain bar pertama = 0) sebagai seed, lalu smoothing Wilder.
+    """
+
+    def __init__(self, period: int):
+        self.period = period
+        self.count = 0
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.avg_gain = NAN
+        self.avg_loss = NAN
+
+    def update(self, delta: float) -> float:
+        gain = delta if _gt(delta, 0) else 0.0
+        loss = -delta if _lt(delta, 0) else 0.0
+        self.count += 1
+
+        if self.count <= self.period:
+            self.gain_sum += gain
+            self.loss_sum += loss
+            if self.count == self.period:
+                self.avg_gain = self.gain_sum / self.period
+                self.avg_loss = self.loss_sum / self.period
+            return NAN
+
+        self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+        self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        rs = self.avg_gain / self.avg_loss if self.avg_loss != 0 else 100
+        return 100 - (100 / (1 + rs))
+
+    def get_state(self) -> Dict[str, Any]:
+        return {'count': self.count, 'gain_sum': self.gain_sum, 'loss_sum': self.loss_sum,
+                'avg_gain': self.avg_gain, 'avg_loss': self.avg_loss}
+
+    def set_state(self, state: Dict[str, Any]):
+        for key in ('count', 'gain_sum', 'loss_sum', 'avg_gain', 'avg_loss'):
+            setattr(self, key, state[key])
+
+
+class StreamingIndicatorEngine:
+    """
+    Indikator TechnicalIndicators (EMA/SMA, MACD, RSI Wilder, ATR/ADX, Bollinger,
+    stochastic, OBV, Ichimoku) yang dimajukan satu candle per update.
+
+    Baris hasil update ke-i sama (dalam toleransi float) dengan baris terakhir
+    TechnicalIndicators(prices[:i+1], periods).add_indicators() jalur pandas, termasuk
+    aturan "data belum cukup" (NaN, atau default ADX 15/20/20). State bisa di-snapshot
+    ke dict biasa (pickle) dan dipulihkan per (coin, set periode).
+    """
+
+    def __init__(self, periods: Optional[Dict[str, Any]] = None, history_size: Optional[int] = None,
+                 resync_interval: Optional[int] = None):
+        self.periods = dict(DEFAULT_PERIODS)
+        if periods:
+            for key, value in periods.items():
+                if key in self.periods:
+                    self.periods[key] = value
+
+        self.history_size = history_size or STREAMING_INDICATOR_CONFIG.get('history_size', 300)
+        resync = resync_interval or STREAMING_INDICATOR_CONFIG.get('resync_interval', 1000)
+        p = self.periods
+
+        self.ma_periods = sorted({p['ma_short'], p['ma_medium'], p['ma_long']})
+        self._sma = {period: _RollingWindow(period, resync) for period in self.ma_periods}
+        self._ema = {period: _Ema(2 / (period + 1)) for period in self.ma_periods}
+
+        self._macd_fast = _Ema(2 / (p['macd_fast'] + 1))
+        self._macd_slow = _Ema(2 / (p['macd_slow'] + 1))
+        self._macd_signal = _Ema(2 / (p['macd_signal'] + 1))
+
+        self._rsi = _WilderRsi(p['rsi_period'])
+
+        self._stoch_low = _RollingExtremum(p['stoch_k'], is_max=False)
+        self._stoch_high = _RollingExtremum(p['stoch_k'], is_max=True)
+        self._stoch_d = _RollingWindow(p['stoch_d'], resync)
+
+        self._bollinger = _RollingWindow(p['bb_period'], resync)
+
+        self._atr = _Ema(1 / p['atr_period'])
+        self._adx_tr = _Ema(1 / p['adx_period'])
+        self._adx_plus_dm = _Ema(1 / p['adx_period'])
+        self._adx_minus_dm = _Ema(1 / p['adx_period'])
+        self._adx = _Ema(1 / p['adx_period'])
+
+        self._ichimoku = {
+            name: (_RollingExtremum(p[name], is_max=True), _RollingExtremum(p[name], is_max=False))
+            for name in ('ichimoku_conversion', 'ichimoku_base', 'ichimoku_span_b')
+        }
+        displacement = p['ichimoku_displacement']
+        self._span_a_lag: deque = deque(maxlen=displacement + 1)
+        self._span_b_lag: deque = deque(maxlen=displacement + 1)
+
+        self.obv = 0.0
+        self.count = 0
+        self.last_timestamp = None
+        self._prev: Dict[str, float] = {}
+        self._history: deque = deque(maxlen=self.history_size)
+        # State sebelum candle terakhir update_frame (untuk revisi candle yang masih berjalan)
+        self._checkpoint: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    # Update
+    # ------------------------------------------------------------------
+
+    def update(self, close: float, high: Optional[float] = None, low: Optional[float] = None,
+               volume: Optional[float] = None, timestamp: Any = None) -> Dict[str, Any]:
+        """Majukan semua indikator satu candle; return baris indikator untuk candle ini"""
+        self._checkpoint = None
+        p = self.periods
+        close = float(close)
+        high = close if high is None or _is_nan(high) else float(high)
+        low = close if low is None or _is_nan(low) else float(low)
+        prev = self._prev
+        prev_close = prev.get('close', NAN)
+        prev_high = prev.get('high', NAN)
+        prev_low = prev.get('low', NAN)
+        self.count += 1
+        n = self.count
+
+        row: Dict[str, Any] = {'close': close, 'high': high, 'low': low}
+        if volume is not None:
+            row['volume'] = float(volume)
+
+        # Moving averages
+        for period in self.ma_periods:
+            self._sma[period].update(close)
+            ema = self._ema[period].update(close)
+            row[f'sma_{period}'] = self._sma[period].mean()
+            row[f'ema_{period}'] = ema if n >= period else NAN
+
+        # MACD
+        macd = self._macd_fast.update(close) - self._macd_slow.update(close)
+        macd_signal = self._macd_signal.update(macd)
+        if n >= p['macd_slow']:
+            row['macd'] = macd
+            row['macd_signal'] = macd_signal
+            row['macd_hist'] = macd - macd_signal
+        else:
+            row['macd'] = row['macd_signal'] = row['macd_hist'] = NAN
+        row['macd_cross_up'] = int(_cross_up(row['macd'], row['macd_signal'],
+                                             prev.get('macd', NAN), prev.get('macd_signal', NAN)))
+        row['macd_cross_down'] = int(_cross_down(row['macd'], row['macd_signal'],
+                                                 prev.get('macd', NAN), prev.get('macd_signal', NAN)))
+
+        # True range (bar pertama: high - low)
+        if _is_nan(prev_close):
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        # ADX
+        up_move = high - prev_high
+        down_move = prev_low - low
+        plus_dm = up_move if (_gt(up_move, down_move) and _gt(up_move, 0)) else 0.0
+        minus_dm = down_move if (_gt(down_move, up_move) and _gt(down_move, 0)) else 0.0
+        adx_atr = _nonzero(self._adx_tr.update(true_range))
+        plus_di = 100 * (self._adx_plus_dm.update(plus_dm) / adx_atr)
+        minus_di = 100 * (self._adx_minus_dm.update(minus_dm) / adx_atr)
+        dx = 100 * (abs(plus_di - minus_di) / _nonzero(plus_di + minus_di))
+        adx = self._adx.update(dx)
+        if n >= p['adx_period']:
+            row['adx'], row['plus_di'], row['minus_di'] = adx, plus_di, minus_di
+        else:
+            row['adx'], row['plus_di'], row['minus_di'] = 15.0, 20.0, 20.0
+
+        # RSI
+        rsi = self._rsi.update(close - prev_close if not _is_nan(prev_close) else NAN)
+        row['rsi'] = rsi
+        row['rsi_overbought'] = _gt(rsi, 70)
+        row['rsi_oversold'] = _lt(rsi, 30)
+
+        # Stochastic
+        low_min = self._stoch_low.update(low)
+        high_max = self._stoch_high.update(high)
+        stoch_k = _div(close - low_min, _nonzero(high_max - low_min)) * 100
+        if not _is_nan(stoch_k):
+            self._stoch_d.update(stoch_k)
+        stoch_d = self._stoch_d.mean()
+        row['stoch_k'], row['stoch_d'] = stoch_k, stoch_d
+        row['stoch_cross_up'] = int(_cross_up(stoch_k, stoch_d, prev.get('stoch_k', NAN), prev.get('stoch_d', NAN)))
+        row['stoch_cross_down'] = int(_cross_down(stoch_k, stoch_d, prev.get('stoch_k', NAN), prev.get('stoch_d', NAN)))
+
+        # Bollinger Bands
+        self._bollinger.update(close)
+        bb_middle, bb_std = self._bollinger.mean(), self._bollinger.std()
+        row['bb_middle'], row['bb_std'] = bb_middle, bb_std
+        row['bb_upper'] = bb_middle + 2 * bb_std
+        row['bb_lower'] = bb_middle - 2 * bb_std
+        bb_range = _nonzero(row['bb_upper'] - row['bb_lower'])
+        row['bb_pct_b'] = (close - row['bb_lower']) / bb_range
+        row['bb_bandwidth'] = _div(bb_range, bb_middle)
+
+        # ATR
+        atr = self._atr.update(true_range)
+        row['atr'] = atr if n >= p['atr_period'] else NAN
+        row['atr_pct'] = _div(row['atr'], close) * 100
+
+        # OBV: volume * sign(perubahan close), bar pertama 0
+        if volume is not None:
+            direction = np.sign(close - prev_close) if not _is_nan(prev_close) else NAN
+            contribution = float(volume) * direction
+            self.obv += 0.0 if _is_nan(contribution) else contribution
+            row['obv'] = self.obv
+
+        self._update_ichimoku(row, close, high, low, prev)
+
+        # Golden/death cross (MA medium vs long)
+        medium, long_ = f"sma_{p['ma_medium']}", f"sma_{p['ma_long']}"
+        row['golden_cross'] = int(_cross_up(row[medium], row[long_], prev.get(medium, NAN), prev.get(long_, NAN)))
+        row['death_cross'] = int(_cross_down(row[medium], row[long_], prev.get(medium, NAN), prev.get(long_, NAN)))
+
+        self._prev = {key: row[key] for key in (
+            'close', 'high', 'low', 'macd', 'macd_signal', 'stoch_k', 'stoch_d',
+            'tenkan_sen', 'kijun_sen', medium, long_
+        )}
+        self.last_timestamp = timestamp
+        self._history.append((timestamp, row))
+        return row
+
+    def _update_ichimoku(self, row: Dict[str, Any], close: float, high: float, low: float,
+                         prev: Dict[str, float]):
+        lines = {}
+        for name, (highest, lowest) in self._ichimoku.items():
+            lines[name] = (highest.update(high) + lowest.update(low)) / 2
+
+        tenkan, kijun = lines['ichimoku_conversion'], lines['ichimoku_base']
+        row['tenkan_sen'], row['kijun_sen'] = tenkan, kijun
+
+        # Senkou span digeser `displacement` bar ke depan: nilai bar sekarang = midpoint
+        # dari displacement bar sebelumnya
+        self._span_a_lag.append((tenkan + kijun) / 2)
+        self._span_b_lag.append(lines['ichimoku_span_b'])
+        lagged = len(self._span_a_lag) == self._span_a_lag.maxlen
+        span_a = self._span_a_lag[0] if lagged else NAN
+        span_b = self._span_b_lag[0] if lagged else NAN
+        row['senkou_span_a'], row['senkou_span_b'] = span_a, span_b
+
+        spans = [s for s in (span_a, span_b) if not _is_nan(s)]
+        cloud_top = max(spans) if spans else NAN
+        cloud_bottom = min(spans) if spans else NAN
+        row['cloud_green'] = _gt(span_a, span_b)
+        row['cloud_red'] = _lt(span_a, span_b)
+        row['price_above_cloud'] = _gt(close, cloud_top)
+        row['price_in_cloud'] = _ge(close, cloud_bottom) and _le(close, cloud_top)
+        row['price_below_cloud'] = _lt(close, cloud_bottom)
+        row['tk_cross_bull'] = _cross_up(tenkan, kijun, prev.get('tenkan_sen', NAN), prev.get('kijun_sen', NAN))
+        row['tk_cross_bear'] = _cross_down(tenkan, kijun, prev.get('tenkan_sen', NAN), prev.get('kijun_sen', NAN))
+
+    def update_frame(self, prices_df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Majukan engine dengan semua baris prices_df (kolom close, opsional high/low/volume)"""
+        close = prices_df['close'].to_numpy(dtype=float)
+        high = prices_df['high'].to_numpy(dtype=float) if 'high' in prices_df.columns else close
+        low = prices_df['low'].to_numpy(dtype=float) if 'low' in prices_df.columns else close
+        volume = prices_df['volume'].to_numpy(dtype=float) if 'volume' in prices_df.columns else None
+        index = prices_df.index
+
+        rows = []
+        for i in range(len(prices_df)):
+            checkpoint = self.snapshot(include_history=False) if i == len(prices_df) - 1 else None
+            rows.append(self.update(close[i], high[i], low[i],
+                                    None if volume is None else volume[i], index[i]))
+        if rows:
+            self._checkpoint = checkpoint
+        return rows
+
+    def matches_last(self, close: float, high: Optional[float] = None, low: Optional[float] = None,
+                     volume: Optional[float] = None) -> bool:
+        """Apakah candle terakhir yang diproses sama dengan nilai ini (normalisasi seperti update)"""
+        if not self._history:
+            return False
+        row = self._history[-1][1]
+        close = float(close)
+        candle = {
+            'close': close,
+            'high': close if high is None or _is_nan(high) else float(high),
+            'low': close if low is None or _is_nan(low) else float(low)
+        }
+        if volume is not None:
+            candle['volume'] = float(volume)
+        return all(
+            key in row and (row[key] == value or (_is_nan(row[key]) and _is_nan(value)))
+            for key, value in candle.items()
+        ) and ('volume' in row) == ('volume' in candle)
+
+    def rollback(self) -> bool:
+        """
+        Batalkan candle terakhir dari update_frame (mis. candle berjalan yang direvisi dengan
+        timestamp sama). False jika tidak ada checkpoint (update() langsung, atau engine hasil
+        restore), caller harus membangun ulang engine.
+        """
+        if self._checkpoint is None or not self._history:
+            return False
+        self._load_state(self._checkpoint)
+        self._history.pop()
+        self._checkpoint = None
+        return True
+
+    @classmethod
+    def from_history(cls, prices_df: pd.DataFrame, periods: Optional[Dict[str, Any]] = None,
+                     **kwargs) -> "StreamingIndicatorEngine":
+        """Engine yang sudah di-warm-up dengan seluruh histori harga"""
+        engine = cls(periods, **kwargs)
+        engine.update_frame(prices_df)
+        return engine
+
+    # ------------------------------------------------------------------
+    # Hasil
+    # ------------------------------------------------------------------
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return dict(self._history[-1][1]) if self._history else None
+
+    def frame(self, last: Optional[int] = None) -> pd.DataFrame:
+        """Baris hasil terakhir (maks. history_size) sebagai DataFrame, mis. untuk generate_alerts"""
+        entries = list(self._history)
+        if last is not None:
+            entries = entries[-last:]
+        if not entries:
+            return pd.DataFrame()
+        timestamps = [timestamp for timestamp, _ in entries]
+        index = pd.Index(timestamps) if all(t is not None for t in timestamps) else None
+        return pd.DataFrame([row for _, row in entries], index=index)
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def _components(self) -> Dict[str, Any]:
+        components = {
+            'macd_fast': self._macd_fast, 'macd_slow': self._macd_slow, 'macd_signal': self._macd_signal,
+            'rsi': self._rsi, 'stoch_low': self._stoch_low, 'stoch_high': self._stoch_high,
+            'stoch_d': self._stoch_d, 'bollinger': self._bollinger, 'atr': self._atr,
+            'adx_tr': self._adx_tr, 'adx_plus_dm': self._adx_plus_dm,
+            'adx_minus_dm': self._adx_minus_dm, 'adx': self._adx
+        }
+        for period in self.ma_periods:
+            components[f'sma_{period}'] = self._sma[period]
+            components[f'ema_{period}'] = self._ema[period]
+        for name, (highest, lowest) in self._ichimoku.items():
+            components[f'{name}_high'] = highest
+            components[f'{name}_low'] = lowest
+        return components
+
+    def snapshot(self, include_history: bool = True) -> Dict[str, Any]:
+        """State lengkap sebagai dict biasa (bisa di-pickle); lihat restore()"""
+        snapshot = {
+            'version': SNAPSHOT_VERSION,
+            'periods': dict(self.periods),
+            'history_size': self.history_size,
+            'count': self.count,
+            'obv': self.obv,
+            'last_timestamp': self.last_timestamp,
+            'prev': dict(self._prev),
+            'span_a_lag': list(self._span_a_lag),
+            'span_b_lag': list(self._span_b_lag),
+            'components': {name: c.get_state() for name, c in self._components().items()}
+        }
+        if include_history:
+            snapshot['history'] = [(timestamp, dict(row)) for timestamp, row in self._history]
+        return snapshot
+
+    def _load_state(self, snapshot: Dict[str, Any]):
+        self.count = snapshot['count']
+        self.obv = snapshot['obv']
+        self.last_timestamp = snapshot['last_timestamp']
+        self._prev = dict(snapshot['prev'])
+        self._span_a_lag.clear()
+        self._span_a_lag.extend(snapshot['span_a_lag'])
+        self._span_b_lag.clear()
+        self._span_b_lag.extend(snapshot['span_b_lag'])
+        for name, component in self._components().items():
+            component.set_state(snapshot['components'][name])
+
+    @classmethod
+    def restore(cls, snapshot: Dict[str, Any]) -> "StreamingIndicatorEngine":
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported streaming snapshot version: {snapshot.get('version')}")
+
+        engine = cls(snapshot['periods'], history_size=snapshot['history_size'])
+        engine._load_state(snapshot)
+        engine._history.extend((timestamp, dict(row)) for timestamp, row in snapshot['history'])
+        return engine
+
+
+class StreamingIndicatorStore:
+    """
+    Engine per (coin, set periode), LRU. advance() hanya memproses candle yang lebih baru
+    dari candle terakhir engine. Jika candle terakhir direvisi dengan timestamp sama
+    (candle yang masih berjalan), engine mundur satu langkah lalu memproses ulang; jika
+    histori tidak menyambung (gap/koreksi data), engine dibangun ulang dari histori penuh.
+    """
+
+    def __init__(self, max_engines: Optional[int] = None):
+        self.max_engines = max_engines or STREAMING_INDICATOR_CONFIG.get('max_engines', 1000)
+        self._engines: "OrderedDict[Tuple, StreamingIndicatorEngine]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self.incremental_updates = 0
+        self.revisions = 0
+        self.rebuilds = 0
+
+    def _key(self, coin: str, periods: Optional[Dict[str, Any]]) -> Tuple:
+        merged = dict(DEFAULT_PERIODS)
+        merged.update({k: v for k, v in (periods or {}).items() if k in DEFAULT_PERIODS})
+        return (coin, period_key(merged))
+
+    def get(self, coin: str, periods: Optional[Dict[str, Any]] = None) -> Optional[StreamingIndicatorEngine]:
+        with self._lock:
+            return self._engines.get(self._key(coin, periods))
+
+    def put(self, coin: str, engine: StreamingIndicatorEngine):
+        key = self._key(coin, engine.periods)
+        with self._lock:
+            self._engines[key] = engine
+            self._engines.move_to_end(key)
+            while len(self._engines) > self.max_engines:
+                self._engines.popitem(last=False)
+
+    def advance(self, coin: str, prices_df: pd.DataFrame,
+                periods: Optional[Dict[str, Any]] = None) -> StreamingIndicatorEngine:
+        """Sinkronkan engine (coin, periods) dengan prices_df (index waktu naik)"""
+        key = self._key(coin, periods)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                engine = self.get(coin, periods)
+                new_rows = None
+                if engine is not None and engine.last_timestamp is not None and len(prices_df):
+                    position = prices_df.index.searchsorted(engine.last_timestamp, side='right')
+                    if position > 0 and prices_df.index[position - 1] == engine.last_timestamp:
+                        last = prices_df.iloc[position - 1]
+                        if engine.matches_last(last['close'], last.get('high'), last.get('low'), last.get('volume')):
+                            new_rows = prices_df.iloc[position:]
+                        elif engine.rollback():
+                            # Candle terakhir direvisi: proses ulang mulai candle tersebut
+                            new_rows = prices_df.iloc[position - 1:]
+                            self.revisions += 1
+
+                if new_rows is None:
+                    engine = StreamingIndicatorEngine.from_history(prices_df, periods)
+                    self.rebuilds += 1
+                else:
+                    engine.update_frame(new_rows)
+                    self.incremental_updates += len(new_rows)
+
+                self.put(coin, engine)
+                return engine
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Snapshot semua engine: {coin: [snapshot engine, ...]}"""
+        with self._lock:
+            engines = list(self._engines.items())
+        result: Dict[str, Any] = {}
+        for (coin, _), engine in engines:
+            result.setdefault(coin, []).append(engine.snapshot())
+        return result
+
+    def restore(self, snapshots: Dict[str, Any]):
+        for coin, engine_snapshots in snapshots.items():
+            for engine_snapshot in engine_snapshots:
+                self.put(coin, StreamingIndicatorEngine.restore(engine_snapshot))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'engines': len(self._engines),
+                'incremental_updates': self.incremental_updates,
+                'revisions': self.revisions,
+                'rebuilds': self.rebuilds
+            }
+
+    def clear(self):
+        with self._lock:
+            self._engines.clear()
+
+
+_store: Optional[StreamingIndicatorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_streaming_store() -> StreamingIndicatorStore:
+    """Store engine streaming bersama untuk proses ini"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = StreamingIndicatorStore()
+    return _store
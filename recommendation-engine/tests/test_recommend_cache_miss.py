@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.api.recommend as recommend
+from src.api.recommendation_cache import RecommendationCache
+from src.api.single_flight import SingleFlight
+
+
+class StubModel:
+    """Model tanpa user_item_matrix: semua user diperlakukan cold-start"""
+
+    def get_cold_start_recommendations(self, user_interests=None, n=10):
+        return [
+            {'id': f'project-{i}', 'name': f'Project {i}', 'recommendation_score': 0.9 - i * 0.01}
+            for i in range(n)
+        ]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Cache in-memory (tanpa SQLite) dan flight baru per test
+    monkeypatch.setattr(recommend, '_user_recommendations_cache', RecommendationCache())
+    monkeypatch.setattr(recommend, '_recommendation_flights', SingleFlight("recommendations-test"))
+    monkeypatch.setattr(recommend, 'get_model', lambda model_type: StubModel())
+
+    app = FastAPI()
+    app.include_router(recommend.router)
+    return TestClient(app)
+
+
+def test_projects_cache_miss_then_hit(client):
+    payload = {'user_id': 'cache-miss-user', 'model_type': 'fecf', 'num_recommendations': 3}
+
+    response = client.post('/recommend/projects', json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['cache_hit'] is False
+    assert [rec['id'] for rec in body['recommendations']] == ['project-0', 'project-1', 'project-2']
+
+    # Response cache miss harus tersimpan di cache
+    response = client.post('/recommend/projects', json=payload)
+    assert response.status_code == 200
+    assert response.json()['cache_hit'] is True
+
+
+def test_batch_cache_miss(client):
+    payload = {'requests': [
+        {'user_id': 'batch-user-1', 'model_type': 'fecf', 'num_recommendations': 2},
+        {'user_id': 'batch-user-2', 'model_type': 'fecf', 'num_recommendations': 2},
+    ]}
+
+    response = client.post('/recommend/batch', json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body['error_count'] == 0
+    assert [item['status'] for item in body['results']] == ['success', 'success']
+    assert all(len(item['response']['recommendations']) == 2 for item in body['results'])
+
+    # Batch menulis ke cache yang sama dengan /projects
+    response = client.post('/recommend/projects', json=payload['requests'][0])
+    assert response.json()['cache_hit'] is True